@@ -0,0 +1,351 @@
+"""
+asset_bundler.py — Gridiron Gazette
+-----------------------------------
+Makes the rendered recap HTML self-contained: no network, no stray paths.
+
+  • Vendored copies of the template's fonts in ./fonts are declared with
+    @font-face, subset to the characters the gazette actually uses
+    (fontTools, optional). Subsets are cached in .cache/fonts by font file
+    hash + character set and shared by every gazette in a batch
+    (FontSubsetCache): inlined in standalone HTML, file:// URLs for the PDF.
+  • A remote font stylesheet (Google Fonts) is dropped only when every
+    family it loads is vendored; otherwise it stays, so a missing TTF means
+    the web font as before rather than a fallback face. Stylesheets whose
+    families can't be told (Typekit kits) always stay. Other remote
+    stylesheets are stripped.
+  • Logos are downscaled once to their print size (48pt ≈ 200px at 300 dpi)
+    and cached in .cache/assets, keyed by file + mtime.
+  • Each distinct image is included ONCE: in standalone HTML as a shared CSS
+    class (data URI), in the PDF path as one file:// URL that WeasyPrint
+    embeds a single time.
+  • url_fetcher() lets WeasyPrint read data:/file: URLs and the font hosts
+    of stylesheets that were kept; anything else on the network is refused.
+    With every font vendored, a render makes no network request at all.
+
+Vendored fonts (OFL, from fonts.google.com) — drop the TTFs into ./fonts:
+    Graduate-Regular.ttf, CourierPrime-Regular.ttf, CourierPrime-Bold.ttf
+
+Usage:
+
+    bundler = AssetBundler()
+    html = bundler.bundle_html(html, inline=True)    # standalone .html
+    html = bundler.bundle_html(html, inline=False)   # for WeasyPrint
+    HTML(string=html, base_url=".", url_fetcher=bundler.url_fetcher).write_pdf(out)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import hashlib
+import html as html_lib
+import io
+import logging
+import mimetypes
+import os
+import re
+import threading
+import urllib.parse
+
+logger = logging.getLogger(__name__)
+
+FONT_DIR = Path(os.getenv("GAZETTE_FONT_DIR", "fonts"))
+ASSET_CACHE_DIR = Path(os.getenv("GAZETTE_ASSET_CACHE", ".cache/assets"))
+FONT_CACHE_DIR = Path(os.getenv("GAZETTE_FONT_CACHE", ".cache/fonts"))
+MAX_LOGO_PX = 200  # 48pt team logos at 300 dpi
+
+# (css family, weight, style, file name) for faces the template uses
+FONT_FACES: Tuple[Tuple[str, int, str, str], ...] = (
+    ("Graduate", 400, "normal", "Graduate-Regular.ttf"),
+    ("Courier Prime", 400, "normal", "CourierPrime-Regular.ttf"),
+    ("Courier Prime", 700, "normal", "CourierPrime-Bold.ttf"),
+)
+
+# Always kept in font subsets: ASCII, Latin-1 and typographic punctuation.
+BASE_CHARSET = "".join(chr(c) for c in range(0x20, 0x7F)) + "".join(chr(c) for c in range(0xA0, 0x100)) + "–—‘’“”•…€™"
+
+_REMOTE_LINK_RE = re.compile(r"<link\b[^>]*\bhref=\"(https?://[^\"]*)\"[^>]*>\s*", re.IGNORECASE)
+_REMOTE_IMPORT_RE = re.compile(r"@import\s+url\(\s*['\"]?(https?://[^)'\"]*)['\"]?\s*\)\s*;?", re.IGNORECASE)
+# Font CDNs: their stylesheets (and the font files those load) are kept for faces we don't vendor
+FONT_HOSTS = ("fonts.googleapis.com", "fonts.gstatic.com", "use.typekit.net", "p.typekit.net")
+_IMG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+_ATTR_RE = r'\b{name}="([^"]*)"'
+_TRANSPARENT_GIF = "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+
+try:
+    from fontTools import subset as ft_subset
+    from fontTools.ttLib import TTFont
+except ImportError:
+    ft_subset = None
+    TTFont = None
+
+@dataclass
+class BundleStats:
+    images: int = 0                 # distinct images bundled
+    image_refs: int = 0             # <img> tags rewritten
+    image_bytes_in: int = 0
+    image_bytes_out: int = 0
+    fonts: List[str] = field(default_factory=list)
+    missing_fonts: List[str] = field(default_factory=list)
+    remote_refs_removed: int = 0
+    remote_fonts_kept: int = 0      # font stylesheets left in for faces that aren't vendored
+    network_blocked: int = 0
+
+def _local_path(src: str) -> Optional[Path]:
+    if src.startswith("file://"):
+        src = urllib.parse.unquote(urllib.parse.urlparse(src).path)
+    elif re.match(r"^[a-z][a-z0-9+.-]*:", src, re.IGNORECASE) and not re.match(r"^[a-z]:[\\/]", src, re.IGNORECASE):
+        return None  # data:, http:, etc.
+    p = Path(src)
+    return p if p.is_file() else None
+
+def _is_font_host(url: str) -> bool:
+    return (urllib.parse.urlsplit(url).hostname or "").lower() in FONT_HOSTS
+
+def linked_families(url: str) -> List[str]:
+    """Families a Google Fonts stylesheet URL loads (css and css2 syntax); [] when it can't be told."""
+    if (urllib.parse.urlsplit(url).hostname or "").lower() != "fonts.googleapis.com":
+        return []
+    families = []
+    for value in urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get("family", []):
+        for part in value.split("|"):
+            name = part.split(":", 1)[0].strip()
+            if name:
+                families.append(name)
+    return families
+
+def _data_uri(data: bytes, mime: str) -> str:
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+def visible_text(html: str) -> str:
+    """Characters that can appear on the page (tags/styles/scripts removed)."""
+    body = re.sub(r"<(style|script)\b.*?</\1>", " ", html, flags=re.IGNORECASE | re.DOTALL)
+    return html_lib.unescape(re.sub(r"<[^>]+>", " ", body))
+
+def subset_font(path: Path, text: str) -> bytes:
+    """TrueType bytes of ``path`` limited to ``text``'s characters (needs fontTools)."""
+    options = ft_subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    font = TTFont(str(path))
+    subsetter = ft_subset.Subsetter(options)
+    subsetter.populate(text="".join(sorted(set(text))) + " ")
+    subsetter.subset(font)
+    buf = io.BytesIO()
+    font.save(buf)
+    return buf.getvalue()
+
+class FontSubsetCache:
+    """
+    Subset fonts once per (font file, character set), on disk.
+
+    Every subset covers BASE_CHARSET plus whatever else the page uses, so
+    the gazettes in a batch — different leagues, same alphabet — almost
+    always resolve to the same key and reuse one subset (across processes,
+    since the cache lives in .cache/fonts).
+    """
+
+    def __init__(self, cache_dir: Path = FONT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory: Dict[str, bytes] = {}
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def font_digest(self, path: Path) -> str:
+        """sha1 of the font file (hashed once per path + mtime + size)."""
+        st = path.stat()
+        key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+        if key not in self._digests:
+            self._digests[key] = hashlib.sha1(path.read_bytes()).hexdigest()
+        return self._digests[key]
+
+    def key(self, path: Path, text: str) -> str:
+        chars = "".join(sorted(set(text) | set(BASE_CHARSET)))
+        return hashlib.sha1(f"{self.font_digest(path)}|{chars}".encode("utf-8")).hexdigest()[:20]
+
+    def get(self, path: Path, text: str) -> Tuple[bytes, Path]:
+        """(font bytes, file holding them): the cached subset, or the full font if it can't be subset."""
+        if ft_subset is None:
+            return path.read_bytes(), path
+        key = self.key(path, text)
+        out = self.cache_dir / f"{path.stem}-{key}.ttf"
+        with self._lock:
+            if key in self._memory:
+                self.hits += 1
+                return self._memory[key], out
+            if out.exists():
+                self.hits += 1
+                self._memory[key] = out.read_bytes()
+                return self._memory[key], out
+            self.misses += 1
+            try:
+                data = subset_font(path, text + BASE_CHARSET)
+            except Exception as e:
+                logger.warning(f"Could not subset {path}: {e}; embedding the full font")
+                return path.read_bytes(), path
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = out.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, out)  # atomic: parallel builds never read a half-written font
+            self._memory[key] = data
+            return data, out
+
+_FONT_CACHE: Optional[FontSubsetCache] = None
+
+def get_font_cache() -> FontSubsetCache:
+    """Process-wide subset cache shared by every AssetBundler."""
+    global _FONT_CACHE
+    if _FONT_CACHE is None:
+        _FONT_CACHE = FontSubsetCache()
+    return _FONT_CACHE
+
+class AssetBundler:
+    def __init__(
+        self,
+        font_dir: Path = FONT_DIR,
+        cache_dir: Path = ASSET_CACHE_DIR,
+        max_logo_px: int = MAX_LOGO_PX,
+        font_cache: Optional[FontSubsetCache] = None,
+    ):
+        self.font_dir = Path(font_dir)
+        self.cache_dir = Path(cache_dir)
+        self.max_logo_px = max_logo_px
+        self.font_cache = font_cache or get_font_cache()
+        self.stats = BundleStats()
+        self._images: Dict[str, Path] = {}   # source path -> print-sized copy
+
+    # ---------- images ----------
+    def prepare_image(self, path: Path) -> Path:
+        """Print-sized PNG copy of ``path`` (cached on disk by source + mtime)."""
+        key = str(path.resolve())
+        if key in self._images:
+            return self._images[key]
+        st = path.stat()
+        digest = hashlib.sha1(f"{key}|{st.st_mtime_ns}|{st.st_size}|{self.max_logo_px}".encode()).hexdigest()[:16]
+        out = self.cache_dir / f"{path.stem}-{digest}.png"
+        if not out.exists():
+            try:
+                from PIL import Image
+                im = Image.open(path)
+                im = im.convert("RGBA") if im.mode not in ("RGB", "RGBA") else im
+                im.thumbnail((self.max_logo_px, self.max_logo_px))
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                im.save(out, format="PNG", optimize=True)
+            except Exception as e:
+                logger.warning(f"Could not downscale {path}: {e}; using original")
+                out = path
+        self._images[key] = out
+        self.stats.images += 1
+        self.stats.image_bytes_in += st.st_size
+        self.stats.image_bytes_out += out.stat().st_size
+        return out
+
+    def _rewrite_images(self, html: str, inline: bool) -> Tuple[str, str]:
+        classes: Dict[Path, str] = {}
+        css: List[str] = []
+
+        def repl(m: "re.Match[str]") -> str:
+            tag = m.group(0)
+            src_m = re.search(_ATTR_RE.format(name="src"), tag)
+            path = _local_path(html_lib.unescape(src_m.group(1))) if src_m else None
+            if path is None:
+                return tag
+            small = self.prepare_image(path)
+            self.stats.image_refs += 1
+            if not inline:
+                return tag.replace(src_m.group(0), f'src="{small.resolve().as_uri()}"')
+            if small not in classes:
+                classes[small] = f"gz-asset-{len(classes)}"
+                mime = mimetypes.guess_type(small.name)[0] or "image/png"
+                css.append(f".{classes[small]}{{background:url({_data_uri(small.read_bytes(), mime)}) center/contain no-repeat}}")
+            tag = tag.replace(src_m.group(0), f'src="{_TRANSPARENT_GIF}"')
+            cls_m = re.search(_ATTR_RE.format(name="class"), tag)
+            if cls_m:
+                return tag.replace(cls_m.group(0), f'class="{cls_m.group(1)} {classes[small]}"')
+            return tag.replace("<img", f'<img class="{classes[small]}"', 1)
+
+        return _IMG_RE.sub(repl, html), "\n".join(css)
+
+    # ---------- fonts ----------
+    def font_css(self, text: str, inline: bool) -> str:
+        rules = []
+        for family, weight, style, filename in FONT_FACES:
+            path = self.font_dir / filename
+            if not path.is_file():
+                if filename not in self.stats.missing_fonts:
+                    self.stats.missing_fonts.append(filename)
+                continue
+            data, out = self.font_cache.get(path, text)
+            src = _data_uri(data, "font/ttf") if inline else out.resolve().as_uri()
+            rules.append(
+                f"@font-face{{font-family:'{family}';font-weight:{weight};font-style:{style};"
+                f"src:url({src}) format('truetype')}}"
+            )
+            if f"{family} {weight}" not in self.stats.fonts:   # once per face, however many pages
+                self.stats.fonts.append(f"{family} {weight}")
+        if self.stats.missing_fonts:
+            logger.info(
+                f"Fonts not vendored in {self.font_dir}/ ({', '.join(self.stats.missing_fonts)}); "
+                "keeping their web font stylesheets"
+            )
+        return "\n".join(rules)
+
+    def vendored_families(self) -> List[str]:
+        """Families with every face the template uses present in font_dir."""
+        families = {family for family, _, _, _ in FONT_FACES}
+        for family, _, _, filename in FONT_FACES:
+            if not (self.font_dir / filename).is_file():
+                families.discard(family)
+        return sorted(families)
+
+    def _strip_remote(self, html: str) -> str:
+        vendored = set(self.vendored_families())
+
+        def repl(m: "re.Match[str]") -> str:
+            url = html_lib.unescape(m.group(1))
+            if _is_font_host(url):
+                families = linked_families(url)
+                if not families or not set(families) <= vendored:
+                    self.stats.remote_fonts_kept += 1
+                    return m.group(0)   # a face we can't serve locally: keep the web font
+            self.stats.remote_refs_removed += 1
+            return ""
+
+        return _REMOTE_IMPORT_RE.sub(repl, _REMOTE_LINK_RE.sub(repl, html))
+
+    # ---------- html ----------
+    def bundle_html(self, html: str, inline: bool = True) -> str:
+        """Strip network references, declare local fonts, and rewrite images (see module docstring)."""
+        html = self._strip_remote(html)
+
+        html, image_css = self._rewrite_images(html, inline)
+        style = "\n".join(s for s in (self.font_css(visible_text(html), inline), image_css) if s)
+        if style:
+            block = f"<style>\n{style}\n</style>\n"
+            head_end = re.search(r"</head>", html, re.IGNORECASE)
+            html = html[:head_end.start()] + block + html[head_end.start():] if head_end else block + html
+        return html
+
+    def url_fetcher(self, url: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """WeasyPrint url_fetcher: local files, data: URLs and font hosts only."""
+        if url.startswith(("http://", "https://")) and not _is_font_host(url):
+            self.stats.network_blocked += 1
+            logger.debug(f"Blocked network fetch during render: {url}")
+            raise ValueError(f"Network access disabled for gazette renders: {url}")
+        from weasyprint import default_url_fetcher
+        return default_url_fetcher(url, *args, **kwargs)
+
+    def summary(self) -> str:
+        s = self.stats
+        saved = (s.image_bytes_in - s.image_bytes_out) / 1024
+        return (
+            f"Assets: {s.images} image(s) for {s.image_refs} reference(s) ({saved:.0f} KB saved by downscaling), "
+            f"fonts [{', '.join(s.fonts) or 'web fonts only'}] (subset cache {self.font_cache.hits} hit / "
+            f"{self.font_cache.misses} miss), {s.remote_refs_removed} remote reference(s) removed, "
+            f"{s.remote_fonts_kept} web font stylesheet(s) kept, "
+            f"{s.network_blocked} network fetch(es) blocked"
+        )
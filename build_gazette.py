@@ -20,6 +20,7 @@ except Exception:
 
 # Our builder - now uses HTML/PDF version
 import weekly_recap
+import render_orchestrator
 
 log = logging.getLogger("build_gazette")
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -41,7 +42,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     p.add_argument("--week",
                    type=int,
                    default=None,
-                   help="Week number; if omitted uses league.current_week")
+                   help="Week number; if omitted uses the latest final week (season_calendar)")
     p.add_argument("--template",
                    default=os.getenv("TEMPLATE", "templates/recap_template.html"),
                    help="Path to the HTML template")
@@ -55,6 +56,15 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     llm.add_argument("--no-llm", dest="llm_blurbs", action="store_false",
                      help="Disable LLM (use simple fallback blurbs)")
     p.set_defaults(llm_blurbs=bool(os.getenv("LLM_BLURBS", "1") != "0"))
+    p.add_argument("--batch-recaps", action="store_true",
+                   default=bool(os.getenv("BATCH_RECAPS", "0") != "0"),
+                   help="Generate all recaps in one LLM request (per-matchup fallback only for failures)")
+    p.add_argument("--stream-recaps", action="store_true",
+                   default=bool(os.getenv("STREAM_RECAPS", "0") != "0"),
+                   help="Stream recaps and stop generating once the word limit is reached")
+    p.add_argument("--formats",
+                   default=os.getenv("GAZETTE_FORMATS", "pdf"),
+                   help="Comma-separated outputs from one render pass: pdf, html, docx, cards (or 'all')")
     
     p.add_argument("--verbose", action="store_true", help="Verbose logging")
     p.add_argument("--debug", action="store_true", help="Print traceback on failure")
@@ -168,6 +178,26 @@ def main(argv: list[str] | None = None) -> None:
     try:
         log.info(f"Building Gazette for League {args.league_id}, Year {args.year}")
         
+        formats = render_orchestrator.parse_formats(args.formats)
+        if formats != ["pdf"]:
+            # One context, several writers in parallel (PDF/HTML/DOCX/share cards)
+            report = render_orchestrator.render_all(
+                league_id=int(args.league_id),
+                year=int(args.year),
+                week=args.week,
+                formats=formats,
+                output=str(Path(str(args.output)).with_suffix("")),
+                html_template=str(tpl),
+                use_llm_blurbs=bool(args.llm_blurbs),
+                batch_recaps=bool(args.batch_recaps),
+                stream_recaps=bool(args.stream_recaps),
+            )
+            failed = [fmt for fmt, r in report.results.items() if not r.ok]
+            if failed:
+                raise RuntimeError(f"Writer(s) failed: {', '.join(failed)}")
+            log.info(f"✅ Gazette built successfully: {len(formats)} format(s)")
+            return
+        
         out_path = weekly_recap.build_weekly_recap(
             league_id=int(args.league_id),
             year=int(args.year),
@@ -175,6 +205,8 @@ def main(argv: list[str] | None = None) -> None:
             template=str(tpl),
             output_path=str(args.output),
             use_llm_blurbs=bool(args.llm_blurbs),
+            batch_recaps=bool(args.batch_recaps),
+            stream_recaps=bool(args.stream_recaps),
         )
         
         log.info(f"✅ Gazette built successfully: {out_path}")
@@ -6,10 +6,19 @@ Focuses exclusively on fixing:
 - Margin consistency
 - Blank page removal
 - Table alignment issues
+
+All fixes run as DocxFix visitors inside one DocxTransform: the document is
+opened once, walked once (sections, then body blocks) and saved once.
+`python document_formatter.py --benchmark file.docx` prints the time per
+document and per fix.
 """
 
 import logging
+import shutil
+import tempfile
+import time
 from pathlib import Path
+from typing import Dict, List, Optional
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.section import WD_SECTION, WD_ORIENTATION
@@ -17,41 +26,102 @@ from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
+from docx.table import Table
 
 logger = logging.getLogger(__name__)
 
 
-def fix_document_formatting(doc_path: str) -> bool:
+# =====================
+# Single-pass transform
+# =====================
+class DocxFix:
+    """
+    One formatting fix. Override only the hooks it needs; DocxTransform
+    calls them during a single walk of the document.
+    """
+    name = "fix"
+
+    def start(self, doc: Document) -> None:
+        pass
+
+    def section(self, section) -> None:
+        pass
+
+    def body_paragraph(self, paragraph, index: int, text: str) -> None:
+        """Top-level body paragraph ``index`` (``text`` is already stripped)."""
+
+    def table(self, table) -> None:
+        pass
+
+    def finish(self, doc: Document) -> None:
+        pass
+
+
+class DocxTransform:
+    """
+    Applies every registered fix in one traversal: sections once (margins,
+    header/footer), body once (paragraphs and tables), then one save.
+    """
+
+    def __init__(self, fixes: List[DocxFix]):
+        self.fixes = list(fixes)
+        self.timings: Dict[str, float] = {}
+
+    def _call(self, fix: DocxFix, hook: str, *args) -> None:
+        t0 = time.perf_counter()
+        getattr(fix, hook)(*args)
+        self.timings[fix.name] = self.timings.get(fix.name, 0.0) + time.perf_counter() - t0
+
+    def apply_to(self, doc: Document) -> Document:
+        for fix in self.fixes:
+            self._call(fix, "start", doc)
+        for section in doc.sections:
+            for fix in self.fixes:
+                self._call(fix, "section", section)
+        index = 0
+        for block in doc.iter_inner_content():
+            if isinstance(block, Table):
+                for fix in self.fixes:
+                    self._call(fix, "table", block)
+                continue
+            text = block.text.strip()
+            for fix in self.fixes:
+                self._call(fix, "body_paragraph", block, index, text)
+            index += 1
+        for fix in self.fixes:
+            self._call(fix, "finish", doc)
+        return doc
+
+    def run(self, doc_path: str) -> None:
+        doc = Document(doc_path)
+        self.apply_to(doc)
+        doc.save(doc_path)
+
+
+def default_fixes() -> List[DocxFix]:
+    """The gazette's standard fixes, in the order they must apply."""
+    return [MarginFix(), HeaderFooterFix(), BlankPageFix(), TableFix(), ParagraphSpacingFix()]
+
+
+def fix_document_formatting(doc_path: str, gradient_png: Optional[str] = None) -> bool:
     """
     Main function to fix all formatting issues in the generated document.
     
     Args:
         doc_path: Path to the DOCX file to fix
+        gradient_png: Optional footer gradient image (footer_gradient), applied
+            in the same pass instead of re-opening the document
         
     Returns:
         True if successful, False otherwise
     """
     try:
         logger.info(f"Fixing formatting for: {doc_path}")
-        doc = Document(doc_path)
-        
-        # Fix 1: Consistent margins to prevent sliding
-        _fix_margins_and_sections(doc)
-        
-        # Fix 2: Header/Footer alignment for gradient
-        _fix_header_footer_alignment(doc)
-        
-        # Fix 3: Remove blank pages
-        _remove_blank_pages(doc)
-        
-        # Fix 4: Fix table formatting
-        _fix_table_formatting(doc)
-        
-        # Fix 5: Consistent paragraph spacing
-        _fix_paragraph_spacing(doc)
-        
-        # Save the fixed document
-        doc.save(doc_path)
+        fixes = default_fixes()
+        if gradient_png:
+            from footer_gradient import FooterGradientFix
+            fixes.append(FooterGradientFix(gradient_png))
+        DocxTransform(fixes).run(doc_path)
         logger.info("✅ Formatting fixes applied successfully")
         return True
         
@@ -60,11 +130,16 @@ def fix_document_formatting(doc_path: str) -> bool:
         return False
 
 
-def _fix_margins_and_sections(doc: Document):
+class MarginFix(DocxFix):
     """
     Fix margins and section settings to prevent sliding and ensure consistency.
     """
-    for section in doc.sections:
+    name = "margins"
+
+    def start(self, doc: Document) -> None:
+        self.count = 0
+
+    def section(self, section) -> None:
         # Set consistent margins (prevent sliding)
         section.top_margin = Inches(1.0)  # Slightly larger for header space
         section.bottom_margin = Inches(1.0)  # Slightly larger for footer space
@@ -80,29 +155,27 @@ def _fix_margins_and_sections(doc: Document):
         section.header_distance = Inches(0.5)
         section.footer_distance = Inches(0.5)
         
-        # Ensure sections are continuous (no unnecessary page breaks)
-        if section != doc.sections[0]:  # Keep first section as is
-            section.start_type = WD_SECTION.CONTINUOUS
-    
-    logger.debug(f"Fixed margins for {len(doc.sections)} sections")
+        # Ensure sections are continuous (no unnecessary page breaks). This has
+        # always applied to every section, the first included: the old
+        # `section != doc.sections[0]` check compared two fresh proxy objects.
+        section.start_type = WD_SECTION.CONTINUOUS
+        self.count += 1
 
+    def finish(self, doc: Document) -> None:
+        logger.debug(f"Fixed margins for {self.count} sections")
 
-def _fix_header_footer_alignment(doc: Document):
+
+class HeaderFooterFix(DocxFix):
     """
     Fix header and footer alignment to prevent gradient sliding.
     This ensures headers/footers span the full width properly.
     """
-    for section in doc.sections:
+    name = "header_footer"
+
+    def section(self, section) -> None:
         # Fix header
-        header = section.header
-        for paragraph in header.paragraphs:
-            # Ensure full width alignment
-            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-            paragraph_format = paragraph.paragraph_format
-            paragraph_format.left_indent = Inches(0)
-            paragraph_format.right_indent = Inches(0)
-            paragraph_format.space_before = Pt(0)
-            paragraph_format.space_after = Pt(0)
+        for paragraph in section.header.paragraphs:
+            self._align(paragraph)
             
             # If this is a gradient/background paragraph
             if not paragraph.text.strip():
@@ -110,33 +183,38 @@ def _fix_header_footer_alignment(doc: Document):
                 for run in paragraph.runs:
                     if hasattr(run, '_element'):
                         # Check for shading/background
-                        rPr = run._element.get_or_add_rPr()
-                        # Ensure full width coverage
+                        run._element.get_or_add_rPr()
         
         # Fix footer
-        footer = section.footer
-        for paragraph in footer.paragraphs:
-            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-            paragraph_format = paragraph.paragraph_format
-            paragraph_format.left_indent = Inches(0)
-            paragraph_format.right_indent = Inches(0)
-            paragraph_format.space_before = Pt(0)
-            paragraph_format.space_after = Pt(0)
-    
-    logger.debug("Fixed header/footer alignment")
+        for paragraph in section.footer.paragraphs:
+            self._align(paragraph)
+
+    @staticmethod
+    def _align(paragraph) -> None:
+        # Ensure full width alignment
+        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
+        paragraph_format = paragraph.paragraph_format
+        paragraph_format.left_indent = Inches(0)
+        paragraph_format.right_indent = Inches(0)
+        paragraph_format.space_before = Pt(0)
+        paragraph_format.space_after = Pt(0)
 
+    def finish(self, doc: Document) -> None:
+        logger.debug("Fixed header/footer alignment")
 
-def _remove_blank_pages(doc: Document):
+
+class BlankPageFix(DocxFix):
     """
     Remove blank pages caused by excessive empty paragraphs and page breaks.
     """
-    paragraphs_to_delete = []
-    consecutive_empty = 0
-    last_paragraph_with_content = None
-    
-    for i, paragraph in enumerate(doc.paragraphs):
-        text = paragraph.text.strip()
-        
+    name = "blank_pages"
+
+    def start(self, doc: Document) -> None:
+        self.paragraphs_to_delete = []
+        self.consecutive_empty = 0
+        self.last_paragraph_with_content = None
+
+    def body_paragraph(self, paragraph, index: int, text: str) -> None:
         # Check if paragraph has any real content
         has_content = bool(text)
         
@@ -152,52 +230,52 @@ def _remove_blank_pages(doc: Document):
                         has_content = True
                         break
         
-        if not has_content:
-            consecutive_empty += 1
-            
-            # Keep maximum 1 empty paragraph for spacing
-            if consecutive_empty > 1:
-                paragraphs_to_delete.append(paragraph)
-            
-            # Check for page breaks in empty paragraphs
-            if hasattr(paragraph, '_element'):
-                page_breaks = paragraph._element.xpath('.//w:br[@w:type="page"]')
-                column_breaks = paragraph._element.xpath('.//w:br[@w:type="column"]')
-                
-                # Remove unnecessary breaks
-                if page_breaks or column_breaks:
-                    # Only keep if there was substantial content before
-                    if last_paragraph_with_content and i - last_paragraph_with_content > 3:
-                        # Keep the break
-                        pass
-                    else:
-                        # Remove the break
-                        for br in page_breaks + column_breaks:
-                            br.getparent().remove(br)
-                        # Mark paragraph for deletion if now empty
-                        if consecutive_empty > 1:
-                            if paragraph not in paragraphs_to_delete:
-                                paragraphs_to_delete.append(paragraph)
-        else:
-            consecutive_empty = 0
-            last_paragraph_with_content = i
-    
-    # Delete marked paragraphs
-    for paragraph in paragraphs_to_delete:
-        try:
-            p = paragraph._element
-            p.getparent().remove(p)
-        except:
-            pass  # Paragraph might already be removed
-    
-    logger.debug(f"Removed {len(paragraphs_to_delete)} empty paragraphs")
+        if has_content:
+            self.consecutive_empty = 0
+            self.last_paragraph_with_content = index
+            return
 
+        self.consecutive_empty += 1
+        
+        # Keep maximum 1 empty paragraph for spacing
+        if self.consecutive_empty > 1:
+            self.paragraphs_to_delete.append(paragraph._element)
+        
+        # Check for page breaks in empty paragraphs
+        page_breaks = paragraph._element.xpath('.//w:br[@w:type="page"]')
+        column_breaks = paragraph._element.xpath('.//w:br[@w:type="column"]')
+        
+        # Remove unnecessary breaks
+        if page_breaks or column_breaks:
+            # Only keep if there was substantial content before
+            if self.last_paragraph_with_content and index - self.last_paragraph_with_content > 3:
+                # Keep the break
+                pass
+            else:
+                # Remove the break
+                for br in page_breaks + column_breaks:
+                    br.getparent().remove(br)
 
-def _fix_table_formatting(doc: Document):
+    def finish(self, doc: Document) -> None:
+        # Delete marked paragraphs
+        for p in self.paragraphs_to_delete:
+            if p.getparent() is not None:
+                p.getparent().remove(p)
+        
+        logger.debug(f"Removed {len(self.paragraphs_to_delete)} empty paragraphs")
+
+
+class TableFix(DocxFix):
     """
     Fix table formatting to prevent margin overflow and ensure proper alignment.
     """
-    for table in doc.tables:
+    name = "tables"
+
+    def start(self, doc: Document) -> None:
+        self.count = 0
+
+    def table(self, table) -> None:
+        self.count += 1
         # Set table alignment to center
         table.alignment = WD_TABLE_ALIGNMENT.CENTER
         
@@ -257,44 +335,50 @@ def _fix_table_formatting(doc: Document):
                     paragraph.paragraph_format.space_after = Pt(3)
                     paragraph.paragraph_format.space_before = Pt(3)
                     paragraph.paragraph_format.line_spacing = 1.0
-    
-    logger.debug(f"Fixed formatting for {len(doc.tables)} tables")
+
+    def finish(self, doc: Document) -> None:
+        logger.debug(f"Fixed formatting for {self.count} tables")
 
 
-def _fix_paragraph_spacing(doc: Document):
+class ParagraphSpacingFix(DocxFix):
     """
     Fix paragraph spacing to be consistent throughout the document.
     """
-    for paragraph in doc.paragraphs:
-        if paragraph.text.strip():  # Only for non-empty paragraphs
-            pf = paragraph.paragraph_format
-            
-            # Check if it's a heading (usually has larger font or bold)
-            is_heading = False
-            if paragraph.runs:
-                first_run = paragraph.runs[0]
-                if first_run.bold or (first_run.font.size and first_run.font.size > Pt(12)):
-                    is_heading = True
-            
-            if is_heading:
-                # Heading spacing
-                pf.space_before = Pt(12)
-                pf.space_after = Pt(6)
-            else:
-                # Normal paragraph spacing
-                pf.space_before = Pt(6)
-                pf.space_after = Pt(6)
-            
-            # Consistent line spacing
-            pf.line_spacing = 1.15
-            
-            # Remove any indentation that might cause margin issues
-            if pf.left_indent and pf.left_indent > Inches(0.5):
-                pf.left_indent = Inches(0)
-            if pf.right_indent and pf.right_indent > Inches(0.5):
-                pf.right_indent = Inches(0)
-    
-    logger.debug("Fixed paragraph spacing")
+    name = "spacing"
+
+    def body_paragraph(self, paragraph, index: int, text: str) -> None:
+        if not text:  # Only for non-empty paragraphs
+            return
+        pf = paragraph.paragraph_format
+        
+        # Check if it's a heading (usually has larger font or bold)
+        is_heading = False
+        runs = paragraph.runs
+        if runs:
+            first_run = runs[0]
+            if first_run.bold or (first_run.font.size and first_run.font.size > Pt(12)):
+                is_heading = True
+        
+        if is_heading:
+            # Heading spacing
+            pf.space_before = Pt(12)
+            pf.space_after = Pt(6)
+        else:
+            # Normal paragraph spacing
+            pf.space_before = Pt(6)
+            pf.space_after = Pt(6)
+        
+        # Consistent line spacing
+        pf.line_spacing = 1.15
+        
+        # Remove any indentation that might cause margin issues
+        if pf.left_indent and pf.left_indent > Inches(0.5):
+            pf.left_indent = Inches(0)
+        if pf.right_indent and pf.right_indent > Inches(0.5):
+            pf.right_indent = Inches(0)
+
+    def finish(self, doc: Document) -> None:
+        logger.debug("Fixed paragraph spacing")
 
 
 def apply_formatting_fixes(doc_path: str) -> str:
@@ -329,10 +413,40 @@ def post_process_with_formatting(doc_path: str):
     return apply_formatting_fixes(doc_path)
 
 
+def benchmark(doc_path: str, runs: int = 20, gradient_png: Optional[str] = None) -> Dict[str, float]:
+    """Average milliseconds per document (open + transform + save) and per fix, on scratch copies."""
+    src = Path(doc_path)
+    totals: Dict[str, float] = {}
+    work = Path(tempfile.mkdtemp(prefix="docx_bench_"))
+    try:
+        for i in range(runs):
+            copy = work / f"{i}.docx"
+            shutil.copyfile(src, copy)
+            fixes = default_fixes()
+            if gradient_png:
+                from footer_gradient import FooterGradientFix
+                fixes.append(FooterGradientFix(gradient_png))
+            transform = DocxTransform(fixes)
+            t0 = time.perf_counter()
+            transform.run(str(copy))
+            totals["total"] = totals.get("total", 0.0) + time.perf_counter() - t0
+            for name, seconds in transform.timings.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {name: round(seconds * 1000 / runs, 2) for name, seconds in totals.items()}
+
+
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+        runs = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+        results = benchmark(sys.argv[2], runs=runs)
+        print(f"Per document ({runs} runs): {results.pop('total'):.1f} ms")
+        for name, ms in results.items():
+            print(f"  {name:<14} {ms:8.2f} ms")
+    elif len(sys.argv) > 1:
         doc_file = sys.argv[1]
         print(f"Applying formatting fixes to: {doc_file}")
         try:
@@ -343,6 +457,7 @@ if __name__ == "__main__":
     else:
         print("Document Formatting Fix Tool")
         print("Usage: python document_formatter.py <path_to_docx>")
+        print("       python document_formatter.py --benchmark <path_to_docx> [runs]")
         print("\nThis tool fixes:")
         print("  • Header/footer gradient sliding")
         print("  • Inconsistent margins")
@@ -0,0 +1,330 @@
+"""
+docx_template.py — Gridiron Gazette
+-----------------------------------
+Precompiled DOCX templates: render by concatenating bytes.
+
+docxtpl parses and re-serialises the whole document XML on every render.
+The gazette templates only use plain {{ NAME }} placeholders, so a template
+is compiled ONCE into (templates with {% %} control tags raise
+UnsupportedTemplate and stay on docxtpl):
+
+  • templated parts (document, headers, footers, ...): static byte segments
+    with placeholder slots between them. Tags Word split across runs
+    ({{</w:t></w:r><w:r><w:t>LEAGUE_LOGO}}) are merged the way docxtpl does,
+  • every other part: its already-compressed zip record, copied into the
+    output verbatim (no inflate, no deflate).
+
+Rendering joins segments with XML-escaped values, deflates just the
+templated parts, and splices in images (DocxImage) as inline drawings with
+their media part, relationship and content type. A .dotx compiles directly
+(its main content type is switched to .docx). Compiled templates are cached
+in memory and pickled under .cache/templates by file hash.
+
+Usage:
+
+    tpl = load_template("GridironGazette.dotx")
+    data = tpl.render({"WEEK_NUMBER": 5, "LEAGUE_LOGO": DocxImage("logos/league.png", width_mm=28)})
+    Path("out.docx").write_bytes(data)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import pickle
+import re
+import struct
+import threading
+import zipfile
+import zlib
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_DIR = Path(os.getenv("GAZETTE_TEMPLATE_CACHE", ".cache/templates"))
+FORMAT_VERSION = 1  # bump when the compiled layout changes
+
+DOTX_MAIN_TYPE = b"application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml"
+DOCX_MAIN_TYPE = b"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+IMAGE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+EMU_PER_MM = 36000
+
+_TAG_RE = re.compile(rb"\{\{(?:(?!\}\}).)*\}\}", re.DOTALL)
+_XML_TAG_RE = re.compile(rb"<[^>]*>")
+_ROOT_TAG_RE = re.compile(rb"<[A-Za-z][^>]*>")
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_NAMESPACES = {
+    b"xmlns:r=": b'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"',
+    b"xmlns:wp=": b'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"',
+}
+
+class UnsupportedTemplate(ValueError):
+    """The template needs Jinja control flow ({% for %}, ...), which only docxtpl handles."""
+
+@dataclass(frozen=True)
+class DocxImage:
+    """An image placeholder value (the compiled-template counterpart of docxtpl's InlineImage)."""
+    path: str
+    width_mm: Optional[float] = None
+    height_mm: Optional[float] = None
+
+# ==========
+# Zip records
+# ==========
+@dataclass
+class _ZipRecord:
+    """One zip member, already compressed: enough to write its local + central headers."""
+    name: str
+    method: int
+    crc: int
+    usize: int
+    data: bytes              # compressed bytes
+    date_time: Tuple[int, ...] = (1980, 1, 1, 0, 0, 0)
+
+    @classmethod
+    def build(cls, name: str, payload: bytes, date_time: Tuple[int, ...] = (1980, 1, 1, 0, 0, 0)) -> "_ZipRecord":
+        c = zlib.compressobj(6, zlib.DEFLATED, -15)
+        return cls(name, zipfile.ZIP_DEFLATED, zlib.crc32(payload), len(payload), c.compress(payload) + c.flush(), date_time)
+
+    def _dos(self) -> Tuple[int, int]:
+        y, mo, d, h, mi, s = self.date_time[:6]
+        return (h << 11) | (mi << 5) | (s // 2), ((max(y, 1980) - 1980) << 9) | (mo << 5) | d
+
+def _write_zip(records: List[_ZipRecord]) -> bytes:
+    out: List[bytes] = []
+    central: List[bytes] = []
+    offset = 0
+    for r in records:
+        name = r.name.encode("utf-8")
+        dostime, dosdate = r._dos()
+        flags = 0x800 if not name.isascii() else 0
+        local = struct.pack("<IHHHHHIIIHH", 0x04034B50, 20, flags, r.method, dostime, dosdate,
+                            r.crc, len(r.data), r.usize, len(name), 0) + name
+        central.append(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, flags, r.method, dostime, dosdate,
+                                   r.crc, len(r.data), r.usize, len(name), 0, 0, 0, 0, 0, offset) + name)
+        out += [local, r.data]
+        offset += len(local) + len(r.data)
+    cd = b"".join(central)
+    return b"".join(out) + cd + struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(records), len(records), len(cd), offset, 0)
+
+def _raw_record(zf: zipfile.ZipFile, fp, info: zipfile.ZipInfo) -> _ZipRecord:
+    """The member's compressed bytes straight from the archive."""
+    fp.seek(info.header_offset)
+    header = fp.read(30)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    fp.seek(info.header_offset + 30 + name_len + extra_len)
+    return _ZipRecord(info.filename, info.compress_type, info.CRC, info.file_size, fp.read(info.compress_size), info.date_time)
+
+# =================
+# Compiled template
+# =================
+@dataclass
+class _Part:
+    name: str
+    segments: List[bytes]     # len(slots) + 1 static chunks
+    slots: List[str]
+    date_time: Tuple[int, ...]
+
+def _rels_name(part: str) -> str:
+    folder, _, base = part.rpartition("/")
+    return f"{folder}/_rels/{base}.rels" if folder else f"_rels/{base}.rels"
+
+def _compile_part(name: str, xml: bytes, date_time: Tuple[int, ...]) -> _Part:
+    segments: List[bytes] = []
+    slots: List[str] = []
+    pos = 0
+    for m in _TAG_RE.finditer(xml):
+        before = xml[pos:m.start()]
+        # values may start/end with spaces: make the enclosing <w:t> preserve them
+        t_open = max(before.rfind(b"<w:t>"), before.rfind(b"<w:t "))
+        if t_open >= 0 and b"xml:space" not in before[t_open:before.index(b">", t_open)]:
+            before = before[:t_open] + b'<w:t xml:space="preserve"' + before[t_open + 4:]
+        segments.append(before)
+        slots.append(_XML_TAG_RE.sub(b"", m.group(0))[2:-2].strip().decode("utf-8").split("|")[0].strip())
+        pos = m.end()
+    segments.append(xml[pos:])
+    # image slots need the drawing namespaces on the root element
+    if slots:
+        root_end = _ROOT_TAG_RE.search(segments[0]).end() - 1
+        missing = b" ".join(decl for prefix, decl in _NAMESPACES.items() if prefix not in segments[0][:root_end])
+        if missing:
+            segments[0] = segments[0][:root_end] + b" " + missing + segments[0][root_end:]
+    return _Part(name, segments, slots, date_time)
+
+@dataclass
+class CompiledDocxTemplate:
+    source: str
+    sha1: str
+    order: List[str] = field(default_factory=list)              # zip member order
+    records: Dict[str, _ZipRecord] = field(default_factory=dict)  # untouched members (raw)
+    parts: Dict[str, _Part] = field(default_factory=dict)         # templated members
+    xml: Dict[str, bytes] = field(default_factory=dict)           # members rewritten when images are added
+
+    @property
+    def placeholders(self) -> List[str]:
+        return sorted({slot for part in self.parts.values() for slot in part.slots})
+
+    # ---------- rendering ----------
+    def render(self, ctx: Dict[str, Any]) -> bytes:
+        images: Dict[str, Tuple[str, bytes]] = {}            # source path -> (media name, bytes)
+        rels: Dict[str, List[Tuple[str, str]]] = {}          # part -> [(rId, target)]
+        rendered: Dict[str, bytes] = {}
+        for name, part in self.parts.items():
+            chunks = [part.segments[0]]
+            for slot, static in zip(part.slots, part.segments[1:]):
+                chunks.append(self._value(ctx.get(slot), name, images, rels))
+                chunks.append(static)
+            rendered[name] = b"".join(chunks)
+
+        replaced = {name: _ZipRecord.build(name, xml, self.parts[name].date_time) for name, xml in rendered.items()}
+        if images:
+            replaced["[Content_Types].xml"] = _ZipRecord.build("[Content_Types].xml", self._content_types(images))
+        for part, entries in rels.items():
+            name = _rels_name(part)
+            replaced[name] = _ZipRecord.build(name, self._rels(name, part, entries))
+
+        out = [replaced.pop(name, None) or self.records[name] for name in self.order]
+        out += replaced.values()  # new .rels members
+        out += [_ZipRecord(media, zipfile.ZIP_STORED, zlib.crc32(data), len(data), data) for media, data in images.values()]
+        return _write_zip(out)
+
+    def render_to(self, path: str, ctx: Dict[str, Any]) -> str:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_bytes(self.render(ctx))
+        return str(out)
+
+    def _value(self, value: Any, part: str, images: Dict[str, Tuple[str, bytes]], rels: Dict[str, List[Tuple[str, str]]]) -> bytes:
+        if value is None:
+            return b""
+        if isinstance(value, DocxImage):
+            return self._drawing(value, part, images, rels)
+        text = _INVALID_XML_CHARS.sub("", str(value))
+        lines = [escape(line, quote=False) for line in text.split("\n")]
+        return '</w:t><w:br/><w:t xml:space="preserve">'.join(lines).encode("utf-8")
+
+    def _drawing(self, image: DocxImage, part: str, images: Dict[str, Tuple[str, bytes]], rels: Dict[str, List[Tuple[str, str]]]) -> bytes:
+        from PIL import Image
+
+        src = Path(image.path)
+        if not src.is_file():
+            logger.warning(f"Image not found for DOCX placeholder: {src}")
+            return b""
+        key = str(src.resolve())
+        if key not in images:
+            images[key] = (f"word/media/gg_image{len(images) + 1}{src.suffix.lower()}", src.read_bytes())
+        media = images[key][0]
+        with Image.open(src) as im:
+            w_px, h_px = im.size
+        if image.width_mm and image.height_mm:
+            cx, cy = image.width_mm * EMU_PER_MM, image.height_mm * EMU_PER_MM
+        elif image.width_mm:
+            cx = image.width_mm * EMU_PER_MM
+            cy = cx * h_px / w_px
+        elif image.height_mm:
+            cy = image.height_mm * EMU_PER_MM
+            cx = cy * w_px / h_px
+        else:
+            cx, cy = w_px * 9525, h_px * 9525  # 96 dpi
+        entries = rels.setdefault(part, [])
+        rid = f"rIdGG{len(entries) + 1}"
+        entries.append((rid, media.split("word/", 1)[1]))
+        doc_pr = 1000 + sum(len(v) for v in rels.values())
+        return (
+            '</w:t></w:r><w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+            f'<wp:extent cx="{int(cx)}" cy="{int(cy)}"/><wp:docPr id="{doc_pr}" name="Picture {doc_pr}"/>'
+            '<wp:cNvGraphicFramePr><a:graphicFrameLocks xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+            '<a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+            '<a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+            '<pic:pic xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+            f'<pic:nvPicPr><pic:cNvPr id="{doc_pr}" name="{escape(src.name)}"/><pic:cNvPicPr/></pic:nvPicPr>'
+            f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+            f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{int(cx)}" cy="{int(cy)}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr></pic:pic></a:graphicData></a:graphic>'
+            '</wp:inline></w:drawing></w:r><w:r><w:t xml:space="preserve">'
+        ).encode("utf-8")
+
+    def _rels(self, name: str, part: str, entries: List[Tuple[str, str]]) -> bytes:
+        base = self.xml.get(name) or (
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"></Relationships>'
+        )
+        folder = part.rpartition("/")[0]
+        added = "".join(
+            f'<Relationship Id="{rid}" Type="{IMAGE_REL_TYPE}" Target="{target if folder == "word" else "/word/" + target}"/>'
+            for rid, target in entries
+        ).encode("utf-8")
+        return base.replace(b"</Relationships>", added + b"</Relationships>")
+
+    def _content_types(self, images: Dict[str, Tuple[str, bytes]]) -> bytes:
+        types = self.xml["[Content_Types].xml"]
+        for media, _ in images.values():
+            ext = media.rsplit(".", 1)[-1]
+            if f'Extension="{ext}"'.encode() not in types:
+                mime = "image/jpeg" if ext in ("jpg", "jpeg") else f"image/{ext}"
+                types = types.replace(b"<Default ", f'<Default Extension="{ext}" ContentType="{mime}"/><Default '.encode(), 1)
+        return types
+
+# ===========
+# Compilation
+# ===========
+def compile_template(path: str) -> CompiledDocxTemplate:
+    """Split a .docx/.dotx into raw zip records and slotted XML parts."""
+    src = Path(path)
+    data = src.read_bytes()
+    tpl = CompiledDocxTemplate(source=str(src), sha1=hashlib.sha1(data).hexdigest())
+    with open(src, "rb") as fp, zipfile.ZipFile(fp) as zf:
+        for info in zf.infolist():
+            name = info.filename
+            tpl.order.append(name)
+            is_xml = name.endswith((".xml", ".rels"))
+            payload = zf.read(name) if is_xml else None
+            if name == "[Content_Types].xml" and payload is not None and DOTX_MAIN_TYPE in payload:
+                payload = payload.replace(DOTX_MAIN_TYPE, DOCX_MAIN_TYPE)
+                tpl.parts[name] = _Part(name, [payload], [], info.date_time)
+            elif payload is not None and name.startswith("word/") and b"{{" in payload:
+                if re.search(rb"\{[%#]", _XML_TAG_RE.sub(b"", payload)):
+                    raise UnsupportedTemplate(f"{src.name}:{name} uses {{% %}}/{{# #}} tags; render it with docxtpl")
+                tpl.parts[name] = _compile_part(name, payload, info.date_time)
+            else:
+                tpl.records[name] = _raw_record(zf, fp, info)
+            if payload is not None and (name == "[Content_Types].xml" or name.endswith(".rels")):
+                tpl.xml[name] = tpl.parts[name].segments[0] if name in tpl.parts else payload
+    logger.debug(f"Compiled {src.name}: {len(tpl.parts)} templated part(s), {len(tpl.placeholders)} placeholder(s)")
+    return tpl
+
+_MEMORY: Dict[Tuple[str, int, int], CompiledDocxTemplate] = {}
+_LOCK = threading.Lock()
+
+def load_template(path: str, cache_dir: Path = TEMPLATE_CACHE_DIR) -> CompiledDocxTemplate:
+    """Compiled template for ``path``: from memory, else the on-disk cache, else compiled now."""
+    src = Path(path)
+    if not src.exists():
+        raise FileNotFoundError(f"Template not found: {src.resolve()}")
+    st = src.stat()
+    key = (str(src.resolve()), st.st_mtime_ns, st.st_size)
+    with _LOCK:
+        if key in _MEMORY:
+            return _MEMORY[key]
+        sha1 = hashlib.sha1(src.read_bytes()).hexdigest()
+        cached = Path(cache_dir) / f"{src.stem}-{sha1[:16]}-v{FORMAT_VERSION}.pkl"
+        tpl = None
+        if cached.exists():
+            try:
+                tpl = pickle.loads(cached.read_bytes())
+            except Exception as e:
+                logger.debug(f"Ignoring unreadable compiled template {cached}: {e}")
+        if tpl is None:
+            tpl = compile_template(str(src))
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(pickle.dumps(tpl, protocol=pickle.HIGHEST_PROTOCOL))
+                os.replace(tmp, cached)
+            except OSError as e:
+                logger.debug(f"Could not cache compiled template: {e}")
+        _MEMORY[key] = tpl
+        return tpl
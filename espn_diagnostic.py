@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """
 ESPN API Diagnostic - Run this to see exactly what your ESPN API returns
+
+Teams, settings and rosters come from the shared league snapshot (league_snapshot.py);
+pass --refresh to re-download them instead of using a fresh snapshot.
 """
 
 import os
+import sys
 import json
 from pathlib import Path
 
@@ -35,17 +39,21 @@ def main():
     print()
     
     try:
-        from espn_api.football import League
+        from league_snapshot import load_snapshot, open_league
         
         print("Connecting to ESPN...")
-        league = League(
-            league_id=config['league_id'],
-            year=config['year'],
+        league = open_league(
+            int(config['league_id']),
+            int(config['year']),
             espn_s2=espn_s2,
-            swid=swid
+            swid=swid,
+            refresh='--refresh' in sys.argv[1:],
         )
+        snap = load_snapshot(int(config['league_id']), int(config['year']))
         
         print(f"✅ Connected to: {league.settings.name}")
+        if snap:
+            print(f"League snapshot: v{snap.version}, {snap.age_s / 60:.0f} min old")
         print(f"Current week: {getattr(league, 'current_week', 'Unknown')}")
         print(f"Number of teams: {len(league.teams)}")
         print()
@@ -1,18 +1,26 @@
 # footer_gradient.py
-from docx import Document
 from docx.shared import Mm
 
-def add_footer_gradient(docx_path, gradient_png, bar_height_mm: float = 12.0) -> None:
+from document_formatter import DocxFix, DocxTransform
+
+class FooterGradientFix(DocxFix):
     """
     Adds a stable diagonal gradient bar in the footer by:
       - clearing legacy floating shapes/paragraphs
       - creating a 2-row, 1-col table with explicit width
       - inserting the gradient as an inline picture (row 1)
       - leaving row 2 for text (or blank)
+
+    Runs inside document_formatter's single pass
+    (fix_document_formatting(path, gradient_png=...)).
     """
-    doc = Document(str(docx_path))
+    name = "footer_gradient"
 
-    for section in doc.sections:
+    def __init__(self, gradient_png, bar_height_mm: float = 12.0):
+        self.gradient_png = gradient_png
+        self.bar_height_mm = bar_height_mm
+
+    def section(self, section) -> None:
         # Keep footer from nudging
         section.bottom_margin = Mm(15)      # ~0.59"
         section.footer_distance = Mm(8)     # ~0.31"
@@ -40,12 +48,14 @@ def add_footer_gradient(docx_path, gradient_png, bar_height_mm: float = 12.0) ->
         cell = tbl.rows[0].cells[0]
         run = cell.paragraphs[0].add_run()
         try:
-            pic = run.add_picture(str(gradient_png))
-            pic.height = Mm(bar_height_mm)   # width auto-fits to the cell
+            pic = run.add_picture(str(self.gradient_png))
+            pic.height = Mm(self.bar_height_mm)   # width auto-fits to the cell
         except Exception as e:
             print(f"[footer] Could not add gradient image: {e}")
 
         # Row 2: reserved for footer text (or leave blank if template provides it)
         tbl.rows[1].cells[0].paragraphs[0].add_run("")
 
-    doc.save(str(docx_path))
+def add_footer_gradient(docx_path, gradient_png, bar_height_mm: float = 12.0) -> None:
+    """Open, add the footer gradient, save (standalone use; see FooterGradientFix)."""
+    DocxTransform([FooterGradientFix(gradient_png, bar_height_mm)]).run(str(docx_path))
@@ -2,12 +2,20 @@ from __future__ import annotations
 import json
 import os
 import logging
+import re
+import sys
+from collections.abc import MutableMapping
+import dataclasses
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from espn_api.football import League, Player
 
+import lineup_optimizer
+from league_snapshot import open_league
+from season_calendar import resolve_week
+
 logger = logging.getLogger(__name__)
 
 # --------- helpers ---------
@@ -40,7 +48,10 @@ def _load_team_logos(json_path: Optional[str]) -> Dict[str, str]:
         return {}
 
 # --------- data shape we assemble from ESPN ---------
-@dataclass
+# Slotted rows (no per-instance __dict__) on Python 3.10+; 3.9 keeps a plain dataclass
+_ROW_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_ROW_OPTIONS)
 class MatchRow:
     home_name: str
     away_name: str
@@ -62,6 +73,222 @@ class MatchRow:
     home_def_points: float = 0.0
     away_def_player: str = ""
     away_def_points: float = 0.0
+    # Optimal-lineup analysis (0.0 when no full roster was available)
+    home_optimal_points: float = 0.0
+    away_optimal_points: float = 0.0
+    home_bench_mistakes: Tuple[str, ...] = ()
+    away_bench_mistakes: Tuple[str, ...] = ()
+    # Current streaks: +N win streak, -N losing streak
+    home_streak: int = 0
+    away_streak: int = 0
+    # ESPN team ids (names aren't unique); live updates find their row by these
+    home_id: int = 0
+    away_id: int = 0
+
+
+def rescore(row: MatchRow, home_score: float, away_score: float) -> MatchRow:
+    """The row with new scores (winner, loser and gap follow; stats are kept)."""
+    winner = row.home_name if home_score >= away_score else row.away_name
+    loser = row.away_name if winner == row.home_name else row.home_name
+    return dataclasses.replace(row, home_score=home_score, away_score=away_score,
+                               winner=winner, loser=loser, gap=abs(home_score - away_score))
+
+
+# --------- per-matchup template tokens, formatted when read ---------
+def _top_line(name: str, player: str, points: float, fallback: str) -> str:
+    return f"{player} — {points:.1f} pts" if points > 0 else fallback.format(name)
+
+def _bust_line(r: MatchRow) -> str:
+    if r.home_bust_points > 0 and r.home_bust_player:
+        home_bust = f"{r.home_bust_player} — {r.home_bust_points:.1f} pts"
+    else:
+        home_bust = f"{r.home_name} avoided major busts"
+    if r.away_bust_points > 0 and r.away_bust_player:
+        away_bust = f"{r.away_bust_player} — {r.away_bust_points:.1f} pts"
+    else:
+        away_bust = f"{r.away_name} had consistent performances"
+
+    # Determine biggest bust overall
+    if r.home_bust_points > 0 and r.away_bust_points > 0:
+        return f"Biggest bust: {home_bust if r.home_bust_points < r.away_bust_points else away_bust}"
+    if r.home_bust_points > 0:
+        return home_bust
+    if r.away_bust_points > 0:
+        return away_bust
+    return "Both teams avoided major disappointments"
+
+def _keyplay_line(r: MatchRow) -> str:
+    player, points = max(
+        [(r.home_top_player, r.home_top_points), (r.away_top_player, r.away_top_points)], key=lambda x: x[1]
+    )
+    if points > 25:  # Great performance
+        return f"Game MVP: {player} with {points:.1f} pts"
+    if points > 15:  # Good performance
+        return f"Top performer: {player} led the way"
+    if points > 0:  # Some data available
+        return f"{player} was the bright spot"
+    # No specific data
+    if r.gap < 5:
+        return "Every point mattered in this nail-biter"
+    if r.gap > 30:
+        return f"{r.winner} dominated from start to finish"
+    return "A solid team effort decided this one"
+
+def _def_line(r: MatchRow) -> str:
+    if r.home_def_points > 0 or r.away_def_points > 0:
+        if r.home_def_points > r.away_def_points:
+            return f"{r.home_def_player} — {r.home_def_points:.1f} pts"
+        return f"{r.away_def_player} — {r.away_def_points:.1f} pts"
+    # Generate context-appropriate defense comment
+    if r.home_score + r.away_score > 220:
+        return "Defenses took a holiday in this shootout"
+    if r.home_score + r.away_score < 160:
+        return "Defense ruled the day"
+    return "Solid defensive performances all around"
+
+# MATCHUP{i}_<FIELD> -> formatter (HOME_LOGO / AWAY_LOGO come from the logo mapping)
+MATCHUP_FIELDS: Dict[str, Callable[[MatchRow], Any]] = {
+    # Basic matchup info
+    "HOME": lambda r: r.home_name,
+    "AWAY": lambda r: r.away_name,
+    "HS": lambda r: _fmt(r.home_score),
+    "AS": lambda r: _fmt(r.away_score),
+    # Stats Spotlight
+    "TOP_HOME": lambda r: _top_line(r.home_name, r.home_top_player, r.home_top_points, "{}'s offense carried the day"),
+    "TOP_AWAY": lambda r: _top_line(r.away_name, r.away_top_player, r.away_top_points, "{}'s squad fought hard"),
+    "BUST": _bust_line,
+    "KEYPLAY": _keyplay_line,
+    "DEF": _def_line,
+    # Additional data for Sabre's commentary
+    "HOME_TOP_SCORER": lambda r: r.home_top_player or f"{r.home_name}'s Star",
+    "HOME_TOP_POINTS": lambda r: r.home_top_points,
+    "AWAY_TOP_SCORER": lambda r: r.away_top_player or f"{r.away_name}'s Star",
+    "AWAY_TOP_POINTS": lambda r: r.away_top_points,
+    # Optimal-lineup analysis (bench points left behind)
+    "HOME_OPTIMAL": lambda r: r.home_optimal_points,
+    "AWAY_OPTIMAL": lambda r: r.away_optimal_points,
+    "HOME_BENCH_MISTAKES": lambda r: list(r.home_bench_mistakes),
+    "AWAY_BENCH_MISTAKES": lambda r: list(r.away_bench_mistakes),
+    "HOME_STREAK": lambda r: r.home_streak,
+    "AWAY_STREAK": lambda r: r.away_streak,
+    # Placeholder for the big recap text (filled in by the recap writers)
+    "BLURB": lambda r: "",
+}
+_LOGO_FIELDS = {"HOME_LOGO": "home_name", "AWAY_LOGO": "away_name"}
+_MATCHUP_KEY_RE = re.compile(r"^MATCHUP(\d+)_([A-Z_]+)$")
+
+
+class GazetteContext(MutableMapping):
+    """
+    The template context, without flattening every matchup into strings up front.
+
+    Global tokens and anything assigned later (recaps, logo paths) live in a
+    plain dict; MATCHUP{i}_* tokens are formatted from the MatchRow when a
+    writer reads them. Text filters (markdown/PDF cleaning) are applied on read
+    too, instead of copying the whole dict once per cleaning pass. dict(ctx)
+    gives an ordinary snapshot (JSON dumps, debugging).
+    """
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None, rows: Optional[List[MatchRow]] = None,
+                 logos: Optional[Dict[str, str]] = None):
+        self._values: Dict[str, Any] = dict(values or {})
+        self._rows: List[MatchRow] = list(rows or [])
+        self._logos: Dict[str, str] = logos or {}
+        self._hidden: set = set()
+        self._filters: List[Callable[[str], str]] = []
+
+    @property
+    def rows(self) -> List[MatchRow]:
+        return self._rows
+
+    def add_text_filter(self, fn: Callable[[str], str]) -> None:
+        """Clean every string value (and strings inside lists/dicts) as it is read."""
+        self._filters.append(fn)
+
+    def _filtered(self, value: Any) -> Any:
+        if not self._filters:
+            return value
+        if isinstance(value, str):
+            for fn in self._filters:
+                value = fn(value)
+            return value
+        if isinstance(value, list):
+            return [self._filtered(v) if isinstance(v, str) else v for v in value]
+        if isinstance(value, dict):
+            return {k: self._filtered(v) for k, v in value.items()}
+        return value
+
+    def _derived(self, key: str) -> Tuple[bool, Any]:
+        m = _MATCHUP_KEY_RE.match(key)
+        if not m or key in self._hidden:
+            return False, None
+        i, name = int(m.group(1)), m.group(2)
+        if not 1 <= i <= len(self._rows):
+            return False, None
+        row = self._rows[i - 1]
+        if name in MATCHUP_FIELDS:
+            return True, MATCHUP_FIELDS[name](row)
+        if name in _LOGO_FIELDS:
+            return True, self._logos.get(getattr(row, _LOGO_FIELDS[name]), "")
+        return False, None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._filtered(self._values[key])
+        found, value = self._derived(key)
+        if not found:
+            raise KeyError(key)
+        return self._filtered(value)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._hidden.discard(key)
+        self._values[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._values.pop(key, None)
+        if self._derived(key)[0]:
+            self._hidden.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or (isinstance(key, str) and self._derived(key)[0])
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._values
+        for i in range(1, len(self._rows) + 1):
+            for name in (*MATCHUP_FIELDS, *_LOGO_FIELDS):
+                key = f"MATCHUP{i}_{name}"
+                if key not in self._values and key not in self._hidden:
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"GazetteContext({len(self._values)} values, {len(self._rows)} matchups)"
+
+
+def _team_streak(team, week: Optional[int] = None) -> int:
+    """
+    The streak at the end of ``week`` as a signed int (+N wins / -N losses,
+    0 after a tie), counted from the team's results up to that week so a
+    rebuilt older week gets the streak it had then. ESPN's current streak is the
+    fallback when the team carries no results.
+    """
+    outcomes = [o for o in (getattr(team, "outcomes", None) or [])[:week] if o in ("W", "L", "T")]
+    if outcomes:
+        last, length = outcomes[-1], 0
+        for outcome in reversed(outcomes):
+            if outcome != last:
+                break
+            length += 1
+        return {"W": length, "L": -length}.get(last, 0)
+    try:
+        length = int(getattr(team, "streak_length", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+    return -length if str(getattr(team, "streak_type", "")).upper() == "LOSS" else length
 
 
 def _extract_player_stats_from_lineup(lineup: List) -> Dict[str, Any]:
@@ -302,58 +529,107 @@ def _generate_synthetic_stats(team_name: str, score: float, is_winner: bool) ->
     }
 
 
-def _fetch_rows(league: League, week: int) -> List[MatchRow]:
-    """Fetch matchup data with multiple fallback methods for player statistics"""
-    rows: List[MatchRow] = []
-    
-    # First try regular scoreboard
-    matchups = league.scoreboard(week=week)
-    
-    # Also try to get box scores for more detailed data
-    box_scores = None
+class EspnRequestCounter:
+    """
+    Counts the HTTP requests a League makes while active (wraps the
+    league_get/get/news_get methods of its espn_request on the instance).
+    Counters nest: each one puts back exactly what it replaced.
+    """
+
+    METHODS = ("league_get", "get", "news_get")
+
+    def __init__(self, league: League):
+        self.target = getattr(league, "espn_request", None)
+        self.count = 0
+        self._saved: Dict[str, Any] = {}
+
+    def __enter__(self) -> "EspnRequestCounter":
+        for name in self.METHODS:
+            fn = getattr(self.target, name, None)
+            if fn is None:
+                continue
+            self._saved[name] = vars(self.target).get(name)   # None: the class method
+
+            def counted(*args, _fn=fn, **kwargs):
+                self.count += 1
+                return _fn(*args, **kwargs)
+            setattr(self.target, name, counted)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for name, own in self._saved.items():
+            if own is None:
+                delattr(self.target, name)   # back to the class method
+            else:
+                setattr(self.target, name, own)   # back to an outer counter's wrapper
+        self._saved.clear()
+
+
+def _box_scores(league: League, week: int) -> List[Any]:
+    """
+    The week's box scores, or [] when ESPN can't serve them: seasons before
+    2019, and weeks past current_week (box_scores() would silently return the
+    current week instead).
+    """
+    current = int(getattr(league, "current_week", week) or week)
+    if int(getattr(league, "year", 0) or 0) < 2019 or week > current:
+        return []
     try:
-        box_scores = league.box_scores(week=week)
-        logger.info(f"Retrieved {len(box_scores) if box_scores else 0} box scores for week {week}")
+        boxes = league.box_scores(week=week)
     except Exception as e:
         logger.debug(f"Could not get box scores: {e}")
-    
-    for i, m in enumerate(matchups):
-        home = m.home_team.team_name
-        away = m.away_team.team_name
-        hs = float(m.home_score or 0.0)
-        as_ = float(m.away_score or 0.0)
+        return []
+    # A bye comes back with team id 0 instead of a Team
+    return [b for b in boxes if hasattr(b.home_team, "team_id") and hasattr(b.away_team, "team_id")]
+
+
+def _fetch_rows(league: League, week: int) -> List[MatchRow]:
+    """
+    Fetch matchup data from as few ESPN calls as possible.
+
+    Box scores carry everything a row needs (teams, scores, full lineups with
+    slots, projections and D/ST), so they are the only call. Lineup analysis
+    is joined to each side by team id. The season scoreboard is only fetched
+    when box scores are unavailable; then stats come from the rosters already
+    loaded with the league, or synthetic stats as a last resort.
+    """
+    rows: List[MatchRow] = []
+
+    with EspnRequestCounter(league) as requests_made:
+        box_scores = _box_scores(league, week)
+        if box_scores:
+            games = [(b.home_team, b.away_team, b.home_score, b.away_score, b) for b in box_scores]
+            source = "box scores"
+        else:
+            games = [(m.home_team, m.away_team, m.home_score, m.away_score, None) for m in league.scoreboard(week=week)]
+            source = "scoreboard"
+    logger.info(f"Week {week}: {len(games)} matchups from {source} in {requests_made.count} ESPN request(s)")
+
+    # Optimal lineups for every team at once (full rosters incl. bench)
+    slot_counts = getattr(getattr(league, "settings", None), "position_slot_counts", None)
+    lineups = lineup_optimizer.solve_week(box_scores, slot_counts, key="team_id")
+
+    for home_team, away_team, home_score, away_score, box in games:
+        # Team names repeat week after week: one string per team in season-scale runs
+        home = sys.intern(home_team.team_name)
+        away = sys.intern(away_team.team_name)
+        hs = float(home_score or 0.0)
+        as_ = float(away_score or 0.0)
         winner = home if hs >= as_ else away
         loser = away if winner == home else home
         gap = abs(hs - as_)
 
-        # Try multiple methods to get player stats
-        home_stats = None
-        away_stats = None
-        
-        # Method 1: Try lineup from matchup
-        home_lineup = getattr(m, 'home_lineup', [])
-        away_lineup = getattr(m, 'away_lineup', [])
-        
-        if home_lineup:
-            home_stats = _extract_player_stats_from_lineup(home_lineup)
-        if away_lineup:
-            away_stats = _extract_player_stats_from_lineup(away_lineup)
-        
-        # Method 2: Try box scores if available
-        if not home_stats and box_scores and i < len(box_scores):
-            box = box_scores[i]
-            if not home_stats:
-                home_stats = _extract_stats_from_box_score(box, True)
-            if not away_stats:
-                away_stats = _extract_stats_from_box_score(box, False)
-        
-        # Method 3: Try team rosters
+        # Method 1: this matchup's box score lineups
+        home_stats = _extract_stats_from_box_score(box, True) if box is not None else None
+        away_stats = _extract_stats_from_box_score(box, False) if box is not None else None
+
+        # Method 2: team rosters (already loaded with the league, no extra request)
         if not home_stats:
-            home_stats = _extract_stats_from_roster(m.home_team, week)
+            home_stats = _extract_stats_from_roster(home_team, week)
         if not away_stats:
-            away_stats = _extract_stats_from_roster(m.away_team, week)
+            away_stats = _extract_stats_from_roster(away_team, week)
         
-        # Method 4: Generate synthetic stats as last resort
+        # Method 3: Generate synthetic stats as last resort
         if not home_stats:
             home_stats = _generate_synthetic_stats(home, hs, winner == home)
             logger.info(f"Using synthetic stats for {home}")
@@ -361,6 +637,8 @@ def _fetch_rows(league: League, week: int) -> List[MatchRow]:
             away_stats = _generate_synthetic_stats(away, as_, winner == away)
             logger.info(f"Using synthetic stats for {away}")
 
+        home_lineup = lineups.get(getattr(home_team, "team_id", None))
+        away_lineup = lineups.get(getattr(away_team, "team_id", None))
         rows.append(MatchRow(
             home_name=home,
             away_name=away,
@@ -383,6 +661,15 @@ def _fetch_rows(league: League, week: int) -> List[MatchRow]:
             away_bust_points=away_stats.get('bust_points', 0),
             away_def_player=away_stats.get('def_player', f"{away} D/ST"),
             away_def_points=away_stats.get('def_points', 0),
+            # Bench points left behind
+            home_optimal_points=home_lineup.optimal_points if home_lineup else 0.0,
+            away_optimal_points=away_lineup.optimal_points if away_lineup else 0.0,
+            home_bench_mistakes=tuple(home_lineup.bench_mistakes) if home_lineup else (),
+            away_bench_mistakes=tuple(away_lineup.bench_mistakes) if away_lineup else (),
+            home_streak=_team_streak(home_team, week),
+            away_streak=_team_streak(away_team, week),
+            home_id=getattr(home_team, "team_id", 0),
+            away_id=getattr(away_team, "team_id", 0),
         ))
         
         # Log what method worked
@@ -400,14 +687,22 @@ def _awards(rows: List[MatchRow]) -> Dict[str, Any]:
             "AWARD_CUPCAKE_TEAM": "", "AWARD_CUPCAKE_NOTE": "",
             "AWARD_KITTY_TEAM": "", "AWARD_KITTY_NOTE": "",
             "AWARD_TOP_TEAM": "", "AWARD_TOP_NOTE": "",
+            "AWARD_EFFICIENCY_TEAM": "", "AWARD_EFFICIENCY_NOTE": "",
             "CUPCAKE_LINE": "—", "KITTY_LINE": "—", "TOPSCORE_LINE": "—",
+            "EFFICIENCY_LINE": "—",
         }
 
     all_team_scores: List[Tuple[str, float]] = []
     kitty_candidates: List[Tuple[str, str, float]] = []
+    # (team, actual, optimal) for the Manager Efficiency award
+    efficiency_candidates: List[Tuple[str, float, float]] = []
     
     for r in rows:
         all_team_scores.extend([(r.home_name, r.home_score), (r.away_name, r.away_score)])
+        if r.home_optimal_points > 0:
+            efficiency_candidates.append((r.home_name, r.home_score, r.home_optimal_points))
+        if r.away_optimal_points > 0:
+            efficiency_candidates.append((r.away_name, r.away_score, r.away_optimal_points))
         # For kitty award, we want the team that lost by the largest margin
         if r.gap > 0:  # Only if there was an actual gap
             if r.winner == r.home_name:
@@ -426,6 +721,17 @@ def _awards(rows: List[MatchRow]) -> Dict[str, Any]:
     else:
         kitty_loser, kitty_winner, kitty_gap = "", "", 0
 
+    # Manager Efficiency: highest share of the optimal lineup actually started
+    if efficiency_candidates:
+        eff_team, eff_actual, eff_optimal = max(
+            efficiency_candidates, key=lambda x: (min(1.0, x[1] / x[2]), x[1])
+        )
+        eff_pct = min(1.0, eff_actual / eff_optimal) * 100
+        eff_left = max(0.0, eff_optimal - eff_actual)
+        eff_note = f"{eff_pct:.1f}% of a possible {eff_optimal:.2f} ({eff_left:.2f} left on the bench)"
+    else:
+        eff_team, eff_note = "", ""
+
     return {
         # tokens the docx renders:
         "AWARD_CUPCAKE_TEAM": cupcake_team,
@@ -434,30 +740,39 @@ def _awards(rows: List[MatchRow]) -> Dict[str, Any]:
         "AWARD_KITTY_NOTE": f"fell to {kitty_winner} by {kitty_gap:.2f}" if kitty_loser else "",
         "AWARD_TOP_TEAM": top_team,
         "AWARD_TOP_NOTE": f"{top_pts:.2f}",
+        "AWARD_EFFICIENCY_TEAM": eff_team,
+        "AWARD_EFFICIENCY_NOTE": eff_note,
         # optional legacy single-line variants:
         "CUPCAKE_LINE": f"{cupcake_team} — {cupcake_pts:.2f}",
         "KITTY_LINE": f"{kitty_loser} fell to {kitty_winner} by {kitty_gap:.2f}" if kitty_loser else "—",
         "TOPSCORE_LINE": f"{top_team} — {top_pts:.2f}",
+        "EFFICIENCY_LINE": f"{eff_team} — {eff_note}" if eff_team else "—",
     }
 
 
-def build_context(league_id: int, year: int, week: int) -> Dict[str, Any]:
+def build_context(league_id: int, year: int, week: Optional[int], league: Optional[League] = None) -> GazetteContext:
     """
-    Fetch ESPN data and assemble a context dict with EVERYTHING your template needs.
+    Fetch ESPN data and assemble a context with EVERYTHING your template needs.
     Uses multiple fallback methods to ensure we always have player stats.
+    Pass ``league`` to reuse an already opened League (live mode). Without
+    ``week`` the latest final week comes from the season calendar (offline).
     """
-    s2 = _env("ESPN_S2", "S2")
-    swid = _env("ESPN_SWID", "SWID")
-    if not s2 or not swid:
-        raise RuntimeError("Missing ESPN cookies: set ESPN_S2 and ESPN_SWID.")
-
-    lg = League(league_id=league_id, year=year, espn_s2=s2, swid=swid)
-    wk = int(week or lg.current_week)
+    wk = resolve_week(year, week)
+    lg = league
+    if lg is None:
+        s2 = _env("ESPN_S2", "S2")
+        swid = _env("ESPN_SWID", "SWID")
+        if not s2 or not swid:
+            raise RuntimeError("Missing ESPN cookies: set ESPN_S2 and ESPN_SWID.")
+
+        # settings/teams/rosters/schedule from the shared league snapshot (no request
+        # when it was taken after this week went final)
+        lg = open_league(league_id, year, espn_s2=s2, swid=swid, week=wk)
     rows = _fetch_rows(lg, wk)
 
     logos = _load_team_logos(os.getenv("TEAM_LOGOS_FILE"))
 
-    ctx: Dict[str, Any] = {
+    values: Dict[str, Any] = {
         # global
         "LEAGUE_ID": league_id,
         "LEAGUE_NAME": getattr(getattr(lg, "settings", None), "name", None) or "League",
@@ -473,97 +788,9 @@ def build_context(league_id: int, year: int, week: int) -> Dict[str, Any]:
         "FOOTER_NOTE":  _safe(os.getenv("FOOTER_NOTE") or ""),
     }
 
-    # Per-matchup tokens with actual or synthetic player stats
-    for i, r in enumerate(rows, start=1):
-        # Basic matchup info
-        ctx[f"MATCHUP{i}_HOME"] = r.home_name
-        ctx[f"MATCHUP{i}_AWAY"] = r.away_name
-        ctx[f"MATCHUP{i}_HS"] = _fmt(r.home_score)
-        ctx[f"MATCHUP{i}_AS"] = _fmt(r.away_score)
-
-        # Logos (if provided in mapping)
-        ctx[f"MATCHUP{i}_HOME_LOGO"] = logos.get(r.home_name, "")
-        ctx[f"MATCHUP{i}_AWAY_LOGO"] = logos.get(r.away_name, "")
-
-        # Stats Spotlight - TOP SCORERS
-        if r.home_top_points > 0:
-            ctx[f"MATCHUP{i}_TOP_HOME"] = f"{r.home_top_player} — {r.home_top_points:.1f} pts"
-        else:
-            ctx[f"MATCHUP{i}_TOP_HOME"] = f"{r.home_name}'s offense carried the day"
-        
-        if r.away_top_points > 0:
-            ctx[f"MATCHUP{i}_TOP_AWAY"] = f"{r.away_top_player} — {r.away_top_points:.1f} pts"
-        else:
-            ctx[f"MATCHUP{i}_TOP_AWAY"] = f"{r.away_name}'s squad fought hard"
-
-        # Stats Spotlight - BUSTS
-        if r.home_bust_points > 0 and r.home_bust_player:
-            home_bust = f"{r.home_bust_player} — {r.home_bust_points:.1f} pts"
-        else:
-            home_bust = f"{r.home_name} avoided major busts"
-        
-        if r.away_bust_points > 0 and r.away_bust_player:
-            away_bust = f"{r.away_bust_player} — {r.away_bust_points:.1f} pts"
-        else:
-            away_bust = f"{r.away_name} had consistent performances"
-        
-        # Determine biggest bust overall
-        if r.home_bust_points > 0 and r.away_bust_points > 0:
-            if r.home_bust_points < r.away_bust_points:
-                ctx[f"MATCHUP{i}_BUST"] = f"Biggest bust: {home_bust}"
-            else:
-                ctx[f"MATCHUP{i}_BUST"] = f"Biggest bust: {away_bust}"
-        elif r.home_bust_points > 0:
-            ctx[f"MATCHUP{i}_BUST"] = home_bust
-        elif r.away_bust_points > 0:
-            ctx[f"MATCHUP{i}_BUST"] = away_bust
-        else:
-            ctx[f"MATCHUP{i}_BUST"] = "Both teams avoided major disappointments"
-
-        # Stats Spotlight - KEY PLAY
-        all_performances = [
-            (r.home_top_player, r.home_top_points, r.home_name),
-            (r.away_top_player, r.away_top_points, r.away_name)
-        ]
-        best_performance = max(all_performances, key=lambda x: x[1])
-        
-        if best_performance[1] > 25:  # Great performance
-            ctx[f"MATCHUP{i}_KEYPLAY"] = f"Game MVP: {best_performance[0]} with {best_performance[1]:.1f} pts"
-        elif best_performance[1] > 15:  # Good performance
-            ctx[f"MATCHUP{i}_KEYPLAY"] = f"Top performer: {best_performance[0]} led the way"
-        elif best_performance[1] > 0:  # Some data available
-            ctx[f"MATCHUP{i}_KEYPLAY"] = f"{best_performance[0]} was the bright spot"
-        else:  # No specific data
-            if r.gap < 5:
-                ctx[f"MATCHUP{i}_KEYPLAY"] = "Every point mattered in this nail-biter"
-            elif r.gap > 30:
-                ctx[f"MATCHUP{i}_KEYPLAY"] = f"{r.winner} dominated from start to finish"
-            else:
-                ctx[f"MATCHUP{i}_KEYPLAY"] = "A solid team effort decided this one"
-
-        # Stats Spotlight - DEFENSE
-        if r.home_def_points > 0 or r.away_def_points > 0:
-            if r.home_def_points > r.away_def_points:
-                ctx[f"MATCHUP{i}_DEF"] = f"{r.home_def_player} — {r.home_def_points:.1f} pts"
-            else:
-                ctx[f"MATCHUP{i}_DEF"] = f"{r.away_def_player} — {r.away_def_points:.1f} pts"
-        else:
-            # Generate context-appropriate defense comment
-            if r.home_score + r.away_score > 220:
-                ctx[f"MATCHUP{i}_DEF"] = "Defenses took a holiday in this shootout"
-            elif r.home_score + r.away_score < 160:
-                ctx[f"MATCHUP{i}_DEF"] = "Defense ruled the day"
-            else:
-                ctx[f"MATCHUP{i}_DEF"] = "Solid defensive performances all around"
-
-        # Additional data for Sabre's commentary
-        ctx[f"MATCHUP{i}_HOME_TOP_SCORER"] = r.home_top_player or f"{r.home_name}'s Star"
-        ctx[f"MATCHUP{i}_HOME_TOP_POINTS"] = r.home_top_points
-        ctx[f"MATCHUP{i}_AWAY_TOP_SCORER"] = r.away_top_player or f"{r.away_name}'s Star"
-        ctx[f"MATCHUP{i}_AWAY_TOP_POINTS"] = r.away_top_points
-
-        # Ensure a placeholder exists for the big recap text
-        ctx.setdefault(f"MATCHUP{i}_BLURB", "")
+    # Per-matchup tokens (scores, Stats Spotlight, bench analysis) are formatted
+    # from the rows when a writer reads them: see MATCHUP_FIELDS
+    ctx = GazetteContext(values, rows, logos)
 
     # Awards block
     ctx.update(_awards(rows))
@@ -579,12 +806,89 @@ def build_context(league_id: int, year: int, week: int) -> Dict[str, Any]:
     return ctx
 
 
+def _sample_row(n: int, row_type: type = MatchRow) -> Any:
+    """A realistic row with its own strings (as decoded from ESPN JSON)."""
+    return row_type(
+        home_name=f"Home Team {n}", away_name=f"Away Team {n}", home_score=101.2 + n, away_score=98.7,
+        winner=f"Home Team {n}", loser=f"Away Team {n}", gap=2.5 + n,
+        home_top_player=f"Star Back {n} (RB)", home_top_points=31.4, away_top_player=f"Deep Threat {n} (WR)",
+        away_top_points=24.0, home_bust_player=f"Big Name {n} (WR)", home_bust_points=2.1,
+        away_bust_player=f"Backup {n} (TE)", away_bust_points=3.3, home_def_player=f"Team {n} D/ST",
+        home_def_points=9.0, away_def_player=f"Other {n} D/ST", away_def_points=4.0,
+        home_optimal_points=120.5, away_optimal_points=110.0,
+        home_bench_mistakes=(f"Benched Guy {n} (18.2) over Starter {n} (4.1)",), away_bench_mistakes=(),
+        home_streak=2, away_streak=-1,
+    )
+
+
+def _object_bytes(obj: Any) -> int:
+    """Size of an object itself plus its instance __dict__ (not the values it points to)."""
+    return sys.getsizeof(obj) + (sys.getsizeof(vars(obj)) if hasattr(obj, "__dict__") else 0)
+
+
+def benchmark_memory(matchups: int = 6, weeks: int = 17) -> Dict[str, float]:
+    """
+    Bytes per matchup held for a season of contexts: flattened dicts (+ the two
+    cleaning copies) over dict-backed rows, versus GazetteContext over slotted rows.
+    """
+    import tracemalloc
+    from dataclasses import fields, make_dataclass, field as dc_field, MISSING
+
+    # The old row shape: same fields, ordinary instance __dict__
+    DictRow = make_dataclass("DictRow", [
+        (f.name, Any) if f.default is MISSING else (f.name, Any, dc_field(default=f.default))
+        for f in fields(MatchRow)
+    ])
+
+    def measure(build: Callable[[], Any]) -> Tuple[int, int]:
+        tracemalloc.start()
+        held = build()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del held
+        return current, peak
+
+    def flattened() -> List[Dict[str, Any]]:
+        season = []
+        for w in range(weeks):
+            rows = [_sample_row(w * matchups + n, DictRow) for n in range(matchups)]
+            ctx = dict(GazetteContext({"WEEK_NUMBER": w + 1}, rows))   # every token preformatted
+            ctx = {k: v for k, v in ctx.items()}                        # markdown cleaning copy
+            ctx = {k: v for k, v in ctx.items()}                        # PDF cleaning copy
+            season.append(ctx)
+        return season
+
+    def lazy() -> List[GazetteContext]:
+        return [GazetteContext({"WEEK_NUMBER": w + 1}, [_sample_row(w * matchups + n) for n in range(matchups)])
+                for w in range(weeks)]
+
+    total = matchups * weeks
+    before, before_peak = measure(flattened)
+    after, after_peak = measure(lazy)
+    return {
+        "before_bytes_per_matchup": round(before / total),
+        "after_bytes_per_matchup": round(after / total),
+        "before_peak_bytes_per_matchup": round(before_peak / total),
+        "after_peak_bytes_per_matchup": round(after_peak / total),
+        "row_bytes_before": _object_bytes(_sample_row(0, DictRow)),
+        "row_bytes_after": _object_bytes(_sample_row(0)),
+    }
+
+
 if __name__ == "__main__":
     # Simple test when run directly
-    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--memory-benchmark":
+        matchups = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+        results = benchmark_memory(matchups)
+        print(f"Season of contexts ({matchups} matchups x 17 weeks), bytes per matchup:")
+        print(f"  held:  {results['before_bytes_per_matchup']:>7,} -> {results['after_bytes_per_matchup']:>7,}")
+        print(f"  peak:  {results['before_peak_bytes_per_matchup']:>7,} -> {results['after_peak_bytes_per_matchup']:>7,}")
+        print(f"  MatchRow object: {results['row_bytes_before']} -> {results['row_bytes_after']} bytes")
+        sys.exit(0)
     
     if len(sys.argv) != 4:
         print("Usage: python gazette_data.py <league_id> <year> <week>")
+        print("       python gazette_data.py --memory-benchmark [matchups]")
         sys.exit(1)
     
     league_id = int(sys.argv[1])
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+gazette_server.py — Gridiron Gazette
+------------------------------------
+A small local HTTP service that renders gazettes on demand:
+
+    GET /league/{league_id}/{year}/{week}.html
+    GET /league/{league_id}/{year}/{week}.pdf
+    GET /health
+
+The process stays up, so everything the CLI builds per run stays warm: the
+league snapshot, template schemas and the compiled template, print-sized
+logos (one AssetBundler), font subsets (asset_bundler's process-wide
+FontSubsetCache), and Sabre recaps (llm_gate's response cache).
+
+  • Concurrent requests for the same league/week share ONE context build,
+    and requests for the same artifact share ONE render (SingleFlight);
+    the others wait for it and get the same bytes.
+  • Built contexts are reused for GAZETTE_SERVE_TTL_S seconds (default 300)
+    while a week may still change, GAZETTE_SERVE_FINAL_TTL_S (default a day)
+    once season_calendar says it is final.
+  • The ETag is a fingerprint of the inputs (context values, template
+    hash, logo files, format). A matching If-None-Match gets 304 with no
+    render; artifacts are kept by ETag in memory and in .cache/artifacts.
+
+Usage:
+  python gazette_server.py --port 8780 [--no-llm]
+  curl -o w5.pdf localhost:8780/league/887998/2025/5.pdf
+  curl -H 'If-None-Match: "<etag>"' -i localhost:8780/league/887998/2025/5.html   # 304
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger("gazette_server")
+
+ARTIFACT_CACHE_DIR = Path(os.getenv("GAZETTE_ARTIFACT_CACHE", ".cache/artifacts"))
+CONTEXT_TTL_S = float(os.getenv("GAZETTE_SERVE_TTL_S", "300"))
+FINAL_CONTEXT_TTL_S = float(os.getenv("GAZETTE_SERVE_FINAL_TTL_S", str(24 * 3600)))
+MAX_MEMORY_ARTIFACTS = int(os.getenv("GAZETTE_SERVE_MAX_ARTIFACTS", "32"))
+DEFAULT_HTML_TEMPLATE = "templates/recap_template.html"
+RENDER_VERSION = 1  # bump when the writers change what the same inputs produce
+
+CONTENT_TYPES = {"html": "text/html; charset=utf-8", "pdf": "application/pdf"}
+_ROUTE_RE = re.compile(r"^/league/(\d+)/(\d{4})/(\d{1,2})\.(html|pdf)$")
+
+
+# ==========
+# Coalescing
+# ==========
+class SingleFlight:
+    """Runs fn once per key at a time; callers arriving meanwhile wait and share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, Dict[str, Any]] = {}
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(result, shared): shared is True when another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+        try:
+            call["result"] = fn()
+            return call["result"], False
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+
+# ========
+# Service
+# ========
+@dataclass
+class BuiltContext:
+    ctx: Dict[str, Any]
+    fingerprint: str
+    built_at: float
+    ttl_s: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.built_at <= self.ttl_s
+
+
+@dataclass
+class Artifact:
+    etag: str
+    fmt: str
+    body: bytes
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.fmt]
+
+
+def _context_fingerprint(ctx: Dict[str, Any]) -> str:
+    data = json.dumps(dict(ctx), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _logo_stats(ctx: Dict[str, Any]) -> List[Tuple[str, int, int]]:
+    """(path, mtime, size) of every logo file the context points at (a swapped logo changes the ETag)."""
+    stats = []
+    for key in sorted(k for k in ctx if k.endswith("_LOGO")):
+        value = ctx.get(key)
+        if not value:
+            continue
+        try:
+            st = os.stat(str(value))
+        except (OSError, ValueError):
+            continue
+        stats.append((str(value), st.st_mtime_ns, st.st_size))
+    return stats
+
+
+def build_gazette_context(league_id: int, year: int, week: int, use_llm: bool = True) -> Dict[str, Any]:
+    import weekly_recap
+
+    return weekly_recap.build_render_context(league_id, year, week, use_llm_blurbs=use_llm)
+
+
+class GazetteService:
+    """Builds, fingerprints and renders gazettes, coalescing duplicate work."""
+
+    def __init__(
+        self,
+        template: str = DEFAULT_HTML_TEMPLATE,
+        use_llm: bool = True,
+        context_ttl_s: float = CONTEXT_TTL_S,
+        final_ttl_s: float = FINAL_CONTEXT_TTL_S,
+        cache_dir: Optional[Path] = ARTIFACT_CACHE_DIR,
+        context_builder: Optional[Callable[[int, int, int], Dict[str, Any]]] = None,
+    ):
+        from asset_bundler import AssetBundler
+
+        self.template = template
+        self.context_ttl_s, self.final_ttl_s = context_ttl_s, final_ttl_s
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.build = context_builder or (lambda lid, yr, wk: build_gazette_context(lid, yr, wk, use_llm))
+        self.bundler = AssetBundler()
+        self._contexts: Dict[Tuple[int, int, int], BuiltContext] = {}
+        self._artifacts: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._jinja: Dict[Tuple[str, int], Any] = {}
+        self._lock = threading.Lock()
+        self._context_flight = SingleFlight()
+        self._render_flight = SingleFlight()
+        self.counters = {"requests": 0, "not_modified": 0, "contexts_built": 0, "renders": 0,
+                         "shared": 0, "memory_hits": 0, "disk_hits": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    # ----- inputs -----
+    def _ttl(self, league_id: int, year: int, week: int) -> float:
+        from season_calendar import get_calendar
+
+        return self.final_ttl_s if get_calendar(year).is_final(week) else self.context_ttl_s
+
+    def context(self, league_id: int, year: int, week: int) -> BuiltContext:
+        key = (league_id, year, week)
+        built = self._contexts.get(key)
+        if built is not None and built.fresh:
+            return built
+
+        def build() -> BuiltContext:
+            ctx = self.build(league_id, year, week)
+            self._count("contexts_built")
+            return BuiltContext(ctx, _context_fingerprint(ctx), time.time(), self._ttl(league_id, year, week))
+
+        built, shared = self._context_flight.do(key, build)
+        if shared:
+            self._count("shared")
+        self._contexts[key] = built
+        return built
+
+    def etag(self, built: BuiltContext, fmt: str) -> str:
+        from template_schema import load_schema
+        import weekly_recap
+
+        template_sha1 = load_schema(str(weekly_recap.resolve_template_path(self.template))).sha1
+        parts = [RENDER_VERSION, fmt, built.fingerprint, template_sha1, _logo_stats(built.ctx)]
+        return '"' + hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()[:24] + '"'
+
+    # ----- rendering -----
+    def _render_html(self, ctx: Dict[str, Any]) -> str:
+        from jinja2 import Environment, FileSystemLoader
+        from template_schema import check_context
+        import weekly_recap
+
+        path = weekly_recap.resolve_template_path(self.template)
+        check_context(str(path), ctx)
+        key = (str(path.resolve()), path.stat().st_mtime_ns)
+        template = self._jinja.get(key)
+        if template is None:
+            env = Environment(loader=FileSystemLoader(str(path.parent)), autoescape=True)
+            template = self._jinja[key] = env.get_template(path.name)
+        return template.render(**ctx)
+
+    def _render(self, built: BuiltContext, fmt: str, etag: str) -> Artifact:
+        import weekly_recap
+
+        html = self._render_html(built.ctx)
+        if fmt == "html":
+            body = self.bundler.bundle_html(html, inline=True).encode("utf-8")
+        else:
+            out = Path(f"{self.cache_dir or ARTIFACT_CACHE_DIR}/render-{os.getpid()}-{threading.get_ident()}.pdf")
+            out.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                weekly_recap.html_to_pdf(html, out, save_html=False)
+                body = out.read_bytes()
+            finally:
+                out.unlink(missing_ok=True)
+        self._count("renders")
+        return Artifact(etag, fmt, body)
+
+    def _disk_path(self, etag: str, fmt: str) -> Optional[Path]:
+        return self.cache_dir / f"{etag.strip(chr(34))}.{fmt}" if self.cache_dir else None
+
+    def _remember(self, artifact: Artifact) -> None:
+        with self._lock:
+            self._artifacts[artifact.etag] = artifact
+            self._artifacts.move_to_end(artifact.etag)
+            while len(self._artifacts) > MAX_MEMORY_ARTIFACTS:
+                self._artifacts.popitem(last=False)
+
+    def artifact(self, league_id: int, year: int, week: int, fmt: str) -> Tuple[Artifact, str]:
+        """The rendered artifact and where it came from: memory, disk, render or shared."""
+        built = self.context(league_id, year, week)
+        etag = self.etag(built, fmt)
+        with self._lock:
+            found = self._artifacts.get(etag)
+        if found is not None:
+            self._count("memory_hits")
+            return found, "memory"
+
+        path = self._disk_path(etag, fmt)
+        if path is not None and path.exists():
+            artifact = Artifact(etag, fmt, path.read_bytes())
+            self._remember(artifact)
+            self._count("disk_hits")
+            return artifact, "disk"
+
+        artifact, shared = self._render_flight.do(etag, lambda: self._render(built, fmt, etag))
+        if shared:
+            self._count("shared")
+            return artifact, "shared"
+        self._remember(artifact)
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(artifact.body)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.debug(f"Could not cache {path}: {e}")
+        return artifact, "render"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "contexts": len(self._contexts), "artifacts": len(self._artifacts)}
+
+
+# ==========
+# HTTP
+# ==========
+def make_handler(service: GazetteService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, code: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/health":
+                self._send_json(200, {"ok": True, **service.stats()})
+                return
+            m = _ROUTE_RE.match(path)
+            if not m:
+                self._send_json(404, {"error": "expected /league/{id}/{year}/{week}.html|.pdf"})
+                return
+            service._count("requests")
+            league_id, year, week, fmt = int(m.group(1)), int(m.group(2)), int(m.group(3)), m.group(4)
+            try:
+                built = service.context(league_id, year, week)
+                etag = service.etag(built, fmt)
+                if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                    service._count("not_modified")
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                artifact, source = service.artifact(league_id, year, week, fmt)
+            except Exception as e:
+                logger.exception(f"Render failed for {path}")
+                self._send_json(500, {"error": str(e)})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", artifact.content_type)
+            self.send_header("Content-Length", str(len(artifact.body)))
+            self.send_header("ETag", artifact.etag)
+            self.send_header("Cache-Control", "no-cache")  # always revalidate; 304 is cheap
+            self.send_header("X-Gazette-Source", source)
+            self.end_headers()
+            self.wfile.write(artifact.body)
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+    return Handler
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Local on-demand Gazette rendering service")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8780)
+    p.add_argument("--template", default=DEFAULT_HTML_TEMPLATE)
+    p.add_argument("--no-llm", action="store_true", help="Use template recaps instead of the LLM")
+    p.add_argument("--ttl", type=float, default=CONTEXT_TTL_S, help="Seconds a current week's context is reused")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args(argv)
+    service = GazetteService(template=args.template, use_llm=not args.no_llm, context_ttl_s=args.ttl)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    logger.info(f"Serving gazettes on http://{args.host}:{args.port}/league/{{id}}/{{year}}/{{week}}.pdf")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
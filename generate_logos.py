@@ -31,18 +31,14 @@ def load_team_mascots() -> dict[str, str]:
     return {}
 
 def load_espn_team_names() -> set[str]:
+    """Team names from the league snapshots (one request per league at most; none when fresh)."""
     names: set[str] = set()
     try:
-        from espn_api.football import League
-        cfgs = json.loads(Path("leagues.json").read_text(encoding="utf-8"))
-        if not isinstance(cfgs, list):
-            cfgs = [cfgs]
-        for c in cfgs:
+        from league_snapshot import config_credentials, get_snapshot, load_league_configs
+        for c in load_league_configs("leagues.json"):
             try:
-                L = League(league_id=c["league_id"], year=c["year"],
-                           ***REMOVED***
-                for t in L.teams:
-                    names.add(t.team_name)
+                snap = get_snapshot(int(c["league_id"]), int(c["year"]), **config_credentials(c))
+                names.update(snap.team_names)
             except Exception:
                 continue
     except Exception:
@@ -3,8 +3,10 @@
 gg.py — Minimal, reliable DOCX renderer for Gridiron Gazette.
 
 - Accepts .docx or .dotx template paths.
-- If .dotx is provided, it copies to a sibling .docx and renders from that.
-- Embeds header/footer logos using docxtpl InlineImage with tags:
+- Renders through docx_template (precompiled, byte-splicing); templates
+  with {% %} control tags fall back to docxtpl (a .dotx is copied to a
+  sibling .docx for that).
+- Embeds header/footer logos as inline images with tags:
     Header: {{ league_logo }}
     Footer: {{ sponsor_logo }}
 - Writes a single output .docx
@@ -16,11 +18,26 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
-from shutil import copyfile
+import zipfile
 from typing import Any, Dict
 
-from docxtpl import DocxTemplate, InlineImage
-from docx.shared import Mm
+from docx_template import DocxImage, UnsupportedTemplate, load_template
+
+DOTX_MAIN_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml"
+DOCX_MAIN_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+
+
+def _dotx_to_docx(src: Path, dst: Path) -> None:
+    """
+    Copy a .dotx as a .docx. The main part's content type has to change too,
+    otherwise python-docx refuses to open the copy.
+    """
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == "[Content_Types].xml":
+                data = data.replace(DOTX_MAIN_TYPE.encode(), DOCX_MAIN_TYPE.encode())
+            zout.writestr(item, data)
 
 
 def resolve_template(path_str: str) -> Path:
@@ -37,7 +54,7 @@ def resolve_template(path_str: str) -> Path:
         docx_copy = p.with_suffix(".docx")
         # Only (re)copy when needed
         if (not docx_copy.exists()) or (p.stat().st_mtime > docx_copy.stat().st_mtime):
-            copyfile(p, docx_copy)
+            _dotx_to_docx(p, docx_copy)
         return docx_copy
 
     # Use .docx directly
@@ -56,9 +73,9 @@ def parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
-def build_context(tpl: DocxTemplate, args: argparse.Namespace) -> Dict[str, Any]:
+def build_context(args: argparse.Namespace) -> Dict[str, Any]:
     """
-    Build the docxtpl context. Header/footer logos are optional; include them only if provided.
+    Build the template context. Header/footer logos are optional; include them only if provided.
     """
     ctx: Dict[str, Any] = {}
 
@@ -66,13 +83,13 @@ def build_context(tpl: DocxTemplate, args: argparse.Namespace) -> Dict[str, Any]
         league_path = Path(args.league_logo)
         if not league_path.exists():
             raise FileNotFoundError(f"League logo not found: {league_path.resolve()}")
-        ctx["LEAGUE_LOGO"] = InlineImage(tpl, str(league_path), width=Mm(args.logo_mm))
+        ctx["LEAGUE_LOGO"] = DocxImage(str(league_path), width_mm=args.logo_mm)
 
     if args.sponsor_logo:
         sponsor_path = Path(args.sponsor_logo)
         if not sponsor_path.exists():
             raise FileNotFoundError(f"Sponsor logo not found: {sponsor_path.resolve()}")
-        ctx["SPONSOR_LOGO"] = InlineImage(tpl, str(sponsor_path), width=Mm(args.logo_mm))
+        ctx["SPONSOR_LOGO"] = DocxImage(str(sponsor_path), width_mm=args.logo_mm)
 
     # Optional text fields you may show in the body
     if args.week is not None:
@@ -86,17 +103,21 @@ def build_context(tpl: DocxTemplate, args: argparse.Namespace) -> Dict[str, Any]
 def main() -> None:
     args = parse_args()
 
-    # Resolve template path first (handles .dotx → .docx copy)
-    template_path = resolve_template(args.template)
-
-    # Build context and render
-    tpl = DocxTemplate(str(template_path))
-    ctx = build_context(tpl, args)
-    tpl.render(ctx)
-
+    ctx = build_context(args)
     out_path = Path(args.out_docx)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    tpl.save(str(out_path))
+
+    try:
+        load_template(args.template).render_to(str(out_path), ctx)
+    except UnsupportedTemplate:
+        from docxtpl import DocxTemplate, InlineImage
+        from docx.shared import Mm
+
+        # Resolve template path first (handles .dotx → .docx copy)
+        tpl = DocxTemplate(str(resolve_template(args.template)))
+        tpl.render({k: InlineImage(tpl, v.path, width=Mm(v.width_mm)) if isinstance(v, DocxImage) else v
+                    for k, v in ctx.items()})
+        tpl.save(str(out_path))
     print(f"[ok] Wrote DOCX: {out_path.resolve()}")
 
 
@@ -0,0 +1,392 @@
+"""
+job_queue.py — Gridiron Gazette
+-------------------------------
+Persistent build queue for weekly multi-league runs (SQLite, like llm_gate).
+
+One job per league/week. Every process and worker thread coordinates
+through one SQLite file:
+
+  • Dedup: a job's key is a hash of (league, year, week, build options).
+    Enqueueing it again is a no-op while it is queued, running or done, so
+    re-running the weekly command only builds what is missing. A failed job
+    enqueued again is reset and retried; ``force`` rebuilds a done one, and
+    so does ``stale_before`` when it finished earlier than that (a gazette
+    built before its week went final).
+  • Priorities: higher first, then oldest.
+  • Claims are taken under BEGIN IMMEDIATE with a lease that the worker
+    renews while the build runs. After a crash, jobs whose worker process
+    is gone (or whose lease ran out) go back to the queue: progress resumes
+    where it stopped and finished leagues are never rebuilt.
+  • Failures are retried with exponential backoff (GAZETTE_JOB_BACKOFF_S ×
+    2^attempt, capped at 30 min) up to max_attempts, then marked failed.
+  • run_workers() runs N worker threads (GAZETTE_WORKERS, default 1).
+
+Config (env):
+  GAZETTE_JOB_DB          SQLite path (default .cache/jobs.sqlite)
+  GAZETTE_WORKERS         concurrent builds (default 1)
+  GAZETTE_JOB_ATTEMPTS    attempts per job (default 3)
+  GAZETTE_JOB_BACKOFF_S   first retry delay (default 30)
+
+Usage:
+
+    queue = JobQueue()
+    queue.enqueue(887998, 2025, 5, name="Browns SEA/KC", priority=10)
+    run_workers(queue, build_league, concurrency=2)     # build_league(job) -> None or raises
+    queue.counts()                                      # {'done': 1}
+
+    python job_queue.py [--week 5]                      # show the queue
+"""
+from __future__ import annotations
+
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = os.getenv("GAZETTE_JOB_DB", ".cache/jobs.sqlite")
+DEFAULT_WORKERS = int(os.getenv("GAZETTE_WORKERS", "1"))
+DEFAULT_ATTEMPTS = int(os.getenv("GAZETTE_JOB_ATTEMPTS", "3"))
+DEFAULT_BACKOFF_S = float(os.getenv("GAZETTE_JOB_BACKOFF_S", "30"))
+MAX_BACKOFF_S = 1800.0
+DEFAULT_LEASE_S = 300.0
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    league_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    options TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    last_error TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, id);
+"""
+
+_COLUMNS = ("id", "key", "league_id", "year", "week", "name", "options", "priority", "status", "attempts",
+            "max_attempts", "not_before", "worker", "lease_until", "last_error")
+
+
+@dataclass
+class Job:
+    id: int
+    key: str
+    league_id: int
+    year: int
+    week: int
+    name: str = ""
+    options: Dict[str, Any] = field(default_factory=dict)
+    priority: int = 0
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = DEFAULT_ATTEMPTS
+    not_before: float = 0.0
+    worker: Optional[str] = None
+    lease_until: Optional[float] = None
+    last_error: str = ""
+
+    @classmethod
+    def from_row(cls, row: Tuple[Any, ...]) -> "Job":
+        data = dict(zip(_COLUMNS, row))
+        data["options"] = json.loads(data["options"] or "{}")
+        return cls(**data)
+
+    @property
+    def label(self) -> str:
+        return self.name or f"league {self.league_id}"
+
+
+def job_key(league_id: int, year: int, week: int, options: Optional[Dict[str, Any]] = None) -> str:
+    blob = json.dumps({"league": int(league_id), "year": int(year), "week": int(week), "options": options or {}},
+                      sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def backoff_s(attempts: int, base_s: float = DEFAULT_BACKOFF_S) -> float:
+    """Delay before retry number ``attempts`` (1, 2, ...): base, 2×base, 4×base ... capped."""
+    return min(MAX_BACKOFF_S, base_s * 2 ** max(0, attempts - 1))
+
+
+def worker_id(n: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{n}"
+
+
+def _worker_alive(worker: Optional[str]) -> bool:
+    """False only when the worker ran on this host and its process is gone."""
+    try:
+        host, pid, _ = (worker or "").rsplit(":", 2)
+        if host != socket.gethostname():
+            return True
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError, OSError):
+        return True
+    return True
+
+
+class JobQueue:
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB,
+        backoff_base_s: float = DEFAULT_BACKOFF_S,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.db_path = Path(db_path)
+        self.backoff_base_s = backoff_base_s
+        self.clock = clock
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation: safe across threads and processes
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = fn(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ---------- producers ----------
+    def enqueue(
+        self,
+        league_id: int,
+        year: int,
+        week: int,
+        name: str = "",
+        priority: int = 0,
+        options: Optional[Dict[str, Any]] = None,
+        max_attempts: int = DEFAULT_ATTEMPTS,
+        force: bool = False,
+        stale_before: float = 0.0,
+    ) -> Tuple[int, bool]:
+        """
+        (job id, queued): queued is False when an identical job is already
+        queued, running or done (done at or after ``stale_before``).
+        """
+        key = job_key(league_id, year, week, options)
+        now = self.clock()
+
+        def txn(conn: sqlite3.Connection) -> Tuple[int, bool]:
+            row = conn.execute("SELECT id, status, updated FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                cur = conn.execute(
+                    "INSERT INTO jobs (key, league_id, year, week, name, options, priority, status, max_attempts, "
+                    "created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, int(league_id), int(year), int(week), name, json.dumps(options or {}, sort_keys=True),
+                     priority, QUEUED, max_attempts, now, now),
+                )
+                return cur.lastrowid, True
+            job_id, status, updated = row
+            if status == FAILED or (status == DONE and (force or updated < stale_before)):
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = 0, not_before = 0, priority = ?, max_attempts = ?, "
+                    "last_error = '', worker = NULL, lease_until = NULL, updated = ? WHERE id = ?",
+                    (QUEUED, priority, max_attempts, now, job_id),
+                )
+                return job_id, True
+            return job_id, False
+
+        return self._write(txn)
+
+    # ---------- workers ----------
+    def recover(self) -> int:
+        """Requeue running jobs whose worker died or whose lease expired; returns how many."""
+        now = self.clock()
+
+        def txn(conn: sqlite3.Connection) -> int:
+            rows = conn.execute("SELECT id, worker, lease_until FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+            stale = [job_id for job_id, worker, lease in rows if (lease or 0) < now or not _worker_alive(worker)]
+            for job_id in stale:
+                conn.execute("UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, updated = ? WHERE id = ?",
+                             (QUEUED, now, job_id))
+            return len(stale)
+
+        recovered = self._write(txn)
+        if recovered:
+            logger.info(f"Requeued {recovered} interrupted job(s)")
+        return recovered
+
+    def claim(self, worker: str, lease_s: float = DEFAULT_LEASE_S) -> Optional[Job]:
+        """Take the highest-priority ready job, or None."""
+        now = self.clock()
+
+        def txn(conn: sqlite3.Connection) -> Optional[Job]:
+            row = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status = ? AND not_before <= ? "
+                "ORDER BY priority DESC, id LIMIT 1",
+                (QUEUED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            job = Job.from_row(row)
+            job.status, job.attempts, job.worker, job.lease_until = RUNNING, job.attempts + 1, worker, now + lease_s
+            conn.execute("UPDATE jobs SET status = ?, attempts = ?, worker = ?, lease_until = ?, updated = ? WHERE id = ?",
+                         (RUNNING, job.attempts, worker, job.lease_until, now, job.id))
+            return job
+
+        return self._write(txn)
+
+    def heartbeat(self, job: Job, lease_s: float = DEFAULT_LEASE_S) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ?",
+                         (self.clock() + lease_s, job.id, job.worker))
+
+    def complete(self, job: Job) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, last_error = '', updated = ? "
+                         "WHERE id = ? AND worker = ?", (DONE, self.clock(), job.id, job.worker))
+
+    def fail(self, job: Job, error: str) -> str:
+        """Record a failed attempt: requeued with backoff, or failed for good. Returns the new status."""
+        now = self.clock()
+        retry = job.attempts < job.max_attempts
+        status = QUEUED if retry else FAILED
+        not_before = now + backoff_s(job.attempts, self.backoff_base_s) if retry else 0.0
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE jobs SET status = ?, not_before = ?, last_error = ?, worker = NULL, lease_until = NULL, "
+                         "updated = ? WHERE id = ? AND worker = ?",
+                         (status, not_before, error[-2000:], now, job.id, job.worker))
+        return status
+
+    # ---------- inspection ----------
+    def jobs(self, week: Optional[int] = None) -> List[Job]:
+        query, params = f"SELECT {', '.join(_COLUMNS)} FROM jobs", ()
+        if week is not None:
+            query, params = query + " WHERE week = ?", (week,)
+        with closing(self._connect()) as conn:
+            return [Job.from_row(r) for r in conn.execute(query + " ORDER BY priority DESC, id", params)]
+
+    def counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def next_ready_in(self, job_ids: Optional[Iterable[int]] = None) -> Optional[float]:
+        """
+        Seconds until the next queued job may run (0 = now), or None if nothing
+        is queued or running. ``job_ids`` limits this to those jobs (one run's).
+        """
+        scope, params = "", ()
+        if job_ids is not None:
+            ids = [int(i) for i in job_ids]
+            scope, params = f" AND id IN ({', '.join('?' * len(ids)) or 'NULL'})", tuple(ids)
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT MIN(not_before) FROM jobs WHERE status = ?{scope}", (QUEUED,) + params).fetchone()
+            running = conn.execute(f"SELECT COUNT(*) FROM jobs WHERE status = ?{scope}", (RUNNING,) + params).fetchone()[0]
+        if row[0] is None:
+            return 1.0 if running else None
+        return max(0.0, row[0] - self.clock())
+
+
+def run_workers(
+    queue: JobQueue,
+    runner: Callable[[Job], Any],
+    concurrency: int = DEFAULT_WORKERS,
+    lease_s: float = DEFAULT_LEASE_S,
+    stop_on_fail: bool = False,
+    sleep: Callable[[float], None] = time.sleep,
+    job_ids: Optional[Iterable[int]] = None,
+) -> Dict[str, int]:
+    """
+    Drain the queue with ``concurrency`` worker threads. ``runner(job)`` builds one
+    league and raises on failure; it is passed a job whose lease is renewed in the
+    background. With ``job_ids`` (the jobs this run enqueued), workers stop once
+    those are settled instead of waiting on other runs' backoffs or builds. Idle
+    workers keep requeueing jobs whose lease ran out. Returns the final status counts.
+    """
+    job_ids = None if job_ids is None else list(job_ids)
+    queue.recover()
+    stop = threading.Event()
+
+    def renew(job: Job, done: threading.Event) -> None:
+        while not done.wait(lease_s / 3):
+            queue.heartbeat(job, lease_s)
+
+    def work(n: int) -> None:
+        me = worker_id(n)
+        while not stop.is_set():
+            job = queue.claim(me, lease_s)
+            if job is None:
+                if queue.recover():     # a lease ran out (its worker hung or died) while we waited
+                    continue
+                wait = queue.next_ready_in(job_ids)
+                if wait is None:
+                    return
+                sleep(min(max(wait, 0.05), 5.0))
+                continue
+            logger.info(f"[{me}] {job.label} week {job.week}: attempt {job.attempts}/{job.max_attempts}")
+            done = threading.Event()
+            threading.Thread(target=renew, args=(job, done), daemon=True).start()
+            t0 = time.time()
+            try:
+                runner(job)
+            except Exception as e:
+                status = queue.fail(job, str(e) or type(e).__name__)
+                logger.warning(f"[{me}] {job.label}: failed ({e}); " +
+                               ("will retry" if status == QUEUED else "giving up"))
+                if status == FAILED and stop_on_fail:
+                    stop.set()
+            else:
+                queue.complete(job)
+                logger.info(f"[{me}] {job.label}: done in {time.time() - t0:.1f}s")
+            finally:
+                done.set()
+
+    threads = [threading.Thread(target=work, args=(n,), daemon=True) for n in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return queue.counts()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Show the gazette build queue")
+    ap.add_argument("--db", default=DEFAULT_DB)
+    ap.add_argument("--week", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    queue = JobQueue(args.db)
+    for job in queue.jobs(args.week):
+        error = f"  {job.last_error.splitlines()[-1]}" if job.last_error else ""
+        print(f"{job.id:>4} W{job.week:<2} p{job.priority:<3} {job.status:<8} {job.attempts}/{job.max_attempts} "
+              f"{job.label}{error}")
+    print(json.dumps(queue.counts()))
+
+
+if __name__ == "__main__":
+    main()
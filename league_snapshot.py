@@ -0,0 +1,329 @@
+"""
+league_snapshot.py — Gridiron Gazette
+-------------------------------------
+A local, versioned snapshot of each league's metadata, shared by every tool.
+
+espn_api's League(...) downloads settings, teams, members, rosters, the
+full schedule, the pro-player map, the pro schedule and the draft on every
+construction. Most tools only need team names, owners and slot settings, so:
+
+  • ONE request (the league view: settings, teams, members, status, rosters,
+    schedule) refreshes a snapshot in .cache/leagues/{league_id}-{year}.json.
+    Rosters and the schedule change daily, so they are stored beside the
+    metadata but left out of its hash.
+  • The snapshot's version only goes up when the metadata hash changes, so
+    re-fetching an unchanged league only renews its timestamp (and rosters).
+  • Within GAZETTE_LEAGUE_TTL_H hours (default 6) every tool reads the
+    snapshot with no network round-trip at all. A build for a given week
+    also re-fetches a snapshot taken before that week started or went final
+    (season_calendar), so its rosters, results and streaks are never older
+    than the week they describe.
+  • open_league() hands gazette_data an espn_api League hydrated from the
+    snapshot (teams, rosters, schedule), ready for box_scores()/scoreboard().
+
+Usage:
+
+    snap = get_snapshot(887998, 2025, espn_s2, swid)
+    snap.team_names, snap.owners, snap.slot_counts, snap.current_week
+
+    league = open_league(887998, 2025, espn_s2, swid)    # 0 requests when fresh
+    league = open_league(887998, 2025, espn_s2, swid, week=5)   # ... and taken after week 5 went final
+    boxes = league.box_scores(week=5)
+
+    python league_snapshot.py [--refresh]                 # every league in leagues.json
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(os.getenv("GAZETTE_LEAGUE_CACHE", ".cache/leagues"))
+SNAPSHOT_TTL_S = float(os.getenv("GAZETTE_LEAGUE_TTL_H", "6")) * 3600
+FORMAT_VERSION = 2  # bump when the stored layout changes
+
+# Parts of the league view that make up the metadata (rosters/schedule are per-week data)
+_KEEP = ("id", "seasonId", "scoringPeriodId", "status", "settings", "members", "teams")
+
+
+@dataclass
+class LeagueSnapshot:
+    league_id: int
+    year: int
+    version: int = 0
+    sha1: str = ""
+    fetched_at: float = 0.0
+    data: Dict[str, Any] = field(default_factory=dict)
+    live: Dict[str, Any] = field(default_factory=dict)   # {"rosters": {team id: roster}, "schedule": [...]}
+
+    @property
+    def age_s(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def name(self) -> str:
+        return self.data.get("settings", {}).get("name") or "League"
+
+    @property
+    def current_week(self) -> int:
+        status = self.data.get("status", {})
+        week = int(self.data.get("scoringPeriodId") or 0)
+        final = int(status.get("finalScoringPeriod") or week)
+        return min(week, final) if self.year >= 2018 else week
+
+    @property
+    def teams(self) -> List[Dict[str, Any]]:
+        """[{id, name, abbrev, owners: [display names], division_id}] sorted by team id."""
+        members = {m.get("id"): m for m in self.data.get("members", [])}
+        out = []
+        for t in sorted(self.data.get("teams", []), key=lambda t: t.get("id", 0)):
+            name = t.get("name") or f"{t.get('location', 'Unknown')} {t.get('nickname', 'Unknown')}"
+            owners = [members.get(o, {}) for o in t.get("owners", [])]
+            out.append({
+                "id": t.get("id"),
+                "name": name,
+                "abbrev": t.get("abbrev", ""),
+                "owners": [_member_name(m) for m in owners if m],
+                "division_id": t.get("divisionId", 0),
+            })
+        return out
+
+    @property
+    def league_view(self) -> Dict[str, Any]:
+        """The league view again: metadata with this fetch's rosters and schedule put back."""
+        view = dict(self.data)
+        rosters = self.live.get("rosters", {})
+        view["teams"] = [dict(t, roster=rosters.get(str(t.get("id")), {})) for t in self.data.get("teams", [])]
+        view["schedule"] = self.live.get("schedule", [])
+        return view
+
+    @property
+    def team_names(self) -> List[str]:
+        return [t["name"] for t in self.teams]
+
+    @property
+    def owners(self) -> Dict[str, List[str]]:
+        return {t["name"]: t["owners"] for t in self.teams}
+
+    @property
+    def slot_counts(self) -> Dict[str, int]:
+        """Lineup slots by label (QB, RB, RB/WR/TE, BE, ...), as League.settings.position_slot_counts."""
+        from espn_api.football.settings import Settings
+
+        return Settings(self.data["settings"]).position_slot_counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"format": FORMAT_VERSION, "league_id": self.league_id, "year": self.year, "version": self.version,
+                "sha1": self.sha1, "fetched_at": self.fetched_at, "data": self.data, "live": self.live}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LeagueSnapshot":
+        if d.get("format") != FORMAT_VERSION:
+            raise ValueError(f"snapshot format {d.get('format')} != {FORMAT_VERSION}")
+        return cls(d["league_id"], d["year"], d["version"], d["sha1"], d["fetched_at"], d["data"], d.get("live", {}))
+
+
+def _member_name(member: Dict[str, Any]) -> str:
+    full = f"{member.get('firstName', '')} {member.get('lastName', '')}".strip()
+    return full or member.get("displayName", "")
+
+
+def _split(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(metadata, live): rosters and the schedule come out of the metadata so they don't move its hash."""
+    data = {k: copy.deepcopy(payload[k]) for k in _KEEP if k in payload}
+    rosters = {str(team.get("id")): team.pop("roster", {}) for team in data.get("teams", [])}
+    return data, {"rosters": rosters, "schedule": copy.deepcopy(payload.get("schedule", []))}
+
+
+def _digest(data: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def snapshot_path(league_id: int, year: int, cache_dir: Path = SNAPSHOT_DIR) -> Path:
+    return Path(cache_dir) / f"{league_id}-{year}.json"
+
+
+def load_snapshot(league_id: int, year: int, cache_dir: Path = SNAPSHOT_DIR) -> Optional[LeagueSnapshot]:
+    """The stored snapshot, or None (missing/unreadable/old format). Never touches the network."""
+    path = snapshot_path(league_id, year, cache_dir)
+    if not path.exists():
+        return None
+    try:
+        return LeagueSnapshot.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable league snapshot {path}: {e}")
+        return None
+
+
+def save_snapshot(league_id: int, year: int, payload: Dict[str, Any], cache_dir: Path = SNAPSHOT_DIR) -> LeagueSnapshot:
+    """Store the league view; the version goes up only if the metadata changed."""
+    data, live = _split(payload)
+    sha1 = _digest(data)
+    old = load_snapshot(league_id, year, cache_dir)
+    changed = old is None or old.sha1 != sha1
+    snap = LeagueSnapshot(league_id, year, (old.version if old else 0) + int(changed), sha1, time.time(),
+                          data if changed else old.data, live)
+    path = snapshot_path(league_id, year, cache_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(snap.to_dict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug(f"Could not save league snapshot: {e}")
+    logger.info(f"League {league_id}/{year} snapshot v{snap.version}" + (" (changed)" if changed and old else ""))
+    return snap
+
+
+def _request_client(league_id: int, year: int, espn_s2: Optional[str], swid: Optional[str]):
+    from espn_api.requests.espn_requests import EspnFantasyRequests
+
+    cookies = {"espn_s2": espn_s2, "SWID": swid} if espn_s2 and swid else None
+    return EspnFantasyRequests(sport="nfl", year=year, league_id=league_id, cookies=cookies)
+
+
+def fetch_league_view(league_id: int, year: int, espn_s2: Optional[str] = None, swid: Optional[str] = None) -> Dict[str, Any]:
+    """One request: settings, teams (with rosters), members, status and schedule."""
+    return _request_client(league_id, year, espn_s2, swid).get_league()
+
+
+def get_snapshot(
+    league_id: int,
+    year: int,
+    espn_s2: Optional[str] = None,
+    swid: Optional[str] = None,
+    max_age_s: float = SNAPSHOT_TTL_S,
+    refresh: bool = False,
+    cache_dir: Path = SNAPSHOT_DIR,
+) -> LeagueSnapshot:
+    """The snapshot, refreshed (one request) only when missing, older than max_age_s or forced."""
+    snap = None if refresh else load_snapshot(league_id, year, cache_dir)
+    if snap is not None and snap.age_s <= max_age_s:
+        return snap
+    return save_snapshot(league_id, year, fetch_league_view(league_id, year, espn_s2, swid), cache_dir)
+
+
+def is_fresh(snap: Optional[LeagueSnapshot], max_age_s: float = SNAPSHOT_TTL_S, week: Optional[int] = None) -> bool:
+    """
+    Young enough to use without a request. With ``week``, the snapshot must
+    also know that week and, once it is final, have been taken after it went
+    final: otherwise rosters, results and streaks would predate the week.
+    """
+    if snap is None or snap.age_s > max_age_s:
+        return False
+    if not week:
+        return True
+    if snap.current_week < week:
+        return False
+    from season_calendar import get_calendar
+
+    final_at = get_calendar(snap.year).final_at(week)
+    return final_at is None or time.time() < final_at or snap.fetched_at >= final_at
+
+
+def hydrate_league(league: Any, payload: Dict[str, Any]) -> Any:
+    """Fill an unfetched espn_api League from a league view, rosters and schedule included (no requests)."""
+    from espn_api.base_league import BaseLeague
+    from espn_api.football import League
+    from espn_api.football.settings import Settings
+
+    data = dict(payload)
+    data.setdefault("schedule", [])
+    data.setdefault("members", [])
+    client = league.espn_request
+    client.get_league = lambda: data          # BaseLeague parses status/settings/members from it
+    try:
+        BaseLeague._fetch_league(league, SettingsClass=Settings)
+    finally:
+        del client.get_league
+    league.nfl_week = data["status"].get("latestScoringPeriod", league.current_week)
+    # The football League's own team setup (schedule entries resolved to Team objects, mov, division
+    # names), minus the pro-schedule request: it only fills Player.schedule, which the gazette doesn't use
+    league._get_all_pro_schedule = lambda: {}
+    try:
+        League._fetch_teams(league, data)
+    finally:
+        del league._get_all_pro_schedule
+    return league
+
+
+def rebase(client: Any, espn_base: str) -> None:
+    """Send an EspnFantasyRequests client's league/season calls to ``espn_base`` instead of ESPN."""
+    from espn_api.requests.constant import FANTASY_BASE_ENDPOINT
+
+    base = espn_base.rstrip("/") + "/"
+    client.LEAGUE_ENDPOINT = client.LEAGUE_ENDPOINT.replace(FANTASY_BASE_ENDPOINT, base, 1)
+    client.ENDPOINT = client.ENDPOINT.replace(FANTASY_BASE_ENDPOINT, base, 1)
+
+
+def open_league(
+    league_id: int,
+    year: int,
+    espn_s2: Optional[str] = None,
+    swid: Optional[str] = None,
+    max_age_s: float = SNAPSHOT_TTL_S,
+    refresh: bool = False,
+    cache_dir: Path = SNAPSHOT_DIR,
+    espn_base: Optional[str] = None,
+    week: Optional[int] = None,
+) -> Any:
+    """
+    An espn_api League with settings, teams, rosters and schedule, ready for
+    box_scores()/scoreboard(): from the snapshot when fresh (no requests), else
+    from one league-view request (which refreshes the snapshot). Pass the
+    ``week`` being built to refuse a snapshot taken before it (see is_fresh).
+    ``espn_base`` points the League at another server (e.g. live_replay).
+    """
+    from espn_api.football import League
+
+    league = League(league_id=league_id, year=year, espn_s2=espn_s2, swid=swid, fetch_league=False)
+    if espn_base:
+        rebase(league.espn_request, espn_base)
+    snap = None if refresh else load_snapshot(league_id, year, cache_dir)
+    if is_fresh(snap, max_age_s, week):
+        logger.info(f"League {league_id}/{year} from snapshot v{snap.version} ({snap.age_s / 60:.0f} min old)")
+        return hydrate_league(league, snap.league_view)
+    payload = league.espn_request.get_league()
+    save_snapshot(league_id, year, payload, cache_dir)
+    return hydrate_league(league, payload)
+
+
+def load_league_configs(path: str = "leagues.json") -> List[Dict[str, Any]]:
+    cfgs = json.loads(Path(path).read_text(encoding="utf-8"))
+    return cfgs if isinstance(cfgs, list) else [cfgs]
+
+
+def config_credentials(cfg: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """espn_s2/swid from a leagues.json entry, else the environment."""
+    return {
+        "espn_s2": cfg.get("espn_s2") or os.getenv("ESPN_S2") or os.getenv("S2"),
+        "swid": cfg.get("swid") or os.getenv("ESPN_SWID") or os.getenv("SWID"),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Show (or refresh) the league metadata snapshots")
+    ap.add_argument("--leagues", default="leagues.json")
+    ap.add_argument("--refresh", action="store_true", help="Re-fetch even if the snapshot is fresh")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    for cfg in load_league_configs(args.leagues):
+        snap = get_snapshot(int(cfg["league_id"]), int(cfg["year"]), refresh=args.refresh, **config_credentials(cfg))
+        print(f"{snap.name} ({snap.league_id}/{snap.year}) v{snap.version}, week {snap.current_week}, "
+              f"{len(snap.teams)} teams, {snap.age_s / 60:.0f} min old")
+        for team in snap.teams:
+            print(f"  {team['id']:>2} {team['name']:<32} {', '.join(team['owners'])}")
+
+
+if __name__ == "__main__":
+    main()
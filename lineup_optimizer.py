@@ -0,0 +1,274 @@
+"""
+lineup_optimizer.py — Gridiron Gazette
+--------------------------------------
+Optimal-lineup ("points left on the bench") solver.
+
+Takes each team's FULL weekly roster (starters + BE), respects the league's
+slot rules (FLEX, OP, RB/WR, WR/TE, IDP flex), and computes the max-possible
+score versus what the manager actually started.
+
+How it stays fast:
+  • Only flex slots create choices. Each flex slot is expanded into the set of
+    distinct "how many starters per position" vectors, deduplicated as we go.
+  • Those vectors depend only on the league's slot counts, so they are cached
+    (lru_cache) and shared by every team in the week — and every week after.
+  • For a given vector the best lineup is simply the top-N at each position, so
+    each team costs one sort per position plus prefix-sum lookups.
+
+Usage:
+
+    from lineup_optimizer import solve_week
+
+    results = solve_week(league.box_scores(week=5), league.settings.position_slot_counts)
+    res = results["Nana's Hawks"]
+    res.points_left, res.efficiency, res.bench_mistakes
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ESPN lineup slot -> positions that may fill it
+SLOT_ELIGIBILITY: Dict[str, Tuple[str, ...]] = {
+    "QB": ("QB",),
+    "TQB": ("QB",),
+    "RB": ("RB",),
+    "WR": ("WR",),
+    "TE": ("TE",),
+    "RB/WR": ("RB", "WR"),
+    "WR/TE": ("WR", "TE"),
+    "RB/WR/TE": ("RB", "WR", "TE"),
+    "FLEX": ("RB", "WR", "TE"),
+    "OP": ("QB", "RB", "WR", "TE"),
+    "D/ST": ("D/ST",),
+    "K": ("K",),
+    "P": ("P",),
+    "HC": ("HC",),
+    # IDP leagues
+    "DT": ("DT",),
+    "DE": ("DE",),
+    "LB": ("LB",),
+    "CB": ("CB",),
+    "S": ("S",),
+    "DL": ("DT", "DE"),
+    "DB": ("CB", "S"),
+    "DP": ("DT", "DE", "LB", "CB", "S"),
+}
+
+# Slots that never count toward the weekly score
+NON_STARTING_SLOTS = {"BE", "IR", "", "FA"}
+
+# Sensible default when league settings are unavailable (standard ESPN 1QB PPR)
+DEFAULT_SLOT_COUNTS: Dict[str, int] = {
+    "QB": 1, "RB": 2, "WR": 2, "TE": 1, "RB/WR/TE": 1, "D/ST": 1, "K": 1,
+}
+
+# ===============
+# Data structures
+# ===============
+@dataclass
+class LineupPlayer:
+    name: str
+    position: str
+    points: float
+    slot: str  # slot the manager actually used (BE for bench)
+
+    @property
+    def started(self) -> bool:
+        return self.slot not in NON_STARTING_SLOTS
+
+@dataclass
+class LineupResult:
+    team: str
+    actual_points: float
+    optimal_points: float
+    optimal_starters: List[LineupPlayer] = field(default_factory=list)
+    bench_mistakes: List[str] = field(default_factory=list)
+
+    @property
+    def points_left(self) -> float:
+        return max(0.0, round(self.optimal_points - self.actual_points, 2))
+
+    @property
+    def efficiency(self) -> float:
+        """Actual / optimal, 0.0–1.0 (1.0 when nothing was possible)."""
+        if self.optimal_points <= 0:
+            return 1.0
+        return min(1.0, self.actual_points / self.optimal_points)
+
+# ===================
+# Eligibility tables
+# ===================
+def _freeze_slot_counts(slot_counts: Optional[Mapping[str, int]]) -> Tuple[Tuple[str, int], ...]:
+    """Starter slots only, in a stable hashable form for the cache."""
+    counts = slot_counts or DEFAULT_SLOT_COUNTS
+    return tuple(sorted(
+        (slot, int(n)) for slot, n in counts.items()
+        if n and slot in SLOT_ELIGIBILITY
+    ))
+
+@lru_cache(maxsize=64)
+def _position_count_vectors(frozen_slots: Tuple[Tuple[str, int], ...]) -> Tuple[Tuple[Tuple[str, int], ...], ...]:
+    """
+    Every distinct {position: starters} vector the slot rules allow.
+    Dedicated slots contribute a fixed count; each flex slot branches.
+    """
+    vectors = {()}
+    for slot, n in frozen_slots:
+        choices = SLOT_ELIGIBILITY[slot]
+        for _ in range(n):
+            grown = set()
+            for vec in vectors:
+                as_dict = dict(vec)
+                for pos in choices:
+                    nxt = dict(as_dict)
+                    nxt[pos] = nxt.get(pos, 0) + 1
+                    grown.add(tuple(sorted(nxt.items())))
+            vectors = grown
+    logger.debug(f"Built {len(vectors)} lineup vectors for slots {frozen_slots}")
+    return tuple(vectors)
+
+def eligibility_table(slot_counts: Optional[Mapping[str, int]] = None) -> Tuple[Tuple[Tuple[str, int], ...], ...]:
+    """Cached position-count vectors for a league's slot settings."""
+    return _position_count_vectors(_freeze_slot_counts(slot_counts))
+
+# ===================
+# Roster helpers
+# ===================
+def _player_position(player: Any) -> str:
+    pos = getattr(player, "position", None)
+    if pos and pos != "Unknown":
+        return pos
+    for slot in getattr(player, "eligibleSlots", None) or []:
+        if "/" not in slot and slot in SLOT_ELIGIBILITY:
+            return slot
+    return "Unknown"
+
+def _to_lineup_players(lineup: Iterable[Any]) -> List[LineupPlayer]:
+    players: List[LineupPlayer] = []
+    for p in lineup or []:
+        try:
+            slot = getattr(p, "slot_position", "") or ""
+            if slot == "IR":
+                continue  # IR can't be started, so it can't be a mistake
+            players.append(LineupPlayer(
+                name=getattr(p, "name", "Unknown Player"),
+                position=_player_position(p),
+                points=float(getattr(p, "points", 0) or 0),
+                slot=slot,
+            ))
+        except Exception as e:
+            logger.debug(f"Skipping lineup player: {e}")
+    return players
+
+def _bench_mistakes(promoted: List[LineupPlayer], demoted: List[LineupPlayer]) -> List[str]:
+    """
+    Pair each benched player who belonged in the lineup with the starter they'd
+    have replaced: same position first, then whatever flex spot is left over.
+    """
+    promoted = sorted(promoted, key=lambda p: p.points, reverse=True)
+    demoted = sorted(demoted, key=lambda p: p.points)
+    pairs = []
+    leftover = []
+    for bench in promoted:
+        match = next((s for s in demoted if s.position == bench.position), None)
+        if match is None:
+            leftover.append(bench)
+            continue
+        demoted.remove(match)
+        pairs.append((bench, match))
+    pairs.extend(zip(leftover, demoted))
+
+    notes = []
+    for bench, starter in pairs:
+        gain = bench.points - starter.points
+        if gain <= 0:
+            continue
+        notes.append(
+            f"Benched {bench.name} ({bench.position}, {bench.points:.1f} pts) "
+            f"while starting {starter.name} ({starter.position}, {starter.points:.1f} pts)"
+        )
+    return notes
+
+# ==================
+# Solver API
+# ==================
+def solve_lineup(
+    team: str,
+    lineup: Iterable[Any],
+    slot_counts: Optional[Mapping[str, int]] = None,
+) -> LineupResult:
+    """Optimal lineup for one team's full weekly roster."""
+    players = _to_lineup_players(lineup)
+    actual = round(sum(p.points for p in players if p.started), 2)
+
+    by_pos: Dict[str, List[LineupPlayer]] = {}
+    for p in players:
+        by_pos.setdefault(p.position, []).append(p)
+    prefix: Dict[str, List[float]] = {}
+    for pos, group in by_pos.items():
+        group.sort(key=lambda p: p.points, reverse=True)
+        sums = [0.0]
+        for p in group:
+            sums.append(sums[-1] + max(0.0, p.points))
+        prefix[pos] = sums
+
+    best_total = 0.0
+    best_vec: Tuple[Tuple[str, int], ...] = ()
+    for vec in eligibility_table(slot_counts):
+        total = 0.0
+        for pos, n in vec:
+            sums = prefix.get(pos)
+            if sums:
+                total += sums[min(n, len(sums) - 1)]
+        if total > best_total:
+            best_total, best_vec = total, vec
+
+    optimal: List[LineupPlayer] = []
+    for pos, n in best_vec:
+        optimal.extend(p for p in by_pos.get(pos, [])[:n] if p.points > 0)
+
+    optimal_ids = {id(p) for p in optimal}
+    promoted = [p for p in optimal if not p.started]
+    demoted = [p for p in players if p.started and id(p) not in optimal_ids]
+
+    # Never report an "optimal" score below what was actually started
+    optimal_points = max(round(best_total, 2), actual)
+
+    return LineupResult(
+        team=team,
+        actual_points=actual,
+        optimal_points=optimal_points,
+        optimal_starters=optimal,
+        bench_mistakes=_bench_mistakes(promoted, demoted),
+    )
+
+def solve_week(
+    box_scores: Iterable[Any],
+    slot_counts: Optional[Mapping[str, int]] = None,
+    key: str = "team_name",
+) -> Dict[Any, LineupResult]:
+    """
+    Solve every team in a week's box scores against one shared eligibility table.
+    Returns {team.<key>: LineupResult} (team_name by default, or key="team_id");
+    bye/empty sides are skipped.
+    """
+    results: Dict[Any, LineupResult] = {}
+    eligibility_table(slot_counts)  # warm the cache once for the whole week
+    for box in box_scores or []:
+        for side in ("home", "away"):
+            team = getattr(box, f"{side}_team", None)
+            lineup = getattr(box, f"{side}_lineup", None)
+            name = getattr(team, "team_name", None)
+            if not name or not lineup:
+                continue
+            try:
+                results[getattr(team, key, name)] = solve_lineup(name, lineup, slot_counts)
+            except Exception as e:
+                logger.debug(f"Lineup solve failed for {name}: {e}")
+    logger.info(f"Solved optimal lineups for {len(results)} teams")
+    return results
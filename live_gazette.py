@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+live_gazette.py — Gridiron Gazette
+----------------------------------
+Live game-day mode: keep each league's gazette current while games are on.
+
+The gazette is built once (gazette_data + weekly_recap, template blurbs, no
+LLM), then every league is polled on its own adaptive interval:
+
+  • ONE request per poll: this week's matchup scores only (the
+    x-fantasy-filter box scores use), not the season scoreboard. An
+    unchanged response (same hash) ends the poll there.
+  • Only the MatchRows whose scores moved are replaced (gazette_data.rescore,
+    matched by team id); their template blurbs are rewritten and the awards
+    recomputed. Player stats (box scores, 3 requests) are refreshed at most
+    every GAZETTE_LIVE_STATS_S seconds (default 300).
+  • The HTML template is split at its top-level {% if %} blocks
+    (SectionedTemplate): a section is re-rendered only when a placeholder it
+    reads changed, so a touchdown in one game re-renders one matchup block.
+  • HTML (and PDF, if asked) are re-published only when something changed,
+    written to a temp file and swapped in with os.replace.
+  • Interval: GAZETTE_LIVE_INTERVAL_S (default 60) while scores move,
+    doubling on quiet polls up to GAZETTE_LIVE_MAX_INTERVAL_S (default 600);
+    a league stops polling once ESPN marks all its games decided.
+
+--record DIR keeps every league view and score response so live_replay.py
+can serve the game day again; --espn-base points the polling at it.
+
+Usage:
+  python live_gazette.py                                   # every league in leagues.json
+  python live_gazette.py --league-id 887998 --year 2025 --formats html,pdf
+  python live_gazette.py --record recordings/2025-w05
+  python live_replay.py recordings/2025-w05 --port 8766 --step 5 &
+  python live_gazette.py --espn-base http://127.0.0.1:8766/ --interval 5
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import gazette_data
+from league_snapshot import config_credentials, load_league_configs, load_snapshot, open_league
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_S = float(os.getenv("GAZETTE_LIVE_INTERVAL_S", "60"))
+MAX_INTERVAL_S = float(os.getenv("GAZETTE_LIVE_MAX_INTERVAL_S", "600"))
+STATS_EVERY_S = float(os.getenv("GAZETTE_LIVE_STATS_S", "300"))
+LIVE_FORMATS = ("html", "pdf")
+DEFAULT_LIVE_OUTPUT = "recaps/live/{league_id}/Gazette_{year}_W{week02}"
+DEFAULT_HTML_TEMPLATE = "templates/recap_template.html"
+
+
+# ===============
+# Score polling
+# ===============
+@dataclass
+class ScoreLine:
+    home_id: int
+    away_id: int
+    home_score: float
+    away_score: float
+    decided: bool
+
+
+def matchup_period(league: Any, week: int) -> int:
+    """The matchup period holding scoring period ``week`` (as espn_api's box_scores)."""
+    for period, weeks in getattr(league.settings, "matchup_periods", {}).items():
+        if week in weeks:
+            return int(period)
+    return week
+
+
+def fetch_scores(league: Any, week: int) -> Dict[str, Any]:
+    """One request: this week's matchups with live totals (box_scores' first call, alone)."""
+    params = {"view": ["mMatchupScore", "mScoreboard"], "scoringPeriodId": week}
+    filters = {"schedule": {"filterMatchupPeriodIds": {"value": [matchup_period(league, week)]}}}
+    return league.espn_request.league_get(params=params, headers={"x-fantasy-filter": json.dumps(filters)})
+
+
+def parse_scores(data: Dict[str, Any], period: int) -> Dict[Tuple[int, int], ScoreLine]:
+    """{(home id, away id): ScoreLine} for the period's games (byes skipped)."""
+    lines: Dict[Tuple[int, int], ScoreLine] = {}
+    for game in data.get("schedule", []):
+        if game.get("matchupPeriodId", period) != period or "away" not in game:
+            continue
+        sides = []
+        for side in (game["home"], game["away"]):
+            points = side.get("totalPointsLive", side.get("totalPoints", 0.0))
+            sides.append((int(side["teamId"]), round(float(points or 0.0), 2)))
+        (home_id, hs), (away_id, as_) = sides
+        lines[(home_id, away_id)] = ScoreLine(home_id, away_id, hs, as_, game.get("winner", "UNDECIDED") != "UNDECIDED")
+    return lines
+
+
+# ===================
+# Sectioned template
+# ===================
+_TAG_RE = re.compile(r"\{%\s*(\w+).*?%\}", re.S)
+_OPENERS = {"if", "for", "with", "filter", "call", "autoescape"}
+# Whitespace control, comments and anything that defines or shares names across
+# the template can't be cut into independent pieces: render those whole
+_UNSPLITTABLE_RE = re.compile(r"\{%-|-%\}|\{#|\{%\s*(?:extends|block|macro|set|import|from|include|raw)\b")
+_MISSING = object()
+
+
+def split_sections(source: str) -> List[str]:
+    """Cut template source into top-level control blocks and the text between them."""
+    if _UNSPLITTABLE_RE.search(source):
+        return [source]
+    sections: List[str] = []
+    depth, start = 0, 0
+    for m in _TAG_RE.finditer(source):
+        word = m.group(1)
+        if word in _OPENERS:
+            if depth == 0 and m.start() > start:
+                sections.append(source[start:m.start()])
+                start = m.start()
+            depth += 1
+        elif word.startswith("end") and word[3:] in _OPENERS:
+            depth -= 1
+            if depth < 0:
+                return [source]
+            if depth == 0:
+                sections.append(source[start:m.end()])
+                start = m.end()
+    if depth:
+        return [source]
+    if start < len(source):
+        sections.append(source[start:])
+    return sections
+
+
+def _fingerprint(value: Any) -> str:
+    if value is _MISSING:
+        return "\0missing"
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class SectionedTemplate:
+    """
+    The HTML template as independently rendered sections. render() reuses a
+    section's last output while the values of the placeholders it reads are
+    unchanged; the joined result is identical to weekly_recap.render_html.
+    """
+
+    def __init__(self, template_path: str):
+        from jinja2 import Environment, FileSystemLoader, meta
+        import weekly_recap
+
+        path = weekly_recap.resolve_template_path(template_path)
+        source = path.read_text(encoding="utf-8")
+        # Jinja drops one trailing newline from a whole template; the sections keep theirs
+        if source.endswith("\n"):
+            source = source[:-1]
+        env = Environment(loader=FileSystemLoader(str(path.parent)), autoescape=True, keep_trailing_newline=True)
+        self.path = path
+        self.sections: List[Tuple[Any, Tuple[str, ...]]] = []
+        for text in split_sections(source):
+            names = tuple(sorted(meta.find_undeclared_variables(env.parse(text))))
+            self.sections.append((env.from_string(text), names))
+        self._cache: List[Optional[Tuple[Tuple[str, ...], str]]] = [None] * len(self.sections)
+        self.rendered = self.reused = 0
+
+    def render(self, ctx: Dict[str, Any]) -> str:
+        parts: List[str] = []
+        self.rendered = self.reused = 0
+        for i, (template, names) in enumerate(self.sections):
+            values = {n: ctx[n] for n in names if n in ctx}
+            key = tuple(_fingerprint(values.get(n, _MISSING)) for n in names)
+            cached = self._cache[i]
+            if cached is not None and cached[0] == key:
+                parts.append(cached[1])
+                self.reused += 1
+                continue
+            out = template.render(**values)
+            self._cache[i] = (key, out)
+            parts.append(out)
+            self.rendered += 1
+        return "".join(parts)
+
+
+# ============
+# Live league
+# ============
+@dataclass
+class PollResult:
+    league_id: int
+    requests: int = 0
+    changed: List[int] = field(default_factory=list)   # matchup slots (1-based) that moved
+    stats_refreshed: bool = False
+    sections_rendered: int = 0
+    sections_reused: int = 0
+    published: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        if not self.changed:
+            return f"League {self.league_id}: no change ({self.requests} request(s), {self.seconds:.2f}s)"
+        return (f"League {self.league_id}: matchup(s) {', '.join(map(str, self.changed))} changed; "
+                f"{self.requests} request(s), {self.sections_rendered} section(s) re-rendered, "
+                f"{self.sections_reused} reused, {self.seconds:.2f}s")
+
+
+class LiveGazette:
+    """One league's live gazette: poll, update the rows that moved, re-render, publish."""
+
+    def __init__(
+        self,
+        league: Any,
+        ctx: gazette_data.GazetteContext,
+        week: int,
+        stem: Path,
+        template: str = DEFAULT_HTML_TEMPLATE,
+        formats: Sequence[str] = ("html",),
+        record_dir: Optional[Path] = None,
+        interval_s: float = POLL_INTERVAL_S,
+        max_interval_s: float = MAX_INTERVAL_S,
+        stats_every_s: float = STATS_EVERY_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        unknown = [f for f in formats if f not in LIVE_FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown live format(s): {', '.join(unknown)} (available: {', '.join(LIVE_FORMATS)})")
+        from asset_bundler import AssetBundler
+
+        self.league, self.ctx, self.week, self.stem = league, ctx, week, Path(stem)
+        self.league_id = int(getattr(league, "league_id", 0))
+        self.period = matchup_period(league, week)
+        self.template = SectionedTemplate(template)
+        self.formats = list(formats)
+        self.record_dir = Path(record_dir) / str(self.league_id) if record_dir else None
+        self.base_interval_s, self.max_interval_s = interval_s, max_interval_s
+        self.interval_s = interval_s
+        self.stats_every_s = stats_every_s
+        self.clock = clock
+        self.done = False
+        self.polls = self.frames = 0
+        self._digest = ""
+        self._stats_at = clock()
+        self._bundler = AssetBundler()
+
+    @classmethod
+    def open(
+        cls,
+        league_id: int,
+        year: int,
+        week: Optional[int] = None,
+        espn_s2: Optional[str] = None,
+        swid: Optional[str] = None,
+        espn_base: Optional[str] = None,
+        output: str = DEFAULT_LIVE_OUTPUT,
+        template: str = DEFAULT_HTML_TEMPLATE,
+        **kwargs: Any,
+    ) -> "LiveGazette":
+        """Open the league, build the context once and publish the first edition."""
+        import weekly_recap
+        from template_schema import check_context
+
+        league = open_league(league_id, year, espn_s2=espn_s2, swid=swid, espn_base=espn_base, week=week)
+        wk = int(week or league.current_week)
+        ctx = weekly_recap.build_render_context(league_id, year, wk, use_llm_blurbs=False, league=league)
+        check_context(str(weekly_recap.resolve_template_path(template)), ctx)
+        stem = Path(output.format(league_id=league_id, year=year, week=wk, week02=f"{wk:02d}"))
+        live = cls(league, ctx, wk, stem, template=template, **kwargs)
+        if live.record_dir:
+            snap = load_snapshot(league_id, year)
+            if snap is not None:
+                live._record("league.json", snap.league_view)
+        live.publish()
+        return live
+
+    # ----- polling -----
+    def poll(self) -> PollResult:
+        t0 = time.perf_counter()
+        result = PollResult(self.league_id)
+        with gazette_data.EspnRequestCounter(self.league) as requests_made:
+            data = fetch_scores(self.league, self.week)
+            self.polls += 1
+            digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+            if digest != self._digest:
+                self._digest = digest
+                if self.record_dir:
+                    self.frames += 1
+                    self._record(f"{self.frames:04d}.json", data)
+                self._apply(parse_scores(data, self.period), result)
+        result.requests = requests_made.count
+
+        if result.changed:
+            html = self.render(result)
+            result.published = self.publish(html)
+        self.interval_s = self.base_interval_s if result.changed else min(self.max_interval_s, self.interval_s * 2)
+        result.seconds = round(time.perf_counter() - t0, 3)
+        logger.info(result.summary())
+        return result
+
+    def _apply(self, scores: Dict[Tuple[int, int], ScoreLine], result: PollResult) -> None:
+        import weekly_recap
+
+        rows = self.ctx.rows
+        moved = [i for i, row in enumerate(rows)
+                 if (line := scores.get((row.home_id, row.away_id))) is not None
+                 and (line.home_score, line.away_score) != (row.home_score, row.away_score)]
+        self.done = bool(scores) and all(line.decided for line in scores.values())
+        if not moved:
+            return
+
+        fresh: Dict[Tuple[int, int], gazette_data.MatchRow] = {}
+        if self.stats_every_s and self.clock() - self._stats_at >= self.stats_every_s:
+            fresh = {(r.home_id, r.away_id): r for r in gazette_data._fetch_rows(self.league, self.week)}
+            self._stats_at = self.clock()
+            result.stats_refreshed = True
+        for i in moved:
+            key = (rows[i].home_id, rows[i].away_id)
+            line = scores[key]
+            rows[i] = gazette_data.rescore(fresh.get(key, rows[i]), line.home_score, line.away_score)
+            self.ctx.pop(f"MATCHUP{i + 1}_BLURB", None)
+        weekly_recap._attach_simple_blurbs(self.ctx)
+        self.ctx.update(gazette_data._awards(rows))
+        result.changed = [i + 1 for i in moved]
+
+    # ----- output -----
+    def render(self, result: Optional[PollResult] = None) -> str:
+        html = self.template.render(self.ctx)
+        if result is not None:
+            result.sections_rendered, result.sections_reused = self.template.rendered, self.template.reused
+        return html
+
+    def publish(self, html: Optional[str] = None) -> List[str]:
+        """Write every live format, each swapped in whole (readers never see a partial file)."""
+        import weekly_recap
+
+        html = self.render() if html is None else html
+        self.stem.parent.mkdir(parents=True, exist_ok=True)
+        paths = []
+        if "html" in self.formats:
+            out = self.stem.with_suffix(".html")
+            tmp = Path(f"{self.stem}.tmp.html")
+            tmp.write_text(self._bundler.bundle_html(html, inline=True), encoding="utf-8")
+            os.replace(tmp, out)
+            paths.append(str(out))
+        if "pdf" in self.formats:
+            out = self.stem.with_suffix(".pdf")
+            tmp = Path(f"{self.stem}.tmp.pdf")
+            weekly_recap.html_to_pdf(html, tmp, save_html=False)
+            os.replace(tmp, out)
+            paths.append(str(out))
+        return paths
+
+    def _record(self, name: str, data: Dict[str, Any]) -> None:
+        self.record_dir.mkdir(parents=True, exist_ok=True)
+        (self.record_dir / name).write_text(json.dumps(data), encoding="utf-8")
+
+
+def run_live(
+    gazettes: List[LiveGazette],
+    max_polls: Optional[int] = None,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """Poll every league on its own interval until all games are decided (or max_polls)."""
+    due = [(clock(), n) for n in range(len(gazettes))]
+    heapq.heapify(due)
+    polls = 0
+    while due and (max_polls is None or polls < max_polls):
+        at, n = heapq.heappop(due)
+        wait = at - clock()
+        if wait > 0:
+            sleep(wait)
+        live = gazettes[n]
+        try:
+            live.poll()
+        except Exception as e:
+            logger.warning(f"League {live.league_id}: poll failed ({e}); retrying in {live.interval_s:.0f}s")
+        polls += 1
+        if live.done:
+            logger.info(f"League {live.league_id}: all games final, live updates stopped")
+            continue
+        heapq.heappush(due, (clock() + live.interval_s, n))
+    return polls
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Live game-day Gazette: poll scores, re-render what changed")
+    p.add_argument("--leagues", default="leagues.json", help="Leagues to follow (ignored with --league-id)")
+    p.add_argument("--league-id", type=int, default=None)
+    p.add_argument("--year", type=int, default=os.getenv("YEAR"))
+    p.add_argument("--week", type=int, default=None)
+    p.add_argument("--formats", default=os.getenv("GAZETTE_LIVE_FORMATS", "html"),
+                   help=f"Comma-separated: {', '.join(LIVE_FORMATS)}")
+    p.add_argument("--output", default=DEFAULT_LIVE_OUTPUT)
+    p.add_argument("--template", default=DEFAULT_HTML_TEMPLATE)
+    p.add_argument("--interval", type=float, default=POLL_INTERVAL_S, help="Seconds between polls while scores move")
+    p.add_argument("--max-interval", type=float, default=MAX_INTERVAL_S)
+    p.add_argument("--stats-every", type=float, default=STATS_EVERY_S, help="Seconds between player-stat refreshes")
+    p.add_argument("--record", default=None, help="Keep every response here for live_replay.py")
+    p.add_argument("--espn-base", default=os.getenv("GAZETTE_ESPN_BASE"), help="Poll this server instead of ESPN")
+    p.add_argument("--max-polls", type=int, default=None)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args(argv)
+    if args.league_id:
+        configs = [{"league_id": args.league_id, "year": args.year}]
+    else:
+        configs = load_league_configs(args.leagues)
+
+    options = dict(
+        week=args.week, espn_base=args.espn_base, output=args.output, template=args.template,
+        formats=[f.strip() for f in args.formats.split(",") if f.strip()],
+        record_dir=Path(args.record) if args.record else None,
+        interval_s=args.interval, max_interval_s=args.max_interval, stats_every_s=args.stats_every,
+    )
+    gazettes = []
+    for cfg in configs:
+        try:
+            gazettes.append(LiveGazette.open(int(cfg["league_id"]), int(cfg["year"]), **config_credentials(cfg), **options))
+        except Exception as e:
+            logger.error(f"League {cfg.get('league_id')}: could not start live mode: {e}")
+    if not gazettes:
+        raise SystemExit(1)
+    run_live(gazettes, max_polls=args.max_polls)
+
+
+if __name__ == "__main__":
+    main()
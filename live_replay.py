@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+live_replay.py — Gridiron Gazette
+---------------------------------
+A local stand-in for ESPN that replays a recorded game day, so live mode
+(live_gazette.py) can be run and tested without a single real request.
+
+A recording (live_gazette.py --record DIR) holds one folder per league:
+
+    DIR/887998/league.json    league view (settings, teams, members, status)
+    DIR/887998/0001.json      score responses, one per change seen live
+    DIR/887998/0002.json      ...
+
+Every league's score requests get its current frame; anything else on a
+league (the league view) gets league.json. Frames advance together for all
+leagues — every --step seconds, or on POST /advance — and stay on the last
+frame once the recording runs out. Non-league paths (pro schedule, player
+ratings) answer 404, which live mode treats as "no box scores".
+
+Usage:
+  python live_replay.py recordings/2025-w05 --port 8766 --step 5
+  python live_gazette.py --espn-base http://127.0.0.1:8766/ --interval 5
+  curl -X POST localhost:8766/advance ; curl localhost:8766/health
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger("live_replay")
+
+_LEAGUE_PATH_RE = re.compile(r"/leagues/(\d+)/?$")
+
+
+class Recording:
+    """One game day on disk: per league, the league view and its score frames."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.frames: Dict[str, List[Path]] = {}
+        for league_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            self.frames[league_dir.name] = sorted(league_dir.glob("[0-9][0-9][0-9][0-9].json"))
+        if not self.frames:
+            raise FileNotFoundError(f"No league recordings under {self.root}")
+        self.index = 0
+        self.lock = threading.Lock()
+
+    @property
+    def length(self) -> int:
+        return max(len(f) for f in self.frames.values())
+
+    def advance(self) -> int:
+        with self.lock:
+            self.index = min(self.index + 1, self.length - 1)
+            return self.index
+
+    def frame(self, league_id: str) -> Optional[bytes]:
+        frames = self.frames.get(league_id)
+        if not frames:
+            return None
+        return frames[min(self.index, len(frames) - 1)].read_bytes()
+
+    def league_view(self, league_id: str) -> Optional[bytes]:
+        path = self.root / league_id / "league.json"
+        return path.read_bytes() if path.exists() else None
+
+
+def make_handler(recording: Recording, stats: Dict[str, int]):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: Any) -> None:
+            data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/health":
+                self._send(200, {"ok": True, "frame": recording.index + 1, "frames": recording.length,
+                                 "leagues": sorted(recording.frames), **stats})
+                return
+            m = _LEAGUE_PATH_RE.search(url.path)
+            if not m:
+                self._send(404, {"error": "not recorded"})
+                return
+            stats["requests"] += 1
+            views = parse_qs(url.query).get("view", [])
+            body = recording.frame(m.group(1)) if "mMatchupScore" in views else recording.league_view(m.group(1))
+            if body is None:
+                self._send(404, {"error": f"league {m.group(1)} not recorded"})
+            else:
+                self._send(200, body)
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/advance":
+                self._send(404, {"error": "not found"})
+                return
+            self._send(200, {"frame": recording.advance() + 1, "frames": recording.length})
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+    return Handler
+
+
+class ReplayServer:
+    """The replay HTTP server on a background thread (port 0 picks a free port)."""
+
+    def __init__(self, root: Path, host: str = "127.0.0.1", port: int = 0, step_s: Optional[float] = None):
+        self.recording = Recording(root)
+        self.stats = {"requests": 0}
+        self.server = ThreadingHTTPServer((host, port), make_handler(self.recording, self.stats))
+        self.step_s = step_s
+        self._stop = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def advance(self) -> int:
+        return self.recording.advance()
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        if self.step_s:
+            threading.Thread(target=self._step, daemon=True).start()
+        return self
+
+    def _step(self) -> None:
+        while not self._stop.wait(self.step_s):
+            self.advance()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Replay a recorded game day as a local ESPN stand-in")
+    p.add_argument("recording", help="Directory written by live_gazette.py --record")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8766)
+    p.add_argument("--step", type=float, default=None, help="Advance every N seconds (default: POST /advance)")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args(argv)
+    replay = ReplayServer(Path(args.recording), args.host, args.port, args.step)
+    logger.info(f"Replaying {replay.recording.length} frame(s) for league(s) "
+                f"{', '.join(sorted(replay.recording.frames))} on {replay.url}")
+    replay.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        replay.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+llm_backends.py — Gridiron Gazette
+----------------------------------
+Registry of LLM backends that speak StoryMaker's ``LLM`` protocol:
+
+    llm(messages, temperature=0.8, top_p=0.9, max_tokens=800) -> str
+
+Backends:
+  • openai — hosted (llm_openai.chat / chat_stream); needs OPENAI_API_KEY.
+  • local  — HTTP client for llm_local_server.py, a long-lived CPU inference
+             process that loads the model once and batches requests. Works
+             offline and in CI. LOCAL_LLM_AUTOSTART=1 starts the server when
+             nothing answers at a loopback LOCAL_LLM_URL (off by default).
+
+Selection (get_backend):
+  LLM_BACKEND=openai|local|none forces a choice; otherwise openai when a key is
+  set, else local when LOCAL_LLM_URL / LOCAL_LLM_MODEL is configured, else None
+  (StoryMaker then uses its template fallback).
+
+Every backend returned is routed through llm_gate (shared cross-process rate
+limiter + response cache) unless LLM_GATE=0, namespaced by backend and model
+so switching OPENAI_MODEL / LOCAL_LLM_MODEL never serves the old model's recaps.
+
+Usage:
+
+    from llm_backends import get_backend
+    backend = get_backend()
+    maker = StoryMaker(llm=backend.chat if backend else None)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from llm_gate import get_gate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_URL = "http://127.0.0.1:8765"
+_LOOPBACK = ("127.0.0.1", "localhost", "::1")
+
+@dataclass
+class Backend:
+    name: str
+    chat: Callable[..., str]
+    chat_stream: Optional[Callable[..., Iterator[str]]] = None
+    model: str = ""     # model (and, for local, server URL) behind chat: part of the gate's cache key
+
+_REGISTRY: Dict[str, Callable[[], Optional[Backend]]] = {}
+
+def register_backend(name: str, factory: Callable[[], Optional[Backend]]) -> None:
+    """Register a backend factory; it returns None when the backend is unusable."""
+    _REGISTRY[name] = factory
+
+def available_backends() -> List[str]:
+    return sorted(_REGISTRY)
+
+def get_backend(name: Optional[str] = None) -> Optional[Backend]:
+    """Resolve the backend to use for this run (see module docstring)."""
+    name = (name or os.getenv("LLM_BACKEND") or "").strip().lower()
+    if name == "none":
+        return None
+    if name:
+        factory = _REGISTRY.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown LLM backend '{name}' (available: {', '.join(available_backends())})")
+        return _gated(factory())
+
+    if os.getenv("OPENAI_API_KEY"):
+        return _gated(_REGISTRY["openai"]())
+    if os.getenv("LOCAL_LLM_URL") or os.getenv("LOCAL_LLM_MODEL"):
+        return _gated(_REGISTRY["local"]())
+    return None
+
+def _gated(backend: Optional[Backend]) -> Optional[Backend]:
+    """Route a backend through the shared rate limiter / response cache."""
+    gate = get_gate()
+    if backend is None or gate is None:
+        return backend
+    namespace = f"{backend.name}:{backend.model}" if backend.model else backend.name
+    return Backend(
+        name=backend.name,
+        chat=gate.wrap(backend.chat, namespace=namespace),
+        chat_stream=gate.wrap_stream(backend.chat_stream, namespace=namespace) if backend.chat_stream else None,
+        model=backend.model,
+    )
+
+# ==========
+# OpenAI
+# ==========
+def _openai_backend() -> Optional[Backend]:
+    try:
+        from llm_openai import DEFAULT_MODEL, chat, chat_stream
+    except Exception as e:
+        logger.info(f"OpenAI backend unavailable: {e}")
+        return None
+    return Backend(name="openai", chat=chat, chat_stream=chat_stream, model=DEFAULT_MODEL)
+
+# ==========
+# Local
+# ==========
+class LocalLLM:
+    """
+    Client for llm_local_server.py. Optionally starts the server (detached, so
+    it stays warm for later runs) when it isn't already listening.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 300.0):
+        self.base_url = (base_url or os.getenv("LOCAL_LLM_URL") or DEFAULT_LOCAL_URL).rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(
+            self.base_url + path, data=data,
+            headers={"Content-Type": "application/json"},
+            method="POST" if data is not None else "GET",
+        )
+        with urllib.request.urlopen(req, timeout=timeout or self.timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    def health(self) -> Optional[dict]:
+        try:
+            return self._request("/health", timeout=2.0)
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+
+    def ensure_server(self, model: Optional[str] = None, wait_s: float = 120.0) -> bool:
+        """Start llm_local_server.py if nothing answers at base_url (only for a loopback base_url)."""
+        if self.health():
+            return True
+        model = model or os.getenv("LOCAL_LLM_MODEL")
+        if not model:
+            logger.warning("Local LLM server not running and LOCAL_LLM_MODEL is not set")
+            return False
+        url = urllib.parse.urlsplit(self.base_url)
+        host = url.hostname or "127.0.0.1"
+        if host not in _LOOPBACK:
+            logger.warning(f"Local LLM server at {self.base_url} is not on this machine; not starting one")
+            return False
+        try:
+            port = url.port or urllib.parse.urlsplit(DEFAULT_LOCAL_URL).port
+        except ValueError:
+            logger.warning(f"Bad port in LOCAL_LLM_URL {self.base_url}")
+            return False
+        cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_local_server.py"),
+               "--model", model, "--host", host, "--port", str(port)]
+        logger.info(f"Starting local LLM server: {' '.join(cmd)}")
+        subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        deadline = time.time() + wait_s
+        while time.time() < deadline:
+            if self.health():
+                return True
+            time.sleep(1.0)
+        logger.error(f"Local LLM server did not come up within {wait_s:.0f}s")
+        return False
+
+    def __call__(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.8,
+        top_p: float = 0.9,
+        max_tokens: int = 800,
+    ) -> str:
+        resp = self._request("/v1/chat/completions", {
+            "messages": messages,
+            "temperature": temperature,
+            "top_p": top_p,
+            "max_tokens": max_tokens,
+        })
+        return (resp.get("content") or "").strip()
+
+def _local_backend() -> Optional[Backend]:
+    client = LocalLLM()
+    autostart = os.getenv("LOCAL_LLM_AUTOSTART", "0") == "1"
+    if not client.health() and not (autostart and client.ensure_server()):
+        logger.info(f"Local LLM backend unavailable at {client.base_url}")
+        return None
+    model = (client.health() or {}).get("model") or os.getenv("LOCAL_LLM_MODEL") or ""
+    return Backend(name="local", chat=client, model=f"{model}@{client.base_url}")
+
+register_backend("openai", _openai_backend)
+register_backend("local", _local_backend)
@@ -0,0 +1,272 @@
+"""
+llm_gate.py — Gridiron Gazette
+------------------------------
+Cross-process LLM rate limiter + shared response cache.
+
+Parallel league builds share one API key. Every backend returned by
+llm_backends.get_backend() goes through this gate, which coordinates all
+processes on the machine through one SQLite file:
+
+  • Token buckets (requests/min, optional tokens/min) refilled by wall-clock
+    time. A caller takes its cost under a write lock or sleeps just long
+    enough for the bucket to refill, so N workers smoothly share the quota
+    instead of all firing at once and eating 429s.
+  • A 429 from the provider drains the bucket for EVERY process (honouring
+    Retry-After when given), so the whole fleet backs off once, together.
+  • Responses are cached by (backend, messages, sampling params), so
+    re-rendering a league/week never pays for the same recap twice.
+
+Config (env):
+  LLM_GATE=0            disable (direct calls)
+  LLM_GATE_DB           SQLite path (default .cache/llm_gate.sqlite)
+  LLM_RPM / LLM_TPM     request / token budgets per minute (TPM 0 = off)
+  LLM_CACHE_TTL_S       cache lifetime (default 7 days; 0 = no cache)
+
+Usage:
+
+    gate = get_gate()
+    chat = gate.wrap(raw_chat, namespace="openai")
+    text = chat(messages, temperature=0.9)
+    gate.report()   # waits, throttle events, cache hits for this process
+"""
+from __future__ import annotations
+
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = os.getenv("LLM_GATE_DB", ".cache/llm_gate.sqlite")
+DEFAULT_RPM = float(os.getenv("LLM_RPM", "120"))
+DEFAULT_TPM = float(os.getenv("LLM_TPM", "0"))
+DEFAULT_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+MAX_RATE_LIMIT_RETRIES = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL);
+"""
+
+@dataclass
+class GateStats:
+    requests: int = 0
+    cache_hits: int = 0
+    throttled: int = 0           # acquisitions that had to wait
+    rate_limited: int = 0        # 429s seen from the provider
+    wait_s: float = 0.0
+    max_wait_s: float = 0.0
+
+def _is_rate_limit(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class LLMGate:
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB,
+        rpm: float = DEFAULT_RPM,
+        tpm: float = DEFAULT_TPM,
+        cache_ttl_s: float = DEFAULT_CACHE_TTL_S,
+        burst_s: float = 5.0,
+    ):
+        self.db_path = Path(db_path)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.cache_ttl_s = cache_ttl_s
+        self.burst_s = burst_s  # bucket capacity = this many seconds of quota
+        self.stats = GateStats()
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation: safe across threads and processes
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # ---------- token buckets ----------
+    def _take(self, name: str, cost: float, per_minute: float) -> float:
+        """Take ``cost`` from bucket ``name``; returns seconds to wait before retrying (0 = granted)."""
+        rate = per_minute / 60.0
+        capacity = max(cost, per_minute * self.burst_s / 60.0)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)", (name, tokens, now))
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def acquire(self, namespace: str, tokens: int = 0) -> float:
+        """Block until this process may send one request; returns the time spent waiting."""
+        t0 = time.perf_counter()
+        buckets = [(f"{namespace}:rpm", 1.0, self.rpm)]
+        if self.tpm > 0 and tokens:
+            buckets.append((f"{namespace}:tpm", float(tokens), self.tpm))
+        for name, cost, per_minute in buckets:
+            if per_minute <= 0:
+                continue
+            while True:
+                wait = self._take(name, cost, per_minute)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, 5.0))
+        waited = time.perf_counter() - t0
+        with self._lock:
+            self.stats.requests += 1
+            if waited > 0.01:
+                self.stats.throttled += 1
+                self.stats.wait_s += waited
+                self.stats.max_wait_s = max(self.stats.max_wait_s, waited)
+        return waited
+
+    def penalize(self, namespace: str, seconds: float) -> None:
+        """Provider said slow down: empty the request bucket for every process for ``seconds``."""
+        rate = self.rpm / 60.0
+        if rate <= 0:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                (f"{namespace}:rpm", -seconds * rate, time.time()),
+            )
+        with self._lock:
+            self.stats.rate_limited += 1
+
+    # ---------- cache ----------
+    @staticmethod
+    def cache_key(namespace: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        blob = json.dumps({"ns": namespace, "messages": messages, "params": params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def cache_get(self, key: str) -> Optional[str]:
+        if self.cache_ttl_s <= 0:
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.cache_ttl_s:
+            return None
+        with self._lock:
+            self.stats.cache_hits += 1
+        return row[0]
+
+    def cache_put(self, key: str, value: str) -> None:
+        if self.cache_ttl_s <= 0 or not value:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)", (key, value, time.time()))
+
+    # ---------- wrappers ----------
+    def _back_off(self, namespace: str, error: Exception, attempt: int) -> None:
+        backoff = _retry_after(error) or min(60.0, 2.0 ** (attempt + 1))
+        logger.warning(f"{namespace} rate limited (429); all workers backing off {backoff:.1f}s")
+        self.penalize(namespace, backoff)
+
+    def _call_with_backoff(self, namespace: str, tokens: int, fn: Callable[[], Any]) -> Any:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.acquire(namespace, tokens)
+            try:
+                return fn()
+            except Exception as e:
+                if not _is_rate_limit(e) or attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                self._back_off(namespace, e, attempt)
+
+    def wrap(self, chat: Callable[..., str], namespace: str) -> Callable[..., str]:
+        """Rate-limited, cached version of an ``LLM``-protocol callable."""
+        from storymaker import count_message_tokens
+
+        def gated(messages: List[Dict[str, str]], temperature: float = 0.8, top_p: float = 0.9, max_tokens: int = 800) -> str:
+            key = self.cache_key(namespace, messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens)
+            cached = self.cache_get(key)
+            if cached is not None:
+                return cached
+            tokens = count_message_tokens(messages) + max_tokens if self.tpm > 0 else 0
+            text = self._call_with_backoff(
+                namespace, tokens,
+                lambda: chat(messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens),
+            )
+            self.cache_put(key, text)
+            return text
+
+        return gated
+
+    def wrap_stream(self, chat_stream: Callable[..., Iterator[str]], namespace: str) -> Callable[..., Iterator[str]]:
+        """
+        Rate-limited streaming callable (streams are cut early, so they aren't
+        cached). A stream usually fails only once it is iterated, so the 429
+        handling wraps the iteration: a 429 before the first delta backs every
+        worker off and retries; one mid-stream still backs off, then raises.
+        """
+        def gated(messages: List[Dict[str, str]], temperature: float = 0.8, top_p: float = 0.9, max_tokens: int = 800) -> Iterator[str]:
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                self.acquire(namespace, 0)
+                started = False
+                try:
+                    for delta in chat_stream(messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens):
+                        started = True
+                        yield delta
+                    return
+                except Exception as e:
+                    if not _is_rate_limit(e):
+                        raise
+                    self._back_off(namespace, e, attempt)
+                    if started or attempt == MAX_RATE_LIMIT_RETRIES:
+                        raise
+        return gated
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            data = asdict(self.stats)
+        data["wait_s"] = round(data["wait_s"], 2)
+        data["max_wait_s"] = round(data["max_wait_s"], 2)
+        data["avg_wait_s"] = round(data["wait_s"] / data["throttled"], 2) if data["throttled"] else 0.0
+        data.update(rpm=self.rpm, tpm=self.tpm, db=str(self.db_path))
+        return data
+
+_GATE: Optional[LLMGate] = None
+_GATE_LOCK = threading.Lock()
+
+def get_gate() -> Optional[LLMGate]:
+    """Process-wide gate (None when LLM_GATE=0 or the DB can't be opened)."""
+    global _GATE
+    if os.getenv("LLM_GATE", "1") == "0":
+        return None
+    with _GATE_LOCK:
+        if _GATE is None:
+            try:
+                _GATE = LLMGate()
+            except Exception as e:
+                logger.warning(f"LLM gate unavailable ({e}); calling the backend directly")
+                return None
+        return _GATE
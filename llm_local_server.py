@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+llm_local_server.py — Persistent local model server for offline Sabre recaps
+Loads a CPU model ONCE and serves chat requests over HTTP, batching requests
+that arrive together with the same sampling params. Clients use llm_backends.LocalLLM (LLM_BACKEND=local).
+
+Engines (optional installs):
+  • llama.cpp    — pip install llama-cpp-python   (--model path/to/model.gguf)
+  • transformers — pip install transformers torch (--model hf-name-or-dir)
+
+Usage:
+  python llm_local_server.py --model models/sabre-q4.gguf --port 8765
+  curl localhost:8765/health
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import queue
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("llm_local_server")
+
+
+# ==========
+# Engines
+# ==========
+class LlamaCppEngine:
+    """llama.cpp CPU inference; a batch is decoded back-to-back on one loaded model."""
+
+    name = "llama.cpp"
+
+    def __init__(self, model_path: str, n_ctx: int = 4096, n_threads: Optional[int] = None):
+        from llama_cpp import Llama  # imported lazily (optional dependency)
+        self.llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+
+    def generate_batch(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        outputs = []
+        for job in jobs:
+            resp = self.llm.create_chat_completion(
+                messages=job["messages"],
+                temperature=job.get("temperature", 0.8),
+                top_p=job.get("top_p", 0.9),
+                max_tokens=job.get("max_tokens", 800),
+            )
+            outputs.append(resp["choices"][0]["message"]["content"] or "")
+        return outputs
+
+
+class TransformersEngine:
+    """Hugging Face causal LM; a batch is padded and generated in one forward pass."""
+
+    name = "transformers"
+
+    def __init__(self, model_name: str, n_threads: Optional[int] = None):
+        import torch  # imported lazily (optional dependency)
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+        if n_threads:
+            torch.set_num_threads(n_threads)
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, padding_side="left")
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.model = AutoModelForCausalLM.from_pretrained(model_name)
+        self.model.eval()
+
+    def generate_batch(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        prompts = [
+            self.tokenizer.apply_chat_template(job["messages"], tokenize=False, add_generation_prompt=True)
+            for job in jobs
+        ]
+        enc = self.tokenizer(prompts, return_tensors="pt", padding=True)
+        # generate() takes one set of sampling params; the Batcher only groups jobs that share them
+        first = jobs[0]
+        with self.torch.no_grad():
+            out = self.model.generate(
+                **enc,
+                do_sample=True,
+                temperature=first.get("temperature", 0.8),
+                top_p=first.get("top_p", 0.9),
+                max_new_tokens=max(job.get("max_tokens", 800) for job in jobs),
+                pad_token_id=self.tokenizer.pad_token_id,
+            )
+        new_tokens = out[:, enc["input_ids"].shape[1]:]
+        return self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+
+
+def load_engine(model: str, engine: str = "auto", threads: Optional[int] = None):
+    if engine == "llama.cpp" or (engine == "auto" and model.endswith(".gguf")):
+        return LlamaCppEngine(model, n_threads=threads)
+    return TransformersEngine(model, n_threads=threads)
+
+
+# ==========
+# Batcher
+# ==========
+def _sampling_key(job: Dict[str, Any]) -> Tuple[float, float]:
+    return float(job.get("temperature", 0.8)), float(job.get("top_p", 0.9))
+
+
+class Batcher:
+    """
+    Collects requests for up to ``window_s`` (or ``max_batch`` jobs) and runs
+    them together: one engine batch per (temperature, top_p) among them.
+    """
+
+    def __init__(self, engine, max_batch: int = 8, window_s: float = 0.05):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.window_s = window_s
+        self.jobs: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self.started = time.time()
+        self.completed = 0
+        self.batches = 0
+        self.busy_s = 0.0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        job = dict(payload, _done=threading.Event(), _result=None, _error=None)
+        self.jobs.put(job)
+        if not job["_done"].wait(timeout):
+            raise TimeoutError("local model did not answer in time")
+        if job["_error"]:
+            raise RuntimeError(job["_error"])
+        return job["_result"]
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.jobs.get()]
+            deadline = time.time() + self.window_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.jobs.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            groups: Dict[Tuple[float, float], List[Dict[str, Any]]] = {}
+            for job in batch:
+                groups.setdefault(_sampling_key(job), []).append(job)
+            for group in groups.values():
+                self._generate(group)
+
+    def _generate(self, batch: List[Dict[str, Any]]) -> None:
+        t0 = time.time()
+        try:
+            results = self.engine.generate_batch(batch)
+            for job, text in zip(batch, results):
+                job["_result"] = text
+        except Exception as e:
+            logger.exception("Batch generation failed")
+            for job in batch:
+                job["_error"] = str(e)
+        finally:
+            self.busy_s += time.time() - t0
+            self.batches += 1
+            self.completed += len(batch)
+            for job in batch:
+                job["_done"].set()
+
+    def stats(self) -> Dict[str, Any]:
+        busy_min = self.busy_s / 60.0
+        return {
+            "completed": self.completed,
+            "batches": self.batches,
+            "avg_batch": round(self.completed / self.batches, 2) if self.batches else 0.0,
+            "recaps_per_minute": round(self.completed / busy_min, 2) if busy_min > 0 else 0.0,
+            "uptime_s": round(time.time() - self.started, 1),
+            "queued": self.jobs.qsize(),
+        }
+
+
+# ==========
+# HTTP
+# ==========
+def make_handler(batcher: Batcher, model_name: str, request_timeout: float):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"ok": True, "model": model_name, "engine": batcher.engine.name, **batcher.stats()})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/v1/chat/completions":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not payload.get("messages"):
+                    raise ValueError("messages required")
+                content = batcher.submit(payload, timeout=request_timeout)
+                self._send(200, {"content": content, "model": model_name})
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, fmt, *args):
+            logger.debug(fmt % args)
+
+    return Handler
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Persistent local LLM server for Gridiron Gazette recaps")
+    p.add_argument("--model", required=True, help="GGUF path (llama.cpp) or HF model name/dir (transformers)")
+    p.add_argument("--engine", default="auto", choices=["auto", "llama.cpp", "transformers"])
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--threads", type=int, default=None, help="CPU threads for inference")
+    p.add_argument("--max-batch", type=int, default=8, help="Max requests generated together")
+    p.add_argument("--batch-window-ms", type=float, default=50.0, help="How long to wait to fill a batch")
+    p.add_argument("--request-timeout", type=float, default=600.0)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args(argv)
+
+    t0 = time.time()
+    engine = load_engine(args.model, args.engine, args.threads)
+    logger.info(f"Loaded {args.model} with {engine.name} in {time.time() - t0:.1f}s")
+
+    batcher = Batcher(engine, max_batch=args.max_batch, window_s=args.batch_window_ms / 1000.0)
+    server_class = ThreadingHTTPServer
+    if ":" in args.host:  # an IPv6 address such as ::1
+        server_class = type("ThreadingHTTPServerV6", (ThreadingHTTPServer,), {"address_family": socket.AF_INET6})
+    server = server_class((args.host, args.port), make_handler(batcher, args.model, args.request_timeout))
+    logger.info(f"Serving on http://{args.host}:{args.port} (max batch {args.max_batch})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 # llm_openai.py
 import os
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 from openai import OpenAI
 
-_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Client-side timeout so a hung request can't stall a build forever
+_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=float(os.getenv("OPENAI_TIMEOUT", "90")))
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
 def chat(messages: List[Dict[str, str]],
@@ -19,3 +20,30 @@ def chat(messages: List[Dict[str, str]],
         max_tokens=max_tokens,
     )
     return resp.choices[0].message.content.strip()
+
+def chat_stream(messages: List[Dict[str, str]],
+                model: Optional[str] = None,
+                temperature: float = 0.8,
+                top_p: float = 0.9,
+                max_tokens: int = 900) -> Iterator[str]:
+    """
+    Stream completion text deltas. Closing the generator early (e.g. once a
+    recap hits its word limit) closes the HTTP stream so generation stops.
+    """
+    stream = _client.chat.completions.create(
+        model=model or DEFAULT_MODEL,
+        messages=messages,
+        temperature=temperature,
+        top_p=top_p,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    finally:
+        stream.close()
@@ -0,0 +1,362 @@
+"""
+recap_grammar.py — Gridiron Gazette
+-----------------------------------
+Precompiled phrase grammar for no-LLM Sabre recaps.
+
+The fallback recap is built from a small grammar: each symbol has a list of
+alternatives, and alternatives can be gated on matchup features:
+
+    margin  nailbiter (<5) | solid (<20) | statement (<30) | demolition
+    total   low (<160) | mid | shootout (>220)
+    star    monster (30+) | good (15+) | quiet | none
+    streak  hot (winner on 3+ W streak) | skid (loser on 3+ L streak) | none
+    bench   yes | no (bench blunders available)
+
+Alternatives are parsed once at import into literal/slot/symbol parts, and the
+per-feature choice lists are cached, so rendering is a few dict lookups and
+joins per sentence — microseconds, deterministic for a given seed, and with no
+LLM involved. Used by StoryMaker._template_recap / _template_blurb.
+
+Usage:
+
+    from recap_grammar import render_recap
+    text = render_recap(matchup_data)             # seed derived from the matchup
+    text = render_recap(matchup_data, seed=42)    # explicit seed
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import logging
+import random
+import re
+
+logger = logging.getLogger(__name__)
+
+RECAP_MIN_WORDS = 200
+RECAP_MAX_WORDS = 250
+BLURB_MAX_WORDS = 45
+
+# ==========
+# Grammar
+# ==========
+# "[feature=value,feature=value] text with {slots} and <symbols>"
+GRAMMAR: Dict[str, List[str]] = {
+    "opener": [
+        "This one played less like chess and more like bumper cars, and somehow {winner} walked away with the keys while {loser} was still looking for the brake pedal.",
+        "Sabre has watched squirrels plan better heists than this week's meeting between {winner} and {loser}, but the scoreboard still had to pick a side.",
+        "Week {week} in {league} served up {winner} against {loser}, and Sabre sniffed out the storyline before the first kickoff was even warm.",
+        "If fantasy football is a dog park, {winner} and {loser} spent Week {week} fighting over the same tennis ball for three straight hours.",
+        "[margin=nailbiter] Somebody get the smelling salts, because {winner} and {loser} just dragged this entire league through a finish that aged everyone ten years.",
+        "[margin=nailbiter] Sabre chewed through two leashes and a couch cushion watching {winner} and {loser} trade punches all the way down to the final whistle.",
+        "[margin=demolition] {winner} did not so much beat {loser} this week as file a noise complaint against them and win the hearing.",
+        "[margin=demolition] There are lopsided matchups, and then there is whatever {winner} did to {loser} in Week {week}, which should come with a content warning.",
+        "[margin=statement] {winner} came into Week {week} with something to prove and left {loser} holding the receipt.",
+        "[total=shootout] Defenses took the week off, the scoreboard operator filed for overtime pay, and {winner} outlasted {loser} in a track meet.",
+        "[total=low] Somewhere a highlight reel is still waiting for footage, because {winner} and {loser} played a game best described as a hostage negotiation.",
+    ],
+    "result": [
+        "The final read {winner} {ws}, {loser} {ls}, a {margin}-point gap that tells most of the story.",
+        "When the dust settled it was {winner} {ws} and {loser} {ls}, a {margin}-point margin that nobody will frame.",
+        "{winner} posted {ws} to {loser}'s {ls}, which is the kind of math even a dog can do.",
+        "Final tally: {winner} {ws}, {loser} {ls}, with {margin} points of daylight between them.",
+    ],
+    "margin_take": [
+        "[margin=nailbiter] Every start-sit call mattered, every kicker mattered, and one questionable waiver claim probably decided the whole thing.",
+        "[margin=nailbiter] A single dropped pass or one extra-point shank would have flipped the result, so {loser} will be refreshing the stat corrections until Wednesday.",
+        "[margin=nailbiter] Close games are supposed to build character, but mostly this one built stomach ulcers on both sidelines.",
+        "[margin=solid] {winner} never looked truly comfortable, but they kept just enough distance to let their managers enjoy Sunday dinner.",
+        "[margin=solid] It was not a masterpiece, but {winner} controlled the game and earned the W the old-fashioned way: by scoring more points.",
+        "[margin=solid] {loser} kept knocking on the door all weekend, and {winner} kept politely refusing to open it.",
+        "[margin=statement] That is a statement win, the kind that makes the rest of the league check the standings twice.",
+        "[margin=statement] {loser} hung around early, then watched {winner} pull away like a delivery driver who refuses to wait for a signature.",
+        "[margin=demolition] {loser} might want to forget this one ever happened, and Sabre is happy to help by never mentioning it again until next week.",
+        "[margin=demolition] By halftime of the late games the only suspense left was whether {loser} would cross the century mark before the lights went out.",
+        "[margin=demolition] It was over early, it was ugly late, and {loser} spent most of Sunday pretending the app would not load.",
+    ],
+    "star": [
+        "[star=monster] {mvp} went nuclear for {mvp_pts} points, the kind of line that wins weeks on its own and ruins opponents' group chats.",
+        "[star=monster] {mvp} dropped {mvp_pts} points on the league like a bag of treats spilled on the kitchen floor, and {mvp_team} happily ate every one.",
+        "[star=monster] Give the game ball to {mvp}, whose {mvp_pts}-point eruption carried {mvp_team} like a golden retriever carrying a stick twice its size.",
+        "[star=good] {mvp} led the way with {mvp_pts} points, steady and reliable, the fantasy equivalent of a good dog who always comes when called.",
+        "[star=good] The bright spot was {mvp} with {mvp_pts} points, enough to keep {mvp_team} managers from throwing their phones into the yard.",
+        "[star=good] {mvp} chipped in {mvp_pts} points for {mvp_team}, which was not flashy but absolutely got the job done.",
+        "[star=quiet] Nobody truly exploded, and {mvp} topping the charts with just {mvp_pts} points tells you how sleepy the afternoon really was.",
+        "[star=quiet] The best performance belonged to {mvp} with a modest {mvp_pts} points, which is less a highlight and more a participation ribbon.",
+        "[star=none] Nobody put on a cape this week, so this one came down to collective effort, depth, and a healthy dose of dumb luck.",
+        "[star=none] There was no single hero in this one, just a pile of role players doing exactly enough to keep the lights on.",
+    ],
+    "bench": [
+        "[bench=yes] And then there is the bench, because {bench_team} {bench_note}, exactly the kind of decision Sabre will bring up at every future league gathering.",
+        "[bench=yes] The lineup decisions deserve their own episode: {bench_team} {bench_note}, and that one is going to sting for a while.",
+        "[bench=yes] Film review will be brutal, since {bench_team} {bench_note}, a move that aged like milk left out in the sun.",
+    ],
+    "loser_take": [
+        "{loser} will spend the week rewatching the tape and wondering where it all went sideways.",
+        "For {loser}, the postgame press conference consisted mostly of long sighs and a firm promise to check the waiver wire sooner.",
+        "{loser} now faces the classic fantasy dilemma: blame the players, blame the projections, or blame the group chat that suggested the trade.",
+        "[margin=nailbiter] {loser} did almost everything right, which is the cruelest possible way to lose a fantasy matchup.",
+        "[margin=demolition] {loser} should consider a bye week of their own, ideally somewhere without cell service or box scores.",
+    ],
+    "totals_take": [
+        "[total=shootout] With {total} combined points, this was a fireworks show that left both defenses looking for their car keys.",
+        "[total=shootout] The teams combined for {total} points, which is great for highlight reels and terrible for anyone who started a defense.",
+        "[total=low] Combined, they managed just {total} points, a total that would make a kicker blush and a punter proud.",
+        "[total=low] A {total}-point combined total means offense was more of a rumor than a strategy in this matchup.",
+        "[total=mid] The {total} combined points landed right in the middle of the road, which is where most of the drama happened anyway.",
+        "[total=mid] At {total} combined points it was not a shootout or a slugfest, just honest fantasy football with a few bad decisions sprinkled in.",
+    ],
+    "streak": [
+        "[streak=hot] {winner} has now stacked {win_streak} straight wins, and the rest of {league} is starting to whisper about it.",
+        "[streak=hot] That makes {win_streak} in a row for {winner}, who are rolling like a dog who just found the muddiest puddle in the park.",
+        "[streak=skid] Meanwhile {loser} has dropped {loss_streak} straight, and the losing streak is starting to develop a personality of its own.",
+        "[streak=skid] That is {loss_streak} consecutive losses for {loser}, which officially moves them from slump territory into full rebuild chatter.",
+    ],
+    "outlook": [
+        "Looking ahead, {winner} gets to enjoy the bragging rights while {loser} heads back to the drawing board with a lot of eraser shavings.",
+        "Next week brings a fresh slate, but the screenshots from this one will live in the group chat forever.",
+        "{winner} will ride the momentum into next week, while {loser} goes hunting on the waiver wire with a flashlight and a prayer.",
+        "The standings will remember the result, the group chat will remember the trash talk, and Sabre will remember absolutely everything.",
+    ],
+    "closer": [
+        "Call it chaos football, hilarious for neutrals and nerve-wracking for everyone with skin in the game.",
+        "Sabre has seen enough; somebody refill the water bowl and queue up next week's slate.",
+        "Fantasy football giveth, fantasy football taketh away, and this week it mostly just laughed at everyone.",
+        "That is the recap, that is the verdict, and that is why nobody in this league should be trusted with a roster.",
+    ],
+    "filler": [
+        "Both managers spent Sunday refreshing the app like it owed them money, and neither one got a refund.",
+        "The projections promised a coin flip, and the actual game delivered a coin that rolled under the couch and stayed there.",
+        "Somewhere in the middle of all this, a waiver pickup from Wednesday quietly outscored a first-round pick, as is tradition.",
+        "Sabre spent the late window pacing the living room, which is usually a sign that the matchup had some real teeth.",
+        "Neither roster will be winning any beauty contests, but fantasy points do not care how pretty the process looks.",
+        "It was the kind of matchup that makes you question every mock draft, every podcast, and every hot take from August.",
+        "Trash talk in the league chat peaked around the second quarter of the late games and never fully recovered.",
+        "As always, the real winners were the neutral managers watching from the sidelines with popcorn and zero stress.",
+    ],
+    # Short blurbs (1–2 sentences)
+    "blurb": [
+        "{winner} handled {loser} {ws}-{ls} in <margin_word>, and {loser} has some serious lineup soul-searching to do before the waiver wire opens again next week, preferably without any help from the group chat.",
+        "In <margin_word>, {winner} topped {loser} {ws}-{ls}. Film rooms get busy tomorrow, the league group chat is already busy tonight, and somebody is definitely drafting an angry trade offer.",
+        "{winner} {ws}, {loser} {ls}: <margin_word> that Sabre graded with one raised eyebrow, a very slow tail wag, and a long nap afterward on the good couch.",
+    ],
+    "margin_word": [
+        "[margin=nailbiter] a nail-biter",
+        "[margin=solid] a solid victory",
+        "[margin=statement] a statement win",
+        "[margin=demolition] an absolute demolition",
+    ],
+}
+
+# Paragraph layout: (symbol, optional) — optional sentences can be dropped to fit
+RECAP_LAYOUT: Tuple[Tuple[Tuple[str, bool], ...], ...] = (
+    (("opener", False), ("result", False), ("margin_take", False)),
+    (("star", False), ("bench", True), ("loser_take", True), ("totals_take", True)),
+    (("streak", True), ("outlook", True), ("closer", False)),
+)
+
+# ==========
+# Compiler
+# ==========
+_TOKEN_RE = re.compile(r"(\{[a-z_]+\}|<[a-z_]+>)")
+_COND_RE = re.compile(r"^\[([^\]]+)\]\s*")
+
+Part = Tuple[int, str]  # (kind, value): 0 literal, 1 slot, 2 symbol
+_LIT, _SLOT, _SYM = 0, 1, 2
+
+def _compile_alternative(text: str) -> Tuple[Dict[str, str], Tuple[Part, ...]]:
+    conds: Dict[str, str] = {}
+    m = _COND_RE.match(text)
+    if m:
+        for pair in m.group(1).split(","):
+            key, _, value = pair.partition("=")
+            conds[key.strip()] = value.strip()
+        text = text[m.end():]
+    parts: List[Part] = []
+    for piece in _TOKEN_RE.split(text):
+        if not piece:
+            continue
+        if piece.startswith("{"):
+            parts.append((_SLOT, piece[1:-1]))
+        elif piece.startswith("<"):
+            parts.append((_SYM, piece[1:-1]))
+        else:
+            parts.append((_LIT, piece))
+    return conds, tuple(parts)
+
+def compile_grammar(grammar: Dict[str, List[str]]) -> Dict[str, Tuple[Tuple[Dict[str, str], Tuple[Part, ...]], ...]]:
+    compiled = {sym: tuple(_compile_alternative(alt) for alt in alts) for sym, alts in grammar.items()}
+    for sym, alts in compiled.items():
+        for _, parts in alts:
+            for kind, value in parts:
+                if kind == _SYM and value not in compiled:
+                    raise ValueError(f"Grammar symbol <{sym}> references unknown symbol <{value}>")
+    return compiled
+
+_COMPILED = compile_grammar(GRAMMAR)
+
+@lru_cache(maxsize=512)
+def _choices(symbol: str, features: Tuple[Tuple[str, str], ...]) -> Tuple[Tuple[Part, ...], ...]:
+    """Alternatives of ``symbol`` whose conditions match; gated ones win over generic ones."""
+    feats = dict(features)
+    gated, generic = [], []
+    for conds, parts in _COMPILED[symbol]:
+        if not conds:
+            generic.append(parts)
+        elif all(feats.get(k) == v for k, v in conds.items()):
+            gated.append(parts)
+    return tuple(gated + generic)
+
+def _expand(symbol: str, features: Tuple[Tuple[str, str], ...], slots: Dict[str, str], rng: random.Random) -> str:
+    options = _choices(symbol, features)
+    if not options:
+        return ""
+    out = []
+    for kind, value in options[rng.randrange(len(options))]:
+        if kind == _LIT:
+            out.append(value)
+        elif kind == _SLOT:
+            out.append(slots.get(value, ""))
+        else:
+            out.append(_expand(value, features, slots, rng))
+    return "".join(out)
+
+# ===================
+# Matchup features
+# ===================
+def _fmt(x: float) -> str:
+    return f"{x:.1f}"
+
+def _top_performer(d: Any) -> Tuple[str, Optional[float], str]:
+    best = None
+    for p in getattr(d, "top_performers", None) or []:
+        pts = getattr(p, "points", None)
+        if best is None or (pts is not None and (best[1] is None or pts > best[1])):
+            best = (p.name, pts, p.team or "")
+    return best or ("", None, "")
+
+def matchup_features(d: Any) -> Tuple[Tuple[Tuple[str, str], ...], Dict[str, str]]:
+    """(hashable feature tuple, slot values) for a MatchupData."""
+    sa, sb = d.score_a or 0.0, d.score_b or 0.0
+    winner = d.winner or (d.team_a if sa >= sb else d.team_b)
+    loser = d.team_b if winner == d.team_a else d.team_a
+    ws, ls = (sa, sb) if winner == d.team_a else (sb, sa)
+    margin = d.margin if d.margin is not None else abs(sa - sb)
+    total = sa + sb
+
+    mvp, mvp_pts, mvp_team = _top_performer(d)
+    if not mvp:
+        star = "none"
+    elif mvp_pts is None or mvp_pts <= 0:
+        star = "none"
+    elif mvp_pts >= 30:
+        star = "monster"
+    elif mvp_pts >= 15:
+        star = "good"
+    else:
+        star = "quiet"
+
+    win_streak = getattr(d, "streak_a" if winner == d.team_a else "streak_b", None) or 0
+    loss_streak = getattr(d, "streak_b" if winner == d.team_a else "streak_a", None) or 0
+    if win_streak >= 3:
+        streak = "hot"
+    elif loss_streak <= -3:
+        streak = "skid"
+    else:
+        streak = "none"
+
+    bench = d.bench_mistakes[0] if getattr(d, "bench_mistakes", None) else ""
+    bench_team = "somebody"
+    if ": " in bench:
+        bench_team, bench = bench.split(": ", 1)  # "Team: Benched X ..." (weekly_recap format)
+
+    features = (
+        ("margin", "nailbiter" if margin < 5 else "solid" if margin < 20 else "statement" if margin < 30 else "demolition"),
+        ("total", "low" if total < 160 else "shootout" if total > 220 else "mid"),
+        ("star", star),
+        ("streak", streak),
+        ("bench", "yes" if bench else "no"),
+    )
+    slots = {
+        "winner": winner, "loser": loser,
+        "ws": _fmt(ws), "ls": _fmt(ls),
+        "margin": _fmt(margin), "total": _fmt(total),
+        "mvp": mvp, "mvp_pts": _fmt(mvp_pts or 0.0), "mvp_team": mvp_team or winner,
+        "win_streak": str(win_streak), "loss_streak": str(abs(loss_streak)),
+        "bench_note": bench[:1].lower() + bench[1:] if bench else "",
+        "bench_team": bench_team,
+        "league": d.league_name, "week": str(d.week),
+    }
+    return features, slots
+
+def seed_for(d: Any) -> int:
+    """Stable seed per matchup (independent of PYTHONHASHSEED)."""
+    key = f"{d.league_name}|{d.week}|{d.team_a}|{d.team_b}"
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+# ==========
+# Rendering
+# ==========
+def _words(text: str) -> int:
+    return len(text.split())
+
+def render_recap(
+    d: Any,
+    seed: Optional[int] = None,
+    min_words: int = RECAP_MIN_WORDS,
+    max_words: int = RECAP_MAX_WORDS,
+) -> str:
+    """A 3-paragraph recap (no sign-off) of ``min_words``–``max_words`` words."""
+    rng = random.Random(seed_for(d) if seed is None else seed)
+    features, slots = matchup_features(d)
+
+    paras: List[List[Tuple[str, bool]]] = []
+    for layout in RECAP_LAYOUT:
+        sentences = []
+        for symbol, optional in layout:
+            text = _expand(symbol, features, slots, rng).strip()
+            if text:
+                sentences.append((text, optional))
+        paras.append(sentences)
+
+    def count() -> int:
+        return sum(_words(s) for para in paras for s, _ in para)
+
+    # Top up from the filler pool (no repeats), into the middle paragraph
+    fillers = list(_choices("filler", features))
+    rng.shuffle(fillers)
+    while count() < min_words and fillers:
+        text = "".join(v if k == _LIT else slots.get(v, "") for k, v in fillers.pop())
+        paras[1].append((text, True))
+
+    # Drop optional sentences (latest first) until it fits
+    for para in reversed(paras):
+        for idx in range(len(para) - 1, -1, -1):
+            if count() <= max_words:
+                break
+            if para[idx][1] and count() - _words(para[idx][0]) >= min_words:
+                del para[idx]
+
+    text = "\n\n".join(" ".join(s for s, _ in para) for para in paras if para)
+    if count() > max_words:
+        logger.debug("Grammar recap over budget after dropping optional sentences; hard-trimming")
+        kept, n = [], 0
+        for token in re.split(r"(\s+)", text):
+            if token.strip():
+                n += 1
+                if n > max_words:
+                    break
+            kept.append(token)
+        text = re.sub(r"[\s,;:]+$", "", "".join(kept)) + "."
+    return text
+
+def render_blurb(d: Any, seed: Optional[int] = None) -> str:
+    """A 1–2 sentence blurb (25–45 words)."""
+    rng = random.Random(seed_for(d) if seed is None else seed)
+    features, slots = matchup_features(d)
+    text = _expand("blurb", features, slots, rng).strip()
+    words = text.split()
+    if len(words) > BLURB_MAX_WORDS:
+        text = re.sub(r"[\s,;:]+$", "", " ".join(words[:BLURB_MAX_WORDS])) + "."
+    return text
@@ -0,0 +1,256 @@
+"""
+recap_scheduler.py — Gridiron Gazette
+-------------------------------------
+Deadline-aware scheduling for the Sabre recap stage.
+
+A hung or slow LLM call must never hold up the gazette. The scheduler runs
+per-matchup recap calls concurrently and:
+
+  • gives the whole stage one overall deadline (RECAP_DEADLINE_S),
+  • gives each call its own timeout (RECAP_CALL_TIMEOUT_S),
+  • hedges: when a call runs past the p95 latency seen so far, a duplicate
+    request is fired and whichever answers first wins,
+  • swaps in the template recap (recap_grammar) for ONLY the matchups that
+    time out, error, or miss the deadline.
+
+Calls run on daemon threads, so an abandoned request can't block exit.
+call_with_timeout() gives the stage's other LLM work (the weekly batch
+request, variety re-rolls) the same guarantee. An abandoned call can't
+start further requests either: StoryMaker(deadline=...) refuses any LLM
+call once the stage deadline has passed.
+
+Usage:
+
+    scheduler = RecapScheduler(maker, deadline_s=240, call_timeout_s=60)
+    recaps, report = scheduler.run(matchups)          # [(slot, MatchupData), ...]
+    for line in report.summary_lines():
+        logger.info(line)
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import math
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_S = float(os.getenv("RECAP_DEADLINE_S", "240"))
+DEFAULT_CALL_TIMEOUT_S = float(os.getenv("RECAP_CALL_TIMEOUT_S", "60"))
+
+SOURCE_LLM = "llm"
+SOURCE_HEDGED = "llm-hedged"
+SOURCE_FALLBACK = "fallback"
+
+# ===============
+# Data structures
+# ===============
+@dataclass
+class RecapOutcome:
+    slot: int
+    matchup: str
+    source: str = SOURCE_FALLBACK
+    reason: str = ""          # why a fallback was used ("timeout", "deadline", "error: ...", "short draft")
+    latency_s: Optional[float] = None
+    attempts: int = 0
+
+@dataclass
+class ScheduleReport:
+    deadline_s: float
+    call_timeout_s: float
+    elapsed_s: float = 0.0
+    p95_s: Optional[float] = None
+    hedges: int = 0
+    outcomes: List[RecapOutcome] = field(default_factory=list)
+
+    @property
+    def llm_count(self) -> int:
+        return sum(1 for o in self.outcomes if o.source != SOURCE_FALLBACK)
+
+    @property
+    def fallback_count(self) -> int:
+        return sum(1 for o in self.outcomes if o.source == SOURCE_FALLBACK)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.update(llm=self.llm_count, fallback=self.fallback_count)
+        return data
+
+    def summary_lines(self) -> List[str]:
+        p95 = f"{self.p95_s:.1f}s" if self.p95_s is not None else "n/a"
+        lines = [
+            f"Recap schedule: {self.llm_count} LLM / {self.fallback_count} fallback in {self.elapsed_s:.1f}s "
+            f"(deadline {self.deadline_s:g}s, call timeout {self.call_timeout_s:g}s, p95 {p95}, hedges {self.hedges})"
+        ]
+        for o in self.outcomes:
+            latency = f"{o.latency_s:.1f}s" if o.latency_s is not None else "-"
+            why = f" ({o.reason})" if o.reason else ""
+            lines.append(f"  #{o.slot} {o.matchup}: {o.source}{why}, {latency}, {o.attempts} attempt(s)")
+        return lines
+
+# ==========
+# Scheduler
+# ==========
+def call_with_timeout(fn: Callable[[], Any], timeout_s: float) -> Tuple[bool, Any]:
+    """
+    Run ``fn`` on a daemon thread: (True, result) when it returns within
+    ``timeout_s``, (False, None) when it doesn't (the call is abandoned).
+    An exception raised by ``fn`` in time is re-raised here.
+    """
+    if timeout_s <= 0:
+        return False, None
+    box: "queue.Queue" = queue.Queue(maxsize=1)
+
+    def work() -> None:
+        try:
+            box.put((fn(), None))
+        except Exception as e:
+            box.put((None, e))
+
+    threading.Thread(target=work, name="recap-timed", daemon=True).start()
+    try:
+        result, error = box.get(timeout=timeout_s)
+    except queue.Empty:
+        return False, None
+    if error is not None:
+        raise error
+    return True, result
+
+def _p95(samples: List[float]) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+class RecapScheduler:
+    def __init__(
+        self,
+        maker: Any,
+        deadline_s: float = DEFAULT_DEADLINE_S,
+        call_timeout_s: float = DEFAULT_CALL_TIMEOUT_S,
+        max_workers: int = 4,
+        hedge: bool = True,
+        max_hedge_fraction: float = 0.3,
+        min_samples: int = 3,
+        latency_history: Optional[List[float]] = None,
+        tick_s: float = 0.05,
+    ):
+        self.maker = maker
+        self.deadline_s = deadline_s
+        self.call_timeout_s = call_timeout_s
+        self.max_workers = max(1, max_workers)
+        self.hedge = hedge
+        self.max_hedge_fraction = max_hedge_fraction
+        self.min_samples = min_samples
+        self.latencies: List[float] = list(latency_history or [])
+        self.tick_s = tick_s
+
+    # ---------- helpers ----------
+    def _hedge_after(self) -> Optional[float]:
+        """Hedge threshold: p95 of observed latencies, once there are enough samples."""
+        if not self.hedge or len(self.latencies) < self.min_samples:
+            return None
+        return _p95(self.latencies)
+
+    def _launch(self, results: "queue.Queue", slot_idx: int, attempt: int, data: Any, kwargs: Dict[str, Any]) -> None:
+        def work() -> None:
+            t0 = time.perf_counter()
+            try:
+                text = self.maker.generate_recap(data, **kwargs)
+                results.put((slot_idx, attempt, text, None, time.perf_counter() - t0))
+            except Exception as e:
+                results.put((slot_idx, attempt, None, e, time.perf_counter() - t0))
+        threading.Thread(target=work, name=f"recap-{slot_idx}-{attempt}", daemon=True).start()
+
+    # ---------- main loop ----------
+    def run(self, matchups: List[Tuple[int, Any]], **gen_kwargs) -> Tuple[List[str], ScheduleReport]:
+        """
+        Recaps for ``matchups`` ([(slot, MatchupData), ...]) in order, plus a
+        report of which came from the LLM and which fell back to the template.
+        """
+        gen_kwargs.setdefault("clean_markdown", True)
+        t0 = time.perf_counter()
+        deadline = t0 + self.deadline_s
+        report = ScheduleReport(deadline_s=self.deadline_s, call_timeout_s=self.call_timeout_s)
+        outcomes = [RecapOutcome(slot=slot, matchup=f"{d.team_a} vs {d.team_b}") for slot, d in matchups]
+        recaps: List[Optional[str]] = [None] * len(matchups)
+        started: Dict[int, List[float]] = {}   # idx -> start time per attempt
+        failed: Dict[int, int] = {}            # idx -> attempts that errored
+        results: "queue.Queue" = queue.Queue()
+        pending = list(range(len(matchups)))
+        max_hedges = int(len(matchups) * self.max_hedge_fraction)
+
+        def finalize(idx: int, text: Optional[str], source: str, reason: str = "", latency: Optional[float] = None) -> None:
+            o = outcomes[idx]
+            _, data = matchups[idx]
+            if text is not None and text == self.maker.fallback_recap(data, gen_kwargs["clean_markdown"]):
+                source, reason = SOURCE_FALLBACK, "short draft"
+            if text is None:
+                text = self.maker.fallback_recap(data, gen_kwargs["clean_markdown"])
+            o.source, o.reason, o.latency_s = source, reason, latency
+            o.attempts = len(started.get(idx, []))
+            recaps[idx] = text
+
+        def open_count() -> int:
+            return sum(1 for idx in started if recaps[idx] is None)
+
+        while any(r is None for r in recaps):
+            now = time.perf_counter()
+            if now >= deadline:
+                for idx, r in enumerate(recaps):
+                    if r is None:
+                        finalize(idx, None, SOURCE_FALLBACK, "deadline")
+                break
+
+            # Start queued matchups as workers free up
+            while pending and open_count() < self.max_workers:
+                idx = pending.pop(0)
+                started[idx] = [time.perf_counter()]
+                self._launch(results, idx, 0, matchups[idx][1], gen_kwargs)
+
+            # Collect finished attempts
+            try:
+                item = results.get(timeout=min(self.tick_s, max(0.0, deadline - now)))
+            except queue.Empty:
+                item = None
+            while item is not None:
+                idx, attempt, text, error, latency = item
+                if recaps[idx] is None:
+                    if error is None:
+                        self.latencies.append(latency)
+                        waited = time.perf_counter() - started[idx][0]  # includes time lost before a hedge
+                        finalize(idx, text, SOURCE_HEDGED if attempt > 0 else SOURCE_LLM, latency=round(waited, 3))
+                    else:
+                        failed[idx] = failed.get(idx, 0) + 1
+                        logger.warning(f"Recap call failed for {outcomes[idx].matchup}: {error}")
+                        if failed[idx] >= len(started[idx]):
+                            finalize(idx, None, SOURCE_FALLBACK, f"error: {error}")
+                try:
+                    item = results.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            # Per-call timeouts and hedging
+            now = time.perf_counter()
+            hedge_after = self._hedge_after()
+            for idx, starts in started.items():
+                if recaps[idx] is not None:
+                    continue
+                if now - starts[0] >= self.call_timeout_s and now - starts[-1] >= self.call_timeout_s:
+                    logger.warning(f"Recap call timed out for {outcomes[idx].matchup}; using fallback")
+                    finalize(idx, None, SOURCE_FALLBACK, "timeout")
+                elif (hedge_after is not None and len(starts) == 1 and report.hedges < max_hedges
+                        and now - starts[0] > hedge_after):
+                    logger.info(f"Hedging slow recap for {outcomes[idx].matchup} after {now - starts[0]:.1f}s")
+                    starts.append(now)
+                    report.hedges += 1
+                    self._launch(results, idx, 1, matchups[idx][1], gen_kwargs)
+
+        report.elapsed_s = round(time.perf_counter() - t0, 3)
+        report.p95_s = _p95(self.latencies)
+        report.outcomes = outcomes
+        return [r or "" for r in recaps], report
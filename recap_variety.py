@@ -0,0 +1,237 @@
+"""
+recap_variety.py — Gridiron Gazette
+-----------------------------------
+Per-league memory of past Sabre recaps, used to catch recycled metaphors.
+
+• One-permutation MinHash signatures over word 5-gram shingles, bucketed with LSH banding, so a
+  near-duplicate lookup only touches the few recaps sharing a band — lookup cost
+  stays flat (sub-millisecond) as the archive grows over seasons.
+• A phrase table of content 4-grams ("cooked like a Thanksgiving turkey") counts
+  how often each phrase has already run, giving targeted "avoid these" hints.
+• Recaps are keyed by (year, week, matchup): re-running a week replaces its
+  recaps (and their phrase counts) instead of piling up copies, and a draft
+  is never compared with the recap it is about to replace.
+
+Usage:
+
+    index = RecapIndex.load(league_id)
+    key = RecapIndex.record_id(2025, 5, "Hawks vs Bears")
+    report = index.check(recap, ignore=[team_a, team_b], exclude=key)
+    if report.needs_reroll:
+        ...regenerate with avoid_phrases=report.repeated_phrases...
+    index.add(recap, week=5, year=2025, matchup="Hawks vs Bears")
+    index.save()
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = Path(os.getenv("RECAP_INDEX_DIR", ".cache/recap_index"))
+
+NUM_PERM = 64
+BANDS = 32          # 32 bands x 2 rows -> candidates from ~0.18 Jaccard up
+SHINGLE_WORDS = 5
+PHRASE_WORDS = 4
+_EMPTY = (1 << 64) - 1
+_DENSIFY_OFFSET = 1 << 58  # keeps borrowed values distinct from native ones
+
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "at", "for", "with", "by",
+    "from", "as", "is", "was", "were", "be", "been", "it", "its", "this", "that", "than", "then",
+    "his", "her", "their", "they", "he", "she", "you", "your", "we", "our", "i", "me", "my",
+    "up", "out", "so", "if", "all", "just", "like", "more", "one", "who", "what", "when",
+    "had", "has", "have", "did", "do", "not", "no", "into", "over", "after", "while",
+}
+
+# ===================
+# Text helpers
+# ===================
+def _tokens(text: str) -> List[str]:
+    text = text.split("—Sabre", 1)[0]  # never index the sign-off
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+def _ngrams(tokens: List[str], n: int) -> List[str]:
+    return [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+
+def _hash64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+
+def minhash(text: str) -> List[int]:
+    """
+    One-permutation MinHash: each shingle is hashed once and binned, keeping
+    the minimum per bin (empty bins borrow from the next filled bin). Same
+    signature shape as classic MinHash at a fraction of the cost.
+    """
+    bins: List[Optional[int]] = [None] * NUM_PERM
+    for gram in _ngrams(_tokens(text), SHINGLE_WORDS):
+        h = _hash64(gram)
+        b, v = h % NUM_PERM, h // NUM_PERM
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    if all(v is None for v in bins):
+        return [_EMPTY] * NUM_PERM
+    sig: List[int] = []
+    for i in range(NUM_PERM):
+        step = 0
+        while bins[(i + step) % NUM_PERM] is None:
+            step += 1
+        sig.append(bins[(i + step) % NUM_PERM] + step * _DENSIFY_OFFSET)
+    return sig
+
+def _bands(sig: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+    rows = len(sig) // BANDS
+    return [(b, tuple(sig[b * rows:(b + 1) * rows])) for b in range(BANDS)]
+
+def _similarity(a: List[int], b: List[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+def content_phrases(text: str, ignore: Iterable[str] = ()) -> Set[str]:
+    """Distinctive 4-grams: at least two non-stopwords and no ignored tokens (team names)."""
+    ignored = {t for name in ignore for t in _tokens(name or "")}
+    phrases = set()
+    for gram in _ngrams(_tokens(text), PHRASE_WORDS):
+        words = gram.split()
+        if ignored.intersection(words):
+            continue
+        if sum(1 for w in words if w not in _STOPWORDS and not w.isdigit()) >= 2:
+            phrases.add(gram)
+    return phrases
+
+# ===============
+# Data structures
+# ===============
+@dataclass
+class VarietyReport:
+    similar: List[Tuple[str, float]] = field(default_factory=list)  # (record id, est. Jaccard)
+    repeated_phrases: List[str] = field(default_factory=list)
+    max_similarity: float = 0.0
+    needs_reroll: bool = False
+
+class RecapIndex:
+    def __init__(
+        self,
+        league_key: str,
+        path: Optional[Path] = None,
+        similarity_threshold: float = 0.2,
+        max_repeated_phrases: int = 3,
+    ):
+        self.league_key = str(league_key)
+        self.path = Path(path) if path else INDEX_DIR / f"{re.sub(r'[^A-Za-z0-9_-]', '_', self.league_key)}.json"
+        self.similarity_threshold = similarity_threshold
+        self.max_repeated_phrases = max_repeated_phrases
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.phrases: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+        self._texts: Dict[str, str] = {}  # text hash -> record id
+
+    # ---------- persistence ----------
+    @classmethod
+    def load(cls, league_key: str, path: Optional[Path] = None, **kwargs) -> "RecapIndex":
+        index = cls(league_key, path, **kwargs)
+        if index.path.exists():
+            try:
+                data = json.loads(index.path.read_text(encoding="utf-8"))
+                if data.get("num_perm") == NUM_PERM:  # version 1 records have no phrases/text
+                    for rec in data.get("records", []):
+                        index._insert(rec)
+                    index.phrases = dict(data.get("phrases", {}))
+                else:
+                    logger.warning(f"Recap index {index.path} uses a different MinHash size; starting fresh")
+            except Exception as e:
+                logger.warning(f"Failed to load recap index {index.path}: {e}")
+        logger.debug(f"Recap index for league {league_key}: {len(index.records)} past recaps")
+        return index
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "version": 2,
+            "num_perm": NUM_PERM,
+            "records": list(self.records.values()),
+            "phrases": self.phrases,
+        }, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+    # ---------- index ops ----------
+    @staticmethod
+    def record_id(year: Optional[int], week: Optional[int], matchup: str) -> str:
+        """The key of a matchup's recap: one per (year, week, matchup)."""
+        return f"{year or ''}-W{week or ''}-{matchup}"
+
+    def _insert(self, rec: Dict[str, Any]) -> None:
+        self.records[rec["id"]] = rec
+        self._texts[rec.get("text") or rec["id"].rsplit("-", 1)[-1]] = rec["id"]
+        for band in _bands(rec["sig"]):
+            self._buckets.setdefault(band, []).append(rec["id"])
+
+    def _remove(self, rec_id: str) -> None:
+        rec = self.records.pop(rec_id)
+        text = rec.get("text") or rec_id.rsplit("-", 1)[-1]
+        if self._texts.get(text) == rec_id:
+            del self._texts[text]
+        for band in _bands(rec["sig"]):
+            bucket = self._buckets.get(band, [])
+            if rec_id in bucket:
+                bucket.remove(rec_id)
+        for phrase in rec.get("phrases", ()):
+            left = self.phrases.get(phrase, 0) - 1
+            if left > 0:
+                self.phrases[phrase] = left
+            else:
+                self.phrases.pop(phrase, None)
+
+    def add(self, text: str, week: Optional[int] = None, year: Optional[int] = None,
+            ignore: Iterable[str] = (), sig: Optional[List[int]] = None, matchup: Optional[str] = None) -> str:
+        """
+        Index an accepted recap. With ``matchup`` it replaces that matchup's
+        recap for the week (a re-run); without, identical text is kept once.
+        """
+        text_hash = f"{_hash64(text):016x}"
+        rec_id = self.record_id(year, week, matchup) if matchup else f"{year or ''}-W{week or ''}-{text_hash}"
+        if rec_id in self.records:
+            if not matchup:
+                return rec_id
+            self._remove(rec_id)
+        phrases = sorted(content_phrases(text, ignore))
+        self._insert({"id": rec_id, "week": week, "year": year, "text": text_hash,
+                      "sig": sig or minhash(text), "phrases": phrases})
+        for phrase in phrases:
+            self.phrases[phrase] = self.phrases.get(phrase, 0) + 1
+        return rec_id
+
+    def check(self, text: str, ignore: Iterable[str] = (), sig: Optional[List[int]] = None,
+              exclude: Optional[str] = None) -> VarietyReport:
+        """``exclude`` leaves out a record (the recap this draft would replace, see record_id)."""
+        if f"{_hash64(text):016x}" in self._texts:
+            return VarietyReport()  # re-render of a recap already accepted (e.g. from the LLM cache)
+        sig = sig or minhash(text)
+        candidates: Set[str] = set()
+        for band in _bands(sig):
+            candidates.update(self._buckets.get(band, ()))
+        candidates.discard(exclude)
+        own = set(self.records.get(exclude, {}).get("phrases", ())) if exclude else set()
+        similar = sorted(
+            ((rid, _similarity(sig, self.records[rid]["sig"])) for rid in candidates),
+            key=lambda x: x[1], reverse=True,
+        )
+        similar = [(rid, s) for rid, s in similar if s >= self.similarity_threshold]
+
+        seen = {p: self.phrases.get(p, 0) - (p in own) for p in content_phrases(text, ignore)}
+        repeated = sorted((p for p, n in seen.items() if n > 0), key=lambda p: seen[p], reverse=True)
+        max_sim = similar[0][1] if similar else 0.0
+        return VarietyReport(
+            similar=similar,
+            repeated_phrases=repeated,
+            max_similarity=max_sim,
+            needs_reroll=bool(similar) or len(repeated) >= self.max_repeated_phrases,
+        )
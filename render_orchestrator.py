@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+render_orchestrator.py — Gridiron Gazette
+-----------------------------------------
+One render pass, many formats.
+
+Builds the gazette context ONCE (ESPN fetch, Sabre recaps, logo resolution,
+text cleaning — weekly_recap.build_render_context) and fans it out to
+independent writers in parallel:
+
+  • pdf   — HTML template -> PDF (WeasyPrint / pdfkit, as weekly_recap)
+  • html  — standalone HTML, fonts and logos inlined once (asset_bundler)
+  • docx  — GridironGazette.dotx via docx_template (precompiled) + document_formatter fixes
+  • cards — one PNG share card per matchup (Pillow)
+
+Before any writer starts, the context is checked against each template's
+placeholder schema (template_schema): a missing or misspelled key fails the
+run up front instead of rendering blanks into every format.
+
+Each writer gets the same read-only context and is timed separately; a
+timings JSON is written next to the outputs.
+
+--live hands over to live_gazette: the HTML/PDF are re-published as game
+scores change (one score request per poll, only changed sections re-rendered).
+
+Usage:
+  python render_orchestrator.py --league-id 887998 --year 2025 --week 5 --formats pdf,html,docx,cards
+  python render_orchestrator.py --league-id 887998 --year 2025 --live --formats html,pdf
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from asset_bundler import AssetBundler
+from template_schema import check_context
+
+logger = logging.getLogger(__name__)
+
+ALL_FORMATS = ("pdf", "html", "docx", "cards")
+DEFAULT_OUTPUT = "recaps/Gazette_{year}_W{week02}"
+DEFAULT_HTML_TEMPLATE = "templates/recap_template.html"
+DEFAULT_DOCX_TEMPLATE = "GridironGazette.dotx"
+# Awards the DOCX layout has slots for but gazette_data doesn't compute (yet): rendered blank
+DOCX_BLANK_KEYS = ("AWARD_PLAY_NOTE", "AWARD_MANAGER_NOTE")
+
+# ===============
+# Data structures
+# ===============
+@dataclass
+class RenderBundle:
+    """Everything the writers share: cleaned context + output naming."""
+    ctx: Dict[str, Any]
+    stem: Path                    # output path without extension
+    html_template: str = DEFAULT_HTML_TEMPLATE
+    docx_template: str = DEFAULT_DOCX_TEMPLATE
+
+    @property
+    def matchup_count(self) -> int:
+        return int(self.ctx.get("MATCHUP_COUNT", 0) or 0)
+
+@dataclass
+class FormatResult:
+    fmt: str
+    ok: bool
+    seconds: float
+    paths: List[str] = field(default_factory=list)
+    error: str = ""
+
+@dataclass
+class RenderReport:
+    context_s: float = 0.0
+    wall_s: float = 0.0
+    results: Dict[str, FormatResult] = field(default_factory=dict)
+
+    def summary_lines(self) -> List[str]:
+        lines = [f"Render: context {self.context_s:.2f}s, writers {self.wall_s:.2f}s wall"]
+        for fmt, r in self.results.items():
+            status = f"{len(r.paths)} file(s)" if r.ok else f"FAILED: {r.error}"
+            lines.append(f"  {fmt:<6} {r.seconds:6.2f}s  {status}")
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+# ==========
+# Writers
+# ==========
+def write_pdf(bundle: RenderBundle, save_html: bool = True) -> List[str]:
+    import weekly_recap
+    return [weekly_recap._render_html_to_pdf(bundle.html_template, str(bundle.stem) + ".pdf", bundle.ctx, save_html=save_html)]
+
+def write_html(bundle: RenderBundle) -> List[str]:
+    import weekly_recap
+    html = AssetBundler().bundle_html(weekly_recap.render_html(bundle.html_template, bundle.ctx), inline=True)
+    out = bundle.stem.with_suffix(".html")
+    out.write_text(html, encoding="utf-8")
+    return [str(out)]
+
+def _docx_context(bundle: RenderBundle, image: Callable[[str], Any]) -> Dict[str, Any]:
+    """Map the HTML context onto the DOCX template's placeholder names."""
+    ctx = dict(bundle.ctx)
+    for i in range(1, bundle.matchup_count + 1):
+        home, away = ctx.get(f"MATCHUP{i}_HOME", ""), ctx.get(f"MATCHUP{i}_AWAY", "")
+        ctx.setdefault(f"MATCHUP{i}_TEAMS", f"{home} vs {away}")
+        ctx.setdefault(f"MATCHUP{i}_HEADLINE", f"{home} {ctx.get(f'MATCHUP{i}_HS', '')} – {ctx.get(f'MATCHUP{i}_AS', '')} {away}")
+        ctx.setdefault(f"MATCHUP{i}_BODY", ctx.get(f"MATCHUP{i}_BLURB", ""))
+    for key in DOCX_BLANK_KEYS:
+        ctx.setdefault(key, "")
+    for key in ("LEAGUE_LOGO", "SPONSOR_LOGO"):
+        value = ctx.get(key)
+        if value and Path(str(value)).is_file():
+            ctx[key] = image(str(value))
+    return ctx
+
+def write_docx(bundle: RenderBundle) -> List[str]:
+    from docx_template import DocxImage, UnsupportedTemplate, load_template
+    from document_formatter import fix_document_formatting
+
+    out = bundle.stem.with_suffix(".docx")
+    try:
+        tpl = load_template(bundle.docx_template)
+        tpl.render_to(str(out), _docx_context(bundle, lambda path: DocxImage(path, width_mm=28)))
+    except UnsupportedTemplate as e:
+        logger.info(f"{e}")
+        from docx.shared import Mm
+        from docxtpl import DocxTemplate, InlineImage
+        from gg import resolve_template
+
+        tpl = DocxTemplate(str(resolve_template(bundle.docx_template)))
+        tpl.render(_docx_context(bundle, lambda path: InlineImage(tpl, path, width=Mm(28))))
+        tpl.save(str(out))
+    fix_document_formatting(str(out))
+    return [str(out)]
+
+CARD_SIZE = (1200, 630)
+CARD_BG = (44, 24, 16)
+CARD_ACCENT = (212, 175, 55)
+CARD_TEXT = (255, 246, 236)
+
+def _card_font(size: int):
+    from PIL import ImageFont
+    for name in ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+def _wrap(draw: Any, text: str, font: Any, width: int, max_lines: int) -> List[str]:
+    lines: List[str] = []
+    line = ""
+    for word in text.split():
+        trial = f"{line} {word}".strip()
+        if draw.textlength(trial, font=font) <= width:
+            line = trial
+            continue
+        lines.append(line)
+        line = word
+        if len(lines) == max_lines:
+            break
+    if line and len(lines) < max_lines:
+        lines.append(line)
+    return lines
+
+def write_cards(bundle: RenderBundle) -> List[str]:
+    from PIL import Image, ImageDraw
+
+    ctx = bundle.ctx
+    out_dir = Path(f"{bundle.stem}_cards")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    title_font, score_font, body_font = _card_font(44), _card_font(96), _card_font(28)
+    logos: Dict[str, Any] = {}  # each logo decoded/resized once for all cards
+
+    def logo(path: str):
+        if path not in logos:
+            try:
+                im = Image.open(path).convert("RGBA")
+                im.thumbnail((180, 180))
+                logos[path] = im
+            except Exception:
+                logos[path] = None
+        return logos[path]
+
+    paths = []
+    for i in range(1, bundle.matchup_count + 1):
+        home, away = ctx.get(f"MATCHUP{i}_HOME"), ctx.get(f"MATCHUP{i}_AWAY")
+        if not (home and away):
+            continue
+        card = Image.new("RGB", CARD_SIZE, CARD_BG)
+        draw = ImageDraw.Draw(card)
+        draw.rectangle([0, 0, CARD_SIZE[0], 12], fill=CARD_ACCENT)
+        draw.text((60, 40), f"{ctx.get('LEAGUE_NAME', 'Gridiron Gazette')} • Week {ctx.get('WEEK_NUMBER', '')}",
+                  font=body_font, fill=CARD_ACCENT)
+        for side, name, score, x in (("HOME", home, ctx.get(f"MATCHUP{i}_HS", ""), 60),
+                                     ("AWAY", away, ctx.get(f"MATCHUP{i}_AS", ""), 640)):
+            path = ctx.get(f"MATCHUP{i}_{side}_LOGO")
+            im = logo(path) if path else None
+            if im is not None:
+                card.paste(im, (x, 100), im)
+            draw.text((x + 200, 110), str(score), font=score_font, fill=CARD_TEXT)
+            for n, line in enumerate(_wrap(draw, str(name), title_font, 500, 2)):
+                draw.text((x, 300 + n * 50), line, font=title_font, fill=CARD_TEXT)
+        first = re.split(r"(?<=[.!?])\s", str(ctx.get(f"MATCHUP{i}_BLURB", "")).strip(), maxsplit=1)[0]
+        for n, line in enumerate(_wrap(draw, first, body_font, CARD_SIZE[0] - 120, 3)):
+            draw.text((60, 440 + n * 38), line, font=body_font, fill=CARD_TEXT)
+        out = out_dir / f"matchup{i}.png"
+        card.save(out, optimize=True)
+        paths.append(str(out))
+    return paths
+
+WRITERS: Dict[str, Callable[..., List[str]]] = {
+    "pdf": write_pdf,
+    "html": write_html,
+    "docx": write_docx,
+    "cards": write_cards,
+}
+
+# ==============
+# Orchestration
+# ==============
+def check_contexts(bundle: RenderBundle, formats: List[str]) -> None:
+    """Validate the context against each template's schema before any writer starts."""
+    import weekly_recap
+
+    if {"pdf", "html"} & set(formats):
+        try:
+            html_template = weekly_recap.resolve_template_path(bundle.html_template)
+        except FileNotFoundError:
+            html_template = None  # the writers report it
+        if html_template:
+            check_context(str(html_template), bundle.ctx)
+    if "docx" in formats and Path(bundle.docx_template).exists():
+        check_context(bundle.docx_template, _docx_context(bundle, lambda path: path))
+
+def _timed(fmt: str, fn: Callable[[], List[str]]) -> FormatResult:
+    t0 = time.perf_counter()
+    try:
+        paths = fn()
+        return FormatResult(fmt, True, round(time.perf_counter() - t0, 3), paths)
+    except Exception as e:
+        logger.error(f"{fmt} writer failed: {e}")
+        return FormatResult(fmt, False, round(time.perf_counter() - t0, 3), error=str(e))
+
+def render_formats(bundle: RenderBundle, formats: List[str], max_workers: Optional[int] = None) -> RenderReport:
+    """Run the requested writers in parallel against one shared bundle."""
+    unknown = [f for f in formats if f not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown format(s): {', '.join(unknown)} (available: {', '.join(ALL_FORMATS)})")
+    check_contexts(bundle, formats)
+    bundle.stem.parent.mkdir(parents=True, exist_ok=True)
+    report = RenderReport()
+
+    jobs: Dict[str, Callable[[], List[str]]] = {}
+    for fmt in formats:
+        if fmt == "pdf":
+            # The PDF writer's debug HTML would collide with the standalone HTML output
+            jobs[fmt] = lambda: write_pdf(bundle, save_html="html" not in formats)
+        else:
+            jobs[fmt] = (lambda w: lambda: w(bundle))(WRITERS[fmt])
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs) or 1) as pool:
+        futures = {fmt: pool.submit(_timed, fmt, job) for fmt, job in jobs.items()}
+        for fmt, fut in futures.items():
+            report.results[fmt] = fut.result()
+    report.wall_s = round(time.perf_counter() - t0, 3)
+    return report
+
+def render_all(
+    league_id: int,
+    year: int,
+    week: Optional[int] = None,
+    formats: Optional[List[str]] = None,
+    output: str = DEFAULT_OUTPUT,
+    html_template: str = DEFAULT_HTML_TEMPLATE,
+    docx_template: str = DEFAULT_DOCX_TEMPLATE,
+    **context_kwargs: Any,
+) -> RenderReport:
+    """Build the context once, then write every requested format."""
+    import weekly_recap
+
+    t0 = time.perf_counter()
+    ctx = weekly_recap.build_render_context(league_id, year, week, **context_kwargs)
+    context_s = time.perf_counter() - t0
+
+    wk = int(ctx.get("WEEK_NUMBER", ctx.get("WEEK", week or 0)) or 0)
+    stem = Path(output.format(year=year, week=wk, week02=f"{wk:02d}"))
+    bundle = RenderBundle(ctx=ctx, stem=stem, html_template=html_template, docx_template=docx_template)
+
+    report = render_formats(bundle, list(formats or ALL_FORMATS))
+    report.context_s = round(context_s, 3)
+    for line in report.summary_lines():
+        logger.info(line)
+    timings = Path(f"{stem}_timings.json")
+    timings.write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+    return report
+
+def parse_formats(value: str) -> List[str]:
+    formats = [f.strip().lower() for f in (value or "").split(",") if f.strip()]
+    return list(ALL_FORMATS) if formats == ["all"] else formats
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Render the Gazette to several formats from one context")
+    p.add_argument("--league-id", type=int, default=os.getenv("LEAGUE_ID"))
+    p.add_argument("--year", type=int, default=os.getenv("YEAR"))
+    p.add_argument("--week", type=int, default=None)
+    p.add_argument("--formats", default=os.getenv("GAZETTE_FORMATS", "all"),
+                   help=f"Comma-separated: {', '.join(ALL_FORMATS)} or 'all'")
+    p.add_argument("--output", default=DEFAULT_OUTPUT, help="Output path stem (no extension)")
+    p.add_argument("--template", default=DEFAULT_HTML_TEMPLATE)
+    p.add_argument("--docx-template", default=DEFAULT_DOCX_TEMPLATE)
+    p.add_argument("--no-llm", action="store_true", help="Use template recaps instead of the LLM")
+    p.add_argument("--live", action="store_true",
+                   help="Game-day mode: keep polling scores and re-publish HTML/PDF as they change (live_gazette)")
+    return p.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    args = parse_args(argv)
+    if args.live:
+        import live_gazette
+        from league_snapshot import config_credentials
+
+        formats = [f for f in parse_formats(args.formats) if f in live_gazette.LIVE_FORMATS] or ["html"]
+        live = live_gazette.LiveGazette.open(int(args.league_id), int(args.year), args.week,
+                                             template=args.template, formats=formats, **config_credentials({}))
+        live_gazette.run_live([live])
+        return
+    report = render_all(
+        league_id=int(args.league_id),
+        year=int(args.year),
+        week=args.week,
+        formats=parse_formats(args.formats),
+        output=args.output,
+        html_template=args.template,
+        docx_template=args.docx_template,
+        use_llm_blurbs=not args.no_llm,
+    )
+    if not all(r.ok for r in report.results.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -7,14 +7,14 @@ Save this in your project root and run: python run_gazette.py
 import os
 import sys
 from pathlib import Path
-from datetime import datetime, timedelta
+
+from season_calendar import resolve_week
 
 # ==================== CONFIGURATION ====================
 # Update these with your actual values
 
 LEAGUE_ID = "887998"  # Your ESPN League ID
 YEAR = 2025
-FANTASY_SEASON_START = "2025-09-02"  # Adjust to your league's start date
 
 # Optional: Set these as environment variables instead
 # ESPN_S2 = "your_espn_s2_cookie"
@@ -23,14 +23,8 @@ FANTASY_SEASON_START = "2025-09-02"  # Adjust to your league's start date
 
 # ==================== AUTO WEEK CALCULATION ====================
 def get_current_week():
-    """Calculate current week based on season start"""
-    try:
-        start_date = datetime.strptime(FANTASY_SEASON_START, "%Y-%m-%d")
-        current_date = datetime.now()
-        week = min(18, max(1, ((current_date - start_date).days // 7) + 1))
-        return week
-    except:
-        return 1  # Fallback to week 1
+    """Latest final week of the season, from the NFL calendar (no network)"""
+    return resolve_week(YEAR)
 
 # ==================== MAIN FUNCTION ====================
 def main():
@@ -45,7 +39,7 @@ def main():
     
     # Get week input
     current_week = get_current_week()
-    print(f"📅 Current calculated week: {current_week}")
+    print(f"📅 Latest final week: {current_week}")
     
     week_input = input(f"Enter week to build (or press Enter for {current_week}): ").strip()
     week = int(week_input) if week_input.isdigit() else current_week
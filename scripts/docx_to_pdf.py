@@ -1,21 +1,24 @@
 # scripts/docx_to_pdf.py
-# Converts DOCX -> PDF using LibreOffice headless (fast, robust in CI)
-import subprocess, shlex
+# Converts DOCX -> PDF using LibreOffice headless, through the warm soffice pool
 from pathlib import Path
+from typing import List
 
-def docx_to_pdf(docx_path: str, out_dir: str | None = None) -> str:
-    docx = Path(docx_path).resolve()
-    out_dir = Path(out_dir).resolve() if out_dir else docx.parent
-    out_dir.mkdir(parents=True, exist_ok=True)
+try:
+    from soffice_pool import get_pool
+except ImportError:
+    from scripts.soffice_pool import get_pool
 
-    # Use soffice (LibreOffice) headless export
-    cmd = (
-        f'soffice --headless --nologo --nolockcheck '
-        f'--convert-to pdf --outdir {shlex.quote(str(out_dir))} {shlex.quote(str(docx))}'
-    )
-    subprocess.run(cmd, shell=True, check=True)
+# Failures raise FileNotFoundError ("PDF not created"), as the one-shot soffice version did
+def docx_to_pdf(docx_path: str, out_dir: str | None = None) -> str:
+    result = get_pool().convert(docx_path, out_dir)
+    if not result.ok:
+        raise FileNotFoundError(f"PDF not created for {Path(docx_path).name}: {result.error}")
+    return result.pdf
 
-    pdf_path = out_dir / (docx.stem + ".pdf")
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF not created: {pdf_path}")
-    return str(pdf_path)
+def docx_to_pdf_batch(docx_paths: List[str], out_dir: str | None = None) -> List[str]:
+    """Convert a whole run's DOCX outputs across the pool's instances."""
+    results = get_pool().convert_batch(docx_paths, out_dir)
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise FileNotFoundError("PDF not created for: " + ", ".join(f"{Path(r.docx).name} ({r.error})" for r in failed))
+    return [r.pdf for r in results]
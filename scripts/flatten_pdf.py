@@ -1,27 +1,14 @@
 # scripts/flatten_pdf.py
-import subprocess, shlex, tempfile, os
+# Rasterises a PDF on a worker pool (see pdf_pipeline.flatten)
 from pathlib import Path
+from typing import Optional
 
-def flatten_pdf(src: str, dst: str, dpi: int = 200) -> None:
-    src_p = Path(src); dst_p = Path(dst)
-    work = Path(tempfile.mkdtemp(prefix="flatten_"))
-    try:
-        # 1) PDF → PNG frames
-        base = work / "page"
-        cmd1 = f'pdftoppm -png -r {dpi} {shlex.quote(str(src_p))} {shlex.quote(str(base))}'
-        subprocess.check_call(cmd1, shell=True)
+try:
+    from pdf_pipeline import flatten
+except ImportError:
+    from scripts.pdf_pipeline import flatten
 
-        # 2) PNGs → single PDF
-        pngs = sorted(str(p) for p in work.glob("page-*.png"))
-        if not pngs:
-            # Some poppler versions name files page-1.png, page-2.png...
-            pngs = sorted(str(p) for p in work.glob("page*.png"))
-        cmd2 = "img2pdf " + " ".join(shlex.quote(p) for p in pngs) + f" -o {shlex.quote(str(dst_p))}"
-        subprocess.check_call(cmd2, shell=True)
-    finally:
-        # cleanup temp dir
-        try:
-            for p in work.glob("*"): p.unlink()
-            work.rmdir()
-        except Exception:
-            pass
+def flatten_pdf(src: str, dst: str, dpi: int = 200, workers: Optional[int] = None, only_annotated: bool = False) -> None:
+    dst_p = Path(dst)
+    dst_p.parent.mkdir(parents=True, exist_ok=True)
+    dst_p.write_bytes(flatten(Path(src).read_bytes(), dpi=dpi, workers=workers, only_annotated=only_annotated))
@@ -1,29 +1,13 @@
 # scripts/lock_pdf.py (resilient)
-# Tries to lock PDF with pikepdf; if unavailable, falls back to a no-op copy
-# so builds never fail during CI/beta.
+# Tries to lock PDF with pikepdf; if unavailable, falls back to an unlocked copy
+# so builds never fail during CI/beta. See pdf_pipeline.lock.
 from pathlib import Path
-import shutil
 
-def _lock_with_pikepdf(src: str, dst: str, owner: str = "owner-secret") -> None:
-    from pikepdf import Pdf, Encryption, Permissions  # imported lazily
-    perms = Permissions(
-        extract=False, modify_annotation=False, modify_form=False,
-        modify_other=False, print_lowres=False, print_highres=False
-    )
-    with Pdf.open(src) as pdf:
-        pdf.save(dst, encryption=Encryption(owner=owner, user="", allow=perms))
+try:
+    from pdf_pipeline import lock
+except ImportError:
+    from scripts.pdf_pipeline import lock
 
 def lock_pdf(src: str, dst: str, owner: str = "owner-secret") -> None:
-    try:
-        _lock_with_pikepdf(src, dst, owner=owner)
-    except ModuleNotFoundError:
-        # Graceful fallback: copy without locking (non-fatal)
-        # CI log line so you can see why it's unlocked
-        print("[lock_pdf] pikepdf not installed; emitting UNLOCKED PDF:", dst)
-        Path(dst).parent.mkdir(parents=True, exist_ok=True)
-        shutil.copyfile(src, dst)
-    except Exception as e:
-        # Any other failure -> also fallback to unlocked copy
-        print(f"[lock_pdf] lock failed ({e}); emitting UNLOCKED PDF: {dst}")
-        Path(dst).parent.mkdir(parents=True, exist_ok=True)
-        shutil.copyfile(src, dst)
+    Path(dst).parent.mkdir(parents=True, exist_ok=True)
+    Path(dst).write_bytes(lock(Path(src).read_bytes(), owner=owner))
@@ -0,0 +1,295 @@
+# scripts/pdf_pipeline.py
+# In-memory PDF post-processing: flatten -> pdfa -> lock as one job.
+#
+# Each step takes PDF bytes and returns PDF bytes, so nothing touches disk
+# between steps. Libraries are used where available (pypdfium2 for
+# rasterising, pikepdf for locking); Ghostscript is piped through
+# stdin/stdout. No shell=True anywhere.
+#
+# Requirements: pypdfium2 and pikepdf (requirements.txt); Ghostscript for
+# pdfa and poppler-utils (pdfinfo/pdftoppm) when pypdfium2 is missing
+# (apt install ghostscript poppler-utils). A step whose tool is missing
+# stops with a message naming what to install.
+#
+# flatten rasterises pages on a worker pool and streams them into the
+# output PDF in order (lossless Flate images). --only-annotated flattens just
+# the pages with form fields/annotations and leaves the rest as vector.
+#
+#   python scripts/pdf_pipeline.py in.pdf out.pdf --steps flatten,pdfa,lock [--workers 4] [--only-annotated]
+#
+#   job = PdfJob(["flatten", "lock"], dpi=200)
+#   data, timings = job.run(Path("in.pdf").read_bytes())
+import argparse
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ---------- steps (bytes -> bytes) ----------
+def _require(tool: str, step: str, install: str) -> None:
+    if shutil.which(tool) is None:
+        raise RuntimeError(f"{step}: {tool} not found ({install})")
+
+def _have_pdfium() -> bool:
+    try:
+        import pypdfium2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _page_count(data: bytes) -> int:
+    if _have_pdfium():
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    _require("pdfinfo", "flatten", "pip install pypdfium2, or apt install poppler-utils")
+    info = subprocess.run(["pdfinfo", "-"], input=data, stdout=subprocess.PIPE, check=True).stdout.decode("latin-1")
+    return int(re.search(r"^Pages:\s+(\d+)", info, re.MULTILINE).group(1))
+
+def _encode(im) -> Tuple[int, int, bytes]:
+    im = im.convert("RGB")
+    return im.width, im.height, zlib.compress(im.tobytes(), 6)
+
+def _render_chunk(data: bytes, dpi: int, pages: List[int]) -> List[Tuple[int, int, bytes]]:
+    """Worker: (width, height, Flate RGB) for ``pages`` (0-based). Runs in its own process."""
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(data)
+    try:
+        return [_encode(pdf[i].render(scale=dpi / 72).to_pil()) for i in pages]
+    finally:
+        pdf.close()
+
+def _render_with_pdftoppm(data: bytes, dpi: int, page: int) -> List[Tuple[int, int, bytes]]:
+    from PIL import Image
+    ppm = subprocess.run(
+        ["pdftoppm", "-r", str(dpi), "-f", str(page + 1), "-l", str(page + 1), "-singlefile", "-"],
+        input=data, stdout=subprocess.PIPE, check=True,
+    ).stdout
+    return [_encode(Image.open(io.BytesIO(ppm)))]
+
+def render_pages(data: bytes, pages: List[int], dpi: int = 200, workers: Optional[int] = None) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Rasterise ``pages`` on a worker pool, yielding compressed pages IN ORDER
+    as they finish, so the writer can stream them out one at a time.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pages) or 1))
+    if _have_pdfium():
+        # pdfium is single-threaded per process: split the pages across processes
+        size = -(-len(pages) // workers)
+        chunks = [pages[i:i + size] for i in range(0, len(pages), size)]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for rendered in ex.map(_render_chunk, [data] * len(chunks), [dpi] * len(chunks), chunks):
+                yield from rendered
+    else:
+        # pdftoppm per page, PPM straight to stdout (no temp files)
+        _require("pdftoppm", "flatten", "pip install pypdfium2, or apt install poppler-utils")
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for rendered in ex.map(lambda i: _render_with_pdftoppm(data, dpi, i), pages):
+                yield from rendered
+
+class RasterPdfWriter:
+    """Minimal PDF writer: one Flate RGB image per page, written as pages arrive."""
+
+    def __init__(self, dpi: int):
+        self.dpi = dpi
+        self.buf = io.BytesIO()
+        self.buf.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.offsets: Dict[int, int] = {}
+        self.kids: List[int] = []
+        self._next = 3  # 1 = catalog, 2 = page tree (written last)
+
+    def _obj(self, body: bytes, num: Optional[int] = None) -> int:
+        if num is None:
+            num, self._next = self._next, self._next + 1
+        self.offsets[num] = self.buf.tell()
+        self.buf.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+        return num
+
+    @staticmethod
+    def _stream(header: str, payload: bytes) -> bytes:
+        return f"<< {header} /Length {len(payload)} >>\nstream\n".encode() + payload + b"\nendstream"
+
+    def add_page(self, width: int, height: int, flate_rgb: bytes) -> None:
+        w_pt, h_pt = width * 72 / self.dpi, height * 72 / self.dpi
+        image = self._obj(self._stream(
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            "/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode", flate_rgb))
+        content = self._obj(self._stream("", f"q {w_pt:.2f} 0 0 {h_pt:.2f} 0 0 cm /Im0 Do Q".encode()))
+        self.kids.append(self._obj(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {w_pt:.2f} {h_pt:.2f}] "
+            f"/Resources << /XObject << /Im0 {image} 0 R >> >> /Contents {content} 0 R >>".encode()))
+
+    def finish(self) -> bytes:
+        kids = " ".join(f"{k} 0 R" for k in self.kids)
+        self._obj(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.kids)} >>".encode(), num=2)
+        self._obj(b"<< /Type /Catalog /Pages 2 0 R >>", num=1)
+        xref = self.buf.tell()
+        size = self._next
+        self.buf.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        for num in range(1, size):
+            self.buf.write(f"{self.offsets[num]:010d} 00000 n \n".encode())
+        self.buf.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+        return self.buf.getvalue()
+
+def _annotated_pages(pdf) -> List[int]:
+    """Pages carrying form fields or annotations (pikepdf document)."""
+    return [i for i, page in enumerate(pdf.pages) if len(page.obj.get("/Annots", [])) > 0]
+
+def flatten(data: bytes, dpi: int = 200, workers: Optional[int] = None, only_annotated: bool = False) -> bytes:
+    """
+    Rasterise pages (no selectable text, no editable fields).
+
+    only_annotated=True keeps every page without form fields/annotations as
+    vector and rasterises just the rest (needs pikepdf; otherwise all pages
+    are flattened).
+    """
+    if only_annotated:
+        try:
+            import pikepdf
+        except ImportError:
+            logger.warning("flatten: pikepdf not installed (pip install pikepdf); flattening every page")
+        else:
+            return _flatten_selected(data, dpi, workers, pikepdf)
+
+    pages = list(range(_page_count(data)))
+    if not pages:
+        raise ValueError("flatten: PDF has no pages")
+    writer = RasterPdfWriter(dpi)
+    for page in render_pages(data, pages, dpi=dpi, workers=workers):
+        writer.add_page(*page)
+    return writer.finish()
+
+def _flatten_selected(data: bytes, dpi: int, workers: Optional[int], pikepdf) -> bytes:
+    with pikepdf.Pdf.open(io.BytesIO(data)) as pdf:
+        targets = _annotated_pages(pdf)
+        logger.info(f"flatten: {len(targets)} of {len(pdf.pages)} page(s) have fields/annotations")
+        if not targets:
+            return data
+        writer = RasterPdfWriter(dpi)
+        for page in render_pages(data, targets, dpi=dpi, workers=workers):
+            writer.add_page(*page)
+        with pikepdf.Pdf.open(io.BytesIO(writer.finish())) as raster:
+            for raster_page, i in zip(raster.pages, targets):
+                pdf.pages.insert(i, raster_page)  # import the raster page in place...
+                del pdf.pages[i + 1]              # ...and drop the vector original
+            if "/AcroForm" in pdf.Root:
+                del pdf.Root["/AcroForm"]
+            out = io.BytesIO()
+            pdf.save(out)
+        return out.getvalue()
+
+def pdfa(data: bytes) -> bytes:
+    """
+    PDF/A-2b via Ghostscript, piped (PDFACompatibilityPolicy=1 fails on
+    noncompliance). -sstdout=%stderr keeps Ghostscript's own messages out of
+    the PDF written to stdout.
+    """
+    cmd = [
+        "gs", "-q", "-sstdout=%stderr", "-dBATCH", "-dNOPAUSE", "-dNOOUTERSAVE", "-dSAFER",
+        "-sDEVICE=pdfwrite", "-dPDFA=2", "-dPDFACompatibilityPolicy=1",
+        "-dProcessColorModel=/DeviceRGB", "-dUseCIEColor",
+        "-sOutputFile=-", "-",
+    ]
+    _require("gs", "pdfa", "apt install ghostscript")
+    out = subprocess.run(cmd, input=data, stdout=subprocess.PIPE, check=True).stdout
+    if not out.startswith(b"%PDF"):
+        raise RuntimeError("pdfa: Ghostscript produced no PDF")
+    return out
+
+def lock(data: bytes, owner: str = "owner-secret") -> bytes:
+    """Owner-password lock via pikepdf; passes the PDF through unlocked if pikepdf is missing or fails."""
+    try:
+        from pikepdf import Encryption, Pdf, Permissions
+        perms = Permissions(
+            extract=False, modify_annotation=False, modify_form=False,
+            modify_other=False, print_lowres=False, print_highres=False,
+        )
+        out = io.BytesIO()
+        with Pdf.open(io.BytesIO(data)) as pdf:
+            pdf.save(out, encryption=Encryption(owner=owner, user="", allow=perms))
+        return out.getvalue()
+    except ModuleNotFoundError:
+        print("[lock_pdf] pikepdf not installed (pip install pikepdf); emitting UNLOCKED PDF")
+    except Exception as e:
+        print(f"[lock_pdf] lock failed ({e}); emitting UNLOCKED PDF")
+    return data
+
+STEPS: Dict[str, Callable[..., bytes]] = {"flatten": flatten, "pdfa": pdfa, "lock": lock}
+
+# ---------- job ----------
+@dataclass
+class StepTiming:
+    step: str
+    seconds: float
+    bytes_in: int
+    bytes_out: int
+
+@dataclass
+class PdfJob:
+    steps: List[str]
+    dpi: int = 200
+    owner: str = "owner-secret"
+    workers: Optional[int] = None
+    only_annotated: bool = False
+    extra_steps: Dict[str, Callable[[bytes], bytes]] = field(default_factory=dict)
+
+    def _call(self, name: str, data: bytes) -> bytes:
+        if name in self.extra_steps:
+            return self.extra_steps[name](data)
+        if name == "flatten":
+            return flatten(data, dpi=self.dpi, workers=self.workers, only_annotated=self.only_annotated)
+        if name == "lock":
+            return lock(data, owner=self.owner)
+        if name in STEPS:
+            return STEPS[name](data)
+        raise ValueError(f"Unknown PDF step: {name} (known: {', '.join(STEPS)})")
+
+    def run(self, data: bytes) -> Tuple[bytes, List[StepTiming]]:
+        timings: List[StepTiming] = []
+        for name in self.steps:
+            t0 = time.perf_counter()
+            out = self._call(name, data)
+            timings.append(StepTiming(name, round(time.perf_counter() - t0, 3), len(data), len(out)))
+            logger.info(f"pdf {name}: {timings[-1].seconds:.2f}s, {len(data) // 1024} KB -> {len(out) // 1024} KB")
+            data = out
+        return data, timings
+
+    def run_file(self, src: str, dst: str) -> List[StepTiming]:
+        data, timings = self.run(Path(src).read_bytes())
+        Path(dst).parent.mkdir(parents=True, exist_ok=True)
+        Path(dst).write_bytes(data)
+        return timings
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Post-process a gazette PDF in memory")
+    ap.add_argument("src")
+    ap.add_argument("dst")
+    ap.add_argument("--steps", default="flatten,lock", help=f"comma list of {', '.join(STEPS)}")
+    ap.add_argument("--dpi", type=int, default=200)
+    ap.add_argument("--workers", type=int, help="rasterisation workers (default: CPU count)")
+    ap.add_argument("--only-annotated", action="store_true", help="flatten only pages with form fields/annotations")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    steps = [s.strip() for s in args.steps.split(",") if s.strip()]
+    try:
+        timings = PdfJob(steps, dpi=args.dpi, workers=args.workers, only_annotated=args.only_annotated).run_file(args.src, args.dst)
+    except RuntimeError as e:
+        raise SystemExit(f"pdf_pipeline: {e}")
+    for t in timings:
+        print(f"{t.step:<8} {t.seconds:6.2f}s  {t.bytes_in:>9} -> {t.bytes_out:>9} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+# scripts/soffice_pool.py
+# Keeps headless LibreOffice instances warm and converts DOCX -> PDF through them.
+#
+# Cold-starting soffice costs seconds per document. The pool starts N
+# instances once (each with its own profile, so they can run side by side),
+# feeds them from a shared queue and restarts any instance that crashes,
+# retrying its document once. Throughput scales with --instances.
+#
+# How an instance stays resident, best first:
+#   uno        LibreOffice's Python-UNO bridge is importable (run with
+#              LibreOffice's python, or apt install python3-uno): soffice
+#              --accept on a socket, documents loaded over UNO.
+#   unoserver  `unoserver` and `unoconvert` are on PATH (pip install
+#              unoserver into LibreOffice's python): one unoserver per slot,
+#              documents sent with unoconvert (which needs no UNO itself).
+#   oneshot    neither: each document is a one-shot `soffice --convert-to`.
+#              Nothing stays resident; a warning says so, and
+#              SOFFICE_REQUIRE_RESIDENT=1 turns it into an error.
+# Profiles live in .cache/soffice/slot-N (SOFFICE_PROFILE_DIR) and are kept
+# between runs, so even one-shot conversions start from a warm profile, as
+# the plain `soffice --convert-to` with the default profile did.
+#
+#   python scripts/soffice_pool.py recaps/*.docx --out-dir recaps --instances 3 [--pdfa]
+#
+#   with SofficePool(instances=3) as pool:
+#       results = pool.convert_batch(docx_paths, out_dir="recaps")
+import argparse
+import atexit
+import logging
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INSTANCES = int(os.getenv("SOFFICE_INSTANCES", "2"))
+PROFILE_DIR = Path(os.getenv("SOFFICE_PROFILE_DIR", ".cache/soffice"))
+REQUIRE_RESIDENT = os.getenv("SOFFICE_REQUIRE_RESIDENT", "0") == "1"
+START_TIMEOUT_S = 45.0
+
+MODE_UNO, MODE_UNOSERVER, MODE_ONESHOT = "uno", "unoserver", "oneshot"
+
+# LibreOffice writer_pdf_Export options for PDF/A-1b (same as pdf_export.docx_to_pdf_a)
+PDFA_FILTER = {"SelectPdfVersion": 1, "UseTaggedPDF": True, "EmbedStandardFonts": True}
+
+def soffice_bin() -> str:
+    mac = "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+    return mac if Path(mac).exists() else "soffice"
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def resident_mode() -> str:
+    """How instances can stay resident here (see the header); MODE_ONESHOT when they can't."""
+    try:
+        import uno  # noqa: F401  (LibreOffice's bundled Python bridge)
+        return MODE_UNO
+    except ImportError:
+        pass
+    if shutil.which("unoserver") and shutil.which("unoconvert"):
+        return MODE_UNOSERVER
+    return MODE_ONESHOT
+
+_warned_oneshot = False
+
+def _check_mode(mode: str) -> None:
+    global _warned_oneshot
+    if mode != MODE_ONESHOT:
+        return
+    message = ("No resident LibreOffice: neither Python-UNO (`import uno`) nor unoserver/unoconvert is "
+               "available, so every document is a one-shot soffice run")
+    if REQUIRE_RESIDENT:
+        raise RuntimeError(message + " (SOFFICE_REQUIRE_RESIDENT=1)")
+    if not _warned_oneshot:
+        _warned_oneshot = True
+        logger.warning(message + "; install python3-uno or unoserver to keep instances warm")
+
+@dataclass
+class ConversionResult:
+    docx: str
+    pdf: Optional[str] = None
+    seconds: float = 0.0
+    instance: int = -1
+    restarts: int = 0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.pdf is not None
+
+# ---------- instances ----------
+class SofficeInstance:
+    """One headless soffice slot with its own persistent profile; resident unless in oneshot mode."""
+
+    def __init__(self, index: int, profile_dir: Path = PROFILE_DIR, mode: Optional[str] = None):
+        self.index = index
+        self.mode = mode or resident_mode()
+        _check_mode(self.mode)
+        self.profile = (Path(profile_dir) / f"slot-{index}").resolve()
+        self.profile.mkdir(parents=True, exist_ok=True)
+        self.proc: Optional[subprocess.Popen] = None
+        self.desktop = None
+        self.port: Optional[int] = None
+
+    @property
+    def resident(self) -> bool:
+        return self.mode != MODE_ONESHOT
+
+    def _base_cmd(self) -> List[str]:
+        return [
+            soffice_bin(), "--headless", "--invisible", "--nologo", "--norestore", "--nolockcheck",
+            f"-env:UserInstallation={self.profile.as_uri()}",
+        ]
+
+    def start(self) -> None:
+        if self.mode == MODE_UNO:
+            self._start_uno()
+        elif self.mode == MODE_UNOSERVER:
+            self._start_unoserver()
+
+    def _start_uno(self) -> None:
+        import uno
+        port = _free_port()
+        self.proc = subprocess.Popen(
+            self._base_cmd() + [f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + START_TIMEOUT_S
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext")
+                self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+                return
+            except Exception:
+                if self.proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"soffice instance {self.index} did not start")
+                time.sleep(0.25)
+
+    def _start_unoserver(self) -> None:
+        self.port = _free_port()
+        self.proc = subprocess.Popen(
+            ["unoserver", "--interface", "127.0.0.1", "--port", str(self.port), "--uno-port", str(_free_port()),
+             "--executable", shutil.which(soffice_bin()) or soffice_bin(),
+             "--user-installation", self.profile.as_uri()],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + START_TIMEOUT_S
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    return
+            except OSError:
+                if self.proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"unoserver instance {self.index} did not start")
+                time.sleep(0.25)
+
+    def alive(self) -> bool:
+        return not self.resident or (self.proc is not None and self.proc.poll() is None)
+
+    def convert(self, docx: Path, out_dir: Path, pdfa: bool = False) -> Path:
+        pdf = out_dir / (docx.stem + ".pdf")
+        if self.mode == MODE_UNO:
+            self._convert_uno(docx, pdf, pdfa)
+        elif self.mode == MODE_UNOSERVER:
+            self._convert_unoserver(docx, pdf, pdfa)
+        else:
+            self._convert_cli(docx, out_dir, pdfa)
+        if not pdf.exists():
+            raise FileNotFoundError(f"PDF not created: {pdf}")
+        return pdf
+
+    def _convert_uno(self, docx: Path, pdf: Path, pdfa: bool) -> None:
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name, value):
+            p = PropertyValue()
+            p.Name, p.Value = name, value
+            return p
+
+        doc = self.desktop.loadComponentFromURL(uno.systemPathToFileUrl(str(docx)), "_blank", 0, (prop("Hidden", True),))
+        try:
+            args = [prop("FilterName", "writer_pdf_Export")]
+            if pdfa:
+                args.append(prop("FilterData", tuple(prop(k, v) for k, v in PDFA_FILTER.items())))
+            doc.storeToURL(uno.systemPathToFileUrl(str(pdf)), tuple(args))
+        finally:
+            doc.close(True)
+
+    def _convert_unoserver(self, docx: Path, pdf: Path, pdfa: bool) -> None:
+        cmd = ["unoconvert", "--host", "127.0.0.1", "--port", str(self.port), "--convert-to", "pdf",
+               "--filter", "writer_pdf_Export"]
+        if pdfa:
+            for k, v in PDFA_FILTER.items():
+                cmd += ["--filter-options", f"{k}={str(v).lower()}"]
+        subprocess.run(cmd + [str(docx), str(pdf)], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def _convert_cli(self, docx: Path, out_dir: Path, pdfa: bool) -> None:
+        target = "pdf"
+        if pdfa:
+            opts = ",".join(
+                f'"{k}":{{"type":"{"boolean" if isinstance(v, bool) else "long"}","value":"{str(v).lower()}"}}'
+                for k, v in PDFA_FILTER.items()
+            )
+            target = f"pdf:writer_pdf_Export:{{{opts}}}"
+        subprocess.run(self._base_cmd() + ["--convert-to", target, "--outdir", str(out_dir), str(docx)],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def restart(self) -> None:
+        self.stop()
+        self.start()
+
+    def stop(self, keep_profile: bool = True) -> None:
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+        if self.proc is not None:
+            if self.mode == MODE_UNOSERVER:
+                self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+            self.proc = None
+        if not keep_profile:
+            shutil.rmtree(self.profile, ignore_errors=True)
+
+# ---------- pool ----------
+class SofficePool:
+    def __init__(self, instances: int = DEFAULT_INSTANCES, instance_factory: Callable[[int], SofficeInstance] = SofficeInstance):
+        self.size = max(1, instances)
+        self._factory = instance_factory
+        self._idle: "queue.Queue" = queue.Queue()
+        self._all: List[SofficeInstance] = []
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def __enter__(self) -> "SofficePool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._all:
+                return
+            # Start instances side by side: cold starts overlap instead of adding up
+            with ThreadPoolExecutor(max_workers=self.size) as ex:
+                started = list(ex.map(self._start_one, range(self.size)))
+            for inst in started:
+                self._all.append(inst)
+                self._idle.put(inst)
+
+    def _start_one(self, index: int) -> SofficeInstance:
+        inst = self._factory(index)
+        inst.start()
+        return inst
+
+    def convert(self, docx: str, out_dir: Optional[str] = None, pdfa: bool = False) -> ConversionResult:
+        """Convert one document on the next free instance (restart + one retry on a crash)."""
+        self.start()
+        src = Path(docx).resolve()
+        out = Path(out_dir).resolve() if out_dir else src.parent
+        out.mkdir(parents=True, exist_ok=True)
+        result = ConversionResult(docx=str(src))
+        inst = self._idle.get()
+        t0 = time.perf_counter()
+        try:
+            result.instance = inst.index
+            for attempt in range(2):
+                try:
+                    if not inst.alive():
+                        raise RuntimeError("instance died")
+                    result.pdf = str(inst.convert(src, out, pdfa=pdfa))
+                    break
+                except Exception as e:
+                    result.error = str(e)
+                    if attempt == 1:
+                        break
+                    logger.warning(f"soffice #{inst.index} failed on {src.name} ({e}); restarting")
+                    try:
+                        inst.restart()
+                    except Exception as restart_error:
+                        result.error = f"restart failed: {restart_error}"
+                        break
+                    result.restarts += 1
+                    with self._lock:
+                        self.restarts += 1
+            if result.ok:
+                result.error = ""
+        finally:
+            result.seconds = round(time.perf_counter() - t0, 3)
+            self._idle.put(inst)
+        return result
+
+    def convert_batch(self, docx_paths: List[str], out_dir: Optional[str] = None, pdfa: bool = False) -> List[ConversionResult]:
+        """Convert many documents across all instances; results keep input order."""
+        self.start()
+        with ThreadPoolExecutor(max_workers=self.size) as ex:
+            return list(ex.map(lambda p: self.convert(p, out_dir, pdfa), docx_paths))
+
+    def close(self) -> None:
+        with self._lock:
+            for inst in self._all:
+                inst.stop()
+            self._all.clear()
+            self._idle = queue.Queue()
+
+_POOL: Optional[SofficePool] = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool() -> SofficePool:
+    """Process-wide pool, shut down at exit (used by docx_to_pdf / pdf_export)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = SofficePool()
+            atexit.register(_POOL.close)
+        return _POOL
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Convert DOCX files to PDF through warm LibreOffice instances")
+    ap.add_argument("docx", nargs="+")
+    ap.add_argument("--out-dir")
+    ap.add_argument("--instances", type=int, default=DEFAULT_INSTANCES)
+    ap.add_argument("--pdfa", action="store_true", help="PDF/A-1b export")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    t0 = time.perf_counter()
+    with SofficePool(instances=args.instances) as pool:
+        results = pool.convert_batch(args.docx, args.out_dir, pdfa=args.pdfa)
+    for r in results:
+        status = r.pdf if r.ok else f"FAILED: {r.error}"
+        print(f"[#{r.instance}] {Path(r.docx).name}: {r.seconds:.1f}s -> {status}")
+    ok = sum(r.ok for r in results)
+    print(f"{ok}/{len(results)} converted in {time.perf_counter() - t0:.1f}s on {args.instances} {resident_mode()} "
+          f"instance(s), {pool.restarts} restart(s)")
+    raise SystemExit(0 if ok == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+season_calendar.py — Gridiron Gazette
+-------------------------------------
+Which NFL week is it, and which weeks are final? Answered offline, in
+microseconds, the same way by every entry point.
+
+  • Each scoring period (NFL week) is a window from its first kickoff to its
+    last. A week is final GAME_S after its last kickoff plus
+    GAZETTE_WEEK_FINAL_LAG_H hours (default 6) — Tuesday morning US time
+    after Monday night football — and never changes after that.
+  • The calendar comes from ESPN's pro schedule (one public request, no
+    league or cookies) cached in .cache/calendar/{year}.json. Without a
+    cached copy it is computed: week 1 kicks off the Thursday after Labor
+    Day, every week runs Thursday to Monday night, 18 weeks from 2021 on
+    (17 before). That is right for every regular season since 2000 except
+    for odd kickoffs, and errs towards "not final yet".
+  • Lookups never touch the network. Only ``python season_calendar.py
+    --refresh`` (or get_calendar(..., refresh=True)) fetches the schedule.
+
+This replaces the three ways the week used to be guessed: the calendar
+week-of-year in weekly_recap_multi, a hard-coded season start in
+run_gazette, and league.current_week in build_context.
+
+Usage:
+
+    resolve_week(2025)                  # latest final week (or 1 before week 1 is over)
+    resolve_week(2025, 7)               # an explicit week always wins
+    cal = get_calendar(2025)
+    cal.is_final(5), cal.current_week(), cal.final_at(5)
+
+    python season_calendar.py [--year 2025] [--refresh]
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_DIR = Path(os.getenv("GAZETTE_CALENDAR_CACHE", ".cache/calendar"))
+FINAL_LAG_S = float(os.getenv("GAZETTE_WEEK_FINAL_LAG_H", "6")) * 3600
+GAME_S = 4 * 3600  # kickoff to final whistle, overtime included
+
+SOURCE_ESPN = "espn"
+SOURCE_COMPUTED = "computed"
+
+# Computed windows, in UTC: Thursday night kickoff (8:15pm ET) to Monday night
+# kickoff (8:15pm ET in standard time, the later of the two)
+_FIRST_KICKOFF = timedelta(days=1, minutes=15)
+_LAST_KICKOFF = timedelta(days=5, hours=1, minutes=15)
+
+
+@dataclass
+class WeekWindow:
+    week: int
+    first_kickoff: float   # epoch seconds
+    last_kickoff: float
+
+    @property
+    def final_at(self) -> float:
+        return self.last_kickoff + GAME_S + FINAL_LAG_S
+
+
+@dataclass
+class SeasonCalendar:
+    year: int
+    weeks: List[WeekWindow] = field(default_factory=list)
+    source: str = SOURCE_COMPUTED
+    fetched_at: float = 0.0
+
+    def window(self, week: int) -> Optional[WeekWindow]:
+        for w in self.weeks:
+            if w.week == week:
+                return w
+        return None
+
+    def final_at(self, week: int) -> Optional[float]:
+        w = self.window(week)
+        return w.final_at if w else None
+
+    def is_final(self, week: int, now: Optional[float] = None) -> bool:
+        at = self.final_at(week)
+        return at is not None and (time.time() if now is None else now) >= at
+
+    def last_final_week(self, now: Optional[float] = None) -> int:
+        """The latest final week, 0 before week 1 is over."""
+        now = time.time() if now is None else now
+        return max((w.week for w in self.weeks if now >= w.final_at), default=0)
+
+    def current_week(self, now: Optional[float] = None) -> int:
+        """The week being played (or next up): the first one not yet final; the last week after the season."""
+        now = time.time() if now is None else now
+        for w in self.weeks:
+            if now < w.final_at:
+                return w.week
+        return self.weeks[-1].week if self.weeks else 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SeasonCalendar":
+        weeks = [WeekWindow(**w) for w in data.get("weeks", [])]
+        return cls(int(data["year"]), weeks, data.get("source", SOURCE_ESPN), float(data.get("fetched_at", 0.0)))
+
+
+# ==============
+# Building one
+# ==============
+def labor_day(year: int) -> date:
+    sep1 = date(year, 9, 1)
+    return sep1 + timedelta(days=(0 - sep1.weekday()) % 7)
+
+
+def season_weeks(year: int) -> int:
+    return 18 if year >= 2021 else 17
+
+
+def season_year(now: Optional[float] = None) -> int:
+    """The NFL season a moment belongs to: January and February close out last year's."""
+    today = datetime.fromtimestamp(time.time() if now is None else now, timezone.utc)
+    return today.year if today.month >= 3 else today.year - 1
+
+
+def computed_calendar(year: int) -> SeasonCalendar:
+    thursday = datetime.combine(labor_day(year) + timedelta(days=3), datetime.min.time(), timezone.utc)
+    weeks = []
+    for n in range(season_weeks(year)):
+        start = thursday + timedelta(weeks=n)
+        weeks.append(WeekWindow(n + 1, (start + _FIRST_KICKOFF).timestamp(), (start + _LAST_KICKOFF).timestamp()))
+    return SeasonCalendar(year, weeks, SOURCE_COMPUTED)
+
+
+def calendar_from_pro_schedule(year: int, data: Dict[str, Any]) -> SeasonCalendar:
+    """Week windows from ESPN's proTeamSchedules_wl view (game dates are epoch ms)."""
+    kickoffs: Dict[int, List[float]] = {}
+    for team in data.get("settings", {}).get("proTeams", []):
+        for period, games in (team.get("proGamesByScoringPeriod") or {}).items():
+            for game in games or []:
+                if game.get("date"):
+                    kickoffs.setdefault(int(period), []).append(game["date"] / 1000.0)
+    if not kickoffs:
+        raise ValueError(f"No pro games in the {year} schedule")
+    weeks = [WeekWindow(p, min(kickoffs[p]), max(kickoffs[p])) for p in sorted(kickoffs)]
+    return SeasonCalendar(year, weeks, SOURCE_ESPN, time.time())
+
+
+def fetch_calendar(year: int, espn_base: Optional[str] = None) -> SeasonCalendar:
+    """ONE request: the season's pro schedule (public, no league or cookies needed)."""
+    from espn_api.requests.espn_requests import EspnFantasyRequests
+    from league_snapshot import rebase
+
+    client = EspnFantasyRequests(sport="nfl", year=year, league_id=0)
+    if espn_base:
+        rebase(client, espn_base)
+    return calendar_from_pro_schedule(year, client.get_pro_schedule())
+
+
+# ============
+# Cache
+# ============
+_memo: Dict[Path, Tuple[float, SeasonCalendar]] = {}
+_memo_lock = threading.Lock()
+
+
+def calendar_path(year: int, cache_dir: Path = CALENDAR_DIR) -> Path:
+    return Path(cache_dir) / f"{int(year)}.json"
+
+
+def load_calendar(year: int, cache_dir: Path = CALENDAR_DIR) -> Optional[SeasonCalendar]:
+    path = calendar_path(year, cache_dir)
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    with _memo_lock:
+        hit = _memo.get(path)
+        if hit and hit[0] == mtime:
+            return hit[1]
+    try:
+        cal = SeasonCalendar.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable season calendar {path}: {e}")
+        return None
+    with _memo_lock:
+        _memo[path] = (mtime, cal)
+    return cal
+
+
+def save_calendar(cal: SeasonCalendar, cache_dir: Path = CALENDAR_DIR) -> Path:
+    path = calendar_path(cal.year, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cal.to_dict(), indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def get_calendar(
+    year: int,
+    refresh: bool = False,
+    cache_dir: Path = CALENDAR_DIR,
+    espn_base: Optional[str] = None,
+) -> SeasonCalendar:
+    """
+    The cached ESPN calendar, else the computed one — no network unless
+    ``refresh``. A failed refresh keeps whatever was there before.
+    """
+    if refresh:
+        try:
+            cal = fetch_calendar(year, espn_base)
+            save_calendar(cal, cache_dir)
+            return cal
+        except Exception as e:
+            logger.warning(f"Could not fetch the {year} pro schedule ({e}); using the cached/computed calendar")
+    return load_calendar(year, cache_dir) or computed_calendar(year)
+
+
+def resolve_week(year: Optional[int] = None, week: Optional[int] = None, now: Optional[float] = None) -> int:
+    """``week`` if given, else the latest final week of ``year`` (week 1 before it is over)."""
+    if week:
+        return int(week)
+    year = season_year(now) if year is None else int(year)
+    return max(1, get_calendar(year).last_final_week(now))
+
+
+# ===========
+# CLI
+# ===========
+def _fmt(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%a %b %d %H:%M UTC")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    p = argparse.ArgumentParser(description="Show (or refresh) the NFL season calendar used to pick weeks")
+    p.add_argument("--year", type=int, default=None, help="Season (default: the current one)")
+    p.add_argument("--refresh", action="store_true", help="Fetch the pro schedule from ESPN and cache it")
+    args = p.parse_args(argv)
+
+    year = args.year or season_year()
+    cal = get_calendar(year, refresh=args.refresh)
+    now = time.time()
+    print(f"{year} season ({cal.source}): current week {cal.current_week(now)}, "
+          f"latest final week {cal.last_final_week(now) or '—'}")
+    for w in cal.weeks:
+        state = "final" if now >= w.final_at else "open"
+        print(f"  W{w.week:02d}  {_fmt(w.first_kickoff)} → {_fmt(w.last_kickoff)}   {state} at {_fmt(w.final_at)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,12 +23,24 @@ Usage:
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Protocol, Any
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Any
 import json
+import os
 import re
+import threading
 import textwrap
+import time
 import logging
 
+from recap_grammar import render_blurb, render_recap
+
+# Optional local tokenizer for prompt budgeting
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 logger = logging.getLogger(__name__)
 
 # ============================
@@ -177,6 +189,7 @@ class PlayerStat:
     position: Optional[str] = None
     line: Optional[str] = None  # e.g., "8 rec, 124 yds, 2 TD"
     team: Optional[str] = None
+    points: Optional[float] = None
 
 @dataclass
 class MatchupData:
@@ -195,6 +208,8 @@ class MatchupData:
     bench_mistakes: List[str] = field(default_factory=list)
     winner: Optional[str] = None
     margin: Optional[float] = None
+    streak_a: Optional[int] = None  # +N = N-game win streak, -N = losing streak
+    streak_b: Optional[int] = None
 
 # ==========
 # LLM types
@@ -208,6 +223,16 @@ class LLM(Protocol):
         max_tokens: int = 800,
     ) -> str: ...
 
+class StreamingLLM(Protocol):
+    """Same arguments as ``LLM`` but yields text deltas as they arrive."""
+    def __call__(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.8,
+        top_p: float = 0.9,
+        max_tokens: int = 800,
+    ) -> Iterator[str]: ...
+
 # ===================
 # Utility helpers
 # ===================
@@ -240,10 +265,77 @@ def _append_signoff(text: str) -> str:
         text += f"\n\n{SABRE_SIGNOFF}"
     return text
 
-def _matchup_json(data: MatchupData) -> str:
-    safe = {
-        "league_name": data.league_name,
-        "week": data.week,
+MIN_RECAP_WORDS = 120
+
+def _bound_recap(text: str) -> str:
+    """Apply the recap paragraph/word bounds and sign-off."""
+    text = _ensure_paragraphs(text, target_paras=2)
+    text = _trim_to_words(text, min_words=200, max_words=250)
+    return _append_signoff(text)
+
+def _recap_within_bounds(text: str) -> bool:
+    """True when a draft can be shaped into a valid recap without regenerating."""
+    if _word_count(text) < MIN_RECAP_WORDS:
+        return False
+    paras = [p for p in re.split(r"\n{2,}", _ensure_paragraphs(text, target_paras=2)) if p.strip()]
+    return len(paras) >= 2
+
+def _parse_batch_recaps(raw: str, expected: int) -> List[Optional[str]]:
+    """
+    Parse a batch response into ``expected`` slots (None where missing/invalid).
+    Accepts a bare JSON array, {"recaps": [...]}, optional ```json fences, and
+    entries that are either strings or {"index": i, "recap": "..."} objects.
+    Indexed entries take their slot (the first one wins); entries without a
+    usable index fill the slots still free, in order, and never overwrite.
+    """
+    out: List[Optional[str]] = [None] * expected
+    text = (raw or "").strip()
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text)
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        start, end = text.find("["), text.rfind("]")
+        try:
+            parsed = json.loads(text[start:end + 1]) if start != -1 and end > start else None
+        except ValueError:
+            parsed = None
+    if isinstance(parsed, dict):
+        parsed = parsed.get("recaps")
+    if not isinstance(parsed, list):
+        logger.warning("Batch recap response was not a JSON array")
+        return out
+
+    unindexed: List[str] = []
+    for item in parsed:
+        idx, recap = None, item
+        if isinstance(item, dict):
+            idx, recap = item.get("index"), item.get("recap")
+        if not isinstance(recap, str) or not recap.strip():
+            continue
+        try:
+            idx = int(idx)
+        except (TypeError, ValueError):
+            unindexed.append(recap.strip())
+            continue
+        if 0 <= idx < expected and out[idx] is None:
+            out[idx] = recap.strip()
+    free = (i for i, slot in enumerate(out) if slot is None)
+    for recap, idx in zip(unindexed, free):
+        out[idx] = recap
+    return out
+
+def _compact(value: Any) -> Any:
+    """Recursively drop None / empty strings / empty containers."""
+    if isinstance(value, dict):
+        out = {k: _compact(v) for k, v in value.items()}
+        return {k: v for k, v in out.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        out = [_compact(v) for v in value]
+        return [v for v in out if v not in (None, "", [], {})]
+    return value
+
+def _matchup_facts(data: MatchupData, include_header: bool = True) -> Dict[str, Any]:
+    facts = {
         "teams": {"a": data.team_a, "b": data.team_b},
         "score": {"a": data.score_a, "b": data.score_b},
         "winner": data.winner,
@@ -254,8 +346,11 @@ def _matchup_json(data: MatchupData) -> str:
         "projection_swing": data.projection_swing,
         "injury_notes": data.injury_notes,
         "bench_mistakes": data.bench_mistakes,
+        "streaks": {"a": data.streak_a or None, "b": data.streak_b or None},
     }
-    return json.dumps(safe, ensure_ascii=False)
+    if include_header:
+        facts = {"league_name": data.league_name, "week": data.week, **facts}
+    return _compact(facts)
 
 # ==================
 # Message assembly
@@ -267,38 +362,342 @@ SYSTEM_BASE = (
     "Style: roast the play, not the person; absolutely hilarious, make readers laugh out loud, PG-13; mix real stats with jokes. "
 )
 
-STRUCTURE_RULES = (
+RECAP_RULES = (
     "Recaps must be 200–250 words in 2–3 paragraphs, 3–5 sentences each paragraph. "
     "Open with a one-liner hook; include at least one precise stat or factual detail, "
     "one metaphor/simile, one clean jab at a decision/play, and a clear outcome/implication. "
-    "Close with a kicker line. Short blurbs must be 1–2 sentences and 25–45 words."
+    "Close with a kicker line."
 )
 
-def _build_messages(task: str, data: MatchupData) -> List[Dict[str, str]]:
-    assert task in {"recap", "blurb"}
-    content = (
-        f"Task: Write a {task} for Week {data.week} in league '{data.league_name}'.\n"
-        f"Teams: {data.team_a} vs. {data.team_b}.\n"
-        f"JSON facts (ground truth; do not fabricate): {_matchup_json(data)}\n"
-        "Do not invent stats. If a stat is missing, be colorful without fabricating numbers.\n"
-        "Required: at least one concrete detail (stat line, swing, injury, or bench mistake).\n"
-    )
-    if task == "recap":
-        content += f"End with this exact sign-off on the final line: {SABRE_SIGNOFF}\n"
-    else:
-        content += "Produce 1–2 sentences (25–45 words). No sign-off for short blurbs.\n"
+BLURB_RULES = "Short blurbs must be 1–2 sentences and 25–45 words."
 
-    return [
-        {"role": "system", "content": SYSTEM_BASE + " " + STRUCTURE_RULES},
-        {"role": "user", "content": content},
-    ]
+FACT_RULES = (
+    "Each request gives JSON facts (ground truth; do not fabricate). Missing fields are unknown. "
+    "Do not invent stats. If a stat is missing, be colorful without fabricating numbers. "
+    "Required: at least one concrete detail (stat line, swing, injury, or bench mistake)."
+)
+
+# Per-request budget (system + user) for the compiled prompt
+DEFAULT_PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "700"))
+
+# Cap on "avoid these phrases" hints sent with a variety re-roll
+MAX_AVOID_PHRASES = 12
+
+# Lists trimmed (in this order) when a prompt runs over budget
+_TRIMMABLE_FIELDS = ("big_plays", "injury_notes", "bench_mistakes", "top_performers")
+
+@lru_cache(maxsize=4)
+def _tiktoken_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.debug(f"tiktoken unavailable offline, using estimate: {e}")
+            return None
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Token count with a local tokenizer (tiktoken when installed).
+    Falls back to a word/punctuation estimate, which runs slightly high for English.
+    """
+    if not text:
+        return 0
+    enc = _tiktoken_encoding(model or os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
+    if enc is not None:
+        return len(enc.encode(text))
+    return max(len(text) // 4, len(re.findall(r"\w+|[^\w\s]", text)))
+
+def count_message_tokens(messages: List[Dict[str, str]], model: Optional[str] = None) -> int:
+    # ~4 tokens of chat framing per message
+    return sum(count_tokens(m.get("content", ""), model) + 4 for m in messages)
+
+class PromptCompiler:
+    """
+    Compiles the per-matchup chat messages for a gazette.
+
+    • The system message (persona + rules + league/week) is built once per
+      (task, league, week) and reused verbatim, so every request in a week shares
+      an identical prefix that providers can cache.
+    • The user message carries only the compact matchup facts.
+    • Each request is held to ``token_budget``; over-budget facts are trimmed.
+    • ``report()`` totals prompt tokens for the gazette.
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET, model: Optional[str] = None):
+        self.token_budget = token_budget
+        self.model = model
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.trimmed_requests = 0
+        self.over_budget_requests = 0
+        self._system_cache: Dict[tuple, Dict[str, str]] = {}
+        self._lock = threading.Lock()  # recaps compile on the scheduler's worker threads
+
+    def system_message(self, task: str, league_name: str, week: int) -> Dict[str, str]:
+        key = (task, league_name, week)
+        cached = self._system_cache.get(key)
+        if cached is None:
+            rules = RECAP_RULES if task == "recap" else BLURB_RULES
+            content = f"{SYSTEM_BASE}{rules} {FACT_RULES} League: '{league_name}', Week {week}."
+            if task == "recap":
+                content += f" End with this exact sign-off on the final line: {SABRE_SIGNOFF}"
+            else:
+                content += " No sign-off for short blurbs."
+            cached = {"role": "system", "content": content}
+            self._system_cache[key] = cached
+        return cached
+
+    def compile(
+        self,
+        task: str,
+        data: MatchupData,
+        avoid_phrases: Optional[List[str]] = None,
+    ) -> List[Dict[str, str]]:
+        assert task in {"recap", "blurb"}
+        system = self.system_message(task, data.league_name, data.week)
+        facts = _matchup_facts(data, include_header=False)
+        avoid = list(avoid_phrases or [])[:MAX_AVOID_PHRASES]
+
+        messages = self._messages(task, system, facts, avoid)
+        tokens = count_message_tokens(messages, self.model)
+        trimmed = over_budget = False
+        if tokens > self.token_budget:
+            trimmed = True
+            for name in _TRIMMABLE_FIELDS:
+                while tokens > self.token_budget and facts.get(name):
+                    facts[name] = facts[name][:-1]
+                    if not facts[name]:
+                        del facts[name]
+                    messages = self._messages(task, system, facts, avoid)
+                    tokens = count_message_tokens(messages, self.model)
+            if tokens > self.token_budget:
+                over_budget = True
+                logger.warning(
+                    f"Prompt for {data.team_a} vs {data.team_b} is {tokens} tokens "
+                    f"(budget {self.token_budget}) after trimming"
+                )
+
+        self._count(tokens, trimmed, over_budget)
+        return messages
+
+    def compile_batch(self, task: str, matchups: List[MatchupData]) -> List[Dict[str, str]]:
+        """One request covering a whole week; the model answers with a JSON array."""
+        assert task == "recap" and matchups
+        first = matchups[0]
+        system = self.system_message(task, first.league_name, first.week)
+        items = [{"index": i, **_matchup_facts(d, include_header=False)} for i, d in enumerate(matchups)]
+        user = (
+            f"Write one recap per matchup ({len(items)} total). Reply with ONLY a JSON array of "
+            '{"index": <matchup index>, "recap": "<recap text, paragraphs separated by \\n\\n>"} objects, '
+            "one per matchup, same indexes. Vary metaphors across recaps. Matchups: "
+            + json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+        )
+        messages = [system, {"role": "user", "content": user}]
+        tokens = count_message_tokens(messages, self.model)
+        over_budget = tokens > self.token_budget * len(matchups)
+        if over_budget:
+            logger.warning(f"Batch prompt is {tokens} tokens (budget {self.token_budget * len(matchups)})")
+        self._count(tokens, False, over_budget)
+        return messages
+
+    def _count(self, tokens: int, trimmed: bool, over_budget: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += tokens
+            self.trimmed_requests += int(trimmed)
+            self.over_budget_requests += int(over_budget)
+
+    @staticmethod
+    def _messages(
+        task: str,
+        system: Dict[str, str],
+        facts: Dict[str, Any],
+        avoid: Optional[List[str]] = None,
+    ) -> List[Dict[str, str]]:
+        user = f"Write a {task}. Facts: " + json.dumps(facts, ensure_ascii=False, separators=(",", ":"))
+        if avoid:
+            user += "\nAlready used in past issues; do NOT reuse these phrases or their metaphors: " + "; ".join(avoid)
+        return [system, {"role": "user", "content": user}]
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            requests, prompt_tokens = self.requests, self.prompt_tokens
+            trimmed, over_budget = self.trimmed_requests, self.over_budget_requests
+        return {
+            "requests": requests,
+            "prompt_tokens": prompt_tokens,
+            "avg_prompt_tokens": round(prompt_tokens / requests, 1) if requests else 0.0,
+            "token_budget": self.token_budget,
+            "trimmed_requests": trimmed,
+            "over_budget_requests": over_budget,
+            "tokenizer": "tiktoken" if _tiktoken_encoding(self.model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")) else "estimate",
+        }
+
+def _build_messages(task: str, data: MatchupData, compiler: Optional[PromptCompiler] = None) -> List[Dict[str, str]]:
+    return (compiler or PromptCompiler()).compile(task, data)
+
+# ==================
+# Streaming recaps
+# ==================
+@dataclass
+class StreamMetrics:
+    time_to_first_token_s: Optional[float] = None
+    total_s: float = 0.0
+    tokens_received: int = 0
+    tokens_kept: int = 0
+    stopped_early: bool = False
+
+    @property
+    def tokens_discarded(self) -> int:
+        return max(0, self.tokens_received - self.tokens_kept)
+
+class IncrementalMarkdownCleaner:
+    """
+    Runs ``clean_markdown_for_docx`` on a token stream one completed line at a
+    time, so markdown that spans chunk boundaries is still cleaned correctly.
+    Words and paragraphs are counted as deltas arrive, each delta looked at
+    once, so checking the recap bounds after every delta stays linear.
+    """
+
+    def __init__(self) -> None:
+        self._pending: List[str] = []   # the line being streamed, in pieces
+        self._open_word = ""            # a word that may still continue
+        self.lines: List[str] = []
+        self.words = 0                  # completed words, as _word_count counts them
+        self.paragraphs = 0             # paragraphs with at least one completed line
+        self.partial_has_text = False
+
+    def feed(self, delta: str) -> None:
+        text = self._open_word + delta
+        words = text.split()
+        self._open_word = words.pop() if words and not text[-1].isspace() else ""
+        self.words += sum(_word_count(w) for w in words)
+
+        if "\n" not in delta:
+            self._pending.append(delta)
+            self.partial_has_text = self.partial_has_text or bool(delta.strip())
+            return
+        head, *rest = delta.split("\n")
+        done = ["".join(self._pending) + head, *rest[:-1]]
+        self._pending = [rest[-1]]
+        self.partial_has_text = bool(rest[-1].strip())
+        for line in done:
+            cleaned = clean_markdown_for_docx(line)
+            if cleaned.strip() and not (self.lines and self.lines[-1].strip()):
+                self.paragraphs += 1
+            self.lines.append(cleaned)
+
+    @property
+    def partial(self) -> str:
+        return "".join(self._pending)
+
+    def text(self, include_partial: bool = True) -> str:
+        partial = self.partial
+        lines = self.lines + ([clean_markdown_for_docx(partial)] if include_partial and partial else [])
+        return "\n".join(lines).strip()
+
+def stream_recap_draft(
+    chunks: Iterable[str],
+    min_words: int = 200,
+    max_words: int = 250,
+    max_paras: int = 3,
+    model: Optional[str] = None,
+) -> "tuple[str, StreamMetrics]":
+    """
+    Consume a streamed completion, stopping as soon as the recap bounds are met:
+      • the word limit is reached (its last word complete),
+      • Sabre's sign-off starts (we append it ourselves), or
+      • a paragraph beyond ``max_paras`` begins once ``min_words`` are in.
+    The source iterator is closed on early stop so the provider stops generating.
+    """
+    metrics = StreamMetrics()
+    cleaner = IncrementalMarkdownCleaner()
+    received: List[str] = []
+    signoff_head = SABRE_SIGNOFF[:6]  # "—Sabre"
+    tail = ""  # end of the previous delta, so a sign-off split across deltas is seen
+    stop = None
+    start = time.perf_counter()
+    iterator = iter(chunks)
+    try:
+        for delta in iterator:
+            if metrics.time_to_first_token_s is None:
+                metrics.time_to_first_token_s = time.perf_counter() - start
+            received.append(delta)
+            cleaner.feed(delta)
+
+            seen = tail + delta
+            tail = seen[-(len(signoff_head) - 1):]
+            if signoff_head in seen:
+                stop = "signoff"
+            elif cleaner.words >= max_words:
+                stop = "words"
+            elif cleaner.paragraphs >= max_paras and cleaner.partial_has_text and cleaner.words >= min_words:
+                stop = "paragraphs"
+            if stop:
+                metrics.stopped_early = True
+                break
+    finally:
+        close = getattr(iterator, "close", None)
+        if metrics.stopped_early and callable(close):
+            close()
+
+    text = cleaner.text()
+    if signoff_head in text:
+        text = text[:text.index(signoff_head)].rstrip()
+    if stop == "paragraphs":
+        # Drop the partial extra paragraph that tripped the paragraph bound
+        paras = [p for p in re.split(r"\n{2,}", text) if p.strip()]
+        text = "\n\n".join(paras[:max_paras])
+    words = list(re.finditer(r"\S+", text))
+    if words and (len(words) > max_words or stop == "words"):
+        # Cut in place (unlike _trim_to_words) so paragraph breaks survive
+        text = re.sub(r"[\s,;:]+$", "", text[:words[min(len(words), max_words) - 1].end()]) + "."
+        text = re.sub(r"([.!?])\.$", r"\1", text)
+
+    metrics.total_s = time.perf_counter() - start
+    metrics.tokens_received = count_tokens("".join(received), model)
+    metrics.tokens_kept = min(metrics.tokens_received, count_tokens(text, model))
+    return text, metrics
+
+def summarize_stream_metrics(items: List[StreamMetrics]) -> Dict[str, Any]:
+    ttfts = [m.time_to_first_token_s for m in items if m.time_to_first_token_s is not None]
+    return {
+        "streams": len(items),
+        "avg_ttft_s": round(sum(ttfts) / len(ttfts), 3) if ttfts else None,
+        "max_ttft_s": round(max(ttfts), 3) if ttfts else None,
+        "tokens_received": sum(m.tokens_received for m in items),
+        "tokens_discarded": sum(m.tokens_discarded for m in items),
+        "stopped_early": sum(1 for m in items if m.stopped_early),
+    }
 
 # ==================
 # Main generator API
 # ==================
 class StoryMaker:
-    def __init__(self, llm: Optional[LLM] = None):
+    def __init__(
+        self,
+        llm: Optional[LLM] = None,
+        compiler: Optional[PromptCompiler] = None,
+        stream_llm: Optional[StreamingLLM] = None,
+        deadline: Optional[float] = None,
+    ):
         self.llm = llm
+        self.compiler = compiler or PromptCompiler()
+        # When set, recaps stream and stop at the word/paragraph limit
+        self.stream_llm = stream_llm
+        self.stream_metrics: List[StreamMetrics] = []
+        self._lock = threading.Lock()  # generate_recap runs on the scheduler's worker threads
+        # time.perf_counter() value after which no new LLM call starts (the recap stage's deadline);
+        # a call abandoned by a timeout then can't go on to batch fallbacks or re-rolls
+        self.deadline = deadline
+
+    def _check_deadline(self) -> None:
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise TimeoutError("recap stage deadline passed; not starting another LLM call")
 
     def generate_recap(
         self,
@@ -308,23 +707,34 @@ class StoryMaker:
         max_tokens: int = 900,
         enforce_bounds: bool = True,
         clean_markdown: bool = True,  # NEW: Auto-clean markdown
+        avoid_phrases: Optional[List[str]] = None,
     ) -> str:
         """
         Create a Sabre recap (200–250 words, 2–3 paragraphs) with sign-off.
         Automatically cleans markdown formatting for DOCX output.
+        ``avoid_phrases`` asks the model to steer clear of recycled wording.
         """
         if self.llm is None:
             recap = self._template_recap(data)
         else:
-            messages = _build_messages("recap", data)
-            draft = (self.llm(messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens) or "").strip()
+            messages = self.compiler.compile("recap", data, avoid_phrases=avoid_phrases)
+            self._check_deadline()
+            if self.stream_llm is not None:
+                chunks = self.stream_llm(messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens)
+                draft, metrics = stream_recap_draft(chunks, model=self.compiler.model)
+                with self._lock:
+                    self.stream_metrics.append(metrics)
+                logger.debug(
+                    f"Streamed recap {data.team_a} vs {data.team_b}: ttft={metrics.time_to_first_token_s}, "
+                    f"discarded={metrics.tokens_discarded} tokens"
+                )
+            else:
+                draft = (self.llm(messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens) or "").strip()
             
             if enforce_bounds:
-                if _word_count(draft) < 120:
+                if _word_count(draft) < MIN_RECAP_WORDS:
                     draft = self._template_recap(data)
-                draft = _ensure_paragraphs(draft, target_paras=2)
-                draft = _trim_to_words(draft, min_words=200, max_words=250)
-                draft = _append_signoff(draft)
+                draft = _bound_recap(draft)
             
             recap = draft
         
@@ -335,6 +745,95 @@ class StoryMaker:
         
         return recap
 
+    def generate_recaps_batch(
+        self,
+        matchups: List[MatchupData],
+        temperature: float = 0.9,
+        top_p: float = 0.9,
+        max_tokens_per_recap: int = 450,
+        clean_markdown: bool = True,
+    ) -> List[str]:
+        """
+        Weekly batch mode: ONE request for all of a week's matchups.
+
+        The model returns a JSON array of recaps. Each entry is validated against
+        the same word/paragraph bounds as single recaps; only entries that fail
+        (missing, too short, unparsable) are regenerated with per-matchup calls.
+        Returns recaps in the same order as ``matchups``.
+        """
+        if not matchups:
+            return []
+        if self.llm is None or len(matchups) == 1:
+            return [self.generate_recap(d, temperature=temperature, top_p=top_p, clean_markdown=clean_markdown)
+                    for d in matchups]
+
+        messages = self.compiler.compile_batch("recap", matchups)
+        self._check_deadline()
+        try:
+            raw = self.llm(
+                messages, temperature=temperature, top_p=top_p,
+                max_tokens=max_tokens_per_recap * len(matchups),
+            ) or ""
+        except Exception as e:
+            logger.warning(f"Batch recap request failed ({e}); falling back to per-matchup calls")
+            raw = ""
+
+        drafts = _parse_batch_recaps(raw, len(matchups))
+        recaps: List[str] = []
+        fallbacks = 0
+        for data, draft in zip(matchups, drafts):
+            if draft is not None and _recap_within_bounds(draft):
+                recap = _bound_recap(draft)
+                if clean_markdown:
+                    recap = clean_markdown_for_docx(recap)
+            else:
+                fallbacks += 1
+                logger.info(f"Batch recap for {data.team_a} vs {data.team_b} failed validation; regenerating")
+                recap = self.generate_recap(data, temperature=temperature, top_p=top_p, clean_markdown=clean_markdown)
+            recaps.append(recap)
+
+        logger.info(f"Batch recaps: {len(matchups) - fallbacks}/{len(matchups)} from one request, "
+                    f"{fallbacks} per-matchup fallbacks")
+        return recaps
+
+    def ensure_variety(
+        self,
+        data: MatchupData,
+        recap: str,
+        index: Any,
+        max_rerolls: int = 2,
+        temperature: float = 0.95,
+        exclude: Optional[str] = None,
+    ) -> str:
+        """
+        Check a finished recap against the league's past-recap index
+        (recap_variety.RecapIndex). Near-duplicates are re-rolled with targeted
+        "avoid these phrases" hints; the least repetitive attempt wins.
+        Only this matchup is regenerated, never the whole week. ``exclude`` is
+        the index record this recap replaces on a re-run.
+        """
+        ignore = [data.team_a, data.team_b, data.league_name]
+        report = index.check(recap, ignore=ignore, exclude=exclude)
+        if not report.needs_reroll or self.llm is None:
+            return recap
+
+        best, best_report = recap, report
+        avoid = list(report.repeated_phrases)
+        for attempt in range(1, max_rerolls + 1):
+            logger.info(
+                f"Variety re-roll {attempt} for {data.team_a} vs {data.team_b}: "
+                f"similarity {best_report.max_similarity:.2f}, {len(best_report.repeated_phrases)} repeated phrases"
+            )
+            candidate = self.generate_recap(data, temperature=temperature, avoid_phrases=avoid)
+            cand_report = index.check(candidate, ignore=ignore, exclude=exclude)
+            if (cand_report.max_similarity, len(cand_report.repeated_phrases)) < \
+                    (best_report.max_similarity, len(best_report.repeated_phrases)):
+                best, best_report = candidate, cand_report
+            if not cand_report.needs_reroll:
+                break
+            avoid = list(dict.fromkeys(avoid + cand_report.repeated_phrases))
+        return best
+
     def generate_blurb(
         self,
         data: MatchupData,
@@ -351,7 +850,8 @@ class StoryMaker:
         if self.llm is None:
             blurb = self._template_blurb(data)
         else:
-            messages = _build_messages("blurb", data)
+            messages = self.compiler.compile("blurb", data)
+            self._check_deadline()
             draft = (self.llm(messages, temperature=temperature, top_p=top_p, max_tokens=max_tokens) or "").strip()
             
             if enforce_bounds:
@@ -371,45 +871,18 @@ class StoryMaker:
         return blurb
 
     # ---------- Fallback templates (no-LLM mode) ----------
+    def fallback_recap(self, data: MatchupData, clean_markdown: bool = True) -> str:
+        """The deterministic template recap, as generate_recap would return it."""
+        recap = self._template_recap(data)
+        return clean_markdown_for_docx(recap) if clean_markdown else recap
+
     def _template_recap(self, d: MatchupData) -> str:
-        """Fallback template when no LLM is available."""
-        hook = f"This one played less like chess and more like bumper cars—{d.team_a} and {d.team_b} turned chaos into content."
-        facts = []
-        if d.score_a is not None and d.score_b is not None:
-            facts.append(f"Final: {d.team_a} {d.score_a:.1f} — {d.team_b} {d.score_b:.1f}.")
-        if d.winner and d.margin is not None:
-            facts.append(f"{d.winner} took it by {d.margin:.1f}.")
-        if d.projection_swing:
-            facts.append(f"Projection swing: {d.projection_swing:+.1f}.")
-        if d.turnovers_a is not None:
-            facts.append(f"{d.team_a} turnovers: {d.turnovers_a}.")
-        if d.turnovers_b is not None:
-            facts.append(f"{d.team_b} turnovers: {d.turnovers_b}.")
-        if d.big_plays:
-            facts.append("Big plays: " + "; ".join(d.big_plays) + ".")
-        if d.injury_notes:
-            facts.append("Injuries: " + "; ".join(d.injury_notes) + ".")
-        if d.bench_mistakes:
-            facts.append("Bench blunders: " + "; ".join(d.bench_mistakes) + ".")
-        if d.top_performers:
-            tp = ", ".join(f"{p.name} {('(' + p.position + ') ') if p.position else ''}{p.line or ''}".strip() for p in d.top_performers)
-            facts.append("Top performers: " + tp + ".")
-
-        mid1 = " ".join(facts[:max(1, len(facts)//2)]) or f"{d.team_a} found bursts, {d.team_b} found answers—nobody found brakes."
-        mid2 = " ".join(facts[max(1, len(facts)//2):]) or "Both sidelines made choices that aged like milk, but the winners cashed in when it counted."
-        kicker = "Call it chaos football—hilarious for neutrals, nerve-wracking for fans."
-
-        body = f"{hook} {mid1}\n\n{mid2} {kicker}"
-        body = _trim_to_words(body, min_words=200, max_words=250)
-        body = _append_signoff(body)
-        return body
+        """Fallback template when no LLM is available (compiled phrase grammar, seeded per matchup)."""
+        return _append_signoff(render_recap(d))
 
     def _template_blurb(self, d: MatchupData) -> str:
         """Fallback template for short blurbs when no LLM is available."""
-        core = f"{d.team_a} vs. {d.team_b}: a yo-yo of momentum and questionable decisions."
-        if d.winner:
-            core += f" {d.winner} escapes with the W; film rooms get busy tomorrow."
-        return _trim_to_words(core, min_words=25, max_words=45)
+        return render_blurb(d)
 
 # ==================
 # Testing utilities
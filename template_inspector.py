@@ -2,52 +2,24 @@
 """
 Template Variable Inspector - Extracts variable names from docx template
 """
-import zipfile
-import xml.etree.ElementTree as ET
-import re
 from pathlib import Path
 
+from template_schema import load_schema
+
 def extract_template_variables(template_path: str):
-    """Extract all Jinja2/docxtpl variables from a .docx template"""
+    """Extract all Jinja2/docxtpl variables from a .docx template (every word/ part, via template_schema)"""
     
     if not Path(template_path).exists():
         print(f"❌ Template not found: {template_path}")
         return []
     
-    variables = set()
-    
     try:
-        with zipfile.ZipFile(template_path, 'r') as docx:
-            # Check document.xml for main content variables
-            if 'word/document.xml' in docx.namelist():
-                with docx.open('word/document.xml') as f:
-                    content = f.read().decode('utf-8')
-                    
-                    # Find all Jinja2 variables {{ variable_name }}
-                    jinja_vars = re.findall(r'\{\{\s*([^}]+)\s*\}\}', content)
-                    for var in jinja_vars:
-                        var = var.strip()
-                        # Clean up any filters or expressions  
-                        var = var.split('|')[0].split('.')[0].strip()
-                        if var and not var.startswith('_'):
-                            variables.add(var)
-            
-            # Check headers/footers
-            for part in ['word/header1.xml', 'word/header2.xml', 'word/footer1.xml', 'word/footer2.xml']:
-                if part in docx.namelist():
-                    with docx.open(part) as f:
-                        content = f.read().decode('utf-8')
-                        jinja_vars = re.findall(r'\{\{\s*([^}]+)\s*\}\}', content)
-                        for var in jinja_vars:
-                            var = var.strip().split('|')[0].split('.')[0].strip()
-                            if var and not var.startswith('_'):
-                                variables.add(var)
-    
+        schema = load_schema(template_path)
     except Exception as e:
         print(f"❌ Error reading template: {e}")
         return []
     
-    return sorted(list(variables))
+    return [name for name in schema.names if not name.startswith('_')]
 
 def analyze_variables(variables):
     """Analyze and categorize the template variables"""
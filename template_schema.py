@@ -0,0 +1,383 @@
+"""
+template_schema.py — Gridiron Gazette
+-------------------------------------
+Placeholder schemas for the recap templates, and a context check before rendering.
+
+A template is compiled ONCE into a typed schema: every placeholder it uses,
+whether it is an image or text, and whether the template can live without it:
+
+  • recap_template.html — parsed with Jinja's own AST (not regexes). A name
+    only used under {% if NAME %} is needed only once NAME is set (MATCHUP1_HS
+    inside {% if MATCHUP1_HOME %}); under |default, else or an expression it
+    is optional; a name rendered into <img src="..."> is an image.
+  • .docx/.dotx — EVERY word/ part (document, all headers and footers,
+    footnotes, ...), with tags Word split across runs merged the way
+    docx_template/docxtpl see them. *_LOGO placeholders are images.
+  • MATCHUPn_* placeholders are only required for n <= MATCHUP_COUNT.
+
+Schemas are cached in memory and as JSON under .cache/schemas by template
+hash. validate_context() compares a render context with a schema and reports
+missing keys, near-miss spellings (MATCHUP1_BLRUB -> MATCHUP1_BLURB) and
+values of the wrong type (a list in a text slot, a logo path that doesn't
+exist). check_context() raises TemplateContextError on anything fatal, so a
+bad context fails in milliseconds instead of after a full PDF/DOCX render.
+
+GAZETTE_CONTEXT_CHECK=strict (default) | warn | off
+
+Usage:
+
+    schema = load_schema("templates/recap_template.html")
+    report = validate_context(schema, ctx)
+    check_context("GridironGazette.dotx", docx_ctx)     # raises TemplateContextError
+
+    python template_schema.py templates/recap_template.html GridironGazette.dotx [--context recaps/x.debug.json]
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_DIR = Path(os.getenv("GAZETTE_SCHEMA_CACHE", ".cache/schemas"))
+SCHEMA_VERSION = 1  # bump when extraction rules change
+CHECK_MODE = os.getenv("GAZETTE_CONTEXT_CHECK", "strict").lower()
+
+TEXT, IMAGE = "text", "image"
+_MATCHUP_RE = re.compile(r"^MATCHUP(\d+)_")
+_IMG_SRC_RE = re.compile(r"""src\s*=\s*["']?$""", re.IGNORECASE)
+_DOCXTPL_TAG_RE = re.compile(r"\{%(?:p|tr|tc|r)\s")   # docxtpl's paragraph/row/cell/run tags
+_SCALARS = (str, int, float, bool)
+
+
+class TemplateContextError(ValueError):
+    """The render context is missing (or misspells) keys the template needs."""
+
+
+@dataclass
+class Placeholder:
+    name: str
+    kind: str = TEXT            # text | image
+    required: bool = True       # False when the template guards it ({% if %}, |default)
+    matchup: int = 0            # n for MATCHUPn_* placeholders
+    when: List[str] = field(default_factory=list)   # optional, but needed once these keys are set
+    parts: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TemplateSchema:
+    template: str
+    sha1: str
+    placeholders: Dict[str, Placeholder] = field(default_factory=dict)
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self.placeholders)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": SCHEMA_VERSION, "template": self.template, "sha1": self.sha1,
+                "placeholders": [asdict(p) for p in self.placeholders.values()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TemplateSchema":
+        if data.get("version") != SCHEMA_VERSION:
+            raise ValueError(f"schema version {data.get('version')} != {SCHEMA_VERSION}")
+        return cls(data["template"], data["sha1"], {p["name"]: Placeholder(**p) for p in data["placeholders"]})
+
+
+@dataclass
+class ContextReport:
+    template: str
+    missing: List[str] = field(default_factory=list)
+    misspelled: Dict[str, str] = field(default_factory=dict)   # context key -> placeholder it probably meant
+    type_errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.misspelled or self.type_errors)
+
+    def summary(self) -> str:
+        name = Path(self.template).name
+        if self.ok:
+            return f"{name}: context OK" + (f" ({len(self.warnings)} warning(s))" if self.warnings else "")
+        problems = []
+        if self.missing:
+            problems.append("missing " + ", ".join(self.missing))
+        if self.misspelled:
+            problems.append("misspelled " + ", ".join(f"{k} (did you mean {v}?)" for k, v in self.misspelled.items()))
+        problems.extend(self.type_errors)
+        return f"{name}: " + "; ".join(problems)
+
+
+# ==========
+# Extraction
+# ==========
+def _matchup_index(name: str) -> int:
+    m = _MATCHUP_RE.match(name)
+    return int(m.group(1)) if m else 0
+
+
+class _Collector:
+    """
+    Walks a Jinja AST recording each variable, whether it lands in an <img src>
+    and which {% if NAME %} tests guard each use: () = unguarded, None = guarded
+    by something the schema can't evaluate (else branches, expressions, |default).
+    """
+
+    def __init__(self, part: str):
+        self.part = part
+        self.uses: Dict[str, List[Optional[Tuple[str, ...]]]] = {}
+        self.images: set = set()
+        self.stored: set = set()
+
+    def visit(self, node: Any, guards: Optional[Tuple[str, ...]] = ()) -> None:
+        from jinja2 import nodes
+
+        if isinstance(node, nodes.Name):
+            if node.ctx == "load":
+                self.uses.setdefault(node.name, []).append(guards)
+            else:
+                self.stored.add(node.name)
+            return
+        if isinstance(node, nodes.If):
+            test = node.test.name if isinstance(node.test, nodes.Name) else None
+            self.visit(node.test, None)
+            inner = guards + (test,) if guards is not None and test else None
+            for child in node.body:
+                self.visit(child, inner)
+            for child in [*node.elif_, *node.else_]:
+                self.visit(child, None)
+            return
+        if isinstance(node, nodes.Filter) and node.name in ("default", "d"):
+            for child in node.iter_child_nodes():
+                self.visit(child, None)
+            return
+        if isinstance(node, nodes.CondExpr):
+            for child in node.iter_child_nodes():
+                self.visit(child, None)
+            return
+        if isinstance(node, nodes.Output):
+            prev = ""
+            for child in node.nodes:
+                if isinstance(child, nodes.TemplateData):
+                    prev = child.data
+                    continue
+                if isinstance(child, nodes.Name) and _IMG_SRC_RE.search(prev):
+                    self.images.add(child.name)
+                self.visit(child, guards)
+                prev = ""
+            return
+        for child in node.iter_child_nodes():
+            self.visit(child, guards)
+
+
+def _collect(source: str, part: str) -> _Collector:
+    from jinja2 import Environment
+
+    collector = _Collector(part)
+    collector.visit(Environment().parse(source))
+    return collector
+
+
+def _merge(schema: TemplateSchema, found: _Collector, image_names: bool) -> None:
+    for name, uses in sorted(found.uses.items()):
+        if name in found.stored:
+            continue   # {% set %} / loop variable, not a context key
+        p = schema.placeholders.get(name)
+        if p is None:
+            p = schema.placeholders[name] = Placeholder(name, required=False, matchup=_matchup_index(name))
+        for guards in uses:
+            if guards == ():
+                p.required, p.when = True, []
+            elif guards and name not in guards and not p.required and (not p.when or len(guards) < len(p.when)):
+                p.when = list(guards)
+        if name in found.images or (image_names and name.endswith("_LOGO")):
+            p.kind = IMAGE
+        if found.part not in p.parts:
+            p.parts.append(found.part)
+
+
+def _docx_part_text(xml: bytes) -> str:
+    from docx_template import _XML_TAG_RE
+
+    # Only text runs matter: dropping the markup merges tags Word split across runs
+    text = _XML_TAG_RE.sub(b"", xml).decode("utf-8", errors="replace")
+    return _DOCXTPL_TAG_RE.sub("{% ", text)
+
+
+def compile_schema(path: str) -> TemplateSchema:
+    """Extract the placeholder schema of an HTML (Jinja) or DOCX/DOTX template."""
+    from jinja2 import TemplateSyntaxError
+
+    src = Path(path)
+    data = src.read_bytes()
+    schema = TemplateSchema(template=str(src), sha1=hashlib.sha1(data).hexdigest())
+    if src.suffix.lower() in (".docx", ".dotx", ".docm"):
+        from docx_template import _TAG_RE, _XML_TAG_RE
+
+        with zipfile.ZipFile(src) as zf:
+            for name in zf.namelist():
+                if not (name.startswith("word/") and name.endswith(".xml")):
+                    continue
+                xml = zf.read(name)
+                if b"{{" not in xml and b"{%" not in xml:
+                    continue
+                try:
+                    found = _collect(_docx_part_text(xml), name)
+                except TemplateSyntaxError as e:
+                    # Not valid Jinja once flattened: fall back to the plain {{ NAME }} tags
+                    logger.debug(f"{src.name}:{name}: {e}; using plain tag scan")
+                    found = _Collector(name)
+                    for m in _TAG_RE.finditer(xml):
+                        tag = _XML_TAG_RE.sub(b"", m.group(0))[2:-2].decode("utf-8").split("|")[0].strip()
+                        if tag.isidentifier():
+                            found.uses.setdefault(tag, []).append(())
+                _merge(schema, found, image_names=True)
+    else:
+        _merge(schema, _collect(data.decode("utf-8"), src.name), image_names=False)
+    logger.debug(f"Schema {src.name}: {len(schema.placeholders)} placeholder(s), "
+                 f"{sum(p.required for p in schema.placeholders.values())} required")
+    return schema
+
+
+_MEMORY: Dict[Tuple[str, int, int], TemplateSchema] = {}
+_LOCK = threading.Lock()
+
+
+def load_schema(path: str, cache_dir: Path = SCHEMA_CACHE_DIR) -> TemplateSchema:
+    """Schema for ``path``: from memory, else the on-disk cache, else compiled now."""
+    src = Path(path)
+    if not src.exists():
+        raise FileNotFoundError(f"Template not found: {src.resolve()}")
+    st = src.stat()
+    key = (str(src.resolve()), st.st_mtime_ns, st.st_size)
+    with _LOCK:
+        if key in _MEMORY:
+            return _MEMORY[key]
+        sha1 = hashlib.sha1(src.read_bytes()).hexdigest()
+        cached = Path(cache_dir) / f"{src.stem}{src.suffix.replace('.', '-')}-{sha1[:16]}-v{SCHEMA_VERSION}.json"
+        schema = None
+        if cached.exists():
+            try:
+                schema = TemplateSchema.from_dict(json.loads(cached.read_text(encoding="utf-8")))
+            except Exception as e:
+                logger.debug(f"Ignoring unreadable schema {cached}: {e}")
+        if schema is None:
+            schema = compile_schema(str(src))
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(schema.to_dict(), indent=1), encoding="utf-8")
+                os.replace(tmp, cached)
+            except OSError as e:
+                logger.debug(f"Could not cache schema: {e}")
+        _MEMORY[key] = schema
+        return schema
+
+
+# ==========
+# Validation
+# ==========
+def _matchup_count(ctx: Dict[str, Any]) -> int:
+    if ctx.get("MATCHUP_COUNT") not in (None, ""):
+        return int(ctx["MATCHUP_COUNT"])
+    return max((_matchup_index(k) for k in ctx), default=0)
+
+
+def _near_miss(key: str, name: str) -> bool:
+    if key.lower() == name.lower():
+        return True
+    if _matchup_index(key) != _matchup_index(name) or abs(len(key) - len(name)) > 2:
+        return False
+    return SequenceMatcher(None, key, name).ratio() >= 0.88
+
+
+def _image_ok(value: Any) -> bool:
+    if not isinstance(value, str):
+        return True   # DocxImage / docxtpl InlineImage
+    if value.startswith(("data:", "file:", "http://", "https://")):
+        return True
+    return Path(value).is_file()
+
+
+def validate_context(schema: TemplateSchema, ctx: Dict[str, Any]) -> ContextReport:
+    """Compare a render context with a template schema (nothing is rendered)."""
+    report = ContextReport(template=schema.template)
+    count = _matchup_count(ctx)
+    absent = []
+    for name, p in sorted(schema.placeholders.items()):
+        value = ctx.get(name)
+        if value is None:
+            absent.append(name)
+            needed = p.required or (p.when and all(ctx.get(g) for g in p.when))
+            if needed and (not p.matchup or p.matchup <= count):
+                report.missing.append(name)
+            continue
+        if p.kind == TEXT and not isinstance(value, _SCALARS):
+            report.type_errors.append(f"{name} is a {type(value).__name__}, expected text")
+        elif p.kind == IMAGE and value and not _image_ok(value):
+            report.warnings.append(f"{name}: image not found ({value})")
+
+    unknown = [k for k in ctx if k not in schema.placeholders]
+    for name in absent:
+        for key in unknown:
+            if key not in report.misspelled and _near_miss(key, name):
+                report.misspelled[key] = name
+                if name in report.missing:
+                    report.missing.remove(name)
+                break
+    return report
+
+
+def check_context(template: str, ctx: Dict[str, Any], mode: Optional[str] = None) -> ContextReport:
+    """Validate ``ctx`` against ``template``'s schema; raise TemplateContextError in strict mode."""
+    mode = (mode or CHECK_MODE).lower()
+    if mode == "off":
+        return ContextReport(template=template)
+    report = validate_context(load_schema(template), ctx)
+    for warning in report.warnings:
+        logger.warning(f"{Path(template).name}: {warning}")
+    if not report.ok:
+        if mode == "strict":
+            raise TemplateContextError(report.summary())
+        logger.warning(report.summary())
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Show template placeholder schemas and check a saved context")
+    ap.add_argument("templates", nargs="+")
+    ap.add_argument("--context", help="JSON context to validate (e.g. a .debug.json)")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    ctx = json.loads(Path(args.context).read_text(encoding="utf-8")) if args.context else None
+    failed = False
+    for template in args.templates:
+        schema = load_schema(template)
+        print(f"{template} ({schema.sha1[:12]}): {len(schema.placeholders)} placeholder(s)")
+        for p in schema.placeholders.values():
+            need = "required" if p.required else ("if " + " and ".join(p.when) if p.when else "optional")
+            flags = ", ".join(filter(None, [p.kind, need,
+                                            f"matchup {p.matchup}" if p.matchup else ""]))
+            print(f"  {p.name:<28} {flags}  [{', '.join(p.parts)}]")
+        if ctx is not None:
+            report = validate_context(schema, ctx)
+            print(f"  -> {report.summary()}")
+            failed |= not report.ok
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
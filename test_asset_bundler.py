@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+test_asset_bundler.py - Self-contained HTML: no network references, each logo embedded once
+Run directly or via pytest; uses the real recap template and team logos.
+"""
+
+import re
+import tempfile
+from pathlib import Path
+
+from asset_bundler import AssetBundler
+from weekly_recap import render_html, resolve_template_path
+
+LOGOS = sorted(Path("logos/team_logos").glob("*.png"))[:2]
+
+
+def _html():
+    ctx = {"LEAGUE_NAME": "Legends League", "WEEK_NUMBER": 5, "YEAR": 2025, "MATCHUP_COUNT": 3}
+    for i in (1, 2, 3):
+        ctx.update({
+            f"MATCHUP{i}_HOME": f"Home Team {i}",
+            f"MATCHUP{i}_AWAY": f"Away Team {i}",
+            f"MATCHUP{i}_HS": "101.2",
+            f"MATCHUP{i}_AS": "99.0",
+            f"MATCHUP{i}_BLURB": "Sabre watched it all unfold.",
+            # the same logo appears three times, a second one once
+            f"MATCHUP{i}_HOME_LOGO": str(LOGOS[0].resolve()),
+            f"MATCHUP{i}_AWAY_LOGO": str(LOGOS[1].resolve()) if i == 1 else "",
+        })
+    return render_html(resolve_template_path("templates/recap_template.html"), ctx)
+
+
+def _vendor_fonts(font_dir):
+    from asset_bundler import FONT_FACES
+
+    font_dir.mkdir()
+    for _, _, _, filename in FONT_FACES:
+        (font_dir / filename).write_bytes(b"\x00\x01\x00\x00" + filename.encode())   # embedded as-is
+
+
+def test_inline_bundle_is_self_contained():
+    tmp = Path(tempfile.mkdtemp())
+    _vendor_fonts(tmp / "fonts")
+    bundler = AssetBundler(font_dir=tmp / "fonts", cache_dir=tmp / "assets")
+    html = bundler.bundle_html(_html(), inline=True)
+    print(bundler.summary())
+
+    # Google Fonts links go (both families vendored); the Typekit kit can't be vendored and stays
+    assert not re.search(r"""(href|src)=["']?https?://fonts\.googleapis""", html)
+    assert "use.typekit.net" in html and bundler.stats.remote_fonts_kept == 1
+    assert "@import url(http" not in html
+    assert html.count("@font-face") == 3 and bundler.stats.fonts == ["Graduate 400", "Courier Prime 400",
+                                                                     "Courier Prime 700"]
+    assert bundler.stats.images == 2 and bundler.stats.image_refs == 4
+    assert html.count("data:image/png;base64,") == 2
+    assert str(LOGOS[0].resolve()) not in html
+    assert bundler.stats.image_bytes_out < bundler.stats.image_bytes_in
+
+    # a long-lived bundler (gazette_server) lists each face once, however many pages it bundles
+    bundler.bundle_html(_html(), inline=False)
+    assert len(bundler.stats.fonts) == 3
+
+
+def test_web_fonts_stay_for_faces_that_are_not_vendored():
+    tmp = Path(tempfile.mkdtemp())
+    bundler = AssetBundler(font_dir=tmp / "fonts", cache_dir=tmp / "assets")
+    html = bundler.bundle_html(_html(), inline=True)
+    assert "fonts.googleapis.com/css2?family=Graduate" in html
+    assert "fonts.googleapis.com/css2?family=Courier+Prime" in html
+    assert bundler.stats.remote_fonts_kept == 3 and "@font-face" not in html
+    assert sorted(bundler.stats.missing_fonts) == ["CourierPrime-Bold.ttf", "CourierPrime-Regular.ttf",
+                                                   "Graduate-Regular.ttf"]
+
+
+def test_file_mode_points_at_print_sized_copies():
+    cache = Path(tempfile.mkdtemp())
+    bundler = AssetBundler(cache_dir=cache)
+    html = bundler.bundle_html(_html(), inline=False)
+    copies = list(cache.glob("*.png"))
+    assert len(copies) == 2
+    assert all(c.resolve().as_uri() in html for c in copies)
+
+    # a second build reuses the cached copies
+    again = AssetBundler(cache_dir=cache)
+    again.bundle_html(_html(), inline=False)
+    assert sorted(cache.glob("*.png")) == sorted(copies)
+
+
+def _tiny_font(path, chars="ABCDEFGHIJabcdefghij é"):
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    def box():
+        pen = TTGlyphPen(None)
+        pen.moveTo((50, 0)); pen.lineTo((50, 700)); pen.lineTo((450, 700)); pen.lineTo((450, 0)); pen.closePath()
+        return pen.glyph()
+
+    names = [".notdef"] + [f"g{ord(c)}" for c in chars]
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder(names)
+    fb.setupCharacterMap({ord(c): f"g{ord(c)}" for c in chars})
+    fb.setupGlyf({n: box() for n in names})
+    fb.setupHorizontalMetrics({n: (500, 50) for n in names})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": "Tiny", "styleName": "Regular"})
+    fb.setupOS2()
+    fb.setupPost()
+    fb.save(str(path))
+
+
+def test_font_subsets_are_shared_across_a_batch():
+    try:
+        import fontTools  # noqa: F401
+    except ImportError:
+        print("fontTools not installed; skipping subset cache check")
+        return
+    from fontTools.ttLib import TTFont
+    from asset_bundler import FontSubsetCache
+
+    tmp = Path(tempfile.mkdtemp())
+    (tmp / "fonts").mkdir()
+    font = tmp / "fonts" / "Graduate-Regular.ttf"
+    _tiny_font(font, chars="ABCDEFGHIJabcdefghij é" + "".join(chr(c) for c in range(0x3041, 0x3097)))
+    page = "<html><head></head><body><p>{}</p></body></html>"
+
+    cache = FontSubsetCache(tmp / "fontcache")
+    first = AssetBundler(font_dir=tmp / "fonts", cache_dir=tmp / "assets", font_cache=cache)
+    html = first.bundle_html(page.format("Abc"), inline=False)
+    subsets = list((tmp / "fontcache").glob("*.ttf"))
+    assert len(subsets) == 1 and subsets[0].resolve().as_uri() in html
+    assert subsets[0].stat().st_size < font.stat().st_size
+    assert 0x3042 not in TTFont(str(subsets[0])).getBestCmap()     # kana the page doesn't use are gone
+
+    # another league's gazette in the same batch (new process -> new cache object), same alphabet
+    other = FontSubsetCache(tmp / "fontcache")
+    html = AssetBundler(font_dir=tmp / "fonts", cache_dir=tmp / "assets", font_cache=other).bundle_html(page.format("Cab é"))
+    assert (cache.misses, other.hits, other.misses) == (1, 1, 0)
+    assert "@font-face{font-family:'Graduate'" in html and "data:font/ttf;base64," in html
+
+    # a character outside the base set is a new subset; a changed font file is a new key
+    AssetBundler(font_dir=tmp / "fonts", cache_dir=tmp / "assets", font_cache=other).bundle_html(page.format("\u3042"))
+    assert other.misses == 1 and len(list((tmp / "fontcache").glob("*.ttf"))) == 2
+    key = other.key(font, "Abc")
+    _tiny_font(font, chars="ABCabc")
+    assert other.key(font, "Abc") != key
+
+
+def test_network_fetches_are_refused():
+    bundler = AssetBundler()
+    try:
+        bundler.url_fetcher("https://example.com/tracker.png")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("network fetch was not blocked")
+    assert bundler.stats.network_blocked == 1
+
+
+if __name__ == "__main__":
+    test_inline_bundle_is_self_contained()
+    test_web_fonts_stay_for_faces_that_are_not_vendored()
+    test_file_mode_points_at_print_sized_copies()
+    test_font_subsets_are_shared_across_a_batch()
+    test_network_fetches_are_refused()
+    print("✅ Asset bundler checks passed")
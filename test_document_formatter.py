@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+test_document_formatter.py - The single-pass DOCX transform matches applying each fix on its own,
+and the output of the original per-fix formatter
+Run directly or via pytest; builds a small document with python-docx.
+"""
+
+import hashlib
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+from docx import Document
+from docx.enum.section import WD_SECTION
+from docx.enum.text import WD_BREAK
+from docx.shared import Inches
+from PIL import Image
+
+from document_formatter import DocxTransform, default_fixes, fix_document_formatting
+from footer_gradient import FooterGradientFix
+
+
+def _sample(tmp):
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Gridiron Gazette"
+    doc.add_paragraph().add_run("Week 5").bold = True
+    for i in range(20):
+        p = doc.add_paragraph(f"Recap line {i}." if i % 3 else "")
+        if i % 7 == 0:
+            p.add_run().add_break(WD_BREAK.PAGE)
+        if i % 5 == 0:
+            p.paragraph_format.left_indent = Inches(1)
+    doc.add_table(rows=2, cols=2).cell(0, 0).text = "score"
+    doc.add_section(WD_SECTION.NEW_PAGE)
+    doc.add_paragraph("Section two")
+    path = tmp / "sample.docx"
+    doc.save(path)
+    Image.new("RGB", (300, 20), "purple").save(tmp / "gradient.png")
+    return path
+
+
+# sha256 of the parts the fixes touch, from the original formatter (fix_document_formatting, then
+# add_footer_gradient, as before the single-pass rewrite) run on _sample() with python-docx 1.1.2 / lxml 5.3.0
+BASELINE_DIGESTS = {
+    "[Content_Types].xml": "ecbe3f7dfd70530319fed457805e79a3df0cc177119a7d97bacbb25f516c7adb",
+    "word/_rels/document.xml.rels": "157ed86827865b095c9c6b39e7c3451315a4b0d6127daa8636026684d8b9df89",
+    "word/_rels/footer1.xml.rels": "a134ffb58bad658becad1362f28a7fcb92904a928e5a686fbae9bed93092e9d8",
+    "word/document.xml": "9f491353c8fa72d2af9539c9085aa3513eb9cabe95042f5c88c2e2154a0f905d",
+    "word/footer1.xml": "becbee6eaf91ec5606ec21ce376539f7f127dfe4ce54fd80c6aef3f7a8e805dd",
+    "word/header1.xml": "b2f23d40ade4cc7d0d8674b804f8b5fa3b3c1aee03bb57950f9a2fd8703ba308",
+}
+
+
+def _parts(path):
+    with zipfile.ZipFile(path) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def test_single_pass_matches_fix_by_fix():
+    tmp = Path(tempfile.mkdtemp())
+    src = _sample(tmp)
+    gradient = tmp / "gradient.png"
+
+    one_pass = tmp / "one_pass.docx"
+    shutil.copy(src, one_pass)
+    assert fix_document_formatting(str(one_pass), gradient_png=str(gradient))
+
+    # the old shape: open / fix / save once per fix
+    fix_by_fix = tmp / "fix_by_fix.docx"
+    shutil.copy(src, fix_by_fix)
+    for fix in default_fixes() + [FooterGradientFix(gradient)]:
+        DocxTransform([fix]).run(str(fix_by_fix))
+
+    assert _parts(one_pass) == _parts(fix_by_fix)
+
+
+def test_single_pass_matches_the_original_formatter():
+    tmp = Path(tempfile.mkdtemp())
+    src = _sample(tmp)
+    assert fix_document_formatting(str(src), gradient_png=str(tmp / "gradient.png"))
+    parts = _parts(src)
+    assert {name: hashlib.sha256(parts[name]).hexdigest() for name in BASELINE_DIGESTS} == BASELINE_DIGESTS
+
+
+if __name__ == "__main__":
+    test_single_pass_matches_fix_by_fix()
+    test_single_pass_matches_the_original_formatter()
+    print("✅ Document formatter checks passed")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+test_docx_template.py - Precompiled DOCX template: placeholders, images, raw-copied parts
+Run directly or via pytest; uses GridironGazette.dotx and a team logo from the repo.
+"""
+
+import io
+import time
+import zipfile
+from pathlib import Path
+
+from docx import Document
+
+from docx_template import DocxImage, compile_template
+
+TEMPLATE = "GridironGazette.dotx"
+LOGO = next(Path("logos/team_logos").glob("*.png"))
+
+
+def _ctx():
+    return {
+        "WEEK_NUMBER": 5,
+        "WEEKLY_INTRO": "Scores & <surprises>",
+        "MATCHUP1_BODY": "First line\nSecond line",
+        "LEAGUE_LOGO": DocxImage(str(LOGO), width_mm=28),
+    }
+
+
+def test_render_fills_placeholders_and_images():
+    tpl = compile_template(TEMPLATE)
+    assert {"LEAGUE_LOGO", "SPONSOR_LOGO", "MATCHUP6_BODY"} <= set(tpl.placeholders)
+
+    t0 = time.perf_counter()
+    data = tpl.render(_ctx())
+    print(f"render: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    doc = Document(io.BytesIO(data))
+    text = "\n".join(p.text for p in doc.paragraphs)
+    assert "WEEK 5 RECAP" in text
+    assert "Scores & <surprises>" in text
+    assert "First line\nSecond line" in text
+    assert "{{" not in text
+    assert doc.sections[0].header._element.xpath(".//w:drawing")
+    assert not doc.sections[0].footer._element.xpath(".//w:drawing")  # SPONSOR_LOGO not given
+
+
+def test_untouched_parts_are_copied_without_recompressing():
+    data = compile_template(TEMPLATE).render(_ctx())
+    with zipfile.ZipFile(TEMPLATE) as src, zipfile.ZipFile(io.BytesIO(data)) as out:
+        assert out.testzip() is None
+        for name in ("word/styles.xml", "word/theme/theme1.xml"):
+            assert out.getinfo(name).compress_size == src.getinfo(name).compress_size
+            assert out.read(name) == src.read(name)
+
+
+if __name__ == "__main__":
+    test_render_fills_placeholders_and_images()
+    test_untouched_parts_are_copied_without_recompressing()
+    print("✅ DOCX template checks passed")
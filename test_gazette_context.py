@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+test_gazette_context.py - Matchup tokens formatted on read, cleaning without copies, slotted rows
+Run directly or via pytest; no ESPN access needed.
+"""
+
+import json
+import sys
+
+from gazette_data import GazetteContext, MatchRow, _sample_row, benchmark_memory
+
+
+def _ctx():
+    return GazetteContext({"WEEK_NUMBER": 5, "MATCHUP_COUNT": 2}, [_sample_row(1), _sample_row(2)],
+                          logos={"Home Team 1": "logos/home1.png"})
+
+
+def test_matchup_tokens_are_formatted_from_rows():
+    ctx = _ctx()
+    assert ctx["MATCHUP1_HOME"] == "Home Team 1"
+    assert ctx["MATCHUP2_HS"] == "103.20"
+    assert ctx["MATCHUP1_TOP_HOME"] == "Star Back 1 (RB) — 31.4 pts"
+    assert ctx["MATCHUP1_KEYPLAY"] == "Game MVP: Star Back 1 (RB) with 31.4 pts"
+    assert ctx["MATCHUP1_HOME_LOGO"] == "logos/home1.png" and ctx["MATCHUP2_HOME_LOGO"] == ""
+    assert ctx["MATCHUP1_HOME_BENCH_MISTAKES"] == ["Benched Guy 1 (18.2) over Starter 1 (4.1)"]
+    assert "MATCHUP3_HOME" not in ctx and ctx.get("MATCHUP3_HOME") is None
+    assert len(ctx) == len(list(ctx)) == 2 + 2 * 22
+
+
+def test_assignments_override_and_filters_apply_on_read():
+    ctx = _ctx()
+    ctx["MATCHUP1_BLURB"] = "**Sabre** saw it all 🔥"
+    ctx.setdefault("MATCHUP2_BLURB", "ignored")          # already a (blank) token
+    del ctx["MATCHUP2_DEF"]
+    ctx.add_text_filter(lambda s: s.replace("**", ""))
+    ctx.add_text_filter(lambda s: s.replace("🔥", "[FIRE]"))
+
+    snapshot = dict(ctx)
+    assert snapshot["MATCHUP1_BLURB"] == "Sabre saw it all [FIRE]"
+    assert snapshot["MATCHUP2_BLURB"] == ""
+    assert "MATCHUP2_DEF" not in snapshot
+    json.dumps(snapshot)
+
+
+def test_rows_are_slotted_and_lighter():
+    if sys.version_info >= (3, 10):
+        assert not hasattr(_sample_row(0), "__dict__")
+    assert isinstance(_sample_row(0), MatchRow)
+    results = benchmark_memory(matchups=6, weeks=4)
+    print(results)
+    assert results["after_bytes_per_matchup"] < results["before_bytes_per_matchup"]
+
+
+if __name__ == "__main__":
+    test_matchup_tokens_are_formatted_from_rows()
+    test_assignments_override_and_filters_apply_on_read()
+    test_rows_are_slotted_and_lighter()
+    print("✅ Gazette context checks passed")
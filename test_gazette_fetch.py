@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+test_gazette_fetch.py - Week fetch from box scores only, joined by team id, with a request count
+Run directly or via pytest; a fake League stands in for ESPN (no network).
+"""
+
+from types import SimpleNamespace
+
+from gazette_data import EspnRequestCounter, _fetch_rows, _team_streak
+
+SLOTS = {"QB": 1, "RB": 1, "D/ST": 1, "BE": 2}
+
+
+def _p(name, position, points, slot):
+    return SimpleNamespace(name=name, position=position, points=points, slot_position=slot)
+
+
+def _team(team_id, name):
+    return SimpleNamespace(team_id=team_id, team_name=name, streak_length=1, streak_type="WIN", roster=[])
+
+
+class FakeRequests:
+    def __init__(self):
+        self.sent = []
+
+    def league_get(self, params=None, headers=None, extend=""):
+        self.sent.append("league_get")
+        return {}
+
+    def get(self, params=None, headers=None, extend=""):
+        self.sent.append("get")
+        return {}
+
+
+class FakeLeague:
+    """box_scores() costs 3 requests (matchups, pro schedule, ratings), scoreboard() 1, like espn_api."""
+
+    def __init__(self, year=2025, current_week=5):
+        self.year, self.current_week = year, current_week
+        self.espn_request = FakeRequests()
+        self.settings = SimpleNamespace(position_slot_counts=SLOTS)
+        # two teams share a name: only the team id tells them apart
+        self.teams = [_team(1, "Hawks"), _team(2, "Bears"), _team(3, "Hawks"), _team(4, "Owls")]
+        self.scoreboard_calls = 0
+
+    def box_scores(self, week=None):
+        self.espn_request.league_get()
+        self.espn_request.get()
+        self.espn_request.league_get()
+        t = {team.team_id: team for team in self.teams}
+
+        def lineup(qb_pts, bench_pts):
+            return [_p("QB", "QB", qb_pts, "QB"), _p("RB", "RB", 10.0, "RB"), _p("D", "D/ST", 5.0, "D/ST"),
+                    _p("Backup QB", "QB", bench_pts, "BE")]
+        return [
+            SimpleNamespace(home_team=t[3], away_team=t[4], home_score=90.0, away_score=120.0,
+                            home_lineup=lineup(20.0, 30.0), away_lineup=lineup(25.0, 1.0)),
+            SimpleNamespace(home_team=t[1], away_team=t[2], home_score=110.5, away_score=100.0,
+                            home_lineup=lineup(22.0, 2.0), away_lineup=lineup(18.0, 3.0)),
+            SimpleNamespace(home_team=t[2], away_team=0, home_score=0, away_score=0, home_lineup=[], away_lineup=[]),  # bye
+        ]
+
+    def scoreboard(self, week=None):
+        self.espn_request.league_get()
+        self.scoreboard_calls += 1
+        t = {team.team_id: team for team in self.teams}
+        return [SimpleNamespace(home_team=t[1], away_team=t[2], home_score=110.5, away_score=100.0),
+                SimpleNamespace(home_team=t[3], away_team=t[4], home_score=90.0, away_score=120.0)]
+
+
+def test_box_scores_are_the_only_call():
+    league = FakeLeague()
+    rows = _fetch_rows(league, 5)
+    assert league.scoreboard_calls == 0
+    assert len(league.espn_request.sent) == 3
+    assert [(r.home_name, r.home_score, r.away_name) for r in rows] == [("Hawks", 90.0, "Owls"), ("Hawks", 110.5, "Bears")]
+    # lineup analysis follows the team id, not the (shared) name or list position
+    assert rows[0].home_optimal_points == 45.0 and rows[1].home_optimal_points == 37.0
+    assert rows[0].home_top_player == "QB (QB)" and rows[0].home_top_points == 20.0
+
+
+def test_scoreboard_only_when_box_scores_are_unavailable():
+    for league, week in ((FakeLeague(year=2018), 5), (FakeLeague(current_week=3), 5)):
+        rows = _fetch_rows(league, week)
+        assert league.scoreboard_calls == 1 and league.espn_request.sent == ["league_get"]
+        assert [r.home_score for r in rows] == [110.5, 90.0]
+
+
+def test_request_counter_restores_the_client():
+    league = FakeLeague()
+    with EspnRequestCounter(league) as counter:
+        league.box_scores(5)
+    league.scoreboard(5)
+    assert counter.count == 3
+    assert "league_get" not in vars(league.espn_request)
+
+
+
+def test_streak_is_counted_up_to_the_week():
+    team = SimpleNamespace(outcomes=["W", "L", "L", "W", "W", "W", "U"], streak_length=3, streak_type="WIN")
+    assert _team_streak(team, 3) == -2 and _team_streak(team, 5) == 2 and _team_streak(team, 7) == 3
+    assert _team_streak(SimpleNamespace(outcomes=["W", "T"]), 2) == 0
+    # No results on the team: ESPN's current streak
+    assert _team_streak(SimpleNamespace(streak_length=4, streak_type="LOSS"), 2) == -4
+
+
+if __name__ == "__main__":
+    test_box_scores_are_the_only_call()
+    test_scoreboard_only_when_box_scores_are_unavailable()
+    test_request_counter_restores_the_client()
+    test_streak_is_counted_up_to_the_week()
+    print("✅ Gazette fetch checks passed")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+test_gazette_server.py - On-demand rendering: concurrent requests coalesce, ETags drive conditional GETs
+Run directly or via pytest; a canned context stands in for ESPN (no network, no LLM).
+"""
+
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+from gazette_server import GazetteService, SingleFlight, make_handler
+from test_template_schema import _ctx
+
+
+class SlowBuilder:
+    """Takes long enough that concurrent requests overlap; counts builds."""
+
+    def __init__(self):
+        self.calls = 0
+        self.home_score = "101.20"
+
+    def __call__(self, league_id, year, week):
+        self.calls += 1
+        time.sleep(0.3)
+        ctx = _ctx()
+        ctx.update(WEEK_NUMBER=week, WEEK=week, YEAR=year, MATCHUP1_HS=self.home_score)
+        return ctx
+
+
+def _get(url, etag=None):
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as r:
+            return r.status, r.headers, r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def _serve(service):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_single_flight_shares_one_call():
+    flight, calls = SingleFlight(), []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return "done"
+
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: flight.do("k", work), range(5)))
+    assert len(calls) == 1 and [r for r, _ in results] == ["done"] * 5
+    assert sum(shared for _, shared in results) == 4
+
+
+def test_concurrent_requests_render_once_and_revalidate():
+    builder = SlowBuilder()
+    service = GazetteService(context_builder=builder, cache_dir=Path(tempfile.mkdtemp()))
+    server, base = _serve(service)
+    try:
+        url = f"{base}/league/424242/2025/5.html"
+        with ThreadPoolExecutor(6) as pool:
+            responses = list(pool.map(lambda _: _get(url), range(6)))
+        assert {status for status, _, _ in responses} == {200}
+        assert len({body for _, _, body in responses}) == 1 and b"101.20" in responses[0][2]
+        assert builder.calls == 1 and service.counters["renders"] == 1
+
+        etag = responses[0][1]["ETag"]
+        status, headers, body = _get(url, etag)
+        assert status == 304 and headers["ETag"] == etag and body == b""
+        assert service.counters["renders"] == 1 and builder.calls == 1
+
+        # New inputs (a rebuilt context with another score) mean a new ETag and one new render
+        service._contexts.clear()
+        builder.home_score = "140.00"
+        status, headers, body = _get(url, etag)
+        assert status == 200 and headers["ETag"] != etag and b"140.00" in body
+        assert service.counters["renders"] == 2
+
+        # A fresh process finds the artifact on disk by its ETag
+        again = GazetteService(context_builder=builder, cache_dir=service.cache_dir)
+        artifact, source = again.artifact(424242, 2025, 5, "html")
+        assert source == "disk" and artifact.etag == headers["ETag"]
+
+        assert _get(f"{base}/league/424242/2025/5.docx")[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_single_flight_shares_one_call()
+    test_concurrent_requests_render_once_and_revalidate()
+    print("✅ Gazette server checks passed")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+test_job_queue.py - Build queue: dedup, priorities, backoff retries, crash recovery, concurrent workers
+Run directly or via pytest; builds are stand-in callables (no ESPN access).
+"""
+
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, backoff_s, run_workers
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _queue(clock=time.time, backoff=30.0):
+    return JobQueue(str(Path(tempfile.mkdtemp()) / "jobs.sqlite"), backoff_base_s=backoff, clock=clock)
+
+
+def test_dedup_and_priority():
+    q = _queue()
+    low, queued = q.enqueue(1, 2025, 5, name="Low")
+    high, _ = q.enqueue(2, 2025, 5, name="High", priority=10)
+    assert queued and q.enqueue(1, 2025, 5, name="Low") == (low, False)
+    assert q.enqueue(1, 2025, 5, options={"llm_blurbs": False})[1]      # other options: another job
+
+    job = q.claim("w")
+    assert job.id == high and job.status == RUNNING and job.attempts == 1
+    q.complete(job)
+    assert q.enqueue(2, 2025, 5, priority=10) == (high, False)           # built: not again
+    assert q.enqueue(2, 2025, 5, priority=10, force=True) == (high, True)
+
+
+def test_failures_back_off_then_give_up_and_requeue():
+    clock = Clock()
+    q = _queue(clock)
+    job_id, _ = q.enqueue(7, 2025, 5, max_attempts=3)
+    assert [backoff_s(n, 30) for n in (1, 2, 3)] == [30, 60, 120]
+
+    assert q.fail(q.claim("w"), "ESPN 500") == QUEUED
+    assert q.claim("w") is None and q.next_ready_in() == 30          # waiting out the backoff
+    clock.now += 30
+    assert q.fail(q.claim("w"), "ESPN 500") == QUEUED
+    clock.now += 60
+    job = q.claim("w")
+    assert job.attempts == 3 and q.fail(job, "still down") == FAILED
+    assert q.counts() == {FAILED: 1} and q.jobs()[0].last_error == "still down"
+
+    assert q.enqueue(7, 2025, 5, max_attempts=3) == (job_id, True)     # next run retries it from scratch
+    assert q.claim("w").attempts == 1
+
+
+def test_crashed_worker_is_recovered():
+    q = _queue()
+    q.enqueue(1, 2025, 5)
+    q.claim("somehost:1:0", lease_s=3600)                               # another host, lease still valid
+    assert q.recover() == 0
+    q.enqueue(2, 2025, 5)
+    q.claim(f"{socket.gethostname()}:999999999:0", lease_s=3600)       # this host, process gone
+    assert q.recover() == 1 and q.counts() == {RUNNING: 1, QUEUED: 1}
+
+
+def test_workers_build_each_league_once_and_retry_only_failures():
+    q = _queue(backoff=0.01)
+    for league in range(1, 7):
+        q.enqueue(league, 2025, 5, name=f"L{league}", max_attempts=2)
+    built, lock, flaky = [], threading.Lock(), {3: 1}
+    active, peak = [0], [0]
+
+    def build(job):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+            if flaky.get(job.league_id):
+                flaky[job.league_id] -= 1
+                raise RuntimeError("ESPN timeout")
+            built.append(job.league_id)
+
+    counts = run_workers(q, build, concurrency=3)
+    assert counts == {DONE: 6} and sorted(built) == [1, 2, 3, 4, 5, 6]
+    assert 1 < peak[0] <= 3
+    assert {j.league_id: j.attempts for j in q.jobs()}[3] == 2
+
+    # the next weekly run rebuilds nothing
+    for league in range(1, 7):
+        assert not q.enqueue(league, 2025, 5, name=f"L{league}", max_attempts=2)[1]
+    built.clear()
+    assert run_workers(q, build, concurrency=3) == {DONE: 6} and built == []
+
+
+def test_a_lease_that_runs_out_mid_run_is_picked_up_again():
+    clock = Clock()
+    q = _queue(clock)
+    job_id, _ = q.enqueue(1, 2025, 5)
+    q.claim("otherhost:1:0", lease_s=60)               # a worker elsewhere took it, then hung
+    built, slept = [], []
+
+    def sleep(s):
+        slept.append(s)
+        clock.now += s
+        assert clock.now < 2000, "the expired lease was never recovered"
+
+    assert run_workers(q, lambda job: built.append(job.league_id), sleep=sleep, job_ids=[job_id]) == {DONE: 1}
+    assert built == [1] and 55 <= sum(slept) <= 65     # waited out the lease, no longer
+    assert q.jobs()[0].attempts == 2
+
+
+def test_workers_only_wait_for_their_own_jobs():
+    clock = Clock()
+    q = _queue(clock)
+    q.enqueue(1, 2025, 4)                              # another run's job, waiting out a retry
+    q.fail(q.claim("w"), "ESPN 500")
+    q.enqueue(2, 2025, 4)
+    q.claim("otherhost:1:0", lease_s=3600)             # ... and one it is still building
+    assert q.next_ready_in() == 30 and q.next_ready_in([]) is None
+    mine, _ = q.enqueue(3, 2025, 5)
+
+    slept = []
+    counts = run_workers(q, lambda job: None, sleep=slept.append, job_ids=[mine])
+    assert counts == {DONE: 1, QUEUED: 1, RUNNING: 1} and slept == []
+
+
+if __name__ == "__main__":
+    test_dedup_and_priority()
+    test_failures_back_off_then_give_up_and_requeue()
+    test_crashed_worker_is_recovered()
+    test_workers_build_each_league_once_and_retry_only_failures()
+    test_a_lease_that_runs_out_mid_run_is_picked_up_again()
+    test_workers_only_wait_for_their_own_jobs()
+    print("✅ Job queue checks passed")
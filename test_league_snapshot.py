@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+test_league_snapshot.py - League metadata snapshot: one request to refresh, none when fresh
+Run directly or via pytest; the ESPN league view is served from a fixture (no network).
+"""
+
+import copy
+import json
+import tempfile
+from pathlib import Path
+
+from espn_api.requests.espn_requests import EspnFantasyRequests
+
+from league_snapshot import get_snapshot, load_snapshot, open_league, snapshot_path
+from season_calendar import computed_calendar
+
+SETTINGS = {
+    "name": "Legends League", "size": 4,
+    "scheduleSettings": {"matchupPeriodCount": 14, "matchupPeriods": {str(w): [w] for w in range(1, 18)},
+                         "playoffTeamCount": 2, "playoffSeedingRule": "TOTAL_POINTS_SCORED",
+                         "divisions": [{"id": 0, "name": "East"}]},
+    "tradeSettings": {"vetoVotesRequired": 4},
+    "draftSettings": {"keeperCount": 0},
+    "scoringSettings": {"matchupTieRule": "NONE", "playoffMatchupTieRule": "NONE", "scoringItems": []},
+    "acquisitionSettings": {"isUsingAcquisitionBudget": False},
+    "rosterSettings": {"lineupSlotCounts": {"0": 1, "2": 2, "4": 2, "6": 1, "16": 1, "17": 1, "20": 6}},
+}
+
+
+def _team(team_id, name, owner):
+    record = {"wins": 3, "losses": 1, "ties": 0, "pointsFor": 450.5, "pointsAgainst": 401.25,
+              "streakLength": 2, "streakType": "WIN"}
+    return {"id": team_id, "abbrev": name[:4].upper(), "name": name, "divisionId": 0, "owners": [owner],
+            "record": {"overall": record}, "playoffSeed": team_id, "rankCalculatedFinal": 0,
+            "roster": {"entries": []}}
+
+
+def _player(player_id, name):
+    return {"playerId": player_id, "lineupSlotId": 0, "acquisitionType": "DRAFT",
+            "playerPoolEntry": {"player": {"fullName": name, "id": player_id, "eligibleSlots": [0, 7],
+                                           "proTeamId": 4, "defaultPositionId": 1, "stats": []}}}
+
+
+def _payload(week=5):
+    teams = [_team(2, "Bears", "{B}"), _team(1, "Hawks", "{A}")]
+    teams[1]["roster"] = {"entries": [_player(3915511, "Joe Burrow")]}
+    return {
+        "id": 887998, "seasonId": 2025, "scoringPeriodId": week,
+        "status": {"currentMatchupPeriod": week, "firstScoringPeriod": 1, "finalScoringPeriod": 17,
+                   "latestScoringPeriod": week, "previousSeasons": [2023, 2024]},
+        "settings": SETTINGS,
+        "members": [{"id": "{A}", "firstName": "Ann", "lastName": "Lee"}, {"id": "{B}", "displayName": "bob99"}],
+        "teams": teams,
+        "schedule": [{"matchupPeriodId": 1, "winner": "HOME",
+                      "home": {"teamId": 1, "totalPoints": 120.5}, "away": {"teamId": 2, "totalPoints": 99.0}}],
+    }
+
+
+class FakeLeagueView:
+    """Serves the league view in place of EspnFantasyRequests.league_get and counts calls."""
+
+    def __init__(self, payload):
+        self.payload, self.calls = payload, 0
+
+    def __enter__(self):
+        self._original = EspnFantasyRequests.league_get
+        EspnFantasyRequests.league_get = lambda _self, params=None, headers=None, extend="": self._serve()
+        return self
+
+    def __exit__(self, *exc):
+        EspnFantasyRequests.league_get = self._original
+
+    def _serve(self):
+        self.calls += 1
+        return copy.deepcopy(self.payload)
+
+
+def test_fresh_snapshot_builds_a_league_without_requests():
+    cache = Path(tempfile.mkdtemp())
+    with FakeLeagueView(_payload()) as espn:
+        first = open_league(887998, 2025, cache_dir=cache)
+        again = open_league(887998, 2025, cache_dir=cache)
+    assert espn.calls == 1
+    stored = json.loads(snapshot_path(887998, 2025, cache).read_text(encoding="utf-8"))
+    assert "schedule" not in stored["data"] and all("roster" not in t for t in stored["data"]["teams"])
+    assert stored["live"]["rosters"]["1"]["entries"] and len(stored["live"]["schedule"]) == 1
+
+    for league in (first, again):
+        assert league.settings.name == "Legends League" and league.current_week == 5 and league.nfl_week == 5
+        assert [t.team_name for t in league.teams] == ["Hawks", "Bears"]
+        assert league.teams[0].division_name == "East" and league.teams[0].streak_length == 2
+        # Rosters and results come back from the snapshot too (roster stats, streaks)
+        assert [p.name for p in league.teams[0].roster] == ["Joe Burrow"] and league.teams[1].roster == []
+        assert league.teams[0].outcomes == ["W"] and league.teams[1].outcomes == ["L"]
+    assert again.settings.position_slot_counts == first.settings.position_slot_counts
+
+
+def test_schedule_round_trips_as_opponent_teams():
+    cache = Path(tempfile.mkdtemp())
+    with FakeLeagueView(_payload()) as espn:
+        fetched = open_league(887998, 2025, cache_dir=cache)
+        cached = open_league(887998, 2025, cache_dir=cache)
+    assert espn.calls == 1
+    for league in (fetched, cached):
+        hawks, bears = league.teams
+        # as espn_api's own League leaves them: opponents as Team objects, margins of victory filled in
+        assert hawks.schedule == [bears] and bears.schedule == [hawks]
+        assert hawks.scores == [120.5] and hawks.mov == [21.5] and bears.mov == [-21.5]
+    assert [t.schedule[0].team_name for t in cached.teams] == [t.schedule[0].team_name for t in fetched.teams]
+
+
+def test_version_moves_only_when_metadata_changes():
+    cache = Path(tempfile.mkdtemp())
+    with FakeLeagueView(_payload()) as espn:
+        snap = get_snapshot(887998, 2025, cache_dir=cache)
+        espn.payload["teams"][0]["roster"] = {"entries": [{"playerId": 1}]}   # rosters are not metadata
+        same = get_snapshot(887998, 2025, refresh=True, cache_dir=cache)
+        espn.payload["teams"][0]["name"] = "Grizzlies"
+        renamed = get_snapshot(887998, 2025, refresh=True, cache_dir=cache)
+    assert (snap.version, same.version, renamed.version) == (1, 1, 2)
+    assert same.fetched_at >= snap.fetched_at
+    assert renamed.team_names == ["Hawks", "Grizzlies"]
+    assert renamed.owners == {"Hawks": ["Ann Lee"], "Grizzlies": ["bob99"]}
+    assert renamed.slot_counts["QB"] == 1 and renamed.current_week == 5
+
+
+def test_stale_snapshot_is_refetched():
+    cache = Path(tempfile.mkdtemp())
+    with FakeLeagueView(_payload()) as espn:
+        get_snapshot(887998, 2025, cache_dir=cache)
+        espn.payload = _payload(week=6)
+        assert get_snapshot(887998, 2025, cache_dir=cache).current_week == 5
+        assert get_snapshot(887998, 2025, max_age_s=0, cache_dir=cache).current_week == 6
+    assert espn.calls == 2 and load_snapshot(887998, 2025, cache).version == 2
+
+
+def test_snapshot_older_than_the_week_is_refetched():
+    cache = Path(tempfile.mkdtemp())
+    final_at = computed_calendar(2025).final_at(5)
+    with FakeLeagueView(_payload()) as espn:
+        get_snapshot(887998, 2025, cache_dir=cache)
+        path = snapshot_path(887998, 2025, cache)
+        stored = json.loads(path.read_text(encoding="utf-8"))
+        stored["fetched_at"] = final_at - 3600          # taken during MNF of week 5
+        path.write_text(json.dumps(stored), encoding="utf-8")
+        forever = float("inf")
+
+        open_league(887998, 2025, max_age_s=forever, cache_dir=cache)
+        assert espn.calls == 1                           # no week asked for: the snapshot will do
+        open_league(887998, 2025, max_age_s=forever, cache_dir=cache, week=4)
+        assert espn.calls == 1                           # week 4 was final before the snapshot
+        open_league(887998, 2025, max_age_s=forever, cache_dir=cache, week=5)
+        assert espn.calls == 2                           # week 5 went final after it: refetched
+        open_league(887998, 2025, max_age_s=forever, cache_dir=cache, week=5)
+        assert espn.calls == 2
+        open_league(887998, 2025, max_age_s=forever, cache_dir=cache, week=6)
+        assert espn.calls == 3                           # the snapshot is still on week 5
+
+
+if __name__ == "__main__":
+    test_fresh_snapshot_builds_a_league_without_requests()
+    test_schedule_round_trips_as_opponent_teams()
+    test_version_moves_only_when_metadata_changes()
+    test_stale_snapshot_is_refetched()
+    test_snapshot_older_than_the_week_is_refetched()
+    print("✅ League snapshot checks passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+test_lineup_optimizer.py - Checks the optimal-lineup (bench points) solver
+Run directly or via pytest; no ESPN calls needed.
+"""
+
+from types import SimpleNamespace
+
+from lineup_optimizer import eligibility_table, solve_lineup, solve_week
+
+SLOTS = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "RB/WR/TE": 1, "D/ST": 1, "K": 1, "BE": 6, "IR": 1}
+
+
+def _p(name, position, points, slot):
+    return SimpleNamespace(name=name, position=position, points=points, slot_position=slot)
+
+
+def _sample_lineup():
+    return [
+        _p("Starting QB", "QB", 18.0, "QB"),
+        _p("Bench QB", "QB", 25.0, "BE"),
+        _p("RB One", "RB", 20.0, "RB"),
+        _p("RB Two", "RB", 4.0, "RB"),
+        _p("RB Bench", "RB", 15.0, "BE"),
+        _p("WR One", "WR", 12.0, "WR"),
+        _p("WR Two", "WR", 10.0, "WR"),
+        _p("WR Bench", "WR", 9.0, "BE"),
+        _p("TE One", "TE", 6.0, "TE"),
+        _p("TE Flexed", "TE", 3.0, "RB/WR/TE"),
+        _p("Team D/ST", "D/ST", 7.0, "D/ST"),
+        _p("Kicker", "K", 8.0, "K"),
+        _p("Hurt Guy", "WR", 30.0, "IR"),
+    ]
+
+
+def test_optimal_lineup_uses_flex_and_bench():
+    """Bench QB, bench RB, and WR3-in-FLEX should all be picked."""
+    res = solve_lineup("Sample", _sample_lineup(), SLOTS)
+
+    print(f"Actual: {res.actual_points}  Optimal: {res.optimal_points}  Left: {res.points_left}")
+    for note in res.bench_mistakes:
+        print(f"  - {note}")
+
+    assert res.actual_points == 88.0
+    # QB 25 + RB 20,15 + WR 12,10 + TE 6 + FLEX WR 9 + D/ST 7 + K 8
+    assert res.optimal_points == 112.0
+    assert res.points_left == 24.0
+    assert len(res.bench_mistakes) == 3
+    # IR players can never be "benched mistakes"
+    assert not any("Hurt Guy" in n for n in res.bench_mistakes)
+
+
+def test_perfect_lineup_has_no_mistakes():
+    lineup = [p for p in _sample_lineup() if p.slot_position in {"QB", "RB", "WR", "TE", "D/ST", "K"}]
+    res = solve_lineup("Perfect", lineup, {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "D/ST": 1, "K": 1})
+    assert res.points_left == 0.0
+    assert res.efficiency == 1.0
+    assert res.bench_mistakes == []
+
+
+def test_superflex_eligibility_table_is_cached():
+    slots = {"QB": 1, "OP": 1, "RB": 2, "WR": 2, "RB/WR/TE": 1}
+    first = eligibility_table(slots)
+    second = eligibility_table(dict(slots))
+    assert first is second
+    # OP can be QB/RB/WR/TE; FLEX can be RB/WR/TE -> distinct count vectors only
+    assert 0 < len(first) <= 4 * 3
+
+
+def test_solve_week_keys_by_team_name():
+    box = SimpleNamespace(
+        home_team=SimpleNamespace(team_name="Home Team"), home_lineup=_sample_lineup(),
+        away_team=0, away_lineup=[],  # bye side
+    )
+    results = solve_week([box], SLOTS)
+    assert set(results) == {"Home Team"}
+
+
+if __name__ == "__main__":
+    test_optimal_lineup_uses_flex_and_bench()
+    test_perfect_lineup_has_no_mistakes()
+    test_superflex_eligibility_table_is_cached()
+    test_solve_week_keys_by_team_name()
+    print("✅ Lineup optimizer checks passed")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+test_live_gazette.py - Live mode against a replayed game day: one request per poll, only moved rows re-rendered
+Run directly or via pytest; live_replay serves the recording locally (no ESPN access).
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import weekly_recap
+from league_snapshot import open_league
+from live_gazette import LiveGazette, SectionedTemplate, run_live, split_sections
+from live_replay import ReplayServer
+from test_league_snapshot import SETTINGS, _team
+
+LEAGUE_ID, YEAR, WEEK = 424242, 2025, 5
+TEMPLATE = "templates/recap_template.html"
+
+
+def _league_view():
+    return {
+        "id": LEAGUE_ID, "seasonId": YEAR, "scoringPeriodId": WEEK,
+        "status": {"currentMatchupPeriod": WEEK, "firstScoringPeriod": 1, "finalScoringPeriod": 17,
+                   "latestScoringPeriod": WEEK, "previousSeasons": []},
+        "settings": SETTINGS,
+        "members": [{"id": "{A}", "displayName": "ann"}],
+        "teams": [_team(1, "Hawks", "{A}"), _team(2, "Bears", "{A}"), _team(3, "Owls", "{A}"), _team(4, "Crows", "{A}")],
+    }
+
+
+def _frame(scores, winners=("UNDECIDED", "UNDECIDED")):
+    (a, b), (c, d) = scores
+    return {"schedule": [
+        {"matchupPeriodId": WEEK, "winner": winners[0],
+         "home": {"teamId": 1, "totalPoints": a, "totalPointsLive": a}, "away": {"teamId": 2, "totalPoints": b, "totalPointsLive": b}},
+        {"matchupPeriodId": WEEK, "winner": winners[1],
+         "home": {"teamId": 3, "totalPoints": c, "totalPointsLive": c}, "away": {"teamId": 4, "totalPoints": d, "totalPointsLive": d}},
+    ]}
+
+
+def _recording():
+    root = Path(tempfile.mkdtemp())
+    league_dir = root / str(LEAGUE_ID)
+    league_dir.mkdir()
+    (league_dir / "league.json").write_text(json.dumps(_league_view()))
+    frames = [
+        _frame(((10.0, 12.5), (20.0, 3.0))),
+        _frame(((10.0, 12.5), (20.0, 3.0))),                                    # nothing moved
+        _frame(((16.4, 12.5), (20.0, 3.0))),                                    # Hawks score
+        _frame(((16.4, 12.5), (27.0, 3.0)), winners=("HOME", "HOME")),         # Owls score, both final
+    ]
+    for n, frame in enumerate(frames, 1):
+        (league_dir / f"{n:04d}.json").write_text(json.dumps(frame))
+    return root
+
+
+def test_sections_join_to_the_full_render():
+    sections = split_sections(Path(TEMPLATE if Path(TEMPLATE).exists() else "recap_template.html").read_text())
+    assert len(sections) > 10 and any(s.startswith("{% if MATCHUP3_HOME %}") for s in sections)
+    assert split_sections("{%- if A %}x{% endif %}") == ["{%- if A %}x{% endif %}"]
+
+    ctx = {"LEAGUE_NAME": "Legends", "WEEK_NUMBER": 5, "WEEKLY_INTRO": "Hi & welcome",
+           "MATCHUP1_HOME": "Hawks", "MATCHUP1_AWAY": "Bears", "MATCHUP1_HS": "10.00", "MATCHUP1_AS": "12.50",
+           "MATCHUP2_HOME": "Owls", "MATCHUP2_AWAY": "Crows", "MATCHUP2_HS": "20.00", "MATCHUP2_AS": "3.00"}
+    template = SectionedTemplate(TEMPLATE)
+    assert template.render(ctx) == weekly_recap.render_html(TEMPLATE, ctx)
+    ctx["MATCHUP2_HS"] = "27.00"
+    assert template.render(ctx) == weekly_recap.render_html(TEMPLATE, ctx)
+    assert template.rendered == 1 and template.reused == len(template.sections) - 1
+
+
+def test_replayed_game_day():
+    out = Path(tempfile.mkdtemp())
+    with ReplayServer(_recording()) as replay:
+        league = open_league(LEAGUE_ID, YEAR, refresh=True, cache_dir=out / "cache", espn_base=replay.url)
+        ctx = weekly_recap.build_render_context(LEAGUE_ID, YEAR, WEEK, use_llm_blurbs=False, league=league)
+        live = LiveGazette(league, ctx, WEEK, out / "Gazette", template=TEMPLATE, interval_s=60,
+                           max_interval_s=600, stats_every_s=0)
+        assert [(r.home_id, r.away_id, r.home_score) for r in ctx.rows] == [(1, 2, 10.0), (3, 4, 20.0)]
+        html = out / "Gazette.html"
+        assert live.publish() == [str(html)] and "10.00" in html.read_text(encoding="utf-8")
+
+        first = live.poll()                               # same scores the gazette was built from
+        assert first.requests == 1 and not first.changed and not first.published
+
+        replay.advance()
+        quiet = live.poll()
+        assert quiet.requests == 1 and not quiet.changed and live.interval_s == 240
+
+        replay.advance()
+        moved = live.poll()
+        assert moved.requests == 1 and moved.changed == [1] and live.interval_s == 60
+        assert ctx["MATCHUP1_HS"] == "16.40" and ctx["MATCHUP1_HOME"] == ctx.rows[0].winner == "Hawks"
+        assert ctx["AWARD_TOP_NOTE"] == "20.00"
+        assert 0 < moved.sections_rendered < moved.sections_reused
+        assert moved.published == [str(html)] and "16.40" in html.read_text(encoding="utf-8")
+
+        replay.advance()
+        polls = run_live([live], max_polls=5, sleep=lambda s: None)
+        assert polls == 1 and live.done and ctx["MATCHUP2_HS"] == "27.00" and ctx["AWARD_TOP_NOTE"] == "27.00"
+        assert replay.stats["requests"] == 4 + 3        # 4 polls + the build (league view, box score call, scoreboard)
+
+
+def test_stats_refresh_inside_a_poll_publishes():
+    out = Path(tempfile.mkdtemp())
+    now = [0.0]
+    with ReplayServer(_recording()) as replay:
+        league = open_league(LEAGUE_ID, YEAR, refresh=True, cache_dir=out / "cache", espn_base=replay.url)
+        ctx = weekly_recap.build_render_context(LEAGUE_ID, YEAR, WEEK, use_llm_blurbs=False, league=league)
+        live = LiveGazette(league, ctx, WEEK, out / "Gazette", template=TEMPLATE, interval_s=60,
+                           max_interval_s=600, stats_every_s=300, clock=lambda: now[0])
+        live.publish()
+        live.poll()
+        replay.advance()
+        replay.advance()
+        now[0] = 301.0                                    # a stats refresh is due with the moved score
+        moved = live.poll()
+        assert moved.stats_refreshed and moved.changed == [1] and moved.requests > 1
+        assert moved.published and "16.40" in (out / "Gazette.html").read_text(encoding="utf-8")
+        assert "league_get" not in vars(league.espn_request)    # every request counter unwound
+
+
+if __name__ == "__main__":
+    test_sections_join_to_the_full_render()
+    test_replayed_game_day()
+    test_stats_refresh_inside_a_poll_publishes()
+    print("✅ Live gazette checks passed")
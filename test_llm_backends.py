@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+test_llm_backends.py - Backend selection, the local server's request batching, and its autostart
+Run directly or via pytest; a fake engine stands in for the model (no model, no network).
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from http.server import ThreadingHTTPServer
+
+import llm_backends
+from llm_backends import Backend, LocalLLM
+from llm_gate import LLMGate
+from llm_local_server import Batcher, make_handler
+
+ENV = ("LLM_BACKEND", "OPENAI_API_KEY", "OPENAI_MODEL", "LOCAL_LLM_URL", "LOCAL_LLM_MODEL", "LOCAL_LLM_AUTOSTART", "LLM_GATE")
+
+
+class Env:
+    """Sets environment variables for a block (None unsets) and puts everything back after."""
+
+    def __init__(self, **values):
+        self.values = values
+
+    def __enter__(self):
+        self.saved = {k: os.environ.get(k) for k in ENV}
+        for k in ENV:
+            os.environ.pop(k, None)
+        self.set(LLM_GATE="0", **self.values)
+        return self
+
+    def set(self, **values):
+        for k, v in values.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    def __exit__(self, *exc):
+        self.set(**self.saved)
+
+
+class FakeEngine:
+    name = "fake"
+
+    def __init__(self, delay_s=0.0, fail=False):
+        self.delay_s, self.fail, self.batches, self.params = delay_s, fail, [], []
+
+    def generate_batch(self, jobs):
+        self.batches.append(len(jobs))
+        self.params.append({(job.get("temperature"), job.get("top_p")) for job in jobs})
+        time.sleep(self.delay_s)
+        if self.fail:
+            raise RuntimeError("out of memory")
+        return [f"recap for {job['messages'][0]['content']}" for job in jobs]
+
+
+def _submit_all(batcher, n, timeout=5.0, params=lambda i: {}):
+    results = [None] * n
+
+    def one(i):
+        try:
+            payload = {"messages": [{"role": "user", "content": f"m{i}"}], **params(i)}
+            results[i] = batcher.submit(payload, timeout=timeout)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=one, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class Launches:
+    """Records the commands LocalLLM would start, and pretends nothing is listening."""
+
+    def __enter__(self):
+        self.cmds = []
+        self._popen, self._health = llm_backends.subprocess.Popen, LocalLLM.health
+        llm_backends.subprocess.Popen = lambda cmd, **kwargs: self.cmds.append(cmd)
+        LocalLLM.health = lambda _self: None
+        return self
+
+    def __exit__(self, *exc):
+        llm_backends.subprocess.Popen, LocalLLM.health = self._popen, self._health
+
+    def args(self, flag):
+        cmd = self.cmds[-1]
+        return cmd[cmd.index(flag) + 1]
+
+
+def test_server_address_comes_from_the_parsed_url():
+    with Launches() as launched:
+        assert not LocalLLM("http://localhost:9001/v1").ensure_server("m.gguf", wait_s=0)
+        assert (launched.args("--host"), launched.args("--port")) == ("localhost", "9001")
+        LocalLLM("http://127.0.0.1").ensure_server("m.gguf", wait_s=0)        # no port: the default one
+        assert launched.args("--port") == "8765"
+        LocalLLM("http://[::1]:8800/").ensure_server("m.gguf", wait_s=0)
+        assert (launched.args("--host"), launched.args("--port")) == ("::1", "8800")
+
+        # Not this machine, or not a port: nothing is started
+        assert not LocalLLM("http://gpu-box.lan:8765").ensure_server("m.gguf", wait_s=0)
+        assert not LocalLLM("http://127.0.0.1:http").ensure_server("m.gguf", wait_s=0)
+        assert len(launched.cmds) == 3
+
+
+def test_autostart_is_off_unless_asked_for():
+    with Env(LOCAL_LLM_MODEL="m.gguf") as env, Launches() as launched:
+        assert llm_backends.get_backend("local") is None and launched.cmds == []
+        env.set(LOCAL_LLM_AUTOSTART="1")
+        ensure_server = LocalLLM.ensure_server
+        LocalLLM.ensure_server = lambda _self: bool(launched.cmds.append("started"))
+        try:
+            llm_backends.get_backend("local")
+        finally:
+            LocalLLM.ensure_server = ensure_server
+        assert launched.cmds == ["started"]
+
+
+def test_backend_selection():
+    registry = dict(llm_backends._REGISTRY)
+    for name in ("openai", "local"):
+        llm_backends.register_backend(name, lambda name=name: Backend(name, chat=lambda messages, **kw: name))
+    try:
+        with Env() as env:
+            assert llm_backends.get_backend() is None                       # nothing configured: templates
+            env.set(LOCAL_LLM_MODEL="m.gguf")
+            assert llm_backends.get_backend().name == "local"
+            env.set(OPENAI_API_KEY="sk-test")
+            assert llm_backends.get_backend().name == "openai"               # a key wins over a local model
+            env.set(LLM_BACKEND="local")
+            assert llm_backends.get_backend().name == "local"                # ... unless a backend is forced
+            env.set(LLM_BACKEND="none")
+            assert llm_backends.get_backend() is None
+            try:
+                llm_backends.get_backend("gpt-9000")
+            except ValueError as e:
+                assert "gpt-9000" in str(e) and "local" in str(e)
+            else:
+                raise AssertionError("unknown backend accepted")
+    finally:
+        llm_backends._REGISTRY.clear()
+        llm_backends._REGISTRY.update(registry)
+
+
+def test_changing_the_model_misses_the_gate_cache():
+    calls = []
+    gate = LLMGate(db_path=str(Path(tempfile.mkdtemp()) / "gate.sqlite"), rpm=6000)
+    registry, get_gate = dict(llm_backends._REGISTRY), llm_backends.get_gate
+    llm_backends.get_gate = lambda: gate
+    llm_backends.register_backend("openai", lambda: Backend(
+        "openai", chat=lambda messages, **kw: calls.append(os.environ["OPENAI_MODEL"]) or os.environ["OPENAI_MODEL"],
+        model=os.environ["OPENAI_MODEL"]))
+    messages = [{"role": "user", "content": "Hawks vs Bears"}]
+    try:
+        with Env(OPENAI_API_KEY="sk-test") as env:
+            env.set(OPENAI_MODEL="gpt-4o-mini")
+            assert llm_backends.get_backend().chat(messages) == "gpt-4o-mini"
+            assert llm_backends.get_backend().chat(messages) == "gpt-4o-mini"      # same model: cached
+            env.set(OPENAI_MODEL="gpt-4o")
+            assert llm_backends.get_backend().chat(messages) == "gpt-4o"           # new model: not the old recap
+    finally:
+        llm_backends.get_gate = get_gate
+        llm_backends._REGISTRY.clear()
+        llm_backends._REGISTRY.update(registry)
+    assert calls == ["gpt-4o-mini", "gpt-4o"]
+
+    # The local backend is keyed by the model the server loaded and where it runs
+    health = LocalLLM.health
+    LocalLLM.health = lambda self: {"model": "m.gguf"}
+    try:
+        with Env(LOCAL_LLM_URL="http://127.0.0.1:9001"):
+            assert llm_backends._local_backend().model == "m.gguf@http://127.0.0.1:9001"
+    finally:
+        LocalLLM.health = health
+
+
+def test_requests_arriving_together_share_a_batch():
+    engine = FakeEngine(delay_s=0.05)
+    batcher = Batcher(engine, max_batch=8, window_s=0.3)
+    assert _submit_all(batcher, 4) == [f"recap for m{i}" for i in range(4)]
+    assert engine.batches == [4] and batcher.stats()["avg_batch"] == 4.0
+
+    engine = FakeEngine()
+    batcher = Batcher(engine, max_batch=2, window_s=0.3)
+    assert len(_submit_all(batcher, 5)) == 5 and max(engine.batches) == 2 and sum(engine.batches) == 5
+
+
+def test_only_requests_with_the_same_sampling_params_share_a_batch():
+    engine = FakeEngine(delay_s=0.05)
+    batcher = Batcher(engine, max_batch=8, window_s=0.3)
+    hot = lambda i: {"temperature": 0.95 if i % 2 else 0.7, "top_p": 0.9}
+    assert _submit_all(batcher, 4, params=hot) == [f"recap for m{i}" for i in range(4)]
+    assert sorted(engine.batches) == [2, 2] and all(len(p) == 1 for p in engine.params)
+    assert batcher.stats()["completed"] == 4
+
+
+def test_batch_failures_and_timeouts_reach_every_caller():
+    results = _submit_all(Batcher(FakeEngine(fail=True), window_s=0.1), 3)
+    assert all(isinstance(r, RuntimeError) and "out of memory" in str(r) for r in results)
+    slow = _submit_all(Batcher(FakeEngine(delay_s=0.5), window_s=0.0), 1, timeout=0.05)
+    assert isinstance(slow[0], TimeoutError)
+
+
+def test_local_client_talks_to_the_server():
+    batcher = Batcher(FakeEngine(), window_s=0.0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(batcher, "fake-model", request_timeout=5.0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = LocalLLM(f"http://127.0.0.1:{server.server_address[1]}/")
+        assert client.health()["engine"] == "fake"
+        assert client([{"role": "user", "content": "Hawks vs Bears"}]) == "recap for Hawks vs Bears"
+        assert client.health()["completed"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_server_address_comes_from_the_parsed_url()
+    test_autostart_is_off_unless_asked_for()
+    test_backend_selection()
+    test_changing_the_model_misses_the_gate_cache()
+    test_requests_arriving_together_share_a_batch()
+    test_only_requests_with_the_same_sampling_params_share_a_batch()
+    test_batch_failures_and_timeouts_reach_every_caller()
+    test_local_client_talks_to_the_server()
+    print("✅ LLM backend checks passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+test_llm_gate.py - Checks the shared cross-process rate limiter and response cache
+Run directly or via pytest; uses a temp SQLite file and fake LLM calls.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+
+from llm_gate import LLMGate
+
+MESSAGES = [{"role": "user", "content": "Recap Week 3"}]
+
+
+def _db():
+    return os.path.join(tempfile.mkdtemp(), "gate.sqlite")
+
+
+def _worker(db, n):
+    gate = LLMGate(db_path=db, rpm=1200, burst_s=0.05)  # 20 req/s shared, 1-request bucket
+    for _ in range(n):
+        gate.acquire("fake")
+
+
+def test_rate_limit_is_shared_across_processes():
+    db = _db()
+    LLMGate(db_path=db)  # create schema up front
+    t0 = time.perf_counter()
+    procs = [multiprocessing.Process(target=_worker, args=(db, 10)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t0
+    print(f"20 requests across 2 processes at 20/s: {elapsed:.2f}s")
+    assert elapsed >= 0.8  # one shared budget, not 2x
+
+
+def test_cache_and_report():
+    calls = []
+    gate = LLMGate(db_path=_db(), rpm=6000)
+    chat = gate.wrap(lambda messages, **kw: calls.append(1) or "Sabre says hi", namespace="fake")
+    assert chat(MESSAGES, temperature=0.9) == "Sabre says hi"
+    assert chat(MESSAGES, temperature=0.9) == "Sabre says hi"
+    assert len(calls) == 1
+    chat(MESSAGES, temperature=0.5)  # different params -> new request
+    assert len(calls) == 2
+    report = gate.report()
+    assert report["cache_hits"] == 1 and report["requests"] == 2
+
+
+def test_429_backs_everyone_off():
+    class RateLimitError(Exception):
+        status_code = 429
+
+    attempts = []
+
+    def flaky(messages, **kw):
+        attempts.append(time.perf_counter())
+        if len(attempts) == 1:
+            raise RateLimitError("slow down")
+        return "ok"
+
+    gate = LLMGate(db_path=_db(), rpm=600, cache_ttl_s=0)
+    import llm_gate
+    original = llm_gate._retry_after
+    llm_gate._retry_after = lambda e: 0.3
+    try:
+        assert gate.wrap(flaky, namespace="fake")(MESSAGES) == "ok"
+    finally:
+        llm_gate._retry_after = original
+    assert attempts[1] - attempts[0] >= 0.25
+    assert gate.report()["rate_limited"] == 1
+
+
+def test_429_while_streaming_is_retried():
+    class RateLimitError(Exception):
+        status_code = 429
+
+    opened = []
+
+    def stream(messages, **kw):
+        opened.append(1)
+        if len(opened) == 1:
+            raise RateLimitError("slow down")    # raised on first iteration, like a real SSE stream
+        yield "Sabre "
+        yield "says hi"
+
+    gate = LLMGate(db_path=_db(), rpm=6000, cache_ttl_s=0)
+    import llm_gate
+    original = llm_gate._retry_after
+    llm_gate._retry_after = lambda e: 0.01
+    try:
+        assert "".join(gate.wrap_stream(stream, namespace="fake")(MESSAGES)) == "Sabre says hi"
+    finally:
+        llm_gate._retry_after = original
+    assert len(opened) == 2 and gate.report()["rate_limited"] == 1
+
+
+if __name__ == "__main__":
+    test_rate_limit_is_shared_across_processes()
+    test_cache_and_report()
+    test_429_backs_everyone_off()
+    test_429_while_streaming_is_retried()
+    print("✅ LLM gate checks passed")
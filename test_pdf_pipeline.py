@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+test_pdf_pipeline.py - Chained in-memory PDF post-processing with per-step timing
+Run directly or via pytest; external tools (gs, pikepdf, pypdfium2) are not required.
+"""
+
+import io
+import re
+import tempfile
+import zlib
+from pathlib import Path
+
+from PIL import Image
+
+from scripts import pdf_pipeline
+from scripts.pdf_pipeline import PdfJob, RasterPdfWriter
+from scripts.lock_pdf import lock_pdf
+
+
+def _pdf_bytes():
+    out = io.BytesIO()
+    Image.new("RGB", (200, 100), "white").save(out, format="PDF")
+    return out.getvalue()
+
+
+def test_steps_chain_in_memory_with_timings():
+    seen = []
+
+    def stamp(data):
+        seen.append(len(data))
+        return data + b"\n%stamped\n"
+
+    data, timings = PdfJob(["stamp", "lock"], extra_steps={"stamp": stamp}).run(_pdf_bytes())
+    assert [t.step for t in timings] == ["stamp", "lock"]
+    assert timings[0].bytes_out == timings[1].bytes_in
+    assert data.startswith(b"%PDF") and seen
+
+
+def test_unknown_step_is_rejected():
+    try:
+        PdfJob(["shred"]).run(_pdf_bytes())
+    except ValueError as e:
+        assert "shred" in str(e)
+    else:
+        raise AssertionError("unknown step accepted")
+
+
+def test_raster_writer_streams_pages_with_a_valid_xref():
+    writer = RasterPdfWriter(dpi=100)
+    for _ in range(2):
+        writer.add_page(850, 1100, zlib.compress(b"\xff" * 850 * 1100 * 3))
+    data = writer.finish()
+
+    assert b"/Count 2" in data and b"/MediaBox [0 0 612.00 792.00]" in data
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    entries = re.findall(rb"(\d{10}) 00000 n", data[xref:])
+    for num, offset in enumerate(entries, start=1):
+        assert data[int(offset):].startswith(f"{num} 0 obj".encode())
+
+
+def test_pdfa_keeps_ghostscript_messages_off_stdout():
+    calls = []
+
+    def fake_run(cmd, input=None, stdout=None, check=False):
+        calls.append(cmd)
+        return type("Done", (), {"stdout": input})()
+
+    original = pdf_pipeline.subprocess.run, pdf_pipeline.shutil.which
+    pdf_pipeline.subprocess.run, pdf_pipeline.shutil.which = fake_run, lambda tool: f"/usr/bin/{tool}"
+    try:
+        assert pdf_pipeline.pdfa(_pdf_bytes()).startswith(b"%PDF")
+    finally:
+        pdf_pipeline.subprocess.run, pdf_pipeline.shutil.which = original
+    cmd = calls[0]
+    assert cmd[0] == "gs" and "-sstdout=%stderr" in cmd
+    assert cmd.index("-sstdout=%stderr") < cmd.index("-sOutputFile=-")
+
+
+def test_missing_tools_are_named():
+    original = pdf_pipeline.shutil.which, pdf_pipeline._have_pdfium
+    pdf_pipeline.shutil.which, pdf_pipeline._have_pdfium = (lambda tool: None), (lambda: False)
+    try:
+        for step, tool, package in (("pdfa", "gs", "ghostscript"), ("flatten", "pdfinfo", "poppler-utils")):
+            try:
+                PdfJob([step]).run(_pdf_bytes())
+            except RuntimeError as e:
+                assert tool in str(e) and package in str(e), e
+            else:
+                raise AssertionError(f"{step} ran without {tool}")
+    finally:
+        pdf_pipeline.shutil.which, pdf_pipeline._have_pdfium = original
+
+
+def test_lock_script_still_writes_a_pdf():
+    tmp = Path(tempfile.mkdtemp())
+    (tmp / "in.pdf").write_bytes(_pdf_bytes())
+    lock_pdf(str(tmp / "in.pdf"), str(tmp / "out" / "locked.pdf"))
+    assert (tmp / "out" / "locked.pdf").read_bytes().startswith(b"%PDF")
+
+
+if __name__ == "__main__":
+    test_steps_chain_in_memory_with_timings()
+    test_unknown_step_is_rejected()
+    test_raster_writer_streams_pages_with_a_valid_xref()
+    test_pdfa_keeps_ghostscript_messages_off_stdout()
+    test_missing_tools_are_named()
+    test_lock_script_still_writes_a_pdf()
+    print("✅ PDF pipeline checks passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+test_recap_grammar.py - Checks the no-LLM phrase-grammar recaps
+Run directly or via pytest; no LLM or network needed.
+"""
+
+import time
+
+from recap_grammar import GRAMMAR, compile_grammar, render_blurb, render_recap
+from storymaker import MatchupData, PlayerStat, SABRE_SIGNOFF, StoryMaker
+
+
+def _matchup(score_a=131.4, score_b=88.2, **kwargs):
+    return MatchupData(
+        league_name="Legends League",
+        week=5,
+        team_a="Nana's Hawks",
+        team_b="Jimmy Birds",
+        score_a=score_a,
+        score_b=score_b,
+        top_performers=[PlayerStat(name="Ja'Marr Chase", team="Nana's Hawks", points=34.2)],
+        **kwargs,
+    )
+
+
+def test_recaps_are_bounded_and_deterministic():
+    for score_a, score_b in ((101.0, 99.5), (120.0, 105.0), (140.0, 115.0), (150.0, 70.0), (70.0, 60.0)):
+        d = _matchup(score_a, score_b, streak_a=4, bench_mistakes=["Jimmy Birds: Benched A (WR, 20.0 pts) while starting B (WR, 2.0 pts)"])
+        for seed in range(25):
+            text = render_recap(d, seed=seed)
+            words = len(text.split())
+            assert 200 <= words <= 250, (score_a, score_b, seed, words)
+            assert text.count("\n\n") == 2
+            assert "{" not in text and "<" not in text
+        assert render_recap(d) == render_recap(d)
+    print("Sample recap:\n" + render_recap(_matchup()))
+
+
+def test_features_pick_matching_phrases():
+    blowout = render_blurb(_matchup(150.0, 70.0))
+    close = render_blurb(_matchup(100.0, 98.0))
+    assert "absolute demolition" in blowout
+    assert "nail-biter" in close
+    assert 25 <= len(close.split()) <= 45
+
+
+def test_grammar_compiles_and_rejects_unknown_symbols():
+    compile_grammar(GRAMMAR)
+    try:
+        compile_grammar({"a": ["<missing>"]})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown symbol should fail to compile")
+
+
+def test_fast_no_llm_mode():
+    maker = StoryMaker(llm=None)
+    d = _matchup()
+    recap = maker.generate_recap(d)
+    assert recap.endswith(SABRE_SIGNOFF)
+
+    t0 = time.perf_counter()
+    for seed in range(1000):
+        render_recap(d, seed=seed)
+    per_recap_us = (time.perf_counter() - t0) * 1e6 / 1000
+    print(f"Grammar recap: {per_recap_us:.0f} µs each")
+    assert per_recap_us < 2000
+
+
+if __name__ == "__main__":
+    test_recaps_are_bounded_and_deterministic()
+    test_features_pick_matching_phrases()
+    test_grammar_compiles_and_rejects_unknown_symbols()
+    test_fast_no_llm_mode()
+    print("✅ Recap grammar checks passed")
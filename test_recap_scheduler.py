@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+test_recap_scheduler.py - Checks deadline/timeout/hedging behaviour of the recap scheduler
+Run directly or via pytest; uses a fake LLM, no network needed.
+"""
+
+import os
+import threading
+import time
+
+import llm_backends
+import weekly_recap
+from recap_scheduler import SOURCE_FALLBACK, SOURCE_HEDGED, SOURCE_LLM, RecapScheduler, call_with_timeout
+from storymaker import MatchupData, StoryMaker
+
+GOOD = "\n\n".join(["Sabre saw it all unfold and has notes on every single lineup decision made this week."] * 9)
+
+
+def _matchups(n):
+    return [(i + 1, MatchupData("League", 3, f"Team {i}A", f"Team {i}B", score_a=100.0 + i, score_b=90.0)) for i in range(n)]
+
+
+def test_hung_call_falls_back_only_for_that_matchup():
+    def llm(messages, **kwargs):
+        if "Team 2A" in messages[-1]["content"]:
+            time.sleep(5)  # hangs well past the call timeout
+        return GOOD
+
+    maker = StoryMaker(llm=llm)
+    t0 = time.perf_counter()
+    recaps, report = RecapScheduler(maker, deadline_s=3, call_timeout_s=0.5, hedge=False).run(_matchups(4))
+    elapsed = time.perf_counter() - t0
+
+    for line in report.summary_lines():
+        print(line)
+    assert elapsed < 2.0
+    assert [o.source for o in report.outcomes] == [SOURCE_LLM, SOURCE_LLM, SOURCE_FALLBACK, SOURCE_LLM]
+    assert report.outcomes[2].reason == "timeout"
+    assert recaps[2] == maker.fallback_recap(_matchups(4)[2][1])
+    assert report.llm_count == 3 and report.fallback_count == 1
+
+
+def test_deadline_caps_the_whole_stage():
+    def llm(messages, **kwargs):
+        time.sleep(0.4)
+        return GOOD
+
+    recaps, report = RecapScheduler(StoryMaker(llm=llm), deadline_s=0.6, call_timeout_s=5, max_workers=1, hedge=False).run(_matchups(4))
+    assert report.elapsed_s < 1.0
+    assert report.outcomes[0].source == SOURCE_LLM
+    assert any(o.reason == "deadline" for o in report.outcomes)
+    assert all(recaps)
+
+
+def test_slow_call_is_hedged():
+    calls = {}
+    lock = threading.Lock()
+
+    def llm(messages, **kwargs):
+        key = messages[-1]["content"]
+        with lock:
+            calls[key] = calls.get(key, 0) + 1
+            first = calls[key] == 1
+        if "Team 3A" in key and first:
+            time.sleep(3)  # first attempt stalls; the hedge answers quickly
+        else:
+            time.sleep(0.05)
+        return GOOD
+
+    recaps, report = RecapScheduler(StoryMaker(llm=llm), deadline_s=5, call_timeout_s=4, max_workers=2).run(_matchups(5))
+    for line in report.summary_lines():
+        print(line)
+    assert report.hedges >= 1
+    assert report.outcomes[3].source == SOURCE_HEDGED
+    assert report.fallback_count == 0
+
+
+def test_call_with_timeout():
+    assert call_with_timeout(lambda: "ok", 1) == (True, "ok")
+    t0 = time.perf_counter()
+    assert call_with_timeout(lambda: time.sleep(5), 0.2) == (False, None)
+    assert time.perf_counter() - t0 < 1
+    try:
+        call_with_timeout(lambda: 1 / 0, 1)
+    except ZeroDivisionError:
+        pass
+    else:
+        raise AssertionError("error was swallowed")
+
+
+class HungBackend:
+    """Answers the batch request only after the deadline, with nothing usable; records when each call started."""
+    name = "hung"
+    chat_stream = None
+
+    def __init__(self):
+        self.started = []
+
+    def chat(self, messages, **kwargs):
+        self.started.append(time.perf_counter())
+        time.sleep(1.0)
+        return "[]"
+
+
+def test_batch_stage_is_held_to_the_deadline():
+    ctx = {"LEAGUE_NAME": "League", "WEEK_NUMBER": 3, "MATCHUP_COUNT": 3}
+    for i in (1, 2, 3):
+        ctx.update({f"MATCHUP{i}_HOME": f"Team {i}A", f"MATCHUP{i}_AWAY": f"Team {i}B",
+                    f"MATCHUP{i}_HS": "101.0", f"MATCHUP{i}_AS": "99.0"})
+    saved = llm_backends.get_backend, weekly_recap.DEFAULT_DEADLINE_S, os.environ.get("RECAP_VARIETY")
+    backend = HungBackend()
+    llm_backends.get_backend = lambda: backend
+    weekly_recap.DEFAULT_DEADLINE_S = 0.5
+    os.environ["RECAP_VARIETY"] = "0"
+    try:
+        t0 = time.perf_counter()
+        weekly_recap._attach_sabre_recaps(ctx, batch=True)
+        elapsed = time.perf_counter() - t0
+        time.sleep(1.0)     # the abandoned batch call returns: its per-matchup fallbacks must not start
+    finally:
+        llm_backends.get_backend, weekly_recap.DEFAULT_DEADLINE_S = saved[0], saved[1]
+        if saved[2] is None:
+            os.environ.pop("RECAP_VARIETY", None)
+        else:
+            os.environ["RECAP_VARIETY"] = saved[2]
+    maker = StoryMaker(llm=None)
+    assert elapsed < 1.0
+    assert len(backend.started) == 1 and backend.started[0] < t0 + 0.5
+    assert all(ctx[f"MATCHUP{i}_BLURB"] == maker.fallback_recap(data) for i, data in weekly_recap._matchups_from_ctx(ctx))
+
+
+if __name__ == "__main__":
+    test_hung_call_falls_back_only_for_that_matchup()
+    test_deadline_caps_the_whole_stage()
+    test_slow_call_is_hedged()
+    test_call_with_timeout()
+    test_batch_stage_is_held_to_the_deadline()
+    print("✅ Recap scheduler checks passed")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+test_recap_variety.py - Checks the past-recap MinHash index used for variety re-rolls
+Run directly or via pytest; no LLM or network needed.
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from recap_variety import RecapIndex, minhash
+from storymaker import MatchupData, StoryMaker
+
+BASE = (
+    "Nana's Hawks folded like a defense in the red zone, and the Champ cooked them like a "
+    "Thanksgiving turkey. The quarterback threw more picks than a guitar store on Black Friday, "
+    "while the bench sat there smoother than Sunday morning coffee. Call it chaos football, "
+    "hilarious for neutrals and nerve-wracking for fans who expected a playoff push this week."
+)
+
+FRESH = (
+    "Jimmy Birds spent Sunday auditioning for a cooking show nobody ordered, burning every drive "
+    "before the oven even warmed up. Annie's squad answered with a tidy, efficient performance that "
+    "looked like tax software finally working on the first try, stacking points in quiet, boring, "
+    "devastating fashion until the scoreboard read like a ransom note."
+)
+
+
+def _random_recap(rng):
+    words = ["blitz", "turkey", "coffee", "rocket", "parade", "waffle", "tornado", "laser",
+             "glacier", "karaoke", "lasagna", "meteor", "bagpipe", "origami", "trombone"]
+    return " ".join(rng.choice(words) for _ in range(220))
+
+
+def test_near_duplicate_flagged():
+    index = RecapIndex("test-league")
+    index.add(BASE, week=1, year=2025)
+
+    again = BASE.replace("this week", "again")
+    report = index.check(again)
+    print(f"Near-dup similarity: {report.max_similarity:.2f}, phrases: {report.repeated_phrases[:3]}")
+    assert report.needs_reroll
+    assert report.max_similarity > 0.5
+
+    fresh = index.check(FRESH)
+    print(f"Fresh similarity: {fresh.max_similarity:.2f}, phrases: {fresh.repeated_phrases}")
+    assert not fresh.needs_reroll
+
+
+def test_team_names_are_not_flagged_as_phrases():
+    index = RecapIndex("names")
+    index.add("Under the InfluWENTZ beat Kansas City Pumas again and again.")
+    report = index.check("Under the InfluWENTZ beat Kansas City Pumas once more.",
+                         ignore=["Under the InfluWENTZ", "Kansas City Pumas"])
+    assert report.repeated_phrases == []
+
+
+def test_lookup_stays_fast_as_archive_grows():
+    rng = random.Random(7)
+    index = RecapIndex("big")
+    for week in range(2000):
+        index.add(_random_recap(rng), week=week)
+    sig = minhash(FRESH)
+    t0 = time.perf_counter()
+    for _ in range(100):
+        index.check(FRESH, sig=sig)
+    per_lookup_ms = (time.perf_counter() - t0) * 1000 / 100
+    print(f"Lookup over {len(index.records)} recaps: {per_lookup_ms:.3f} ms")
+    assert per_lookup_ms < 1.0
+
+
+def test_save_and_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "league.json"
+        index = RecapIndex("persist", path=path)
+        index.add(BASE, week=3, year=2025)
+        index.add(FRESH, week=3, year=2025, matchup="Hawks vs Bears")
+        index.save()
+        reloaded = RecapIndex.load("persist", path=path)
+    assert len(reloaded.records) == 2 and reloaded.phrases == index.phrases
+    assert reloaded.check(BASE.replace("this week", "again")).needs_reroll
+    assert not reloaded.check(BASE).needs_reroll  # identical text = re-render, not a repeat
+    # Replacing a reloaded record takes its phrases back out
+    reloaded.add(BASE, week=3, year=2025, matchup="Hawks vs Bears")
+    assert len(reloaded.records) == 2 and set(reloaded.phrases.values()) == {2}
+
+
+def test_rerunning_a_week_replaces_its_recaps():
+    index = RecapIndex("rerun")
+    index.add(BASE, week=5, year=2025, matchup="Hawks vs Bears")
+    phrases = dict(index.phrases)
+
+    # The same week built again: one record per matchup, phrase counts unchanged
+    index.add(BASE, week=5, year=2025, matchup="Hawks vs Bears")
+    assert len(index.records) == 1 and index.phrases == phrases
+
+    # A new draft for that matchup is not compared with the recap it replaces...
+    key = RecapIndex.record_id(2025, 5, "Hawks vs Bears")
+    redraft = BASE.replace("this week", "again")
+    assert index.check(redraft).needs_reroll and not index.check(redraft, exclude=key).needs_reroll
+    # ...and takes its place, phrases and all
+    index.add(FRESH, week=5, year=2025, matchup="Hawks vs Bears")
+    assert len(index.records) == 1 and not set(index.phrases) & set(phrases)
+    assert not index.check(redraft).needs_reroll
+
+    # Another matchup or week is a separate record
+    index.add(BASE, week=5, year=2025, matchup="Owls vs Lions")
+    index.add(BASE, week=6, year=2025, matchup="Hawks vs Bears")
+    assert len(index.records) == 3 and set(index.phrases.values()) == {1, 2}
+
+
+def test_reroll_only_when_needed():
+    calls = []
+
+    def llm(messages, **kwargs):
+        calls.append(messages[-1]["content"])
+        return "\n\n".join([FRESH] * 3)  # 3 paragraphs, long enough to keep
+
+    maker = StoryMaker(llm=llm)
+    data = MatchupData("League", 2, "Nana's Hawks", "The Champ Big Daddy")
+    index = RecapIndex("reroll")
+    index.add(BASE, week=1)
+
+    assert maker.ensure_variety(data, FRESH, index) == FRESH
+    assert calls == []
+
+    recycled = BASE.replace("this week", "again")
+    result = maker.ensure_variety(data, recycled, index)
+    assert result != recycled
+    assert len(calls) == 1
+    assert "do NOT reuse" in calls[0]
+
+
+if __name__ == "__main__":
+    test_near_duplicate_flagged()
+    test_team_names_are_not_flagged_as_phrases()
+    test_lookup_stays_fast_as_archive_grows()
+    test_save_and_reload()
+    test_rerunning_a_week_replaces_its_recaps()
+    test_reroll_only_when_needed()
+    print("✅ Recap variety checks passed")
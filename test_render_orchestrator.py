@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+test_render_orchestrator.py - Renders HTML, DOCX and share cards from one shared context
+Run directly or via pytest; no ESPN or LLM access needed (PDF needs WeasyPrint, so it's skipped here).
+"""
+
+import tempfile
+from pathlib import Path
+
+from render_orchestrator import RenderBundle, parse_formats, render_formats
+
+LOGO = next(Path("logos/team_logos").glob("*.png"), None)
+
+
+def _bundle():
+    ctx = {"LEAGUE_NAME": "Legends League", "WEEK_NUMBER": 5, "YEAR": 2025, "MATCHUP_COUNT": 2,
+           "LEAGUE_LOGO": "Legends League", "SPONSOR_LOGO": "", "FOOTER_NOTE": "",
+           "WEEKLY_INTRO": "Week 5 delivered its usual chaos."}
+    for award in ("CUPCAKE", "KITTY", "TOP", "EFFICIENCY"):
+        ctx.update({f"AWARD_{award}_TEAM": "Home Team 1", f"AWARD_{award}_NOTE": "101.20"})
+    for i in (1, 2):
+        ctx.update({
+            f"MATCHUP{i}_HOME": f"Home Team {i}",
+            f"MATCHUP{i}_AWAY": f"Away Team {i}",
+            f"MATCHUP{i}_HS": "101.2",
+            f"MATCHUP{i}_AS": "99.0",
+            f"MATCHUP{i}_BLURB": "Sabre watched it all unfold. It was chaos from start to finish.",
+            f"MATCHUP{i}_HOME_LOGO": str(LOGO.resolve()) if LOGO else "",
+            f"MATCHUP{i}_AWAY_LOGO": "",
+            f"MATCHUP{i}_TOP_HOME": "Star Back — 31.4 pts",
+            f"MATCHUP{i}_TOP_AWAY": "Deep Threat — 24.0 pts",
+            f"MATCHUP{i}_BUST": "Big Name — 2.1 pts",
+            f"MATCHUP{i}_KEYPLAY": "Star Back went for 31.4",
+            f"MATCHUP{i}_DEF": "Defense ruled the day",
+        })
+    return RenderBundle(ctx=ctx, stem=Path(tempfile.mkdtemp()) / "Gazette_2025_W05")
+
+
+def test_fan_out_writes_each_format():
+    bundle = _bundle()
+    report = render_formats(bundle, ["html", "docx", "cards"])
+    for line in report.summary_lines():
+        print(line)
+    assert all(r.ok for r in report.results.values()), report.results
+    assert len(report.results["cards"].paths) == 2
+
+    html = Path(report.results["html"].paths[0]).read_text(encoding="utf-8")
+    assert "Home Team 1" in html
+    if LOGO:
+        assert "data:image/png;base64," in html
+        assert str(LOGO.resolve()) not in html
+
+    from docx import Document
+    text = "\n".join(p.text for p in Document(report.results["docx"].paths[0]).paragraphs)
+    assert "Home Team 1 vs Away Team 1" in text
+
+
+def test_writer_failure_is_isolated():
+    bundle = _bundle()
+    bundle.docx_template = "missing.dotx"
+    report = render_formats(bundle, ["cards", "docx"])
+    assert report.results["cards"].ok
+    assert not report.results["docx"].ok
+
+
+def test_bad_context_fails_before_any_writer():
+    from template_schema import TemplateContextError
+
+    bundle = _bundle()
+    bundle.ctx["MATCHUP2_BLRUB"] = bundle.ctx.pop("MATCHUP2_BLURB")
+    try:
+        render_formats(bundle, ["html", "docx", "cards"])
+    except TemplateContextError as e:
+        assert "MATCHUP2_BLRUB (did you mean MATCHUP2_BLURB?)" in str(e)
+    else:
+        raise AssertionError("misspelled key was rendered")
+    assert not bundle.stem.parent.exists() or not any(bundle.stem.parent.iterdir())
+
+
+def test_parse_formats():
+    assert parse_formats("all") == ["pdf", "html", "docx", "cards"]
+    assert parse_formats("pdf, cards") == ["pdf", "cards"]
+
+
+if __name__ == "__main__":
+    test_fan_out_writes_each_format()
+    test_writer_failure_is_isolated()
+    test_bad_context_fails_before_any_writer()
+    test_parse_formats()
+    print("✅ Render orchestrator checks passed")
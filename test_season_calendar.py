@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+test_season_calendar.py - Season calendar: computed weeks, finality, the cached ESPN schedule, rebuild decisions
+Run directly or via pytest; the pro schedule is served from a fixture (no network).
+"""
+
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from espn_api.requests.espn_requests import EspnFantasyRequests
+
+from job_queue import JobQueue
+from season_calendar import (SOURCE_COMPUTED, SOURCE_ESPN, calendar_path, computed_calendar, get_calendar,
+                             labor_day, resolve_week, season_year)
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def _ms(*args):
+    return int(_ts(*args) * 1000)
+
+
+def _pro_schedule():
+    # Week 1 opens Thu Sep 4 and closes with MNF; week 2 (a short one here) ends Sunday night
+    games = {
+        1: {"1": [{"date": _ms(2025, 9, 5, 0, 20)}], "2": [{"date": _ms(2025, 9, 14, 17, 0)}]},
+        2: {"1": [{"date": _ms(2025, 9, 9, 0, 15)}], "2": [{"date": _ms(2025, 9, 15, 0, 20)}]},
+    }
+    return {"settings": {"proTeams": [{"id": 0, "proGamesByScoringPeriod": {}}] +
+                         [{"id": team, "proGamesByScoringPeriod": by_week} for team, by_week in games.items()]}}
+
+
+class FakeProSchedule:
+    """Serves the pro schedule in place of EspnFantasyRequests.get and counts calls."""
+
+    def __init__(self, payload):
+        self.payload, self.calls = payload, 0
+
+    def __enter__(self):
+        self._original = EspnFantasyRequests.get
+        EspnFantasyRequests.get = lambda _self, params=None, headers=None, extend="": self._serve(params)
+        return self
+
+    def __exit__(self, *exc):
+        EspnFantasyRequests.get = self._original
+
+    def _serve(self, params):
+        assert params == {"view": "proTeamSchedules_wl"}
+        self.calls += 1
+        return self.payload
+
+
+def test_computed_calendar_and_finality():
+    assert str(labor_day(2025)) == "2025-09-01" and str(labor_day(2024)) == "2024-09-02"
+    cal = computed_calendar(2025)
+    assert cal.source == SOURCE_COMPUTED and len(cal.weeks) == 18 and len(computed_calendar(2020).weeks) == 17
+    week1 = cal.window(1)
+    assert datetime.fromtimestamp(week1.first_kickoff, timezone.utc).strftime("%a %b %d") == "Fri Sep 05"  # Thu night ET
+    assert cal.window(2).first_kickoff - week1.first_kickoff == 7 * 86400 and cal.window(19) is None
+
+    monday_night = _ts(2025, 9, 9, 3, 0)          # MNF of week 1 still on
+    tuesday_noon = _ts(2025, 9, 9, 16, 0)
+    assert not cal.is_final(1, monday_night) and cal.current_week(monday_night) == 1
+    assert cal.is_final(1, tuesday_noon) and cal.current_week(tuesday_noon) == 2
+    assert cal.last_final_week(tuesday_noon) == 1 and cal.last_final_week(monday_night) == 0
+    assert cal.last_final_week(_ts(2026, 2, 1)) == 18 and cal.current_week(_ts(2026, 2, 1)) == 18
+    assert season_year(_ts(2026, 1, 10)) == 2025 and season_year(_ts(2025, 9, 10)) == 2025
+
+
+def test_refresh_caches_the_pro_schedule_for_offline_lookups():
+    cache = Path(tempfile.mkdtemp())
+    assert get_calendar(2025, cache_dir=cache).source == SOURCE_COMPUTED   # nothing cached: computed, no request
+
+    with FakeProSchedule(_pro_schedule()) as espn:
+        fetched = get_calendar(2025, refresh=True, cache_dir=cache)
+        cached = get_calendar(2025, cache_dir=cache)
+        assert espn.calls == 1 and calendar_path(2025, cache).exists()
+    assert cached.source == fetched.source == SOURCE_ESPN and [w.week for w in cached.weeks] == [1, 2]
+    assert cached.window(1).last_kickoff == _ts(2025, 9, 9, 0, 15)
+
+    # Week 2 ended Sunday night in this schedule: final Monday morning, not Tuesday
+    monday = _ts(2025, 9, 15, 12, 0)
+    assert cached.is_final(2, monday) and not computed_calendar(2025).is_final(2, monday)
+
+    # A failed refresh keeps the cached schedule
+    with FakeProSchedule({"settings": {"proTeams": []}}):
+        assert get_calendar(2025, refresh=True, cache_dir=cache).window(2).last_kickoff == cached.window(2).last_kickoff
+
+
+def test_week_resolution_and_rebuilds_after_the_week_goes_final():
+    assert resolve_week(2025, 7) == 7
+    assert resolve_week(2025, now=_ts(2025, 8, 1)) == 1 and resolve_week(2025, now=_ts(2025, 10, 15)) == 6
+
+    cal = computed_calendar(2025)
+    clock = [cal.window(5).first_kickoff + 3600]   # built mid-week (an unfinished build)
+    queue = JobQueue(str(Path(tempfile.mkdtemp()) / "jobs.sqlite"), clock=lambda: clock[0])
+    job_id, _ = queue.enqueue(1, 2025, 5, stale_before=cal.final_at(5))
+    queue.complete(queue.claim("w"))
+
+    clock[0] = cal.final_at(5) + 60                # the week is final now: the early build is redone once
+    assert queue.enqueue(1, 2025, 5, stale_before=cal.final_at(5)) == (job_id, True)
+    queue.complete(queue.claim("w"))
+    assert queue.enqueue(1, 2025, 5, stale_before=cal.final_at(5)) == (job_id, False)
+
+
+if __name__ == "__main__":
+    test_computed_calendar_and_finality()
+    test_refresh_caches_the_pro_schedule_for_offline_lookups()
+    test_week_resolution_and_rebuilds_after_the_week_goes_final()
+    print("✅ Season calendar checks passed")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+test_soffice_pool.py - Queue/restart behaviour of the warm LibreOffice pool
+Run directly or via pytest. Uses a stand-in instance class (LibreOffice itself isn't needed).
+"""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import scripts.soffice_pool as soffice_pool
+from scripts.docx_to_pdf import docx_to_pdf
+from scripts.soffice_pool import MODE_ONESHOT, SofficeInstance, SofficePool
+
+
+class EchoInstance:
+    """Writes a fake PDF; the first document it sees crashes it once."""
+    starts = 0
+    lock = threading.Lock()
+
+    def __init__(self, index):
+        self.index = index
+        self.crashed = False
+
+    def start(self):
+        with EchoInstance.lock:
+            EchoInstance.starts += 1
+
+    def alive(self):
+        return True
+
+    def restart(self):
+        self.start()
+
+    def stop(self, keep_profile=False):
+        pass
+
+    def convert(self, docx, out_dir, pdfa=False):
+        if self.index == 0 and not self.crashed:
+            self.crashed = True
+            raise RuntimeError("soffice crashed")
+        time.sleep(0.05)
+        pdf = out_dir / (docx.stem + ".pdf")
+        pdf.write_bytes(b"%PDF-1.4\n")
+        return pdf
+
+
+def test_batch_survives_a_crash_and_keeps_order():
+    tmp = Path(tempfile.mkdtemp())
+    docs = []
+    for i in range(6):
+        p = tmp / f"league_{i}.docx"
+        p.write_bytes(b"docx")
+        docs.append(str(p))
+
+    t0 = time.perf_counter()
+    with SofficePool(instances=3, instance_factory=EchoInstance) as pool:
+        results = pool.convert_batch(docs, out_dir=str(tmp / "pdf"))
+    elapsed = time.perf_counter() - t0
+
+    assert all(r.ok for r in results), [r.error for r in results]
+    assert [Path(r.pdf).stem for r in results] == [f"league_{i}" for i in range(6)]
+    assert pool.restarts == 1 and sum(r.restarts for r in results) == 1
+    assert elapsed < 6 * 0.05  # documents ran on several instances at once
+
+
+def test_profiles_persist_and_oneshot_can_be_refused():
+    tmp = Path(tempfile.mkdtemp())
+    first = SofficeInstance(0, profile_dir=tmp, mode=MODE_ONESHOT)
+    (first.profile / "registrymodifications.xcu").write_text("warm")
+    first.stop()
+    again = SofficeInstance(0, profile_dir=tmp, mode=MODE_ONESHOT)
+    assert again.profile == first.profile and (again.profile / "registrymodifications.xcu").exists()
+    assert not again.resident
+
+    soffice_pool.REQUIRE_RESIDENT = True
+    try:
+        SofficeInstance(1, profile_dir=tmp, mode=MODE_ONESHOT)
+    except RuntimeError as e:
+        assert "SOFFICE_REQUIRE_RESIDENT" in str(e)
+    else:
+        raise AssertionError("one-shot mode was not refused")
+    finally:
+        soffice_pool.REQUIRE_RESIDENT = False
+
+
+class BrokenInstance(EchoInstance):
+    def convert(self, docx, out_dir, pdfa=False):
+        raise RuntimeError("soffice exited 1")
+
+
+def test_docx_to_pdf_failure_is_still_file_not_found():
+    docx = Path(tempfile.mkdtemp()) / "league.docx"
+    docx.write_bytes(b"docx")
+    saved = soffice_pool._POOL
+    soffice_pool._POOL = SofficePool(instances=1, instance_factory=BrokenInstance)
+    try:
+        docx_to_pdf(str(docx))
+    except FileNotFoundError as e:
+        assert "league.docx" in str(e)
+    else:
+        raise AssertionError("no error for a failed conversion")
+    finally:
+        soffice_pool._POOL.close()
+        soffice_pool._POOL = saved
+
+
+if __name__ == "__main__":
+    test_batch_survives_a_crash_and_keeps_order()
+    test_profiles_persist_and_oneshot_can_be_refused()
+    test_docx_to_pdf_failure_is_still_file_not_found()
+    print("✅ soffice pool checks passed")
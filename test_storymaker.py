@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+test_storymaker.py - Recap prompts (shared system prefix, token budget trimming), batch recap parsing
+and streamed recaps cut off at the bounds
+Run directly or via pytest; no LLM is called.
+"""
+
+import json
+
+import storymaker
+from storymaker import (SABRE_SIGNOFF, MatchupData, PlayerStat, PromptCompiler, _parse_batch_recaps,
+                        count_message_tokens, stream_recap_draft)
+
+
+def _data(**kwargs):
+    fields = dict(
+        league_name="Legends League", week=5, team_a="Hawks", team_b="Bears", score_a=120.5, score_b=99.0,
+        winner="Hawks", margin=21.5,
+        top_performers=[PlayerStat(f"Player {i}", "WR", f"{i} rec, {i * 20} yds, 1 TD", "Hawks") for i in range(1, 4)],
+        big_plays=[f"Big play {i}: a long touchdown down the sideline in the fourth quarter" for i in range(1, 4)],
+        injury_notes=[f"Injury {i}: hamstring tightness, questionable to return" for i in range(1, 4)],
+        bench_mistakes=[f"Mistake {i}: benched a 20-point wideout for a 2-point one" for i in range(1, 4)],
+    )
+    fields.update(kwargs)
+    return MatchupData(**fields)
+
+
+def _facts(messages):
+    return json.loads(messages[1]["content"].split("Facts: ", 1)[1])
+
+
+def _tokens(data):
+    return count_message_tokens(PromptCompiler(token_budget=10 ** 6).compile("recap", data))
+
+
+def test_system_message_is_shared_per_week():
+    compiler = PromptCompiler()
+    a = compiler.compile("recap", _data())
+    b = compiler.compile("recap", _data(team_a="Owls", team_b="Lions"))
+    assert a[0] is b[0] and "Week 5" in a[0]["content"]
+    assert compiler.compile("recap", _data(week=6))[0] is not a[0]
+    assert "Legends League" not in a[1]["content"]          # the header lives in the system message only
+
+
+def test_over_budget_prompts_lose_the_least_important_facts_first():
+    full = _tokens(_data())
+    no_big_plays = _tokens(_data(big_plays=[]))
+
+    # Just over budget: big plays go first, from the end of the list
+    compiler = PromptCompiler(token_budget=full - 1)
+    facts = _facts(compiler.compile("recap", _data()))
+    assert facts["big_plays"] == [f"Big play {i}: a long touchdown down the sideline in the fourth quarter" for i in (1, 2)]
+    assert len(facts["injury_notes"]) == len(facts["bench_mistakes"]) == len(facts["top_performers"]) == 3
+
+    # Big plays gone entirely is not enough: injury notes go next
+    compiler = PromptCompiler(token_budget=no_big_plays - 1)
+    facts = _facts(compiler.compile("recap", _data()))
+    assert "big_plays" not in facts and len(facts["injury_notes"]) == 2
+    assert len(facts["bench_mistakes"]) == len(facts["top_performers"]) == 3
+    assert compiler.report()["trimmed_requests"] == 1 and compiler.report()["over_budget_requests"] == 0
+
+    # Hopeless budget: every trimmable list goes, the score and teams stay, and it is counted
+    compiler = PromptCompiler(token_budget=50)
+    facts = _facts(compiler.compile("recap", _data()))
+    assert not {"big_plays", "injury_notes", "bench_mistakes", "top_performers"} & set(facts)
+    assert facts["teams"] == {"a": "Hawks", "b": "Bears"} and facts["score"] == {"a": 120.5, "b": 99.0}
+    assert compiler.report()["over_budget_requests"] == 1
+
+
+def test_within_budget_prompts_are_untouched():
+    compiler = PromptCompiler(token_budget=10 ** 6)
+    facts = _facts(compiler.compile("recap", _data()))
+    assert all(len(facts[k]) == 3 for k in ("big_plays", "injury_notes", "bench_mistakes", "top_performers"))
+    report = compiler.report()
+    assert report["requests"] == 1 and report["trimmed_requests"] == 0
+    assert report["prompt_tokens"] == _tokens(_data())
+
+
+def test_batch_recaps_land_in_their_slots():
+    indexed = '```json\n[{"index": 2, "recap": "C"}, {"index": 0, "recap": "A"}, {"index": 1, "recap": " B "}]\n```'
+    assert _parse_batch_recaps(indexed, 3) == ["A", "B", "C"]
+    assert _parse_batch_recaps('{"recaps": ["A", "B"]}', 3) == ["A", "B", None]
+    assert _parse_batch_recaps('Sure! Here you go: ["A", "B", "C"] Enjoy.', 3) == ["A", "B", "C"]
+
+
+def test_mixed_or_malformed_batches_never_overwrite():
+    # An indexed entry keeps its slot; the bare string fills the slot left free
+    assert _parse_batch_recaps('[{"index": 1, "recap": "B"}, "A"]', 2) == ["A", "B"]
+    # Duplicate indexes: the first one wins
+    assert _parse_batch_recaps('[{"index": 0, "recap": "A"}, {"index": 0, "recap": "A2"}]', 2) == ["A", None]
+    # Bad or missing indexes count as unindexed; out-of-range indexes and empty recaps are dropped
+    raw = '[{"index": "x", "recap": "P"}, {"index": 7, "recap": "Q"}, {"recap": ""}, {"index": 0, "recap": "A"}, 42]'
+    assert _parse_batch_recaps(raw, 3) == ["A", "P", None]
+    assert _parse_batch_recaps("not json at all", 2) == [None, None]
+    assert _parse_batch_recaps('{"recap": "A"}', 1) == [None]
+
+
+class Stream:
+    """A provider stream: yields small deltas and records how far it was read and whether it was closed."""
+
+    def __init__(self, text, size=7):
+        self.text, self.size, self.sent, self.closed = text, size, 0, False
+
+    def __iter__(self):
+        try:
+            for i in range(0, len(self.text), self.size):
+                self.sent = i + self.size
+                yield self.text[i:i + self.size]
+        finally:
+            self.closed = True
+
+
+def _para(n, word="word"):
+    return " ".join(f"{word}{i}" for i in range(n)) + "."
+
+
+def test_stream_stops_at_the_word_limit():
+    stream = Stream("\n\n".join(_para(120) for _ in range(4)))
+    text, metrics = stream_recap_draft(iter(stream), max_words=250)
+    assert metrics.stopped_early and stream.closed and stream.sent < len(stream.text)
+    assert len(text.split()) == 250 and text.endswith(".") and text.count("\n\n") == 2
+    assert metrics.tokens_received >= metrics.tokens_kept > 0 and metrics.time_to_first_token_s is not None
+
+
+def test_stream_stops_at_the_sign_off_and_drops_it():
+    stream = Stream(_para(210) + "\n\n" + SABRE_SIGNOFF + "\n\nP.S. " + _para(200, "extra"))
+    text, metrics = stream_recap_draft(iter(stream))
+    assert metrics.stopped_early and stream.closed and "Sabre" not in text and "extra" not in text
+    assert len(text.split()) == 210
+
+
+def test_stream_stops_when_an_extra_paragraph_begins():
+    stream = Stream("\n\n".join(_para(70) for _ in range(5)))
+    text, metrics = stream_recap_draft(iter(stream), max_words=1000)
+    assert metrics.stopped_early and stream.closed
+    assert [len(p.split()) for p in text.split("\n\n")] == [70, 70, 70]
+
+
+def test_stream_cleans_markdown_split_across_chunks():
+    stream = Stream("**Big** win for the _Hawks_.\n\n## Kicker\nThat is all.", size=3)
+    text, metrics = stream_recap_draft(iter(stream))
+    assert not metrics.stopped_early and stream.sent >= len(stream.text)
+    assert "**" not in text and "##" not in text and "Big win" in text
+
+
+def test_stream_cleans_each_line_once():
+    cleaned = []
+    original = storymaker.clean_markdown_for_docx
+    storymaker.clean_markdown_for_docx = lambda text: cleaned.append(text) or original(text)
+    try:
+        stream = Stream("\n\n".join(_para(70) for _ in range(3)), size=2)
+        text, metrics = stream_recap_draft(iter(stream), max_words=1000)
+    finally:
+        storymaker.clean_markdown_for_docx = original
+    assert not metrics.stopped_early and len(text.split()) == 210
+    # four completed lines (two paragraphs, two blanks), then the unterminated last one once at the end
+    assert len(cleaned) == 4 + 1 and len(stream.text) // stream.size > 500
+
+
+if __name__ == "__main__":
+    test_system_message_is_shared_per_week()
+    test_over_budget_prompts_lose_the_least_important_facts_first()
+    test_within_budget_prompts_are_untouched()
+    test_batch_recaps_land_in_their_slots()
+    test_mixed_or_malformed_batches_never_overwrite()
+    test_stream_stops_at_the_word_limit()
+    test_stream_stops_at_the_sign_off_and_drops_it()
+    test_stream_stops_when_an_extra_paragraph_begins()
+    test_stream_cleans_markdown_split_across_chunks()
+    test_stream_cleans_each_line_once()
+    print("✅ Storymaker checks passed")
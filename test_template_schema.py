@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+test_template_schema.py - Placeholder schemas from the real templates, and context checks against them
+Run directly or via pytest; no ESPN or LLM access needed.
+"""
+
+import tempfile
+from pathlib import Path
+
+import template_schema
+from template_schema import IMAGE, TemplateContextError, check_context, load_schema, validate_context
+from weekly_recap import resolve_template_path
+
+HTML = str(resolve_template_path("templates/recap_template.html"))
+DOCX = "GridironGazette.dotx"
+
+
+def _ctx(count=2):
+    """What gazette_data.build_context produces (including keys no template uses)."""
+    ctx = {"LEAGUE_NAME": "Legends League", "WEEK_NUMBER": 5, "WEEK": 5, "YEAR": 2025, "MATCHUP_COUNT": count,
+           "LEAGUE_LOGO": "Legends League", "SPONSOR_LOGO": "", "SPONSOR_LINE": "", "FOOTER_NOTE": "",
+           "WEEKLY_INTRO": "Week 5 delivered its usual chaos."}
+    for award in ("CUPCAKE", "KITTY", "TOP", "EFFICIENCY"):
+        ctx.update({f"AWARD_{award}_TEAM": "Team A", f"AWARD_{award}_NOTE": "88.10"})
+    for i in range(1, count + 1):
+        for side in ("HOME", "AWAY"):
+            ctx.update({
+                f"MATCHUP{i}_{side}": f"{side.title()} Team {i}",
+                f"MATCHUP{i}_{side}_LOGO": "",
+                f"MATCHUP{i}_TOP_{side}": "Star Back — 31.4 pts",
+                f"MATCHUP{i}_{side}_TOP_SCORER": "Star Back",
+                f"MATCHUP{i}_{side}_TOP_POINTS": 31.4,
+                f"MATCHUP{i}_{side}_OPTIMAL": 120.5,
+                f"MATCHUP{i}_{side}_BENCH_MISTAKES": ["Left 18.2 on the bench"],
+                f"MATCHUP{i}_{side}_STREAK": 2,
+            })
+        ctx.update({f"MATCHUP{i}_HS": "101.20", f"MATCHUP{i}_AS": "99.00", f"MATCHUP{i}_BLURB": "",
+                    f"MATCHUP{i}_BUST": "Big Name — 2.1 pts", f"MATCHUP{i}_KEYPLAY": "Star Back went for 31.4",
+                    f"MATCHUP{i}_DEF": "Defense ruled the day"})
+    return ctx
+
+
+def test_html_schema_follows_the_template_guards():
+    schema = load_schema(HTML)
+    p = schema.placeholders
+    assert p["WEEK_NUMBER"].required
+    assert not p["MATCHUP1_BLURB"].required and not p["MATCHUP1_BLURB"].when   # {% if MATCHUP1_BLURB %}
+    assert p["MATCHUP1_HS"].when == ["MATCHUP1_HOME"] and p["MATCHUP1_HS"].matchup == 1
+    assert p["MATCHUP1_HOME_LOGO"].kind == IMAGE
+    assert p["LEAGUE_LOGO"].kind != IMAGE   # shown as text in the masthead
+
+
+def test_docx_schema_reads_every_part():
+    schema = load_schema(DOCX)
+    assert "word/header1.xml" in schema.placeholders["LEAGUE_LOGO"].parts
+    assert "word/footer1.xml" in schema.placeholders["SPONSOR_LOGO"].parts
+    assert schema.placeholders["SPONSOR_LOGO"].kind == IMAGE
+    assert {"MATCHUP6_TEAMS", "AWARD_PLAY_NOTE"} <= set(schema.names)
+
+
+def test_gazette_context_passes_both_templates():
+    from render_orchestrator import RenderBundle, _docx_context
+
+    ctx = _ctx()
+    assert validate_context(load_schema(HTML), ctx).ok, validate_context(load_schema(HTML), ctx).summary()
+    docx_ctx = _docx_context(RenderBundle(ctx=ctx, stem=Path("unused")), lambda path: path)
+    report = validate_context(load_schema(DOCX), docx_ctx)
+    assert report.ok and not report.misspelled, report.summary()
+
+
+def test_missing_misspelled_and_mistyped_keys():
+    ctx = _ctx()
+    del ctx["WEEK_NUMBER"]
+    del ctx["MATCHUP2_AS"]                            # needed: MATCHUP2_HOME is set
+    ctx["MATCHUP1_BLRUB"] = ctx.pop("MATCHUP1_BLURB")
+    ctx["MATCHUP1_DEF"] = ["not", "text"]
+    report = validate_context(load_schema(HTML), ctx)
+    assert report.missing == ["MATCHUP2_AS", "WEEK_NUMBER"]
+    assert report.misspelled == {"MATCHUP1_BLRUB": "MATCHUP1_BLURB"}
+    assert report.type_errors == ["MATCHUP1_DEF is a list, expected text"]
+
+    try:
+        check_context(HTML, ctx)
+    except TemplateContextError as e:
+        assert "did you mean MATCHUP1_BLURB?" in str(e)
+    else:
+        raise AssertionError("strict check passed a broken context")
+    assert not check_context(HTML, ctx, mode="warn").ok
+
+
+def test_schema_cache_is_keyed_by_template_hash():
+    cache = Path(tempfile.mkdtemp())
+    template_schema._MEMORY.clear()
+    first = load_schema(DOCX, cache_dir=cache)
+    files = list(cache.glob("GridironGazette-dotx-*.json"))
+    assert len(files) == 1 and first.sha1[:16] in files[0].name
+
+    template_schema._MEMORY.clear()
+    again = load_schema(DOCX, cache_dir=cache)
+    assert again.names == first.names and again.placeholders["LEAGUE_LOGO"].parts == ["word/header1.xml"]
+
+
+if __name__ == "__main__":
+    test_html_schema_follows_the_template_guards()
+    test_docx_schema_reads_every_part()
+    test_gazette_context_passes_both_templates()
+    test_missing_misspelled_and_mistyped_keys()
+    test_schema_cache_is_keyed_by_template_hash()
+    print("✅ Template schema checks passed")
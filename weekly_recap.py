@@ -6,6 +6,7 @@ Generates HTML from Jinja2 template and converts to PDF
 from __future__ import annotations
 import os
 import json
+import time
 import logging
 from pathlib import Path
 from typing import Any, Dict, Optional, List
@@ -30,19 +31,20 @@ from storymaker import (
     MatchupData, 
     PlayerStat,
     clean_markdown_for_docx,
-    clean_all_markdown_in_dict
+    summarize_stream_metrics,
 )
 
 # Set up logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
-# Optional OpenAI wrapper
-try:
-    from llm_openai import chat as openai_llm
-except Exception:
-    openai_llm = None
-    logger.info("OpenAI LLM not available, will use fallback templates")
+# LLM backends (OpenAI or the local model server); None -> fallback templates
+import llm_backends
+import llm_gate
+from recap_variety import RecapIndex
+from recap_scheduler import DEFAULT_DEADLINE_S, RecapScheduler, SOURCE_FALLBACK, call_with_timeout
+from asset_bundler import AssetBundler
+from template_schema import check_context
 
 
 def clean_for_pdf(text):
@@ -85,6 +87,8 @@ def build_weekly_recap(
     template: str = "templates/recap_template.html",
     output_path: str = "recaps/Gazette_{year}_W{week02}.pdf",
     use_llm_blurbs: bool = True,
+    batch_recaps: bool = False,
+    stream_recaps: bool = False,
 ) -> str:
     """
     Builds the Gazette PDF from HTML template:
@@ -97,58 +101,68 @@ def build_weekly_recap(
     Args:
         league_id: ESPN league ID
         year: Season year
-        week: Week number (None for current week)
+        week: Week number (None for the latest final week)
         template: Path to HTML template
         output_path: Output path pattern
         use_llm_blurbs: Whether to use LLM for Sabre blurbs
+        batch_recaps: Generate the whole week's recaps in a single LLM request
+        stream_recaps: Stream recaps and stop generating at the word limit
     """
-    # Get base context from ESPN
-    ctx = gazette_data.build_context(league_id, year, week)
+    ctx = build_render_context(
+        league_id, year, week,
+        use_llm_blurbs=use_llm_blurbs,
+        batch_recaps=batch_recaps,
+        stream_recaps=stream_recaps,
+    )
+    
+    # Fail fast on missing/misspelled keys before the (slow) PDF render
+    check_context(str(resolve_template_path(template)), ctx)
+
+    # Render HTML and convert to PDF
+    out = _render_html_to_pdf(template, output_path, ctx)
     
-    # Use the week from context if not provided
-    if week is None:
-        week = ctx.get("WEEK_NUMBER", ctx.get("WEEK", 1))
+    logger.info(f"✅ Generated PDF gazette: {out}")
+    return out
+
+
+def build_render_context(
+    league_id: int,
+    year: int,
+    week: Optional[int] = None,
+    use_llm_blurbs: bool = True,
+    batch_recaps: bool = False,
+    stream_recaps: bool = False,
+    league: Any = None,
+) -> gazette_data.GazetteContext:
+    """
+    Fetch ESPN data, attach Sabre recaps and logos, and clean the text —
+    the format-independent context every writer (PDF, HTML, DOCX, cards) uses.
+    ``league`` reuses an already opened espn_api League.
+    """
+    # Get base context from ESPN
+    ctx = gazette_data.build_context(league_id, year, week, league=league)
     
     # Add Sabre blurbs
     if use_llm_blurbs:
-        _attach_sabre_recaps(ctx)
+        _attach_sabre_recaps(ctx, batch=batch_recaps, stream=stream_recaps)
     else:
         _attach_simple_blurbs(ctx)
     
     # Add team logos from team_logos.json
     _attach_team_logos(ctx)
     
-    # Clean all markdown from the context
-    ctx = clean_all_markdown_in_dict(ctx)
-    
-    # Clean all text for PDF (handle emojis and special characters)
-    ctx = _clean_context_for_pdf(ctx)
-    
-    # Render HTML and convert to PDF
-    out = _render_html_to_pdf(template, output_path, ctx)
+    # Strip markdown, then make text PDF-safe (emojis, special characters).
+    # Applied as values are read, so the context is never copied per pass.
+    if not isinstance(ctx, gazette_data.GazetteContext):
+        ctx = gazette_data.GazetteContext(ctx)
+    ctx.add_text_filter(clean_markdown_for_docx)
+    ctx.add_text_filter(clean_for_pdf)
     
-    logger.info(f"✅ Generated PDF gazette: {out}")
-    return out
+    return ctx
 
 
-def _clean_context_for_pdf(ctx: Dict[str, Any]) -> Dict[str, Any]:
-    """Clean all string values in context for PDF generation"""
-    cleaned = {}
-    for key, value in ctx.items():
-        if isinstance(value, str):
-            cleaned[key] = clean_for_pdf(value)
-        elif isinstance(value, dict):
-            cleaned[key] = _clean_context_for_pdf(value)
-        elif isinstance(value, list):
-            cleaned[key] = [clean_for_pdf(item) if isinstance(item, str) else item for item in value]
-        else:
-            cleaned[key] = value
-    return cleaned
-
-
-def _render_html_to_pdf(template_path: str, output_pattern: str, ctx: Dict[str, Any]) -> str:
-    """Render HTML template and convert to PDF"""
-    
+def resolve_template_path(template_path: str) -> Path:
+    """The HTML template, trying the usual alternate locations"""
     tpl_path = Path(template_path)
     if not tpl_path.exists():
         # Try alternate paths
@@ -163,6 +177,25 @@ def _render_html_to_pdf(template_path: str, output_pattern: str, ctx: Dict[str,
                 break
         else:
             raise FileNotFoundError(f"Template not found: {template_path}")
+    return tpl_path
+
+
+def render_html(template_path: str, ctx: Dict[str, Any]) -> str:
+    """Render the Jinja2 HTML template with the gazette context"""
+    tpl_path = resolve_template_path(template_path)
+    
+    # Set up Jinja2 environment with UTF-8 encoding
+    template_dir = tpl_path.parent if tpl_path.parent.exists() else Path('.')
+    env = Environment(
+        loader=FileSystemLoader(str(template_dir)),
+        autoescape=True
+    )
+    template = env.get_template(tpl_path.name)
+    return template.render(**ctx)
+
+
+def _render_html_to_pdf(template_path: str, output_pattern: str, ctx: Dict[str, Any], save_html: bool = True) -> str:
+    """Render HTML template and convert to PDF"""
     
     # Get week and year for output filename
     week = int(ctx.get("WEEK_NUMBER", ctx.get("WEEK", 0)))
@@ -178,41 +211,46 @@ def _render_html_to_pdf(template_path: str, output_pattern: str, ctx: Dict[str,
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    # Set up Jinja2 environment with UTF-8 encoding
-    template_dir = tpl_path.parent if tpl_path.parent.exists() else Path('.')
-    env = Environment(
-        loader=FileSystemLoader(str(template_dir)),
-        autoescape=True
-    )
-    template = env.get_template(tpl_path.name)
-    
     # Render HTML
     try:
-        html_content = template.render(**ctx)
+        html_content = render_html(template_path, ctx)
     except Exception as e:
         logger.error(f"Template rendering failed: {e}")
         # Save context for debugging
         debug_file = output_file.with_suffix('.debug.json')
         with open(debug_file, 'w', encoding='utf-8') as f:
-            json.dump(ctx, f, indent=2, ensure_ascii=False, default=str)
+            json.dump(dict(ctx), f, indent=2, ensure_ascii=False, default=str)
         logger.info(f"Context saved to {debug_file} for debugging")
         raise
+
+    return html_to_pdf(html_content, output_file, save_html=save_html)
+
+
+def html_to_pdf(html_content: str, output_file: Path, save_html: bool = True) -> str:
+    """Bundle assets and convert already rendered gazette HTML to a PDF"""
+    output_file = Path(output_file)
+
+    # Local fonts, print-sized logos, no network references
+    bundler = AssetBundler()
+    html_content = bundler.bundle_html(html_content, inline=False)
+    logger.info(bundler.summary())
     
     # Save HTML for debugging (with proper encoding)
     html_debug = output_file.with_suffix('.html')
-    try:
-        with open(html_debug, 'w', encoding='utf-8', errors='replace') as f:
-            f.write(html_content)
-        logger.debug(f"Saved HTML debug file: {html_debug}")
-    except Exception as e:
-        logger.warning(f"Could not save HTML debug file: {e}")
+    if save_html:
+        try:
+            with open(html_debug, 'w', encoding='utf-8', errors='replace') as f:
+                f.write(html_content)
+            logger.debug(f"Saved HTML debug file: {html_debug}")
+        except Exception as e:
+            logger.warning(f"Could not save HTML debug file: {e}")
     
     # Convert to PDF
     try:
         if USE_WEASYPRINT:
             # WeasyPrint with encoding handling
             from weasyprint import HTML
-            HTML(string=html_content, encoding='utf-8').write_pdf(str(output_file))
+            HTML(string=html_content, encoding='utf-8', base_url=str(Path.cwd()), url_fetcher=bundler.url_fetcher).write_pdf(str(output_file))
             logger.info(f"✅ Generated PDF with WeasyPrint: {output_file}")
         else:
             # pdfkit with encoding handling
@@ -254,7 +292,7 @@ def _render_html_to_pdf(template_path: str, output_pattern: str, ctx: Dict[str,
             logger.info("Trying WeasyPrint as fallback...")
             try:
                 from weasyprint import HTML
-                HTML(string=html_content, encoding='utf-8').write_pdf(str(output_file))
+                HTML(string=html_content, encoding='utf-8', base_url=str(Path.cwd()), url_fetcher=bundler.url_fetcher).write_pdf(str(output_file))
                 logger.info(f"✅ Generated PDF with WeasyPrint fallback: {output_file}")
                 return str(output_file)
             except Exception as e2:
@@ -340,15 +378,21 @@ def _attach_team_logos(ctx: Dict[str, Any]) -> None:
             ctx[f"MATCHUP{i}_AWAY_LOGO"] = ""
 
 
-def _attach_sabre_recaps(ctx: Dict[str, Any]) -> None:
-    """Generate and attach Sabre recaps using the StoryMaker"""
-    
-    maker = StoryMaker(llm=openai_llm if os.getenv("OPENAI_API_KEY") else None)
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _matchups_from_ctx(ctx: Dict[str, Any]) -> List[tuple]:
+    """Build (slot index, MatchupData) pairs from the flat template context"""
     
     count = int(ctx.get("MATCHUP_COUNT", 7))
     league_name = str(ctx.get("LEAGUE_NAME", "League"))
     week_num = int(ctx.get("WEEK_NUMBER", ctx.get("WEEK", 0)))
     
+    matchups = []
     for i in range(1, min(count + 1, 11)):
         home = ctx.get(f"MATCHUP{i}_HOME")
         away = ctx.get(f"MATCHUP{i}_AWAY")
@@ -364,9 +408,9 @@ def _attach_sabre_recaps(ctx: Dict[str, Any]) -> None:
         top_away = ctx.get(f"MATCHUP{i}_TOP_AWAY", "")
         
         if top_home:
-            top_performers.append(PlayerStat(name=top_home, team=home))
+            top_performers.append(PlayerStat(name=ctx.get(f"MATCHUP{i}_HOME_TOP_SCORER") or top_home, team=home, points=_as_float(ctx.get(f"MATCHUP{i}_HOME_TOP_POINTS"))))
         if top_away:
-            top_performers.append(PlayerStat(name=top_away, team=away))
+            top_performers.append(PlayerStat(name=ctx.get(f"MATCHUP{i}_AWAY_TOP_SCORER") or top_away, team=away, points=_as_float(ctx.get(f"MATCHUP{i}_AWAY_TOP_POINTS"))))
         
         # Parse scores
         try:
@@ -375,8 +419,12 @@ def _attach_sabre_recaps(ctx: Dict[str, Any]) -> None:
         except (ValueError, TypeError):
             score_a = score_b = 0.0
         
+        # Bench points left behind (from the optimal-lineup solver)
+        bench_mistakes = [f"{home}: {m}" for m in ctx.get(f"MATCHUP{i}_HOME_BENCH_MISTAKES") or []]
+        bench_mistakes += [f"{away}: {m}" for m in ctx.get(f"MATCHUP{i}_AWAY_BENCH_MISTAKES") or []]
+        
         # Create matchup data
-        matchup_data = MatchupData(
+        matchups.append((i, MatchupData(
             league_name=league_name,
             week=week_num,
             team_a=str(home),
@@ -384,71 +432,132 @@ def _attach_sabre_recaps(ctx: Dict[str, Any]) -> None:
             score_a=score_a,
             score_b=score_b,
             top_performers=top_performers,
+            bench_mistakes=bench_mistakes,
             winner=str(home) if score_a >= score_b else str(away),
             margin=abs(score_a - score_b),
+            streak_a=ctx.get(f"MATCHUP{i}_HOME_STREAK"),
+            streak_b=ctx.get(f"MATCHUP{i}_AWAY_STREAK"),
+        )))
+    
+    return matchups
+
+
+def _set_recap(ctx: Dict[str, Any], i: int, recap: str) -> None:
+    """Format a recap for HTML display and store it in its matchup slot"""
+    paragraphs = recap.split('\n\n')
+    cleaned_paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    ctx[f"MATCHUP{i}_BLURB"] = '\n\n'.join(cleaned_paragraphs)
+
+
+def _attach_sabre_recaps(ctx: Dict[str, Any], batch: bool = False, stream: bool = False) -> None:
+    """
+    Generate and attach Sabre recaps using the StoryMaker.
+    With ``batch=True`` the whole week goes out as one LLM request; only
+    recaps that fail validation are regenerated individually.
+    With ``stream=True`` per-matchup recaps stream and stop at the word limit.
+    Every LLM call in the stage (batch request, per-matchup recaps, variety
+    re-rolls) fits in one RECAP_DEADLINE_S budget; whatever runs out of time
+    keeps its template or first-draft recap.
+    """
+    
+    backend = llm_backends.get_backend()
+    if backend is None:
+        logger.info("No LLM backend configured, will use fallback templates")
+    t0 = time.perf_counter()
+    deadline = t0 + DEFAULT_DEADLINE_S
+    maker = StoryMaker(
+        llm=backend.chat if backend else None,
+        stream_llm=backend.chat_stream if (backend and stream) else None,
+        deadline=deadline,   # calls abandoned at the deadline start no further requests
+    )
+    matchups = _matchups_from_ctx(ctx)
+    
+    # Past recaps for this league, to catch recycled metaphors
+    variety = None
+    if maker.llm is not None and os.getenv("RECAP_VARIETY", "1") != "0":
+        variety = RecapIndex.load(str(ctx.get("LEAGUE_ID") or ctx.get("LEAGUE_NAME", "league")))
+    
+    schedule = None
+    fallback_slots = set()
+    if batch and maker.llm is not None:
+        done, recaps = call_with_timeout(
+            lambda: maker.generate_recaps_batch([data for _, data in matchups], clean_markdown=True),
+            DEFAULT_DEADLINE_S,
+        )
+        if not done:
+            logger.warning(f"Batch recaps missed the {DEFAULT_DEADLINE_S:g}s deadline; using template recaps")
+            recaps = [maker.fallback_recap(data, clean_markdown=True) for _, data in matchups]
+            fallback_slots = {i for i, _ in matchups}
+    elif maker.llm is not None:
+        # Deadline-aware: per-call timeouts, hedged slow calls, template fallback per matchup
+        recaps, schedule = RecapScheduler(maker).run(matchups, clean_markdown=True)
+        fallback_slots = {o.slot for o in schedule.outcomes if o.source == SOURCE_FALLBACK}
+        for line in schedule.summary_lines():
+            logger.info(line)
+    else:
+        # Generate recaps with markdown cleaning
+        recaps = [maker.generate_recap(data, clean_markdown=True) for _, data in matchups]
+    
+    for (i, data), recap in zip(matchups, recaps):
+        if variety is not None and i not in fallback_slots:
+            # Re-roll only this matchup if it repeats past issues (or earlier recaps this week),
+            # within what is left of the stage deadline. A re-run replaces this matchup's recap.
+            matchup = f"{data.team_a} vs {data.team_b}"
+            key = RecapIndex.record_id(ctx.get("YEAR"), data.week, matchup)
+            done, rerolled = call_with_timeout(
+                lambda data=data, recap=recap, key=key: maker.ensure_variety(data, recap, variety, exclude=key),
+                deadline - time.perf_counter(),
+            )
+            if done:
+                recap = rerolled
+            else:
+                logger.info(f"No time left for variety re-rolls ({data.team_a} vs {data.team_b} keeps its draft)")
+            variety.add(recap, week=data.week, year=ctx.get("YEAR"), matchup=matchup,
+                        ignore=[data.team_a, data.team_b, data.league_name])
+        _set_recap(ctx, i, recap)
+        logger.info(f"Generated Sabre recap for matchup {i}: {clean_for_pdf(data.team_a)} vs {clean_for_pdf(data.team_b)}")
+    
+    if variety is not None:
+        try:
+            variety.save()
+        except Exception as e:
+            logger.warning(f"Could not save recap variety index: {e}")
+    
+    # Prompt-size report for this gazette (LLM cost/latency tracking)
+    if maker.llm is not None:
+        elapsed = time.perf_counter() - t0
+        rate = len(matchups) / (elapsed / 60.0) if elapsed > 0 else 0.0
+        logger.info(f"LLM backend '{backend.name}': {len(matchups)} recaps in {elapsed:.1f}s ({rate:.1f} recaps/min)")
+        stats = maker.compiler.report()
+        logger.info(
+            f"Prompt tokens this gazette: {stats['prompt_tokens']} over {stats['requests']} requests "
+            f"(avg {stats['avg_prompt_tokens']}, budget {stats['token_budget']}/request, "
+            f"trimmed {stats['trimmed_requests']}, tokenizer={stats['tokenizer']})"
+        )
+    gate = llm_gate.get_gate() if maker.llm is not None else None
+    if gate is not None:
+        g = gate.report()
+        logger.info(
+            f"LLM gate: {g['requests']} requests, {g['cache_hits']} cache hits, {g['throttled']} throttled "
+            f"(queue wait {g['wait_s']}s total, {g['max_wait_s']}s max), {g['rate_limited']} provider 429s"
+        )
+    if maker.stream_metrics:
+        sstats = summarize_stream_metrics(maker.stream_metrics)
+        logger.info(
+            f"Streaming: avg time-to-first-token {sstats['avg_ttft_s']}s (max {sstats['max_ttft_s']}s), "
+            f"{sstats['stopped_early']}/{sstats['streams']} stopped early, "
+            f"{sstats['tokens_discarded']} of {sstats['tokens_received']} streamed tokens discarded"
         )
-        
-        # Generate recap with markdown cleaning
-        recap = maker.generate_recap(matchup_data, clean_markdown=True)
-        
-        # Format for HTML display
-        paragraphs = recap.split('\n\n')
-        cleaned_paragraphs = [p.strip() for p in paragraphs if p.strip()]
-        recap = '\n\n'.join(cleaned_paragraphs)
-        
-        ctx[f"MATCHUP{i}_BLURB"] = recap
-        
-        logger.info(f"Generated Sabre recap for matchup {i}: {clean_for_pdf(home)} vs {clean_for_pdf(away)}")
 
 
 def _attach_simple_blurbs(ctx: Dict[str, Any]) -> None:
-    """Attach simple fallback blurbs when LLM is not available"""
-    
-    count = int(ctx.get("MATCHUP_COUNT", 7))
+    """Attach fallback recaps (phrase grammar, no LLM) to any empty matchup slots"""
     
-    for i in range(1, min(count + 1, 11)):
+    maker = StoryMaker(llm=None)
+    for i, data in _matchups_from_ctx(ctx):
         if ctx.get(f"MATCHUP{i}_BLURB"):
             continue
-            
-        home = ctx.get(f"MATCHUP{i}_HOME")
-        away = ctx.get(f"MATCHUP{i}_AWAY")
-        home_score = ctx.get(f"MATCHUP{i}_HS")
-        away_score = ctx.get(f"MATCHUP{i}_AS")
-        
-        if not (home and away):
-            continue
-        
-        try:
-            score_a = float(home_score) if home_score else 0.0
-            score_b = float(away_score) if away_score else 0.0
-        except (ValueError, TypeError):
-            score_a = score_b = 0.0
-        
-        winner = home if score_a >= score_b else away
-        loser = away if winner == home else home
-        margin = abs(score_a - score_b)
-        
-        if margin < 5:
-            tone = "nail-biter"
-        elif margin > 30:
-            tone = "absolute demolition"
-        elif margin > 20:
-            tone = "statement win"
-        else:
-            tone = "solid victory"
-        
-        blurb = f"In a {tone}, {winner} topped {loser} {home_score}-{away_score}. "
-        
-        if margin < 5:
-            blurb += "This one came down to the wire, with every decision mattering in the final outcome. "
-        elif margin > 30:
-            blurb += f"{loser} might want to forget this one ever happened. "
-        else:
-            blurb += f"{winner} controlled the game and earned the W. "
-        
-        blurb += "\n\n—Sabre, your hilariously snarky 4-legged Gridiron Gazette reporter 🐾"
-        
-        ctx[f"MATCHUP{i}_BLURB"] = clean_markdown_for_docx(blurb)
+        _set_recap(ctx, i, maker.generate_recap(data, clean_markdown=True))
 
 
 def verify_setup():
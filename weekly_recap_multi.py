@@ -2,6 +2,16 @@
 """
 weekly_recap_multi.py — Run multiple leagues from config file
 Updated to support Sabre-style LLM blurbs
+
+Each league is a job in the persistent build queue (job_queue.py): leagues
+already built for the week are skipped, failed ones are retried with backoff,
+an interrupted run resumes where it stopped, and --workers builds several
+leagues at once. A league's "priority" in the config orders the queue.
+
+What to build is decided offline from the season calendar
+(season_calendar.py): --auto-week picks the latest final week, leagues whose
+week is not final yet are skipped (--allow-unfinished builds them anyway),
+and a gazette built before its week went final is built again.
 """
 import argparse
 import sys
@@ -13,14 +23,18 @@ import json
 from pathlib import Path
 import yaml
 
+from job_queue import DEFAULT_ATTEMPTS, DEFAULT_DB, DEFAULT_WORKERS, DONE, Job, JobQueue, run_workers
+from season_calendar import get_calendar, resolve_week
+
 def parse_args():
     p = argparse.ArgumentParser(description="Build gazettes for multiple leagues")
     p.add_argument("--config", default="leagues.yml", help="Config file (YAML or JSON)")
     
     # Week selection
     p.add_argument("--week", type=int, help="Specific week number")
-    p.add_argument("--auto-week", action="store_true", help="Auto-detect week")
-    p.add_argument("--week-offset", type=int, default=0, help="Week offset")
+    p.add_argument("--auto-week", action="store_true", help="Latest final week (the default without --week)")
+    p.add_argument("--week-offset", type=int, default=0, help="Added to the auto-detected week")
+    p.add_argument("--allow-unfinished", action="store_true", help="Build even if the week's games are not all final")
     
     # LLM options
     p.add_argument("--llm-blurbs", action="store_true", help="Generate LLM blurbs")
@@ -29,16 +43,20 @@ def parse_args():
     
     # Output
     p.add_argument("--output-dir", default="recaps", help="Output directory")
-    p.add_argument("--stop-on-fail", action="store_true", help="Stop on first failure")
+    p.add_argument("--stop-on-fail", action="store_true", help="Stop once a league has used up its retries")
     p.add_argument("--verbose", action="store_true", help="Verbose output")
     
+    # Queue
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Leagues built at once")
+    p.add_argument("--attempts", type=int, default=DEFAULT_ATTEMPTS, help="Attempts per league before giving up")
+    p.add_argument("--force", action="store_true", help="Rebuild leagues already built for this week")
+    p.add_argument("--db", default=DEFAULT_DB, help="Job queue database")
+    
     return p.parse_args()
 
-def compute_auto_week(offset=0) -> int:
-    """Compute current week number"""
-    today = dt.date.today()
-    wk = int(today.strftime("%U"))
-    return max(1, wk + offset)
+def compute_auto_week(offset=0, year=None) -> int:
+    """Latest final NFL week of the season (season calendar, no network), plus offset"""
+    return max(1, resolve_week(year) + offset)
 
 def load_config(config_path: str):
     """Load league configuration from YAML or JSON"""
@@ -65,28 +83,36 @@ def load_config(config_path: str):
         raise ValueError(f"Invalid config format in {config_path}")
 
 def run_one_league(league_id, year, week, args):
-    """Build gazette for a single league"""
+    """Build gazette for a single league; returns (returncode, output)"""
     cmd = [
         sys.executable, "build_gazette.py",
         "--league-id", str(league_id),
         "--year", str(year),
         "--week", str(week),
-        "--output-dir", args.output_dir,
+        "--output", str(Path(args.output_dir) / str(league_id) / "Gazette_{year}_W{week02}.pdf"),
+        "--llm-blurbs" if args.llm_blurbs else "--no-llm",
     ]
     
-    # Add LLM options if enabled
-    if args.llm_blurbs:
-        cmd.extend([
-            "--llm-blurbs",
-            "--blurb-style", args.blurb_style,
-            "--blurb-words", str(args.blurb_words),
-        ])
-    
     if args.verbose:
         cmd.append("--verbose")
         print(f"[multi] Command: {' '.join(shlex.quote(c) for c in cmd)}")
     
-    return subprocess.run(cmd).returncode
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return proc.returncode, proc.stdout or ""
+
+def run_job(job: Job, args) -> None:
+    """Queue runner: build one league, keep its log, raise on failure (the queue retries)"""
+    args = argparse.Namespace(**{**vars(args), **job.options})  # the options the job was queued with
+    rc, output = run_one_league(job.league_id, job.year, job.week, args)
+    log = Path(args.output_dir) / "logs" / f"{job.league_id}_W{job.week:02d}.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(f"=== attempt {job.attempts} (rc={rc}) ===\n{output}\n")
+    if args.verbose:
+        print(output)
+    if rc != 0:
+        tail = " | ".join(line for line in output.strip().splitlines()[-3:])
+        raise RuntimeError(f"rc={rc}: {tail} (log: {log})")
 
 def main():
     args = parse_args()
@@ -114,9 +140,10 @@ def main():
         print(f"Blurb Style: {args.blurb_style}")
     print()
     
-    # Process each league
-    failures = []
-    successes = []
+    # Queue each league (already built ones are skipped), then drain the queue
+    queue = JobQueue(args.db)
+    options = {"llm_blurbs": bool(args.llm_blurbs), "output_dir": args.output_dir}
+    job_ids = []
     
     for i, league_cfg in enumerate(leagues, 1):
         # Handle different config formats
@@ -132,22 +159,31 @@ def main():
             print(f"[WARN] Skipping {name}: missing id or year")
             continue
         
-        print(f"[{i}/{len(leagues)}] Building {name} (id={league_id})...")
-        
-        t0 = time.time()
-        rc = run_one_league(league_id, year, week, args)
-        dt_s = time.time() - t0
+        # Finality comes from the cached season calendar: no ESPN call to decide
+        calendar = get_calendar(int(year))
+        final_at = calendar.final_at(week)
+        if not calendar.is_final(week) and not args.allow_unfinished:
+            when = (f"not final until {dt.datetime.fromtimestamp(final_at):%a %b %d %H:%M}" if final_at
+                    else f"not in the {year} season")
+            print(f"[{i}/{len(leagues)}] {name} (id={league_id}): skipped, week {week} {when}")
+            continue
         
-        if rc == 0:
-            print(f"  ✅ SUCCESS in {dt_s:.1f}s")
-            successes.append(name)
-        else:
-            print(f"  ❌ FAILED (rc={rc})")
-            failures.append({"name": name, "id": league_id, "rc": rc})
-            
-            if args.stop_on_fail:
-                print("[multi] Stopping due to failure (--stop-on-fail)")
-                break
+        job_id, queued = queue.enqueue(
+            league_id, year, week, name=name, priority=int(league_cfg.get("priority", 0)),
+            options=options, max_attempts=args.attempts, force=args.force, stale_before=final_at or 0.0,
+        )
+        job_ids.append(job_id)
+        print(f"[{i}/{len(leagues)}] {name} (id={league_id}): {'queued' if queued else 'already queued or built'}")
+    
+    t0 = time.time()
+    run_workers(queue, lambda job: run_job(job, args), concurrency=args.workers, stop_on_fail=args.stop_on_fail,
+                job_ids=job_ids)
+    print(f"[multi] Queue drained in {time.time() - t0:.1f}s")
+    
+    jobs = [job for job in queue.jobs(week) if job.id in job_ids]
+    successes = [job.label for job in jobs if job.status == DONE]
+    failures = [{"name": job.label, "id": job.league_id, "status": job.status, "error": job.last_error}
+                for job in jobs if job.status != DONE]
     
     # Summary
     print(f"\n=== Summary ===")
@@ -162,7 +198,7 @@ def main():
     if failures:
         print(f"\n❌ Failed leagues:")
         for f in failures:
-            print(f"  - {f['name']} (id={f['id']}, rc={f['rc']})")
+            print(f"  - {f['name']} (id={f['id']}, {f['status']}): {f['error'][-200:]}")
     
     sys.exit(1 if failures else 0)
 